@@ -0,0 +1,164 @@
+"""
+Controle de admissão: classes de prioridade e rate limit por cliente
+
+Sobe o app (uvicorn) com poucas vagas para auditorias e confere que:
+- durante uma rajada de auditorias lentas (servidor com ?delay=), o
+  /calculate-roi continua com a mesma latência de antes da rajada
+- auditorias além das vagas + fila recebem 503 na hora, com Retry-After
+- um cliente que estoura o token bucket recebe 429 com Retry-After, sem
+  afetar outro cliente (X-Client-Id diferente)
+- sem X-API-Secret, trocar o X-Client-Id a cada pedido não escapa do
+  bucket: o cliente é o IP
+- rotas fora do controle (/health) nunca são recusadas
+Uso (a partir de backend/):
+    python -m benchmarks.bench_admission [--audits 24] [--delay 0.6]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_content_stream import SECRET, free_port, start_app
+from benchmarks.stand_in import serve_corpus
+
+HEAVY_CONCURRENCY = 4
+HEAVY_QUEUE = 6
+INTERACTIVE_RATE = 50
+INTERACTIVE_BURST = 20
+ROI_BODY = {"investimento_inicial": 10000, "investimento_mensal": 1000, "receita_mensal": 4000, "periodo_meses": 24}
+
+
+def roi_latencies(client: httpx.Client, url: str, calls: int, client_id: str) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        response = client.post(url, json=ROI_BODY, headers={"X-Client-Id": client_id})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, (response.status_code, response.text)
+        # Abaixo da taxa do token bucket (INTERACTIVE_RATE)
+        time.sleep(1 / (INTERACTIVE_RATE / 2))
+    return samples
+
+
+def summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+def main(audits: int, delay: float) -> None:
+    report: Dict[str, Any] = {"audits": audits, "delay_s": delay}
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+
+    # Configuração lida na importação do app (antes de start_app)
+    os.environ.update({
+        "FASTAPI_SECRET": SECRET,
+        "ADMISSION_ENABLED": "true",
+        "ADMISSION_HEAVY_CONCURRENCY": str(HEAVY_CONCURRENCY),
+        "ADMISSION_HEAVY_QUEUE": str(HEAVY_QUEUE),
+        "ADMISSION_HEAVY_QUEUE_TIMEOUT": "30",
+        "RATE_LIMIT_HEAVY_PER_SECOND": "0",
+        "RATE_LIMIT_INTERACTIVE_PER_SECOND": str(INTERACTIVE_RATE),
+        "RATE_LIMIT_INTERACTIVE_BURST": str(INTERACTIVE_BURST),
+    })
+
+    with serve_corpus() as site, httpx.Client(timeout=60, headers={"X-API-Secret": SECRET}) as client:
+        server, thread = start_app(port)
+        try:
+            roi_url = f"{base}/api/v1/calculate-roi"
+            roi_latencies(client, roi_url, 10, "aquecimento")
+            # Primeira auditoria sobe os workers do pool de análise (spawn): fora da medição
+            assert client.post(f"{base}/api/v1/analyze-seo", json={"url": f"{site}/small"}).status_code == 200
+            report["roi_idle"] = summary(roi_latencies(client, roi_url, 40, "painel"))
+
+            # Rajada de auditorias lentas em paralelo, ROI medido ao mesmo tempo. Um só
+            # cliente para as auditorias: criar um httpx.Client por thread (contexto SSL)
+            # disputa o GIL com o app, que roda neste mesmo processo
+            audit_client = httpx.Client(
+                timeout=60, headers={"X-API-Secret": SECRET}, limits=httpx.Limits(max_connections=audits)
+            )
+
+            def audit(index: int) -> httpx.Response:
+                url = f"{site}/medium?delay={delay}&n={index}"
+                return audit_client.post(f"{base}/api/v1/analyze-seo", json={"url": url})
+
+            barrier = threading.Event()
+            with audit_client, ThreadPoolExecutor(max_workers=audits) as pool:
+                futures = [pool.submit(lambda i=i: (barrier.wait(), audit(i))[1]) for i in range(audits)]
+                barrier.set()
+                time.sleep(0.1)
+                during = roi_latencies(client, roi_url, 40, "painel")
+                responses = [future.result() for future in futures]
+            report["roi_during_audits"] = summary(during)
+
+            statuses = [response.status_code for response in responses]
+            overloaded = [response for response in responses if response.status_code == 503]
+            assert set(statuses) <= {200, 503}, statuses
+            assert statuses.count(200) >= HEAVY_CONCURRENCY + HEAVY_QUEUE, statuses
+            assert overloaded, statuses
+            for response in overloaded:
+                assert int(response.headers["retry-after"]) >= 1, response.headers
+                assert "ocupado" in response.json()["detail"]
+            rejected_ms = max(response.elapsed.total_seconds() * 1000 for response in overloaded)
+            # Recusa imediata (sem esperar a fila andar)
+            assert rejected_ms < delay * 1000 / 2, rejected_ms
+            report["audit_burst"] = {"ok": statuses.count(200), "503": len(overloaded), "slowest_503_ms": round(rejected_ms, 1)}
+
+            # ROI não espera pelas auditorias: latência da mesma ordem de grandeza
+            assert report["roi_during_audits"]["p95_ms"] < max(50.0, 5 * report["roi_idle"]["p95_ms"]), report
+            assert report["roi_during_audits"]["p95_ms"] < delay * 1000 / 2, report
+
+            # Token bucket: rajada acima do burst vira 429; outro cliente segue normal
+            abusive = [
+                client.post(roi_url, json=ROI_BODY, headers={"X-Client-Id": "abusivo"})
+                for _ in range(INTERACTIVE_BURST * 3)
+            ]
+            limited = [response for response in abusive if response.status_code == 429]
+            assert limited and all(response.status_code in (200, 429) for response in abusive)
+            assert abusive[0].status_code == 200
+            assert all(int(response.headers["retry-after"]) >= 1 for response in limited)
+            assert client.post(roi_url, json=ROI_BODY, headers={"X-Client-Id": "outro"}).status_code == 200
+            assert all(client.get(f"{base}/health").status_code == 200 for _ in range(INTERACTIVE_BURST * 2))
+            time.sleep(int(limited[-1].headers["retry-after"]))
+            assert client.post(roi_url, json=ROI_BODY, headers={"X-Client-Id": "abusivo"}).status_code == 200
+            # Sem o secret o X-Client-Id é ignorado: ids sorteados caem todos no bucket do IP
+            with httpx.Client(timeout=60) as anonymous:
+                spoofed = [
+                    anonymous.post(roi_url, json=ROI_BODY, headers={"X-Client-Id": f"falso-{index}"})
+                    for index in range(INTERACTIVE_BURST * 3)
+                ]
+            spoofed_limited = [response for response in spoofed if response.status_code == 429]
+            assert spoofed_limited and all(response.status_code in (401, 429) for response in spoofed), spoofed
+            report["rate_limit"] = {"calls": len(abusive), "429": len(limited), "spoofed_429": len(spoofed_limited)}
+            # O pedido de stats abaixo (sem X-Client-Id) usa o mesmo bucket do IP
+            time.sleep(int(spoofed_limited[-1].headers["retry-after"]))
+
+            stats = client.get(f"{base}/api/v1/stats/admission").json()
+        finally:
+            server.should_exit = True
+            thread.join()
+
+    heavy = stats["classes"]["heavy"]
+    assert heavy["overloaded"] == len(overloaded) and heavy["limiter"]["peak_active"] <= HEAVY_CONCURRENCY, heavy
+    assert stats["classes"]["interactive"]["rate_limited"] == len(limited) + len(spoofed_limited), stats
+    report["stats"] = {name: {key: value for key, value in data.items() if key != "limiter"} for name, data in stats["classes"].items()}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audits", type=int, default=24)
+    parser.add_argument("--delay", type=float, default=0.6)
+    args = parser.parse_args()
+    main(args.audits, args.delay)
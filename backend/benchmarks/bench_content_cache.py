@@ -0,0 +1,131 @@
+"""
+Geração de conteúdo: cache por prompt, cliente OpenAI compartilhado e limite de concorrência
+
+Sobe o app (uvicorn) apontando para o servidor fake da OpenAI e mede:
+- pedido refeito por um editor (mesmo prompt com maiúsculas/espaços diferentes):
+  a segunda resposta vem do cache, sem chamar o modelo
+- rajada de pedidos idênticos simultâneos: uma única chamada ao modelo
+- rajada de pedidos distintos: no máximo OPENAI_MAX_CONCURRENCY chamadas
+  simultâneas chegam ao modelo, as demais esperam na fila sem erro, e as
+  conexões com a OpenAI são reaproveitadas
+Uso (a partir de backend/):
+    python -m benchmarks.bench_content_cache [--burst 24] [--max-concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.bench_content_stream import SECRET, free_port, read_events, start_app
+from benchmarks.fake_openai import serve_fake_openai
+
+BODY = {
+    "topic": "Como medir o ROI de campanhas de SEO",
+    "content_type": "blog_post",
+    "length": "medium",
+    "keywords": ["roi", "seo"],
+}
+# O mesmo pedido digitado de outro jeito (cai na mesma chave do cache)
+RETRY = {**BODY, "topic": "  como medir o ROI de campanhas   de seo "}
+
+
+async def timed_posts(base: str, bodies: List[Dict[str, Any]]) -> Tuple[float, List[Dict[str, Any]]]:
+    """Envia os pedidos ao mesmo tempo; retorna (tempo total em ms, respostas)"""
+    async with httpx.AsyncClient(timeout=120, headers={"X-API-Secret": SECRET}) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post(f"{base}/generate-content", json=body) for body in bodies))
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+    for response in responses:
+        assert response.status_code == 200, response.text
+    return elapsed, [response.json() for response in responses]
+
+
+def main(burst: int, max_concurrency: int) -> None:
+    report: Dict[str, Any] = {"burst": burst, "max_concurrency": max_concurrency}
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api/v1"
+
+    with serve_fake_openai(tokens=300, first_token_delay=0.2, token_delay=0.001) as fake:
+        # Configuração lida na importação do app (antes de start_app)
+        os.environ.update({
+            "FASTAPI_SECRET": SECRET,
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": fake.url,
+            "OPENAI_MAX_CONCURRENCY": str(max_concurrency),
+        })
+        server, thread = start_app(port)
+        try:
+            # Editor refaz o pedido: MISS e depois HIT
+            miss_ms, (first,) = asyncio.run(timed_posts(base, [BODY]))
+            hit_ms, (retry,) = asyncio.run(timed_posts(base, [RETRY]))
+            assert first["generated_with_ai"] and not first["cached"], first
+            assert retry["cached"] and retry["content"] == first["content"], retry
+            assert len(fake.requests) == 1, len(fake.requests)
+            report["retry"] = {"miss_ms": miss_ms, "hit_ms": hit_ms, "speedup": round(miss_ms / hit_ms, 1)}
+
+            # use_cache=false força uma geração nova
+            _, (fresh,) = asyncio.run(timed_posts(base, [{**BODY, "use_cache": False}]))
+            assert not fresh["cached"] and len(fake.requests) == 2, fresh
+
+            # O streaming reaproveita o mesmo cache
+            with httpx.Client(timeout=120) as client:
+                stream_ttfb_ms, _, events = read_events(client, f"{base}/generate-content/stream", RETRY)
+            done = events[-1][1]
+            assert done["cached"] and len(fake.requests) == 2, done
+            assert "".join(data["content"] for name, data in events if name == "token") == first["content"]
+            report["stream_hit_ttfb_ms"] = stream_ttfb_ms
+
+            # Rajada de pedidos idênticos (novo tópico): uma única chamada ao modelo
+            same = {**BODY, "topic": "Checklist de SEO técnico para lojas virtuais"}
+            before = len(fake.requests)
+            same_ms, results = asyncio.run(timed_posts(base, [same] * burst))
+            assert len(fake.requests) - before == 1, len(fake.requests) - before
+            assert len({result["content"] for result in results}) == 1
+            report["identical_burst"] = {"requests": burst, "upstream_calls": 1, "total_ms": same_ms}
+
+            # Rajada de pedidos distintos: fila no limitador, nenhum fallback
+            before = len(fake.requests)
+            distinct = [{**BODY, "topic": f"Estratégia de conteúdo número {index}"} for index in range(burst)]
+            distinct_ms, results = asyncio.run(timed_posts(base, distinct))
+            assert all(result["generated_with_ai"] for result in results), "fallback para template na rajada"
+            assert len(fake.requests) - before == burst
+            assert fake.peak_concurrency <= max_concurrency, fake.peak_concurrency
+
+            with httpx.Client(timeout=30, headers={"X-API-Secret": SECRET}) as client:
+                stats = client.get(f"{base}/stats/content").json()
+        finally:
+            server.should_exit = True
+            thread.join()
+
+    limiter = stats["openai"]["limiter"]
+    assert limiter["peak_active"] <= max_concurrency and limiter["queue_timeouts"] == 0, limiter
+    if burst > max_concurrency:
+        assert limiter["peak_waiting"] > 0, limiter
+    # Cliente único: as conexões com a OpenAI são reaproveitadas entre as chamadas
+    assert fake.connections <= max_concurrency + 1, (fake.connections, len(fake.requests))
+
+    report["distinct_burst"] = {
+        "requests": burst,
+        "total_ms": distinct_ms,
+        "upstream_peak_concurrency": fake.peak_concurrency,
+        "peak_waiting": limiter["peak_waiting"],
+        "avg_wait_ms": limiter["wait"]["avg_ms"],
+    }
+    report["upstream"] = {"requests": len(fake.requests), "connections": fake.connections}
+    report["cache"] = {key: stats["cache"][key] for key in ("hits", "misses", "bypassed")}
+    report["cache"]["coalesced"] = stats["cache"]["single_flight"]["coalesced"]
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--burst", type=int, default=24)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    main(args.burst, args.max_concurrency)
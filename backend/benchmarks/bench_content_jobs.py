@@ -0,0 +1,223 @@
+"""
+Jobs de geração de conteúdo em lote contra o servidor fake da OpenAI
+
+Envia dois jobs (um com system prompt próprio), reinicia o app no meio do
+processamento e confere que:
+- todos os itens terminam depois do reinício, sem perder os já gerados
+- erros transitórios (503) são tentados de novo com backoff e erros
+  definitivos (400) falham na primeira tentativa; fora da OpenAI, só rede,
+  timeout e fila do limitador contam como transitórios (ValueError etc. não)
+- cada tentativa registrada é uma chamada que chegou ao modelo (a interrompida
+  pelo reinício antes de sair não conta)
+- no máximo CONTENT_JOBS_WORKERS chamadas simultâneas chegam ao modelo
+- itens com o mesmo system prompt são gerados em sequência
+- a paginação e o filtro por status devolvem todos os itens
+Uso (a partir de backend/):
+    python -m benchmarks.bench_content_jobs [--items 150] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_content_stream import SECRET, free_port, start_app
+from benchmarks.fake_openai import FAIL_MARKER, FLAKY_FAILURES, FLAKY_MARKER, serve_fake_openai
+
+BRAND_PROMPT = "Você escreve para a marca Orbee: frases curtas, tom direto, sem jargão."
+
+
+def post(index: int) -> Dict[str, Any]:
+    topic = f"Post {index} da campanha de SEO local"
+    if index % 25 == 3:
+        topic += f" {FLAKY_MARKER}"
+    elif index % 50 == 7:
+        topic += f" {FAIL_MARKER}"
+    return {"topic": topic, "content_type": "social_media", "length": "short", "keywords": ["seo local"]}
+
+
+def all_items(client: httpx.Client, url: str, **params: Any) -> List[Dict[str, Any]]:
+    """Percorre a paginação até next_offset = null"""
+    items: List[Dict[str, Any]] = []
+    offset = 0
+    while offset is not None:
+        page = client.get(url, params={**params, "offset": offset, "limit": 40}).json()
+        items += page["results"]
+        offset = page["pagination"]["next_offset"]
+    return items
+
+
+def wait_jobs(client: httpx.Client, base: str, job_ids: List[str], timeout: float = 120) -> Dict[str, Any]:
+    deadline = time.time() + timeout
+    while True:
+        jobs = {job_id: client.get(f"{base}/content-jobs/{job_id}", params={"limit": 1}).json() for job_id in job_ids}
+        if all(job["status"] == "completed" for job in jobs.values()):
+            return jobs
+        assert time.time() < deadline, jobs
+        time.sleep(0.1)
+
+
+def check_retryable() -> None:
+    """Classificação dos erros: só os transitórios voltam para a fila"""
+    import openai
+
+    from services.concurrency import QueueFullError, QueueTimeoutError
+    from services.content_jobs import retryable
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    def status_error(status: int) -> Exception:
+        return openai.APIStatusError("erro", response=httpx.Response(status, request=request), body=None)
+
+    transient = [
+        openai.APIConnectionError(request=request),
+        openai.APITimeoutError(request=request),
+        asyncio.TimeoutError(),
+        QueueFullError("fila cheia"),
+        QueueTimeoutError("espera esgotada"),
+        *(status_error(status) for status in (408, 409, 429, 500, 503)),
+    ]
+    definitive = [ValueError("bug"), KeyError("topic"), TypeError("bug"), *(status_error(status) for status in (400, 401, 404, 422))]
+    assert all(retryable(error) for error in transient), [error for error in transient if not retryable(error)]
+    assert not any(retryable(error) for error in definitive), [error for error in definitive if retryable(error)]
+
+
+def main(items: int, workers: int) -> None:
+    report: Dict[str, Any] = {"items": items, "workers": workers}
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api/v1"
+    db_path = os.path.join(tempfile.mkdtemp(), "content_jobs.sqlite3")
+
+    with serve_fake_openai(tokens=120, first_token_delay=0.05, token_delay=0.0005) as fake:
+        # Configuração lida na importação do app (antes de start_app)
+        os.environ.update({
+            "FASTAPI_SECRET": SECRET,
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": fake.url,
+            # Sem as novas tentativas do SDK: quem tenta de novo é o job
+            "OPENAI_MAX_RETRIES": "0",
+            "CONTENT_JOBS_DB_PATH": db_path,
+            "CONTENT_JOBS_WORKERS": str(workers),
+            "CONTENT_JOBS_RETRY_BASE": "0.05",
+        })
+        brand_items = items // 3
+        bodies = [post(index) for index in range(items)]
+        brand_bodies = [{**post(index), "topic": f"Post {index} da marca"} for index in range(brand_items)]
+
+        with httpx.Client(timeout=60, headers={"X-API-Secret": SECRET}) as client:
+            server, thread = start_app(port)
+            started = time.perf_counter()
+            try:
+                response = client.post(f"{base}/content-jobs", json={"items": bodies})
+                assert response.status_code == 202, response.text
+                default_job = response.json()
+                submit_ms = round((time.perf_counter() - started) * 1000, 1)
+                brand_job = client.post(
+                    f"{base}/content-jobs", json={"items": brand_bodies, "system_prompt": BRAND_PROMPT}
+                ).json()
+                assert default_job["status"] == "queued" and default_job["total"] == items
+
+                too_many = client.post(f"{base}/content-jobs", json={"items": [post(0)] * 10_000})
+                assert too_many.status_code == 422, too_many.status_code
+                assert client.get(f"{base}/content-jobs/inexistente").status_code == 404
+
+                # Reinício no meio do job
+                while client.get(f"{base}/content-jobs/{default_job['id']}").json()["items"]["done"] < items // 3:
+                    time.sleep(0.05)
+            finally:
+                server.should_exit = True
+                thread.join()
+            before_restart = len(fake.requests)
+
+            # Desligamento limpo: nada fica "running" no SQLite
+            with sqlite3.connect(db_path) as conn:
+                states = dict(conn.execute("SELECT status, COUNT(*) FROM content_job_items GROUP BY status").fetchall())
+            assert "running" not in states and states.get("pending"), states
+            done_before = states.get("done", 0)
+
+            server, thread = start_app(port)
+            try:
+                jobs = wait_jobs(client, base, [default_job["id"], brand_job["id"]])
+                elapsed = round(time.perf_counter() - started, 2)
+
+                results = all_items(client, f"{base}/content-jobs/{default_job['id']}")
+                failed = all_items(client, f"{base}/content-jobs/{default_job['id']}", status="failed")
+                stats = client.get(f"{base}/stats/content").json()["jobs"]
+            finally:
+                server.should_exit = True
+                thread.join()
+
+    job = jobs[default_job["id"]]
+    expected_failed = [index for index in range(items) if FAIL_MARKER in bodies[index]["topic"]]
+    flaky = [index for index in range(items) if FLAKY_MARKER in bodies[index]["topic"]]
+    assert [item["index"] for item in results] == list(range(items))
+    assert [item["index"] for item in failed] == expected_failed, failed
+    assert job["succeeded"] == items - len(expected_failed) and job["failed"] == len(expected_failed), job
+    assert jobs[brand_job["id"]]["succeeded"] == brand_items
+    # Chamadas ao modelo por tópico (primeira linha do prompt: "Crie um <tipo> sobre: <tópico>")
+    upstream = Counter(
+        request["messages"][1]["content"].split("\n", 1)[0].split("sobre: ", 1)[1] for request in fake.requests
+    )
+    interrupted = 0
+    for item in results:
+        calls = upstream[bodies[item["index"]]["topic"]]
+        # Cada tentativa é uma chamada que chegou ao modelo, nem mais nem menos
+        assert item["attempts"] == calls, (item, calls)
+        if item["index"] in flaky:
+            assert item["status"] == "done" and item["attempts"] >= FLAKY_FAILURES + 1, item
+            interrupted += item["attempts"] - (FLAKY_FAILURES + 1)
+        elif item["index"] in expected_failed:
+            assert item["status"] == "failed" and "400" in item["error"], item
+            interrupted += item["attempts"] - 1
+        else:
+            assert item["status"] == "done", item
+            assert item["result"]["generated_with_ai"] and item["result"]["content"], item
+            interrupted += item["attempts"] - 1
+    # Tentativa extra só para quem estava com a chamada em andamento no desligamento
+    assert interrupted <= workers, interrupted
+
+    # Só os itens em andamento no desligamento podem ter sido gerados duas vezes
+    expected_calls = items + brand_items + FLAKY_FAILURES * len(flaky)
+    assert expected_calls <= len(fake.requests) <= expected_calls + workers, (len(fake.requests), expected_calls)
+    assert fake.peak_concurrency <= workers, fake.peak_concurrency
+
+    # Troca de system prompt entre chamadas consecutivas ao modelo
+    prompts = [request["messages"][0]["content"] for request in fake.requests]
+    switches = sum(1 for previous, current in zip(prompts, prompts[1:]) if previous != current)
+    brand_calls = sum(1 for prompt in prompts if prompt == BRAND_PROMPT)
+    assert brand_items <= brand_calls <= brand_items + workers, brand_calls
+    assert switches <= 4 * workers, switches
+
+    report["submit_ms"] = submit_ms
+    report["total_s"] = elapsed
+    report["restart"] = {
+        "done_before": done_before,
+        "upstream_calls_before": before_restart,
+        "interrupted_calls": interrupted,
+    }
+    report["upstream"] = {
+        "calls": len(fake.requests),
+        "expected_calls": expected_calls,
+        "peak_concurrency": fake.peak_concurrency,
+        "system_prompt_switches": switches,
+    }
+    report["retries"] = {"flaky_items": len(flaky), "failed_items": len(expected_failed)}
+    # Depois do app: importar services.content_jobs antes fixaria o CONTENT_JOBS_DB_PATH padrão
+    check_retryable()
+    report["jobs_stats_after_restart"] = stats
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.items, args.workers)
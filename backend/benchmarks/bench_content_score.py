@@ -0,0 +1,138 @@
+"""
+Score SEO do conteúdo gerado, no processo (sem URL nem fetch)
+
+Mede score_content em textos do tamanho das gerações (template, short,
+medium e long em Markdown e o mesmo texto em HTML) e confere que:
+- cada documento leva bem menos de 10 ms (p95 < 10 ms)
+- Markdown e HTML do mesmo texto dão os mesmos headings, palavras e
+  ocorrências das palavras-chave
+- as páginas do corpus também podem ser pontuadas como HTML
+- o pior caso aceito pela API (100 KB de texto, 50 palavras-chave) fica
+  abaixo de WORST_CASE_BUDGET_MS
+Uso (a partir de backend/):
+    python -m benchmarks.bench_content_score [--runs 200]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import load_corpus
+from benchmarks.fake_openai import WORDS
+from services.content_generator import generate_template_content
+from services.seo_analyzer import score_content
+
+KEYWORDS = ["seo local", "marketing digital", "palavras-chave", "orbee"]
+BUDGET_MS = 10.0
+# Limites de ContentScoreRequest (content max_length e keywords max_length)
+MAX_CONTENT_CHARS = 100000
+MAX_KEYWORDS = 50
+WORST_CASE_BUDGET_MS = 100.0
+
+
+def generated_markdown(words: int) -> str:
+    """Texto no formato típico da geração: H1, seções H2/H3, listas, links e ênfase"""
+    vocabulary = WORDS + ["seo", "local", "para", "empresas", "com", "resultados"]
+    lines = ["# Guia de SEO local para pequenas empresas", ""]
+    written = 0
+    section = 0
+    while written < words:
+        section += 1
+        lines += [f"## Seção {section}: marketing digital na prática", ""]
+        paragraph = " ".join(vocabulary[(written + offset) % len(vocabulary)] for offset in range(60))
+        lines += [f"{paragraph}. Veja o **seo local** e o [guia completo](/blog/guia-{section}).", ""]
+        if section % 2 == 0:
+            lines += ["### Checklist", "", "- palavras-chave no título", "- links internos", "1. medir", ""]
+        written += 75
+    return "\n".join(lines)
+
+
+def markdown_to_html(markdown: str) -> str:
+    """Conversão mínima (headings, listas, links, ênfase) para comparar os dois formatos"""
+    html: List[str] = []
+    for line in markdown.splitlines():
+        line = re.sub(r"\[([^\]]*)\]\(([^)]*)\)", r'<a href="\2">\1</a>', line)
+        line = re.sub(r"\*\*([^*]+)\*\*", r"<strong>\1</strong>", line)
+        heading = re.match(r"(#{1,6}) (.*)", line)
+        if heading:
+            level = len(heading.group(1))
+            html.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif re.match(r"(?:- |\d+\. )", line):
+            html.append(f"<ul><li>{line.split(' ', 1)[1]}</li></ul>")
+        elif line.strip():
+            html.append(f"<p>{line}</p>")
+    return "<article>" + "\n".join(html) + "</article>"
+
+
+def latency(fn: Callable[[], Any], runs: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def main(runs: int) -> None:
+    template = generate_template_content("SEO local para empresas", "blog_post", "professional", "long", KEYWORDS, None)
+    documents = {
+        "template": template["content"],
+        "short_md": generated_markdown(400),
+        "medium_md": generated_markdown(900),
+        "long_md": generated_markdown(2000),
+    }
+    documents["long_html"] = markdown_to_html(documents["long_md"])
+
+    report: Dict[str, Any] = {"runs": runs, "budget_ms": BUDGET_MS, "documents": {}}
+    for name, content in documents.items():
+        result = score_content(content, KEYWORDS)
+        timing = latency(lambda: score_content(content, KEYWORDS), runs)
+        assert timing["p95_ms"] < BUDGET_MS, (name, timing)
+        report["documents"][name] = {
+            "format": result["format"],
+            "words": result["word_count"],
+            "overall_score": result["overall_score"],
+            **timing,
+        }
+
+    # Mesmo texto em Markdown e HTML: mesma estrutura e mesmas palavras-chave
+    markdown = score_content(documents["long_md"], KEYWORDS)
+    html = score_content(documents["long_html"], KEYWORDS)
+    assert markdown["format"] == "markdown" and html["format"] == "html"
+    assert markdown["categories"]["headings"] == html["categories"]["headings"], (markdown, html)
+    assert markdown["word_count"] == html["word_count"], (markdown["word_count"], html["word_count"])
+    assert markdown["categories"]["keywords"] == html["categories"]["keywords"]
+    assert markdown["overall_score"] == html["overall_score"]
+    assert markdown["categories"]["keywords"]["coverage"] == 0.75  # "orbee" não aparece
+
+    # Pior caso aceito pelo /score-content: o custo cresce com o texto x o número de palavras-chave
+    worst = generated_markdown(MAX_CONTENT_CHARS // 4)[:MAX_CONTENT_CHARS]
+    worst_keywords = [f"{WORDS[index % len(WORDS)]} {index}" for index in range(MAX_KEYWORDS)]
+    timing = latency(lambda: score_content(worst, worst_keywords), 10)
+    assert timing["p95_ms"] < WORST_CASE_BUDGET_MS, timing
+    report["worst_case"] = {"chars": len(worst), "keywords": MAX_KEYWORDS, **timing}
+
+    # Páginas inteiras do corpus (HTML com head, scripts, ...) também funcionam
+    corpus = load_corpus()
+    report["corpus"] = {
+        name: {"words": score_content(page, ["seo"])["word_count"], **latency(lambda: score_content(page, ["seo"]), 20)}
+        for name, page in corpus.items()
+        if name != "huge"
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    main(args.runs)
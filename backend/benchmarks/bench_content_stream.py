@@ -0,0 +1,139 @@
+"""
+Geração de conteúdo: resposta completa vs. streaming SSE
+
+Sobe o app (uvicorn) apontando para o servidor fake da OpenAI e mede o tempo
+até o primeiro byte útil nos dois endpoints. Confere que o streaming entrega
+o mesmo texto e os mesmos metadados da resposta completa e que o template
+de fallback também é enviado em streaming quando a OpenAI falha.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_content_stream [--tokens 400] [--token-delay 0.01]
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.fake_openai import FAIL_MARKER, serve_fake_openai
+
+SECRET = "bench-secret"
+BODY = {
+    "topic": "Como medir o ROI de campanhas de SEO",
+    "content_type": "blog_post",
+    "length": "long",
+    "keywords": ["roi", "seo"],
+    # Sempre gerar de novo: o streaming não pode vir do cache da resposta completa
+    "use_cache": False,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(port: int):
+    import uvicorn
+
+    # Os benchmarks são um único cliente disparando em rajada: sem rate limit por
+    # cliente, a menos que o benchmark configure outro valor (ex.: bench_admission)
+    for name in ("INTERACTIVE", "STANDARD", "HEAVY"):
+        os.environ.setdefault(f"RATE_LIMIT_{name}_PER_SECOND", "0")
+
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+def read_events(
+    client: httpx.Client, url: str, body: Dict[str, Any]
+) -> Tuple[float, float, List[Tuple[str, Dict[str, Any]]]]:
+    """Eventos SSE (nome, dados), tempo até o primeiro token e tempo total (ms)"""
+    events: List[Tuple[str, Dict[str, Any]]] = []
+    first_token_ms = None
+    started = time.perf_counter()
+    with client.stream("POST", url, json=body, headers={"X-API-Secret": SECRET}) as response:
+        assert response.status_code == 200, response.status_code
+        assert response.headers["content-type"].startswith("text/event-stream")
+        name = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                name = line[len("event: "):]
+            elif line.startswith("data: "):
+                if name == "token" and first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started) * 1000
+                events.append((name, json.loads(line[len("data: "):])))
+    return round(first_token_ms, 1), round((time.perf_counter() - started) * 1000, 1), events
+
+
+def main(tokens: int, token_delay: float) -> None:
+    report: Dict[str, Any] = {"tokens": tokens, "token_delay_s": token_delay}
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api/v1"
+
+    with serve_fake_openai(tokens=tokens, token_delay=token_delay) as fake:
+        # Configuração lida na importação do app (antes de start_app)
+        os.environ.update({"FASTAPI_SECRET": SECRET, "OPENAI_API_KEY": "sk-fake", "OPENAI_BASE_URL": fake.url})
+        server, thread = start_app(port)
+        try:
+            with httpx.Client(timeout=120) as client:
+                started = time.perf_counter()
+                complete = client.post(f"{base}/generate-content", json=BODY, headers={"X-API-Secret": SECRET})
+                complete_ms = round((time.perf_counter() - started) * 1000, 1)
+                assert complete.status_code == 200, complete.text
+                expected = complete.json()
+                assert expected["generated_with_ai"] is True
+
+                first_token_ms, total_ms, events = read_events(client, f"{base}/generate-content/stream", BODY)
+                # OpenAI com erro: o template de fallback também chega em streaming
+                fallback = read_events(
+                    client, f"{base}/generate-content/stream", {**BODY, "topic": f"{BODY['topic']} {FAIL_MARKER}"}
+                )
+        finally:
+            server.should_exit = True
+            thread.join()
+
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and set(names[:-1]) == {"token"}, names[-3:]
+    done = events[-1][1]
+    content = "".join(data["content"] for name, data in events if name == "token")
+    assert content == expected.pop("content")
+    assert {key: done[key] for key in expected} == expected, (done, expected)
+    # O primeiro token chega com o primeiro token da OpenAI, não com o fim da geração
+    assert first_token_ms < complete_ms / 3, (first_token_ms, complete_ms)
+
+    report["complete"] = {"ttfb_ms": complete_ms}
+    report["stream"] = {
+        "ttfb_ms": first_token_ms,
+        "total_ms": total_ms,
+        "events": len(events),
+        "upstream_ttfb_ms": done["ttfb_ms"],
+    }
+    report["ttfb_speedup"] = round(complete_ms / first_token_ms, 1)
+
+    first_token_ms, total_ms, events = fallback
+    done = events[-1][1]
+    assert events[-1][0] == "done" and done["generated_with_ai"] is False, events[-1]
+    assert len(events) > 10
+    report["template_fallback"] = {"ttfb_ms": first_token_ms, "total_ms": total_ms, "events": len(events)}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+    main(args.tokens, args.token_delay)
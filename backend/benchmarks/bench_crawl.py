@@ -0,0 +1,75 @@
+"""
+Crawl do site de exemplo (benchmarks/corpus/site) servido localmente
+
+Mostra as métricas agregadas (títulos/descriptions duplicados, páginas órfãs,
+distribuição de H1) e o tempo total do crawl, conferindo que:
+- cada página é visitada uma vez (o link com #fragmento e a repetição no sitemap
+  não geram visita nova) e PDF, mailto e links externos ficam de fora
+- links malformados (IPv6 quebrado, porta > 65535), na página ou no sitemap,
+  são ignorados e contados sem derrubar o crawl
+Uso (a partir de backend/):
+    python -m benchmarks.bench_crawl [--bloom]
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict
+
+from benchmarks.common import load_site
+from benchmarks.stand_in import serve_corpus
+from services import analysis_pool
+from services.http_client import close_http_client
+from services.seo_batch import load_sitemap
+from services.site_crawler import crawl_site
+
+# Páginas alcançáveis do site de exemplo com max_depth=3 (quebrada responde 404)
+EXPECTED_PAGES = {
+    "/site/", "/site/produtos", "/site/promocao", "/site/sobre", "/site/contato",
+    "/site/produto-1", "/site/produto-2?ref=lista", "/site/produto-3", "/site/links", "/site/quebrada",
+}
+
+
+def check(report: Dict[str, Any], base_url: str) -> None:
+    urls = [page["url"].removeprefix(base_url) for page in report["pages"]]
+    assert len(urls) == len(set(urls)), urls
+    assert set(urls) == EXPECTED_PAGES, sorted(urls)
+
+    site = report["site"]
+    assert site["pages_crawled"] == len(EXPECTED_PAGES) - 1 and site["pages_failed"] == 1, site
+    failed = [page for page in report["pages"] if "error" in page]
+    assert failed[0]["url"].endswith("/site/quebrada") and "404" in failed[0]["error"], failed
+    links = next(page for page in report["pages"] if page["url"].endswith("/site/links"))
+    assert links["invalid_links"] == ["http://[bad", "http://127.0.0.1:99999/site/"], links["invalid_links"]
+    assert site["invalid_links"] == 2, site
+    assert site["orphan_pages"] == [f"{base_url}/site/promocao"], site["orphan_pages"]
+    assert list(site["duplicate_titles"]) == ["Produto | Loja Exemplo"], site["duplicate_titles"]
+    assert site["h1_distribution"] == {"0": 1, "1": 7, "2+": 1}, site["h1_distribution"]
+
+
+async def main(use_bloom_filter: bool) -> None:
+    analysis_pool.start_analysis_pool(kind="thread")
+    with serve_corpus(load_site()) as base_url:
+        sitemap = await load_sitemap(f"{base_url}/site/sitemap.xml")
+        report = await crawl_site(
+            f"{base_url}/site/",
+            max_depth=3,
+            max_pages=50,
+            use_bloom_filter=use_bloom_filter,
+            extra_urls=sitemap,
+        )
+        check(report, base_url)
+    analysis_pool.shutdown_analysis_pool()
+    await close_http_client()
+
+    pages = [
+        {key: page.get(key) for key in ("url", "depth", "overall_score", "inbound_links", "error")}
+        for page in report["pages"]
+    ]
+    print(json.dumps({"pages": pages, "site": report["site"], "elapsed_s": report["elapsed_s"]}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bloom", action="store_true", help="usar Bloom filter como visited-set")
+    asyncio.run(main(parser.parse_args().bloom))
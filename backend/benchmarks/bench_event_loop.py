@@ -0,0 +1,95 @@
+"""
+Load test: latência do event loop enquanto auditorias de páginas grandes rodam
+
+Compara o modo inline (parsing no event loop) com o pool de processos e
+confere que o pool se recupera quando um processo morre (as auditorias
+seguintes não recebem BrokenProcessPool).
+Uso (a partir de backend/):
+    python -m benchmarks.bench_event_loop [--audits 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List
+
+from benchmarks.stand_in import serve_corpus
+from services import analysis_pool
+from services.http_client import close_http_client
+from services.seo_analyzer import analyze_url
+
+PROBE_INTERVAL = 0.01
+
+
+async def probe_loop_lag(samples: List[float], stop: asyncio.Event) -> None:
+    """Mede o atraso de um sleep curto: é o tempo que o loop ficou bloqueado"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def run_mode(base_url: str, mode: str, audits: int) -> Dict[str, Any]:
+    analysis_pool.shutdown_analysis_pool()
+    analysis_pool.start_analysis_pool(kind=mode, max_pending=audits)
+
+    # Aquecer os workers (spawn + imports) fora da medição
+    await analyze_url(f"{base_url}/small")
+
+    samples: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(samples, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(analyze_url(f"{base_url}/huge") for _ in range(audits)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    samples.sort()
+    return {
+        "audits": audits,
+        "elapsed_s": round(elapsed, 2),
+        "loop_lag_p50_ms": round(statistics.median(samples), 2),
+        "loop_lag_p99_ms": round(samples[int(len(samples) * 0.99) - 1], 2),
+        "loop_lag_max_ms": round(samples[-1], 2),
+    }
+
+
+async def check_crash_recovery(base_url: str) -> Dict[str, Any]:
+    """Um processo do pool morre (os._exit): o pool é recriado e as auditorias seguem"""
+    analysis_pool.shutdown_analysis_pool()
+    analysis_pool.start_analysis_pool(kind="process", workers=2, max_pending=16)
+    await analyze_url(f"{base_url}/small")
+    restarts = analysis_pool.pool_stats()["restarts"]
+
+    # A tarefa que derruba o processo falha (também na nova tentativa, que quebra o pool novo)
+    crashed = await asyncio.gather(analysis_pool.run_in_pool(os._exit, 1), return_exceptions=True)
+    assert isinstance(crashed[0], BrokenProcessPool), crashed
+    # As auditorias seguintes encontram o pool quebrado, que é recriado na hora
+    audits = await asyncio.gather(*(analyze_url(f"{base_url}/medium") for _ in range(4)), return_exceptions=True)
+    assert all(not isinstance(result, BaseException) for result in audits), audits
+    stats = analysis_pool.pool_stats()
+    assert stats["restarts"] == restarts + 2, stats
+    return {"restarts": stats["restarts"] - restarts, "audits_after_crash": len(audits)}
+
+
+async def main(audits: int) -> None:
+    report: Dict[str, Any] = {}
+    with serve_corpus() as base_url:
+        for mode in ("inline", "process"):
+            report[mode] = await run_mode(base_url, mode, audits)
+        report["crash_recovery"] = await check_crash_recovery(base_url)
+    analysis_pool.shutdown_analysis_pool()
+    await close_http_client()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--audits", type=int, default=8)
+    asyncio.run(main(parser.parse_args().audits))
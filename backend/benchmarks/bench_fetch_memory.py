@@ -0,0 +1,80 @@
+"""
+Pico de memória (RSS) por auditoria: download em streaming com limite vs. leitura completa
+
+Cada modo roda num subprocesso próprio, já que o pico de RSS é do processo inteiro.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_fetch_memory [--size-mb 100]
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.stand_in import serve_corpus
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss é em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_mode(mode: str, url: str) -> dict:
+    from services.http_client import close_http_client, get_http_client
+    from services.page_fetcher import fetch_page
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        if mode == "streaming":
+            page = await fetch_page(url)
+            size = page.size
+        else:
+            # Comportamento antigo: corpo inteiro em memória + texto decodificado
+            response = await get_http_client().get(url)
+            response.text  # noqa: B018 - o código antigo decodificava o corpo inteiro
+            size = len(response.content)
+    except Exception as e:
+        outcome = f"{type(e).__name__}: {e}"
+        size = None
+    elapsed = time.perf_counter() - start
+    await close_http_client()
+
+    return {
+        "mode": mode,
+        "outcome": outcome,
+        "bytes_kept": size,
+        "elapsed_s": round(elapsed, 2),
+        "peak_rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def main(size_mb: int) -> None:
+    report = []
+    with serve_corpus({}) as base_url:
+        for mode in ("streaming", "buffered"):
+            for send_length in (True, False):
+                url = f"{base_url}/stream/{size_mb * 1024 * 1024}" + ("" if send_length else "?no-length")
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_fetch_memory", "--child", mode, url],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                record = json.loads(output.strip().splitlines()[-1])
+                record["content_length_header"] = send_length
+                report.append(record)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(run_mode(*args.child))))
+    else:
+        main(args.size_mb)
@@ -0,0 +1,61 @@
+"""
+Benchmark: extrator de passada única vs. BeautifulSoup + find_all
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_html_features
+"""
+
+import json
+from typing import Any, Dict
+
+from benchmarks import legacy_seo
+from benchmarks.common import load_corpus, timeit
+from services.html_features import extract_features
+from services.seo_analyzer import analyze_content_seo, analyze_technical_seo
+
+# Variações de atributos em que o extrator precisa concordar com o BeautifulSoup
+EDGE_CASES = {
+    "rel_canonical_capitalized": '<html><head><link rel="Canonical" href="/a"></head><body></body></html>',
+    "rel_canonical_multi": '<html><head><link rel="alternate canonical" href="/a"></head><body></body></html>',
+    "rel_canonical_spaces": '<html><head><link rel="  canonical " href="/a"></head><body></body></html>',
+    "rel_canonical_upper": '<html><head><link rel="CANONICAL" href="/a"></head><body></body></html>',
+}
+
+
+def analyze_html(html: str) -> Dict[str, Any]:
+    features = extract_features(html)
+    return {
+        "technical": analyze_technical_seo(features, ""),
+        "content": analyze_content_seo(features),
+    }
+
+
+def main() -> None:
+    for name, html in EDGE_CASES.items():
+        old = legacy_seo.analyze_html(html)
+        new = analyze_html(html)
+        if old != new:
+            raise AssertionError(f"Scores divergentes em {name}:\n{old}\n{new}")
+
+    report = {}
+    for name, html in load_corpus().items():
+        old = legacy_seo.analyze_html(html)
+        new = analyze_html(html)
+        if old != new:
+            raise AssertionError(f"Scores divergentes em {name}:\n{old}\n{new}")
+
+        repeat = 3 if len(html) > 1_000_000 else 7
+        old_stats = timeit(lambda: legacy_seo.analyze_html(html), repeat=repeat)
+        new_stats = timeit(lambda: extract_features(html), repeat=repeat)
+        report[name] = {
+            "bytes": len(html.encode("utf-8")),
+            "beautifulsoup": old_stats,
+            "single_pass": new_stats,
+            "speedup": round(old_stats["median_ms"] / new_stats["median_ms"], 1),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
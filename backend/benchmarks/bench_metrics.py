@@ -0,0 +1,204 @@
+"""
+Métricas (GET /metrics): conteúdo e custo da instrumentação
+
+Sobe o app (uvicorn) com o servidor fake da OpenAI e o corpus local, faz
+chamadas de ROI, auditorias SEO e gerações (normal e streaming) e confere no
+/metrics que:
+- contagens por rota usam o template da rota (sem ids na label) e batem com
+  as chamadas feitas, status incluído
+- os estágios da análise SEO (fetch, queue, parse, technical, content,
+  performance) têm uma observação por auditoria
+- latência, tempo até o primeiro token e tokens da OpenAI batem com o fake
+- pools, caches e limitadores aparecem como gauges
+Depois mede, no processo, o custo do middleware por requisição e compara com
+o /calculate-roi: a instrumentação precisa ficar abaixo de 3% da rota.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_metrics [--calls 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.bench_content_stream import BODY, SECRET, free_port, read_events, start_app
+from benchmarks.fake_openai import fake_tokens, serve_fake_openai
+from benchmarks.stand_in import serve_corpus
+
+ROI_BODY = {"investimento_inicial": 10000, "investimento_mensal": 1000, "receita_mensal": 4000, "periodo_meses": 24}
+TOKENS = 80
+OVERHEAD_BUDGET = 0.03
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+
+
+def parse_metrics(text: str) -> Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]:
+    """Amostras do formato de texto: (nome, labels) -> valor"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        pairs = tuple(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels or ""))
+        samples[(name, pairs)] = float(value)
+    return samples
+
+
+def value(samples: Dict, name: str, **labels: str) -> float:
+    return samples.get((name, tuple(labels.items())), 0.0)
+
+
+def scenario(calls: int) -> Dict[str, Any]:
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    with serve_corpus() as site, serve_fake_openai(tokens=TOKENS, token_delay=0.001) as fake:
+        # Configuração lida na importação do app (antes de start_app)
+        os.environ.update({"FASTAPI_SECRET": SECRET, "OPENAI_API_KEY": "sk-fake", "OPENAI_BASE_URL": fake.url})
+        server, thread = start_app(port)
+        try:
+            with httpx.Client(base_url=base, timeout=60, headers={"X-API-Secret": SECRET}) as client:
+                for _ in range(calls):
+                    assert client.post("/api/v1/calculate-roi", json=ROI_BODY).status_code == 200
+                assert client.post("/api/v1/calculate-roi", json={}).status_code == 422
+                assert client.post("/api/v1/calculate-roi", json=ROI_BODY, headers={"X-API-Secret": "x"}).status_code == 401
+                for job_id in ("a1", "b2", "c3"):
+                    assert client.get(f"/api/v1/content-jobs/{job_id}").status_code == 404
+                assert client.get("/nao-existe").status_code == 404
+
+                audits = 0
+                for page in ("small", "medium", "ecommerce"):
+                    response = client.post("/api/v1/analyze-seo", json={"url": f"{site}/{page}"})
+                    assert response.status_code == 200, response.text
+                    audits += 1
+
+                generated = client.post("/api/v1/generate-content", json=BODY)
+                assert generated.status_code == 200 and generated.json()["generated_with_ai"]
+                read_events(client, f"{base}/api/v1/generate-content/stream", BODY)
+
+                text = client.get("/metrics").text
+        finally:
+            server.should_exit = True
+            thread.join()
+
+    samples = parse_metrics(text)
+    requests = "orbee_http_requests_total"
+    roi = "/api/v1/calculate-roi"
+    assert value(samples, requests, method="POST", route=roi, status="200") == calls
+    assert value(samples, requests, method="POST", route=roi, status="422") == 1
+    assert value(samples, requests, method="POST", route=roi, status="401") == 1
+    assert value(samples, requests, method="GET", route="/api/v1/content-jobs/{job_id}", status="404") == 3
+    assert value(samples, requests, method="GET", route="unmatched", status="404") == 1
+    assert "a1" not in text and "/nao-existe" not in text
+    assert value(samples, "orbee_http_request_duration_seconds_count", method="POST", route=roi) == calls + 2
+    # A própria leitura do /metrics ainda está em andamento
+    assert value(samples, "orbee_http_requests_in_progress", method="GET") == 1
+
+    # Histograma: buckets cumulativos e _count igual ao +Inf
+    buckets = [
+        number for (name, labels), number in samples.items()
+        if name == "orbee_http_request_duration_seconds_bucket" and ("route", roi) in labels
+        and ("method", "POST") in labels
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == calls + 2, buckets
+
+    stages = {
+        stage: value(samples, "orbee_seo_stage_duration_seconds_count", stage=stage)
+        for stage in ("fetch", "queue", "parse", "technical", "content", "performance")
+    }
+    assert all(count == audits for count in stages.values()), stages
+
+    llm_complete = value(samples, "orbee_llm_request_duration_seconds_count", mode="complete", outcome="ok")
+    llm_stream = value(samples, "orbee_llm_request_duration_seconds_count", mode="stream", outcome="ok")
+    assert llm_complete == 1 and llm_stream == 1, (llm_complete, llm_stream)
+    assert value(samples, "orbee_llm_first_token_seconds_count") == 1
+    assert value(samples, "orbee_llm_tokens_total", kind="prompt") == 2 * 50
+    assert value(samples, "orbee_llm_tokens_total", kind="completion") == 2 * len(fake_tokens(TOKENS))
+
+    for name in (
+        "orbee_http_pool_connections", "orbee_analysis_pool_pending", "orbee_seo_cache_entries",
+        "orbee_content_cache_entries", "orbee_limiter_active", "orbee_content_jobs_pending_items",
+    ):
+        assert any(key[0] == name for key in samples), name
+    assert value(samples, "orbee_limiter_active", limiter="llm") == 0
+    assert value(samples, "orbee_seo_cache_lookups_total", result="misses") == audits
+
+    return {
+        "series": len(samples),
+        "bytes": len(text),
+        "seo_stage_mean_ms": {
+            stage: round(value(samples, "orbee_seo_stage_duration_seconds_sum", stage=stage) / audits * 1000, 3)
+            for stage in stages
+        },
+        "llm_tokens": {
+            kind: value(samples, "orbee_llm_tokens_total", kind=kind) for kind in ("prompt", "completion")
+        },
+    }
+
+
+async def _per_request_us(app: Any, path: str, body: bytes, requests: int) -> float:
+    """Mediana (µs) de uma requisição ASGI chamada direto, sem rede nem servidor"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http", "path": path,
+        "raw_path": path.encode(), "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+        "headers": [(b"content-type", b"application/json"), (b"x-api-secret", SECRET.encode())],
+    }
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    samples: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def overhead(requests: int) -> Dict[str, Any]:
+    from main import app
+    from services.metrics import MetricsMiddleware
+
+    async def noop(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def measure() -> Dict[str, float]:
+        body = json.dumps(ROI_BODY).encode()
+        # Aquecimento (imports, caches do FastAPI)
+        await _per_request_us(app, "/api/v1/calculate-roi", body, 50)
+        return {
+            "noop_us": await _per_request_us(noop, "/x", b"", requests * 10),
+            "instrumented_noop_us": await _per_request_us(MetricsMiddleware(noop), "/x", b"", requests * 10),
+            "roi_us": await _per_request_us(app, "/api/v1/calculate-roi", body, requests),
+        }
+
+    result = asyncio.run(measure())
+    result["middleware_us"] = max(0.0, result["instrumented_noop_us"] - result["noop_us"])
+    share = result["middleware_us"] / result["roi_us"]
+    assert share < OVERHEAD_BUDGET, result
+    result["share_of_roi_pct"] = share * 100
+    return {key: round(number, 2) if isinstance(number, float) else number for key, number in result.items()}
+
+
+def main(calls: int) -> None:
+    report = {"calls": calls, "scrape": scenario(calls), "overhead": overhead(calls * 5)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    main(args.calls)
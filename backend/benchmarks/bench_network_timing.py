@@ -0,0 +1,52 @@
+"""
+Tempos de rede da auditoria contra o servidor local com atrasos injetados
+
+Confere que o TTFB medido acompanha o atraso do servidor (inclusive numa
+cadeia de redirects) e mostra o efeito no score de performance.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_network_timing
+"""
+
+import asyncio
+import json
+from urllib.parse import quote
+
+from benchmarks.stand_in import serve_corpus
+from services.http_client import close_http_client, pool_stats
+from services.page_fetcher import fetch_page
+from services.seo_analyzer import analyze_performance
+
+DELAYS = (0.0, 0.3, 0.8)
+
+
+async def main() -> None:
+    report = []
+    with serve_corpus() as base_url:
+        # "localhost" em vez do IP: a resolução entra no connect_ms
+        base_url = base_url.replace("127.0.0.1", "localhost")
+        cases = [(f"{base_url}/medium?delay={delay}", delay) for delay in DELAYS]
+        # Redirect lento seguido de página lenta: o TTFB soma os dois saltos
+        target = quote("/medium?delay=0.2", safe="/")
+        cases.append((f"{base_url}/small?delay=0.2&redirect={target}", 0.4))
+
+        for url, expected_delay in cases:
+            page = await fetch_page(url)
+            performance = await analyze_performance(page.url, page)
+            timing = performance["timing"]
+            assert timing["ttfb_ms"] >= expected_delay * 1000, (url, timing)
+            report.append({
+                "url": url.replace(base_url, ""),
+                "score": performance["score"],
+                "redirects": timing["redirects"],
+                "connect_ms": timing["connect_ms"],
+                "ttfb_ms": timing["ttfb_ms"],
+                "download_ms": timing["download_ms"],
+            })
+
+    report.append({"outbound_latency": pool_stats()["latency"]})
+    await close_http_client()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,237 @@
+"""
+Persistência write-behind num SQLite local (no lugar do Postgres)
+
+Confere a fila de gravação isoladamente e dentro do app:
+- enfileirar custa microssegundos, contra um INSERT + commit por linha
+- lotes fecham por tamanho (PERSISTENCE_BATCH_SIZE) e por tempo (FLUSH_INTERVAL)
+- com o banco lento e a fila cheia, quem enfileira espera no máximo
+  ENQUEUE_TIMEOUT e a linha é descartada (backpressure sem segurar a resposta)
+- falhas do banco são tentadas de novo com backoff, sem perder linhas
+- no app: cada /calculate-roi e /analyze-seo vira uma linha, o X-Record-Id é o
+  id gravado, userId vem do X-Client-Id e o desligamento grava o que está na fila
+Uso (a partir de backend/):
+    python -m benchmarks.bench_persistence [--calls 300]
+"""
+
+import os
+import tempfile
+
+# Configuração lida na importação de services.persistence (antes dos imports abaixo)
+WORKDIR = tempfile.mkdtemp()
+APP_DB = os.path.join(WORKDIR, "app.sqlite3")
+os.environ.update({
+    "PERSISTENCE_ENABLED": "true",
+    "PERSISTENCE_DATABASE_URL": f"sqlite:///{APP_DB}",
+    "PERSISTENCE_BATCH_SIZE": "50",
+    "PERSISTENCE_FLUSH_INTERVAL_MS": "100",
+})
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import sqlite3  # noqa: E402
+import statistics  # noqa: E402
+import time  # noqa: E402
+from typing import Any, Dict, List, Sequence, Tuple  # noqa: E402
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_content_stream import SECRET, free_port, start_app  # noqa: E402
+from benchmarks.stand_in import serve_corpus  # noqa: E402
+from services.persistence import PersistenceBackend, SQLiteBackend, WriteBehindQueue, _now, new_id  # noqa: E402
+
+ROI_BODY = {"investimento_inicial": 10000, "investimento_mensal": 1000, "receita_mensal": 4000, "periodo_meses": 24}
+
+
+def audit_row(index: int) -> Tuple[Any, ...]:
+    now = _now()
+    return (new_id(), f"https://loja.example.com/{index}", 80, json.dumps({"overall_score": 80}), now, now)
+
+
+class MemoryBackend(PersistenceBackend):
+    """Guarda os lotes recebidos; pode atrasar cada gravação ou falhar as primeiras"""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.batches: List[int] = []
+
+    async def insert_many(self, table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("banco fora do ar")
+        self.batches.append(len(rows))
+
+
+async def enqueue_cost(path: str, rows: int) -> Dict[str, Any]:
+    """put() na fila vs. INSERT síncrono (uma transação por linha, como o Prisma faz por pedido)"""
+    sync = SQLiteBackend(path)
+    await sync.start()
+    samples = []
+    for index in range(rows):
+        started = time.perf_counter()
+        sync._insert("seo_audits", [audit_row(index)])
+        samples.append((time.perf_counter() - started) * 1e6)
+    await sync.close()
+
+    writer = WriteBehindQueue(SQLiteBackend(path), batch_size=100, flush_interval=0.05)
+    await writer.start()
+    queued = []
+    for index in range(rows):
+        row = audit_row(index)
+        started = time.perf_counter()
+        assert await writer.put("seo_audits", row)
+        queued.append((time.perf_counter() - started) * 1e6)
+    await writer.stop()
+    stats = writer.stats()
+    assert stats["written"] == rows and stats["batches"] < rows, stats
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM "seo_audits"').fetchone()[0] == 2 * rows
+    result = {
+        "sync_insert_median_us": round(statistics.median(samples), 1),
+        "enqueue_median_us": round(statistics.median(queued), 1),
+        "batches": stats["batches"],
+    }
+    assert result["enqueue_median_us"] * 5 < result["sync_insert_median_us"], result
+    return result
+
+
+async def batching() -> Dict[str, Any]:
+    # Por tamanho: 250 linhas de uma vez, lotes de 100 (o intervalo longo não interfere)
+    backend = MemoryBackend()
+    writer = WriteBehindQueue(backend, batch_size=100, flush_interval=5)
+    await writer.start()
+    for index in range(250):
+        await writer.put("seo_audits", audit_row(index))
+    await asyncio.sleep(0.1)
+    by_size = list(backend.batches)
+    await writer.stop()
+    assert by_size == [100, 100], by_size
+    assert backend.batches == [100, 100, 50], backend.batches
+    size_batches = backend.batches
+
+    # Por tempo: poucas linhas, lote grande; gravadas depois de ~flush_interval
+    backend = MemoryBackend()
+    writer = WriteBehindQueue(backend, batch_size=1000, flush_interval=0.05)
+    await writer.start()
+    started = time.perf_counter()
+    for index in range(5):
+        await writer.put("seo_audits", audit_row(index))
+    while not backend.batches:
+        await asyncio.sleep(0.005)
+    flushed_ms = (time.perf_counter() - started) * 1000
+    await writer.stop()
+    assert backend.batches == [5], backend.batches
+    assert 40 <= flushed_ms < 500, flushed_ms
+    return {"by_size": size_batches, "by_time_flush_ms": round(flushed_ms, 1)}
+
+
+async def backpressure() -> Dict[str, Any]:
+    # Banco lento (0,2 s por lote) e fila pequena: a rajada passa da capacidade
+    backend = MemoryBackend(delay=0.2)
+    writer = WriteBehindQueue(backend, batch_size=10, flush_interval=0.01, max_size=20, enqueue_timeout=0.05)
+    await writer.start()
+
+    async def timed_put(index: int) -> float:
+        started = time.perf_counter()
+        await writer.put("seo_audits", audit_row(index))
+        return (time.perf_counter() - started) * 1000
+
+    waits = await asyncio.gather(*(timed_put(index) for index in range(200)))
+    await writer.stop()
+    stats = writer.stats()
+    assert stats["dropped"] > 0 and stats["waited"] > 0, stats
+    assert stats["written"] + stats["dropped"] == 200, stats
+    assert sum(backend.batches) == stats["written"], (backend.batches, stats)
+    # Ninguém espera mais que o ENQUEUE_TIMEOUT (+ folga do event loop)
+    assert max(waits) < 50 + 100, max(waits)
+    return {"written": stats["written"], "dropped": stats["dropped"], "max_wait_ms": round(max(waits), 1)}
+
+
+async def retries() -> Dict[str, Any]:
+    backend = MemoryBackend(failures=2)
+    writer = WriteBehindQueue(backend, batch_size=50, flush_interval=0.01, max_attempts=3)
+    await writer.start()
+    for index in range(30):
+        await writer.put("seo_audits", audit_row(index))
+    started = time.perf_counter()
+    await writer.stop()
+    stats = writer.stats()
+    assert stats["retries"] == 2 and stats["written"] == 30 and stats["failed"] == 0, stats
+    assert backend.batches == [30], backend.batches
+    recovered_s = time.perf_counter() - started
+
+    # Sem sucesso em max_attempts: o lote é descartado e contado em failed
+    backend = MemoryBackend(failures=10)
+    writer = WriteBehindQueue(backend, batch_size=50, flush_interval=0.01, max_attempts=2)
+    await writer.start()
+    for index in range(10):
+        await writer.put("seo_audits", audit_row(index))
+    await writer.stop()
+    assert writer.stats()["failed"] == 10 and not backend.batches, writer.stats()
+    return {"retries": stats["retries"], "recovered_in_s": round(recovered_s, 2)}
+
+
+def app_roundtrip(calls: int) -> Dict[str, Any]:
+    """App com PERSISTENCE_ENABLED: linhas gravadas = chamadas, depois do desligamento"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    os.environ["FASTAPI_SECRET"] = SECRET
+    roi_ids: List[str] = []
+    audit_ids: List[str] = []
+    latencies: List[float] = []
+    with serve_corpus() as site, httpx.Client(timeout=60, headers={"X-API-Secret": SECRET}) as client:
+        server, thread = start_app(port)
+        try:
+            for index in range(calls):
+                body = {**ROI_BODY, "receita_mensal": 4000 + index}
+                started = time.perf_counter()
+                response = client.post(f"{base}/api/v1/calculate-roi", json=body, headers={"X-Client-Id": "painel"})
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+                roi_ids.append(response.headers["x-record-id"])
+            for page in ("small", "medium", "ecommerce"):
+                response = client.post(f"{base}/api/v1/analyze-seo", json={"url": f"{site}/{page}"})
+                assert response.status_code == 200, response.text
+                audit_ids.append(response.headers["x-record-id"])
+            stats = client.get(f"{base}/api/v1/stats/persistence").json()
+            metrics = client.get(f"{base}/metrics").text
+            assert "orbee_persistence_rows_total" in metrics
+        finally:
+            # O lifespan grava o que ainda estiver na fila antes de o processo sair
+            server.should_exit = True
+            thread.join()
+
+    with sqlite3.connect(APP_DB) as conn:
+        roi_rows = dict(conn.execute('SELECT "id", "userId" FROM "roi_calculations"').fetchall())
+        audits = dict(conn.execute('SELECT "id", "url" FROM "seo_audits"').fetchall())
+        sample = json.loads(conn.execute('SELECT "data" FROM "roi_calculations" LIMIT 1').fetchone()[0])
+    assert sorted(roi_rows) == sorted(roi_ids) and set(roi_rows.values()) == {"painel"}, len(roi_rows)
+    assert sorted(audits) == sorted(audit_ids), audits
+    assert sample["investimento_inicial"] == ROI_BODY["investimento_inicial"], sample
+    assert stats["enabled"] and stats["dropped"] == 0 and stats["failed"] == 0, stats
+    return {
+        "calls": calls,
+        "rows": len(roi_rows) + len(audits),
+        "batches_before_shutdown": stats["batches"],
+        "roi_median_ms": round(statistics.median(latencies), 2),
+    }
+
+
+def main(calls: int) -> None:
+    report = {
+        "enqueue_cost": asyncio.run(enqueue_cost(os.path.join(WORKDIR, "enqueue.sqlite3"), calls)),
+        "batching": asyncio.run(batching()),
+        "backpressure": asyncio.run(backpressure()),
+        "retries": asyncio.run(retries()),
+        "app": app_roundtrip(calls),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300, help="linhas no custo de enfileirar e chamadas de ROI no app")
+    main(parser.parse_args().calls)
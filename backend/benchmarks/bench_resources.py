@@ -0,0 +1,70 @@
+"""
+Peso dos sub-recursos de uma página servida localmente
+
+A página tem dezenas de recursos; alguns recusam HEAD (fallback para GET com
+Range) e alguns são lentos, para conferir que o prazo por requisição não
+segura a auditoria inteira. Recursos com URL malformada viram itens com erro
+sem derrubar a auditoria.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_resources [--assets 60] [--slow 3]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.stand_in import serve_corpus
+from services import resource_analyzer
+from services.html_features import extract_features
+from services.http_client import close_http_client, pool_stats
+from services.resource_analyzer import analyze_resources
+
+
+def build_page(assets: int, slow: int) -> str:
+    head = [
+        '<link rel="stylesheet" href="/static/app.css?size=180000">',
+        '<link rel="stylesheet" href="/static/print.css" media="print">',
+        '<link rel="preload" as="font" href="/static/font.woff2?size=40000">',
+        '<script src="/static/vendor.js?size=350000&nocache"></script>',
+        '<script src="/static/app.js?size=90000" defer></script>',
+    ]
+    # URLs malformadas: IPv6 quebrado e porta fora do intervalo
+    body = ['<img src="http://[bad/x.png" alt="x">', '<img src="http://127.0.0.1:99999/x.png" alt="x">']
+    for i in range(assets):
+        query = f"size={30000 + i * 1000}"
+        if i % 5 == 0:
+            query += "&nohead"
+        if i < slow:
+            query += f"&delay={resource_analyzer.SEO_RESOURCE_TIMEOUT + 2}"
+        body.append(f'<img src="/img/produto-{i}.webp?{query}" alt="Produto {i}">')
+    return f"<html><head><title>Loja</title>{''.join(head)}</head><body>{''.join(body)}</body></html>"
+
+
+async def main(assets: int, slow: int) -> None:
+    html = build_page(assets, slow)
+    with serve_corpus({"loja": html}) as base_url:
+        features = extract_features(html)
+        started = time.perf_counter()
+        report = await analyze_resources(f"{base_url}/loja", len(html), features.resources)
+        elapsed = time.perf_counter() - started
+
+    assert report["timed_out"] == slow, report["timed_out"]
+    invalid = [item for item in report["items"] if item.get("error", "").startswith("URL inválida")]
+    assert len(invalid) == 2 and report["failed"] == slow + 2, (invalid, report["failed"])
+    # Recursos lentos não seguram a auditoria além do prazo por requisição
+    assert elapsed < resource_analyzer.SEO_RESOURCE_TIMEOUT + 1.5, elapsed
+
+    summary = {key: value for key, value in report.items() if key != "items"}
+    summary["elapsed_s"] = round(elapsed, 2)
+    summary["connections_opened"] = pool_stats()["connections_opened"]
+    await close_http_client()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=60)
+    parser.add_argument("--slow", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.assets, args.slow))
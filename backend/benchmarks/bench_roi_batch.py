@@ -0,0 +1,74 @@
+"""
+ROI em lote (uma passada vetorizada) vs. uma chamada por cenário
+
+Confere que cada cenário do lote dá exatamente o mesmo resultado de
+/calculate-roi e compara tempo e tamanho do payload (JSON) para uma tabela
+de sensibilidade receita x taxa x período.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_roi_batch
+"""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from services.roi_calculator import calculate_advanced_roi, calculate_roi_batch, expand_grid
+
+BASE = {
+    "investimento_inicial": 50000.0,
+    "investimento_mensal": 1500.0,
+    "receita_mensal": 12000.0,
+    "custo_operacional": 2500.0,
+    "periodo_meses": 24,
+    "taxa_desconto": 0.1,
+    "crescimento_mensal": 0.0,
+}
+GRID = {
+    "receita_mensal": np.round(np.linspace(4000, 40000, 25), 2).tolist(),
+    "taxa_desconto": [0.0, 0.05, 0.1, 0.15, 0.2, 0.3],
+    "periodo_meses": [6, 12, 24, 36, 48, 60],
+}
+
+
+async def main() -> None:
+    scenarios, grid = expand_grid(BASE, GRID)
+    count = len(scenarios["investimento_inicial"])
+
+    started = time.perf_counter()
+    singles = [
+        await calculate_advanced_roi(**{name: values[i] for name, values in scenarios.items()})
+        for i in range(count)
+    ]
+    singles_payload = json.dumps(singles)
+    singles_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = await calculate_roi_batch(scenarios, grid=grid)
+    batch_payload = json.dumps(batch)
+    batch_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = await calculate_roi_batch(scenarios, summary_only=True, grid=grid)
+    summary_payload = json.dumps(summary)
+    summary_s = time.perf_counter() - started
+
+    # Cenário i do lote == chamada individual
+    for i, single in enumerate(singles):
+        for name, values in batch["resultados"].items():
+            assert values[i] == single[name], (i, name, values[i], single[name])
+        for name, series in batch["projecao_mensal"].items():
+            assert series[i] == [month[name] for month in single["projecao_mensal"]], (i, name)
+
+    print(json.dumps({
+        "scenarios": count,
+        "grid": grid,
+        "per_scenario_calls": {"ms": round(singles_s * 1000, 1), "payload_kb": len(singles_payload) // 1024},
+        "batch": {"ms": round(batch_s * 1000, 1), "payload_kb": len(batch_payload) // 1024},
+        "batch_summary_only": {"ms": round(summary_s * 1000, 1), "payload_kb": len(summary_payload) // 1024},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+"""
+Motor de ROI em NumPy vs. implementação antiga em laços
+
+Confere que os resultados batem centavo a centavo em cenários aleatórios
+(dentro do limite atual de 60 meses) e mede horizontes bem maiores. Também
+confere TIR/TIRM (VPL zero na TIR, fórmula fechada = matriz de fluxos), que a
+receita constante informada como série dá o mesmo resumo (break-even
+inclusive) e mede o root finder em lote.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_roi_engine [--cases 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+
+import numpy as np
+
+from benchmarks import legacy_roi
+from benchmarks.common import timeit
+from services.roi_calculator import calculate_advanced_roi
+from services.roi_engine import revenue_schedule, roi_summary
+
+HORIZONS = (12, 60, 600, 6000, 60000)
+
+
+def random_case(rng: random.Random) -> dict:
+    return {
+        # 3 casas decimais geram valores em ,xx5 (o caso difícil do arredondamento)
+        "investimento_inicial": round(rng.uniform(100, 500000), rng.choice((0, 2, 3))),
+        "investimento_mensal": rng.choice((0.0, round(rng.uniform(0, 20000), 2))),
+        "receita_mensal": round(rng.uniform(0, 80000), rng.choice((0, 2, 3))),
+        "custo_operacional": rng.choice((0.0, round(rng.uniform(0, 30000), 2))),
+        "periodo_meses": rng.randint(1, 60),
+        "taxa_desconto": rng.choice((0.0, 0.1, round(rng.uniform(0, 1), 4))),
+    }
+
+
+def check_equivalence(cases: int) -> dict:
+    """
+    Tudo igual, exceto o VPL, que pode diferir em 1 centavo quando o valor
+    exato cai em ,xx5: o laço antigo acumula erro de arredondamento a cada
+    mês e a fórmula fechada não.
+    """
+    rng = random.Random(42)
+    npv_cent_differences = 0
+    for _ in range(cases):
+        case = random_case(rng)
+        expected = legacy_roi.calculate_advanced_roi(**case)
+        actual = asyncio.run(calculate_advanced_roi(**case))
+        # Métricas novas (TIR, TIRM, payback descontado) não existem no laço antigo
+        actual = {key: actual[key] for key in expected}
+        if actual["npv"] != expected["npv"]:
+            assert abs(actual["npv"] - expected["npv"]) <= 0.0100001, (case, expected["npv"], actual["npv"])
+            npv_cent_differences += 1
+            expected["npv"] = actual["npv"]
+        assert actual == expected, (case, {
+            key: (expected[key], actual[key])
+            for key in expected if expected[key] != actual[key] and key != "projecao_mensal"
+        })
+    return {"cases": cases, "npv_cent_differences": npv_cent_differences}
+
+
+# Valores em reais: a série soma mês a mês e a fórmula fechada multiplica (pode diferir em 1 centavo)
+MONEY_METRICS = ("npv", "receita_total", "lucro_total", "custo_total", "investimento_total")
+
+
+def check_series_equivalence(cases: int) -> dict:
+    """Receita constante vs. a mesma receita em receitas_mensais: mesmo resumo"""
+    rng = random.Random(3)
+    cent_differences = 0
+    for _ in range(cases):
+        case = random_case(rng)
+        constant = asyncio.run(calculate_advanced_roi(**case))
+        series = asyncio.run(calculate_advanced_roi(
+            **case, receitas_mensais=[case["receita_mensal"]] * case["periodo_meses"]
+        ))
+        for name, expected in constant.items():
+            if name == "projecao_mensal" or series[name] == expected:
+                continue
+            assert name in MONEY_METRICS and abs(series[name] - expected) <= 0.0100001, (case, name, expected, series[name])
+            cent_differences += 1
+    return {"cases": cases, "money_cent_differences": cent_differences}
+
+
+def random_batch(count: int) -> list:
+    rng = np.random.default_rng(7)
+    taxa = rng.uniform(0, 1, count)
+    taxa[: count // 10] = 0.0
+    return [
+        rng.uniform(100, 500000, count),
+        rng.choice([0.0, 1500.0], count),
+        rng.uniform(0, 80000, count),
+        rng.uniform(0, 30000, count),
+        rng.integers(1, 61, count),
+        taxa,
+    ]
+
+
+def check_irr(count: int) -> dict:
+    """
+    TIR: o VPL descontado à própria TIR é zero e VPL > 0 exatamente quando
+    TIR > taxa. Receita constante informada como série (matriz de fluxos)
+    dá as mesmas métricas das fórmulas fechadas.
+    """
+    args = random_batch(count)
+    closed = roi_summary(*args)
+    found = np.isfinite(closed["tir_anual"])
+
+    at_irr = roi_summary(*args[:5], np.where(found, closed["tir_anual"], 0.0))["npv"]
+    scale = np.maximum(1.0, args[0])
+    assert np.all(np.abs(at_irr[found]) / scale[found] < 1e-9), np.abs(at_irr[found] / scale[found]).max()
+    assert np.all((closed["npv"] > 0)[found] == (closed["tir_anual"] > args[5])[found])
+    # Sem TIR: o fluxo nunca recupera o investimento, nem sem desconto
+    fluxo = args[2] - args[3] - args[1]
+    assert not np.any((~found) & (fluxo * args[4] > args[0]))
+
+    series = roi_summary(*args, receitas=revenue_schedule(args[2], 0.0, 60))
+    differences = {}
+    for name, expected in closed.items():
+        actual = series[name]
+        both = np.isfinite(expected) & np.isfinite(actual)
+        assert np.array_equal(np.isfinite(expected), np.isfinite(actual)), name
+        differences[name] = float(np.max(np.abs(expected[both] - actual[both]) / np.maximum(1.0, np.abs(expected[both]))))
+        assert differences[name] < 1e-9, (name, differences[name])
+
+    assert np.all((closed["payback_descontado_meses"] >= closed["payback_meses"])[
+        np.isfinite(closed["payback_descontado_meses"])
+    ])
+    return {"cases": count, "with_irr": int(found.sum()), "max_relative_difference": max(differences.values())}
+
+
+def main(cases: int) -> None:
+    loop = asyncio.new_event_loop()
+    report = {
+        "equivalence": check_equivalence(cases),
+        "series_equivalence": check_series_equivalence(cases),
+        "irr": check_irr(cases),
+        "horizons": {},
+    }
+
+    # TIR/TIRM em lote: fórmula fechada (receita constante) e matriz de fluxos (receita variável)
+    batch = random_batch(10000)
+    growth = revenue_schedule(batch[2], 0.01, 60)
+    report["batch_10000"] = {
+        "constant": timeit(lambda: roi_summary(*batch), repeat=5),
+        "time_varying": timeit(lambda: roi_summary(*batch, receitas=growth), repeat=5),
+    }
+
+    base = {
+        "investimento_inicial": 50000.0,
+        "investimento_mensal": 2000.0,
+        "receita_mensal": 15000.0,
+        "custo_operacional": 3000.0,
+        "taxa_desconto": 0.12,
+    }
+    for months in HORIZONS:
+        case = {**base, "periodo_meses": months}
+        repeat = 5 if months <= 6000 else 3
+        legacy = timeit(lambda: legacy_roi.calculate_advanced_roi(**case), repeat=repeat)
+        engine = timeit(lambda: loop.run_until_complete(calculate_advanced_roi(**case)), repeat=repeat)
+        report["horizons"][months] = {
+            "legacy": legacy,
+            "engine": engine,
+            "speedup": round(legacy["median_ms"] / engine["median_ms"], 1),
+        }
+
+    loop.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.cases)
@@ -0,0 +1,98 @@
+"""
+Orçamento de latência da simulação Monte Carlo de ROI
+
+Falha (exit != 0) se 50k sorteios x 60 meses passarem do orçamento num único
+núcleo. Também confere reprodutibilidade pela seed, que, sem incerteza, a
+simulação reproduz o cálculo determinístico e que churn de 100% (fixo ou
+sorteado) não gera NaN.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_roi_simulation [--draws 50000] [--months 60] [--budget-ms 1000]
+"""
+
+import os
+
+# Um núcleo: BLAS/OpenMP com uma thread (antes de importar o NumPy)
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import math  # noqa: E402
+
+from benchmarks.common import timeit  # noqa: E402
+from services.roi_calculator import calculate_advanced_roi  # noqa: E402
+from services.roi_simulation import simulate_roi  # noqa: E402
+
+SCENARIO = {
+    "investimento_inicial": {"tipo": "triangular", "min": 40000, "moda": 50000, "max": 70000},
+    "investimento_mensal": 1500,
+    "receita_mensal": {"tipo": "lognormal", "media": 12000, "desvio": 3000},
+    "custo_operacional": {"tipo": "normal", "media": 2500, "desvio": 400},
+    "taxa_desconto": {"tipo": "uniforme", "min": 0.08, "max": 0.14},
+    "churn_mensal": {"tipo": "uniforme", "min": 0.0, "max": 0.03},
+    "rampa_meses": {"tipo": "uniforme", "min": 0, "max": 6},
+}
+
+
+def check_deterministic() -> None:
+    fixed = {
+        "investimento_inicial": 50000.0,
+        "investimento_mensal": 1500.0,
+        "receita_mensal": 12000.0,
+        "custo_operacional": 2500.0,
+        "periodo_meses": 36,
+        "taxa_desconto": 0.12,
+    }
+    expected = asyncio.run(calculate_advanced_roi(**fixed))
+    simulated = simulate_roi(**fixed, simulacoes=100, seed=1)
+    assert simulated["npv"]["percentis"]["p50"] == expected["npv"], (simulated["npv"], expected["npv"])
+    assert simulated["roi_percentual"]["percentis"]["p50"] == expected["roi_percentual"]
+    assert simulated["payback_meses"]["percentis"]["p50"] == expected["payback_meses"]
+    assert simulated["probabilidade_break_even"] == 1.0
+
+
+def check_full_churn() -> None:
+    """Churn = 1: só o primeiro mês tem receita, e nenhuma estatística vira NaN/None"""
+    fixed = {
+        "investimento_inicial": 1000.0,
+        "investimento_mensal": 0.0,
+        "receita_mensal": 500.0,
+        "custo_operacional": 0.0,
+        "periodo_meses": 12,
+        "taxa_desconto": 0.0,
+    }
+    simulated = simulate_roi(**fixed, churn_mensal=1.0, simulacoes=100, seed=1)
+    assert simulated["npv"]["media"] == -500.0, simulated["npv"]
+    assert simulated["probabilidade_break_even"] == 0.0
+
+    # Normal cortada em 1: boa parte dos sorteios fica exatamente em 100%
+    churn = {"tipo": "normal", "media": 0.9, "desvio": 0.2, "max": 1.0}
+    sorteado = simulate_roi(**{**SCENARIO, "churn_mensal": churn}, periodo_meses=24, simulacoes=5000, seed=7)
+    for name in ("npv", "roi_percentual"):
+        stats = sorteado[name]
+        assert math.isfinite(stats["media"]) and None not in stats["percentis"].values(), (name, stats)
+
+
+def main(draws: int, months: int, budget_ms: float) -> None:
+    check_deterministic()
+    check_full_churn()
+
+    first = simulate_roi(**SCENARIO, periodo_meses=months, simulacoes=draws, seed=42)
+    assert simulate_roi(**SCENARIO, periodo_meses=months, simulacoes=draws, seed=42) == first
+
+    timing = timeit(
+        lambda: simulate_roi(**SCENARIO, periodo_meses=months, simulacoes=draws, seed=42),
+        repeat=7,
+    )
+    print(json.dumps({"draws": draws, "months": months, "timing": timing, "result": first}, indent=2))
+    assert timing["median_ms"] < budget_ms, f"Simulação levou {timing['median_ms']}ms (orçamento: {budget_ms}ms)"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--draws", type=int, default=50000)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+    main(args.draws, args.months, args.budget_ms)
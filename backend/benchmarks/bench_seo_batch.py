@@ -0,0 +1,96 @@
+"""
+Auditoria SEO em lote (analyze_batch) com um leitor lento do stream
+
+Roda o lote no processo contra o corpus local (dois hosts: 127.0.0.1 e
+localhost) e confere que:
+- cada URL gera exatamente um registro e o resumo bate com os registros
+- URLs malformadas viram registros de erro sem derrubar o lote
+- nunca há mais que per_host_concurrency auditorias do mesmo host ao mesmo
+  tempo, e os dois hosts andam em paralelo
+- com o leitor atrasado, as auditorias iniciadas não passam de
+  lidas + 2 x concurrency (vagas + fila limitada): o servidor não acumula o lote
+Uso (a partir de backend/):
+    python -m benchmarks.bench_seo_batch [--urls 60] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from benchmarks.stand_in import serve_corpus
+from services import analysis_pool, seo_batch
+from services.http_client import close_http_client
+
+PER_HOST = 2
+READ_DELAY = 0.02
+INVALID_URLS = ["http://[bad/p", "http://127.0.0.1:99999/p"]
+
+
+async def run(site: str, urls: int, concurrency: int) -> Dict[str, Any]:
+    other = site.replace("127.0.0.1", "localhost")
+    batch = [f"{base}/small?n={index}" for index in range(urls // 2) for base in (site, other)] + INVALID_URLS
+
+    original = seo_batch._analyze_one
+    active: Dict[str, int] = {}
+    peak: Dict[str, int] = {}
+    parallel_hosts = 0
+    started = 0
+
+    async def counted(url: str, options: Dict[str, bool]) -> Dict[str, Any]:
+        nonlocal started, parallel_hosts
+        host = url.split("/")[2]
+        started += 1
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        parallel_hosts = max(parallel_hosts, sum(1 for count in active.values() if count))
+        try:
+            return await original(url, options)
+        finally:
+            active[host] -= 1
+
+    seo_batch._analyze_one = counted
+    records: List[Dict[str, Any]] = []
+    ahead = 0
+    try:
+        async for record in seo_batch.analyze_batch(batch, concurrency=concurrency, per_host_concurrency=PER_HOST):
+            records.append(record)
+            # Leitor lento: quantas auditorias começaram além do que já foi lido
+            ahead = max(ahead, started - len(records))
+            await asyncio.sleep(READ_DELAY)
+    finally:
+        seo_batch._analyze_one = original
+
+    summary = records.pop()
+    assert summary["type"] == "summary", summary
+    assert sorted(record["index"] for record in records) == list(range(len(batch))), records
+    invalid = [record for record in records if record["index"] >= len(batch) - len(INVALID_URLS)]
+    assert all(record["type"] == "error" and "URL inválida" in record["error"] for record in invalid), invalid
+    assert summary["ok"] == len(batch) - len(INVALID_URLS) and summary["errors"] == len(INVALID_URLS), summary
+    assert max(peak.values()) <= PER_HOST and parallel_hosts == 2, (peak, parallel_hosts)
+    assert ahead <= 2 * concurrency, ahead
+    return {
+        "urls": len(batch),
+        "ok": summary["ok"],
+        "errors": summary["errors"],
+        "peak_per_host": peak,
+        "max_started_ahead_of_reader": ahead,
+        "elapsed_s": summary["elapsed_s"],
+    }
+
+
+async def main(urls: int, concurrency: int) -> None:
+    analysis_pool.start_analysis_pool(kind="thread")
+    with serve_corpus() as site:
+        report = await run(site, urls, concurrency)
+    analysis_pool.shutdown_analysis_pool()
+    await close_http_client()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.urls, args.concurrency))
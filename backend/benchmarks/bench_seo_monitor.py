@@ -0,0 +1,216 @@
+"""
+Monitoramento SEO: checagens incrementais e agendamento com limite por host
+
+Páginas do corpus servidas localmente (o servidor troca o HTML via PUT) e
+checadas em sequência, conferindo que:
+- com ETag, a página sem mudança volta 304 e nada é baixado nem analisado
+- sem ETag, o hash igual evita o parser (checagem bem mais barata que a auditoria)
+- mudar só o <title> analisa só o <head> e recalcula só a categoria technical;
+  mudar só o texto analisa só o body e recalcula só content
+- o resultado incremental é idêntico ao de uma auditoria completa da mesma página
+- o diff traz score antes/depois e issues novas ou resolvidas
+- o cadastro espalha a primeira checagem pelo intervalo e o agendador nunca
+  passa do limite por host, com hosts diferentes checados em paralelo
+Uso (a partir de backend/):
+    python -m benchmarks.bench_seo_monitor [--urls 2000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import load_corpus
+from benchmarks.stand_in import serve_corpus
+from services import analysis_pool
+from services.http_client import close_http_client
+from services.seo_analyzer import analyze_url
+from services.seo_monitor import (
+    RUN_BASELINE,
+    RUN_CHANGED,
+    RUN_NOT_MODIFIED,
+    RUN_UNCHANGED,
+    SEOMonitorScheduler,
+    SQLiteMonitorStore,
+    check_page,
+)
+
+# Título curto demais (fora da faixa de 30-60 caracteres)
+NEW_TITLE = "<title>Loja</title>"
+
+
+async def run_check(store: SQLiteMonitorStore, url: str) -> Dict[str, Any]:
+    """Uma checagem da URL, gravada no store como o agendador faz"""
+    _, (id_,) = store.upsert([url], 3600, 0)
+    store.reschedule(id_, 0)
+    monitor = store.claim([])
+    assert monitor is not None and monitor["id"] == id_
+    started = time.perf_counter()
+    check = await check_page(monitor)
+    check["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    store.save_check(id_, check, time.time() + 3600)
+    return check
+
+
+async def assert_matches_full_audit(url: str, check: Dict[str, Any]) -> None:
+    full = await analyze_url(url)
+    for name in ("technical", "content"):
+        assert check["result"]["categories"][name] == full["categories"][name], name
+    assert check["result"]["categories"]["performance"]["score"] == full["categories"]["performance"]["score"]
+    assert check["result"]["overall_score"] == full["overall_score"], (check["result"], full)
+
+
+async def incremental(site: str, repeat: int) -> Dict[str, Any]:
+    store = SQLiteMonitorStore(":memory:")
+    report: Dict[str, Any] = {}
+    corpus = load_corpus()
+
+    async with httpx.AsyncClient() as client:
+        # Com ETag: 304 depois da primeira checagem
+        url = f"{site}/ecommerce?etag"
+        first = await run_check(store, url)
+        assert first["status"] == RUN_BASELINE and first["parsed"] == ["head", "body"], first["status"]
+        assert first["rescored"] == ["technical", "content", "performance"]
+        await assert_matches_full_audit(url, first)
+        second = await run_check(store, url)
+        assert second["status"] == RUN_NOT_MODIFIED and second["http_status"] == 304, second["status"]
+        assert not second["parsed"] and not second["rescored"] and second["result"] == first["result"]
+        report["etag"] = {"baseline_ms": first["duration_ms"], "not_modified_ms": second["duration_ms"]}
+
+        # Sem ETag, página grande: hash igual pula o parser
+        url = f"{site}/huge"
+        baseline = await run_check(store, url)
+        unchanged: List[float] = []
+        audits: List[float] = []
+        for _ in range(repeat):
+            check = await run_check(store, url)
+            assert check["status"] == RUN_UNCHANGED and not check["parsed"], check["status"]
+            assert not check["diff"]["changed"], check["diff"]
+            unchanged.append(check["duration_ms"])
+            started = time.perf_counter()
+            await analyze_url(url)
+            audits.append((time.perf_counter() - started) * 1000)
+        report["unchanged_huge"] = {
+            "baseline_ms": baseline["duration_ms"],
+            "unchanged_median_ms": round(statistics.median(unchanged), 2),
+            "full_audit_median_ms": round(statistics.median(audits), 2),
+        }
+        assert report["unchanged_huge"]["unchanged_median_ms"] < report["unchanged_huge"]["full_audit_median_ms"] / 2, report
+
+        # Só o <head> muda
+        url = f"{site}/medium"
+        await run_check(store, url)
+        html = corpus["medium"].replace("__BASE_URL__", site)
+        start, end = html.index("<title>"), html.index("</title>") + len("</title>")
+        edited = html[:start] + NEW_TITLE + html[end:]
+        await client.put(url, content=edited.encode("utf-8"))
+        check = await run_check(store, url)
+        assert check["status"] == RUN_CHANGED and check["parsed"] == ["head"], (check["status"], check["parsed"])
+        assert check["rescored"] == ["technical"], check["rescored"]
+        technical_diff = check["diff"]["categories"]["technical"]
+        assert technical_diff["score"]["delta"] < 0 and list(check["diff"]["categories"]) == ["technical"], check["diff"]
+        assert any("Título deve ter" in issue for issue in technical_diff["issues"]["added"]), technical_diff
+        await assert_matches_full_audit(url, check)
+        report["head_change"] = {"rescored": check["rescored"], "diff": check["diff"]}
+
+        # Só o body muda: o conteúdo vira curto demais
+        body_start = edited.index("<body")
+        short = edited[:body_start] + "<body><h1>Loja</h1><p>Poucas palavras aqui.</p></body></html>"
+        await client.put(url, content=short.encode("utf-8"))
+        check = await run_check(store, url)
+        assert check["parsed"] == ["body"], check["parsed"]
+        assert "content" in check["rescored"] and check["diff"]["changed"], check
+        content_diff = check["diff"]["categories"]["content"]
+        assert content_diff["score"]["delta"] < 0, content_diff
+        assert any("Conteúdo muito curto" in issue for issue in content_diff["issues"]["added"]), content_diff
+        await assert_matches_full_audit(url, check)
+        report["body_change"] = {"rescored": check["rescored"], "diff": check["diff"]}
+
+        # Volta ao original: as issues somem (resolved) e o score sobe
+        await client.put(url, content=html.encode("utf-8"))
+        check = await run_check(store, url)
+        assert check["diff"]["overall_score"]["delta"] > 0, check["diff"]
+        await assert_matches_full_audit(url, check)
+
+    history = store.monitor(store.upsert([url], 3600, 0)[1][0], 10)
+    assert [run["status"] for run in history["runs"]] == [RUN_CHANGED, RUN_CHANGED, RUN_CHANGED, RUN_BASELINE]
+    assert history["changes"] == 4, history
+    store.close()
+    return report
+
+
+def spread(urls: int) -> Dict[str, Any]:
+    """Primeira checagem sorteada dentro do intervalo: cada décimo recebe ~10% das URLs"""
+    store = SQLiteMonitorStore(":memory:")
+    interval = 3600.0
+    now = time.time()
+    created, _ = store.upsert([f"https://loja{index % 50}.example.com/p/{index}" for index in range(urls)], interval, interval)
+    assert created == urls
+    with store._lock:
+        due = [row[0] - now for row in store._conn.execute("SELECT next_check_at FROM seo_monitors")]
+    store.close()
+    deciles = [0] * 10
+    for offset in due:
+        deciles[min(9, int(offset / interval * 10))] += 1
+    shares = [round(count / urls, 3) for count in deciles]
+    assert all(0.05 < share < 0.15 for share in shares), shares
+    return {"urls": urls, "share_per_tenth_of_interval": shares}
+
+
+async def scheduling(site: str, pages: int) -> Dict[str, Any]:
+    """Agendador com 4 workers e 1 checagem por host: dois hosts em paralelo, nunca dois do mesmo"""
+    other = site.replace("127.0.0.1", "localhost")
+    # Atraso por página bem acima do custo fixo de cada checagem (parsing, SQLite)
+    delay = 0.25
+    urls = [f"{base}/small?delay={delay}&n={index}" for base in (site, other) for index in range(pages)]
+    scheduler = SEOMonitorScheduler(":memory:", concurrency=4, per_host=1)
+    await scheduler.start()
+    await scheduler.add(urls, interval=3600, check_now=True)
+
+    peak: Dict[str, int] = {}
+    parallel_hosts = 0
+    started = time.perf_counter()
+    while scheduler.counters[RUN_BASELINE] < len(urls):
+        in_use = scheduler.hosts.in_use()
+        for host, active in in_use.items():
+            peak[host] = max(peak.get(host, 0), active)
+        parallel_hosts = max(parallel_hosts, len(in_use))
+        assert time.perf_counter() - started < 60, scheduler.stats()
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await scheduler.refresh_stats()
+    stats = scheduler.stats()
+    await scheduler.stop()
+
+    assert max(peak.values()) == 1 and parallel_hosts == 2, (peak, parallel_hosts)
+    # Dois hosts em paralelo: ~metade do tempo de checar tudo em sequência
+    assert elapsed < len(urls) * delay * 0.8, elapsed
+    assert stats["monitors"] == len(urls) and stats["due"] == 0 and stats["checks"]["error"] == 0, stats
+    return {"urls": len(urls), "peak_per_host": peak, "elapsed_s": round(elapsed, 2)}
+
+
+async def main(urls: int, repeat: int) -> None:
+    analysis_pool.start_analysis_pool(kind="process")
+    try:
+        with serve_corpus() as site:
+            report = {
+                "incremental": await incremental(site, repeat),
+                "spread": spread(urls),
+                "scheduling": await scheduling(site, 6),
+            }
+    finally:
+        analysis_pool.shutdown_analysis_pool()
+        await close_http_client()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--urls", type=int, default=2000, help="URLs cadastradas no teste de espalhamento")
+    parser.add_argument("--repeat", type=int, default=5, help="checagens sem mudança na página grande")
+    args = parser.parse_args()
+    asyncio.run(main(args.urls, args.repeat))
@@ -0,0 +1,102 @@
+"""
+Serialização das respostas: caminho antigo (dict -> jsonable_encoder -> json)
+vs. orjson, MessagePack e compressão br/gzip
+
+Payloads reais: ROI de 60 meses, ROI em lote (grid 25 x 6 x 6 com projeção),
+análise SEO de uma página do corpus e um lote de 200 análises (tamanho de um
+crawl). Confere que JSON (orjson) e MessagePack decodificam para o mesmo
+conteúdo do json da stdlib e que o orjson é mais rápido em todos os payloads.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_serialization [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+from typing import Any, Dict
+
+import httpx
+import msgpack
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from benchmarks.bench_roi_batch import BASE, GRID
+from benchmarks.common import load_corpus, timeit
+from services.analysis_pool import start_analysis_pool
+from services.page_fetcher import FetchedPage
+from services.responses import brotli, compress, dumps_json, dumps_msgpack
+from services.roi_calculator import calculate_advanced_roi, calculate_roi_batch, expand_grid
+from services.seo_analyzer import analyze_response
+
+
+async def payloads() -> Dict[str, Any]:
+    roi = await calculate_advanced_roi(
+        investimento_inicial=50000, investimento_mensal=1500, receita_mensal=12000,
+        custo_operacional=2500, periodo_meses=60, crescimento_mensal=0.01,
+    )
+    scenarios, grid = expand_grid(BASE, GRID)
+    roi_batch = await calculate_roi_batch(scenarios, grid=grid)
+
+    # Análise SEO no próprio processo (sem pool), a partir do HTML do corpus
+    start_analysis_pool(kind="inline")
+    html = load_corpus()["ecommerce"].encode("utf-8")
+    page = FetchedPage(
+        "https://loja.example.com/", 200, httpx.Headers({"content-type": "text/html"}), html, "utf-8", len(html),
+        timing={"ttfb_ms": 120.0, "total_ms": 180.0, "redirects": 0, "hops": []},
+    )
+    seo = await analyze_response(page.url, page, with_page_info=True)
+    crawl = {"pages": [{**seo, "url": f"https://loja.example.com/p/{index}"} for index in range(200)]}
+    return {"roi_60_months": roi, "roi_batch_grid": roi_batch, "seo_analysis": seo, "seo_crawl_200": crawl}
+
+
+def main(repeat: int) -> None:
+    report: Dict[str, Any] = {"repeat": repeat, "payloads": {}}
+    for name, payload in asyncio.run(payloads()).items():
+        # Caminho de um endpoint que devolve dict: jsonable_encoder + json da stdlib
+        legacy = lambda: JSONResponse(jsonable_encoder(payload)).body  # noqa: E731
+        stdlib = lambda: JSONResponse(payload).body  # noqa: E731
+        body = dumps_json(payload)
+        packed = dumps_msgpack(payload)
+
+        expected = json.loads(stdlib())
+        assert json.loads(body) == expected, name
+        assert msgpack.unpackb(packed) == expected, name
+
+        timings = {
+            "dict_jsonable_encoder_json": timeit(legacy, repeat),
+            "json_stdlib": timeit(stdlib, repeat),
+            "orjson": timeit(lambda: dumps_json(payload), repeat),
+            "msgpack": timeit(lambda: dumps_msgpack(payload), repeat),
+            "gzip_orjson": timeit(lambda: compress(body, "gzip"), repeat),
+        }
+        sizes = {
+            "json_stdlib": len(stdlib()),
+            "orjson": len(body),
+            "msgpack": len(packed),
+            "gzip": len(gzip.compress(body, 6)),
+            "gzip_msgpack": len(compress(packed, "gzip")),
+        }
+        if brotli is not None:
+            timings["br_orjson"] = timeit(lambda: compress(body, "br"), repeat)
+            sizes["br"] = len(compress(body, "br"))
+            sizes["br_msgpack"] = len(compress(packed, "br"))
+
+        assert timings["orjson"]["median_ms"] < timings["json_stdlib"]["median_ms"], (name, timings)
+        assert timings["json_stdlib"]["median_ms"] <= timings["dict_jsonable_encoder_json"]["median_ms"], name
+        report["payloads"][name] = {
+            "median_ms": {encoder: timing["median_ms"] for encoder, timing in timings.items()},
+            "speedup_vs_dict_path": round(
+                timings["dict_jsonable_encoder_json"]["median_ms"] / max(timings["orjson"]["median_ms"], 1e-6), 1
+            ),
+            "bytes": sizes,
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,130 @@
+"""
+Subida do servidor: tempo até ficar pronto e latência das primeiras requisições
+
+Sobe o app num processo novo em três modos e, para cada um, mede o tempo até
+o /health/ready responder 200 e a latência da primeira e da segunda chamada
+de uma auditoria SEO (corpus local), do score de conteúdo e do ROI:
+- uvicorn sem aquecimento (WARMUP_ENABLED=false): como era antes
+- uvicorn com aquecimento
+- gunicorn com gunicorn.conf.py (preload + WEB_CONCURRENCY workers uvicorn)
+Confere que, com o aquecimento, a primeira auditoria não paga mais o spawn do
+pool de análise nem os imports, que /health/live e /health/ready respondem e
+que o gunicorn sobe mais de um worker. No próprio processo, confere que uma
+etapa do aquecimento que falha deixa o worker pronto ("degraded") e volta a
+"ready" quando a nova tentativa passa.
+Uso (a partir de backend/):
+    python -m benchmarks.bench_startup [--workers 2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.bench_content_stream import SECRET, free_port
+from benchmarks.common import server_command, spawn_server
+from benchmarks.stand_in import serve_corpus
+from services import warmup
+
+ROI_BODY = {"investimento_inicial": 10000, "investimento_mensal": 1000, "receita_mensal": 4000, "periodo_meses": 24}
+SCORE_BODY = {"content": "# Marketing digital\n\nSEO local para pequenas empresas.", "keywords": ["seo"]}
+
+
+def launch(command: List[str], port: int, env: Dict[str, str]) -> Dict[str, Any]:
+    """Sobe o servidor, espera o readiness e mede as primeiras chamadas"""
+    with spawn_server(command, port, env) as (base, startup_s), serve_corpus() as site, httpx.Client(
+        base_url=base, timeout=60, headers={"X-API-Secret": SECRET}
+    ) as client:
+        ready = client.get("/health/ready").json()
+        assert ready["status"] == "ready", ready
+        result: Dict[str, Any] = {"startup_s": round(startup_s, 3), "warmup": ready["warmup"], "first_ms": {}}
+        calls = {
+            "analyze_seo": lambda page: client.post("/api/v1/analyze-seo", json={"url": f"{site}/{page}"}),
+            "score_content": lambda _: client.post("/api/v1/score-content", json=SCORE_BODY),
+            "calculate_roi": lambda _: client.post("/api/v1/calculate-roi", json=ROI_BODY),
+        }
+        second: Dict[str, float] = {}
+        for name, call in calls.items():
+            # Páginas diferentes: a segunda auditoria não vem do cache
+            for page, latencies in (("medium", result["first_ms"]), ("ecommerce", second)):
+                call_started = time.perf_counter()
+                response = call(page)
+                latencies[name] = round((time.perf_counter() - call_started) * 1000, 1)
+                assert response.status_code == 200, (name, response.status_code, response.text)
+        result["second_ms"] = second
+
+        live = client.get("/health/live")
+        assert live.status_code == 200 and live.json()["status"] == "alive", live.text
+        # Conexões novas: o kernel distribui entre os workers que aceitam no socket
+        result["pids"] = len({httpx.get(f"{base}/health/live").json()["pid"] for _ in range(40)})
+        return result
+
+
+async def check_degraded() -> Dict[str, Any]:
+    """Etapa que falha uma vez: pronto e degraded na subida, ready depois da nova tentativa"""
+    original, interval = warmup.WARMUP_STEPS["analysis_pool"], warmup.WARMUP_RETRY_INTERVAL
+    calls = []
+
+    async def flaky_pool() -> None:
+        calls.append(time.perf_counter())
+        if len(calls) == 1:
+            raise RuntimeError("pool indisponível")
+
+    warmup.WARMUP_STEPS["analysis_pool"], warmup.WARMUP_RETRY_INTERVAL = flaky_pool, 0.05
+    try:
+        await warmup.warm_up()
+        degraded = warmup.readiness()
+        assert degraded["ready"] and degraded["status"] == "degraded", degraded
+        assert degraded["errors"] == ["analysis_pool: RuntimeError: pool indisponível"], degraded
+        for _ in range(100):
+            if warmup.readiness()["status"] == "ready":
+                break
+            await asyncio.sleep(0.02)
+        recovered = warmup.readiness()
+        assert recovered["status"] == "ready" and not recovered["errors"] and recovered["retries"] == 1, recovered
+        return {"degraded": degraded["status"], "recovered": recovered["status"], "step_calls": len(calls)}
+    finally:
+        await warmup.stop_warm_up()
+        warmup.WARMUP_STEPS["analysis_pool"], warmup.WARMUP_RETRY_INTERVAL = original, interval
+
+
+def main(workers: int) -> None:
+    data_dir = tempfile.mkdtemp()
+    env = {
+        "FASTAPI_SECRET": SECRET,
+        # Só as rotas locais (sem OpenAI): score de conteúdo e ROI não chamam o modelo
+        "OPENAI_API_KEY": "",
+        "RATE_LIMIT_INTERACTIVE_PER_SECOND": "0",
+        "RATE_LIMIT_STANDARD_PER_SECOND": "0",
+        "RATE_LIMIT_HEAVY_PER_SECOND": "0",
+    }
+    report: Dict[str, Any] = {"warmup_retry": asyncio.run(check_degraded())}
+    for mode, server, extra in (
+        ("uvicorn_cold", "uvicorn", {"WARMUP_ENABLED": "false"}),
+        ("uvicorn_warm", "uvicorn", {"WARMUP_ENABLED": "true"}),
+        ("gunicorn", "gunicorn", {"WARMUP_ENABLED": "true", "WEB_CONCURRENCY": str(workers)}),
+    ):
+        port = free_port()
+        extra["CONTENT_JOBS_DB_PATH"] = os.path.join(data_dir, f"{mode}.sqlite3")
+        report[mode] = launch(server_command(server, port), port, {**env, **extra})
+
+    cold, warm, forked = report["uvicorn_cold"], report["uvicorn_warm"], report["gunicorn"]
+    assert not cold["warmup"] and warm["warmup"]["analysis_pool"] > 0, (cold, warm)
+    # O spawn do pool e os imports saíram da primeira auditoria
+    assert warm["first_ms"]["analyze_seo"] < cold["first_ms"]["analyze_seo"], (cold, warm)
+    assert forked["first_ms"]["analyze_seo"] < cold["first_ms"]["analyze_seo"], (cold, forked)
+    assert workers == 1 or forked["pids"] > 1, forked
+    report["first_audit_speedup"] = round(cold["first_ms"]["analyze_seo"] / warm["first_ms"]["analyze_seo"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    main(args.workers)
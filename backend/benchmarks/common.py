@@ -0,0 +1,199 @@
+"""
+Utilitários compartilhados pelos benchmarks
+"""
+
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import httpx
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+# Página "huge": a grade de produtos do ecommerce.html repetida até ~2 MB
+HUGE_TARGET_BYTES = 2 * 1024 * 1024
+
+
+def load_corpus() -> Dict[str, str]:
+    """Carrega as páginas salvas do corpus (mais a página huge sintetizada)"""
+    corpus = {
+        path.stem: path.read_text(encoding="utf-8")
+        for path in sorted(CORPUS_DIR.glob("*.html"))
+    }
+    corpus["huge"] = build_huge_page(corpus["ecommerce"])
+    return corpus
+
+
+def load_site() -> Dict[str, str]:
+    """Site de exemplo para o crawler: caminhos /site/<página> (e /site/sitemap.xml)"""
+    site_dir = CORPUS_DIR / "site"
+    pages = {
+        f"site/{path.stem}": path.read_text(encoding="utf-8")
+        for path in sorted(site_dir.glob("*.html"))
+    }
+    pages["site"] = pages.pop("site/index")
+    pages["site/sitemap.xml"] = (site_dir / "sitemap.xml").read_text(encoding="utf-8")
+    return pages
+
+
+def build_huge_page(ecommerce_html: str) -> str:
+    start = ecommerce_html.index('<section class="grid">')
+    end = ecommerce_html.index("</section>")
+    head, grid, tail = ecommerce_html[:start], ecommerce_html[start:end], ecommerce_html[end:]
+    copies = max(1, HUGE_TARGET_BYTES // len(grid.encode("utf-8")) + 1)
+    return head + grid * copies + tail
+
+
+def timeit(fn: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Executa fn repeat*number vezes e retorna estatísticas em milissegundos"""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def percentiles(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 (nearest-rank), média e máximo de latências em milissegundos"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {}
+
+    def rank(q: float) -> float:
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "p50_ms": round(rank(0.50), 3),
+        "p95_ms": round(rank(0.95), 3),
+        "p99_ms": round(rank(0.99), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Máquina e versão do código de uma execução (para saber o que se compara)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(path: str, report: Dict[str, Any]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def read_report(path: str) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+# Métricas comparadas com a baseline: latências (_ms, menor é melhor) e vazão (_rps, maior é melhor).
+# p99 e máximo ficam de fora: variam demais entre execuções para servir de critério.
+COMPARED_METRICS = ("median_ms", "p50_ms", "p95_ms", "throughput_rps")
+# Diferenças absolutas menores que isso (ms) não contam como regressão (ruído de timer)
+MIN_DELTA_MS = 0.05
+
+
+def flatten_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """{"micro": {"nome": {"median_ms": 1.2}}} -> {"micro.nome.median_ms": 1.2}"""
+    flat: Dict[str, float] = {}
+
+    def walk(prefix: str, node: Any) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                walk(f"{prefix}.{key}" if prefix else key, value)
+        elif prefix.rsplit(".", 1)[-1] in COMPARED_METRICS and isinstance(node, (int, float)):
+            flat[prefix] = float(node)
+
+    walk("", {key: report[key] for key in ("micro", "load") if key in report})
+    return flat
+
+
+def compare_reports(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Regressões e melhoras acima da tolerância (fração) em relação à baseline"""
+    now, before = flatten_metrics(current), flatten_metrics(baseline)
+    result: Dict[str, List[Dict[str, Any]]] = {"regressions": [], "improvements": [], "missing": []}
+    for name, old in before.items():
+        new = now.get(name)
+        if new is None:
+            result["missing"].append({"metric": name})
+            continue
+        if old <= 0:
+            continue
+        change = (new - old) / old
+        higher_is_better = name.endswith("_rps")
+        worse = -change if higher_is_better else change
+        if not higher_is_better and abs(new - old) < MIN_DELTA_MS:
+            continue
+        entry = {"metric": name, "baseline": old, "current": new, "change_pct": round(change * 100, 1)}
+        if worse > tolerance:
+            result["regressions"].append(entry)
+        elif worse < -tolerance:
+            result["improvements"].append(entry)
+    return result
+
+
+@contextmanager
+def spawn_server(
+    command: List[str], port: int, env: Dict[str, str], timeout: float = 60
+) -> Iterator[Tuple[str, float]]:
+    """
+    Sobe o app num processo novo e espera o /health/ready responder 200;
+    devolve a URL base e o tempo de subida (s). Rodar o servidor fora do
+    processo do benchmark evita que o gerador de carga dispute o GIL com ele.
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, env={**os.environ, **env, "PORT": str(port)}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            assert process.poll() is None, f"servidor saiu com código {process.returncode}"
+            assert time.perf_counter() - started < timeout, "servidor não ficou pronto"
+            try:
+                if httpx.get(f"{base}/health/ready", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        yield base, time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=timeout)
+
+
+def server_command(kind: str, port: int) -> List[str]:
+    """Linha de comando do servidor: uvicorn (um processo) ou gunicorn (gunicorn.conf.py)"""
+    if kind == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"]
+    return [
+        sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning",
+    ]
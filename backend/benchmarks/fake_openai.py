@@ -0,0 +1,211 @@
+"""
+Servidor local compatível com a API de chat da OpenAI (substitui a OpenAI nos benchmarks)
+
+Responde POST /v1/chat/completions com um texto determinístico, no modo
+normal (JSON) e no streaming (SSE, "data: {...}" e "data: [DONE]"). O atraso
+até o primeiro token e entre tokens simula a latência de um modelo real.
+Mensagens com FAIL_MARKER recebem um erro (para testar o fallback) e
+mensagens com FLAKY_MARKER recebem 503 nas FLAKY_FAILURES primeiras vezes
+(para testar novas tentativas). O
+servidor anota os pedidos, as conexões usadas e o pico de pedidos simultâneos.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Set
+
+WORDS = (
+    "marketing digital conteúdo otimizado para mecanismos de busca com estratégia "
+    "clara, palavras-chave relevantes, links internos e chamadas para ação"
+).split()
+
+FAIL_MARKER = "__falha__"
+FLAKY_MARKER = "__instavel__"
+FLAKY_FAILURES = 2
+
+
+def fake_tokens(count: int) -> List[str]:
+    """Tokens do texto gerado: palavras com espaço, com um heading a cada 60"""
+    tokens = []
+    for index in range(count):
+        if index % 60 == 0:
+            tokens.append(("\n\n" if index else "") + "## Seção ")
+        tokens.append(WORDS[index % len(WORDS)] + " ")
+    return tokens
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Configuração do servidor (definida em serve_fake_openai)
+    tokens = 400
+    first_token_delay = 0.3
+    token_delay = 0.01
+    fail_status = 0
+    requests: List[Dict[str, Any]] = []
+    connections: Set[int] = set()
+    seen: Dict[str, int] = {}
+    load: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self.send_error(404)
+            return
+        with self.lock:
+            self.requests.append(body)
+            self.connections.add(self.client_address[1])
+            self.load["active"] += 1
+            self.load["peak"] = max(self.load["peak"], self.load["active"])
+        try:
+            self._complete(body)
+        finally:
+            with self.lock:
+                self.load["active"] -= 1
+
+    def _complete(self, body: Dict[str, Any]) -> None:
+        prompt = " ".join(str(message.get("content", "")) for message in body.get("messages", []))
+        if self.fail_status or FAIL_MARKER in prompt:
+            self._send_json(self.fail_status or 400, {"error": {"message": "falha simulada", "type": "server_error"}})
+            return
+        if FLAKY_MARKER in prompt:
+            with self.lock:
+                self.seen[prompt] = self.seen.get(prompt, 0) + 1
+                flaky = self.seen[prompt] <= FLAKY_FAILURES
+            if flaky:
+                self._send_json(503, {"error": {"message": "instabilidade simulada", "type": "server_error"}})
+                return
+
+        tokens = fake_tokens(min(self.tokens, body.get("max_tokens") or self.tokens))
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            self._stream(tokens, model, (body.get("stream_options") or {}).get("include_usage", False))
+        else:
+            # Modo normal: o modelo gera tudo antes de responder
+            time.sleep(self.first_token_delay + self.token_delay * len(tokens))
+            self._send_json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 50, "completion_tokens": len(tokens), "total_tokens": 50 + len(tokens)},
+            })
+
+    def _stream(self, tokens: List[str], model: str, include_usage: bool = False) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        def chunk(delta: Dict[str, Any], finish_reason: Any = None) -> bytes:
+            return event([{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+
+        def event(choices: List[Dict[str, Any]], **extra: Any) -> bytes:
+            payload = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+        try:
+            time.sleep(self.first_token_delay)
+            self.wfile.write(chunk({"role": "assistant", "content": ""}))
+            for token in tokens:
+                self.wfile.write(chunk({"content": token}))
+                self.wfile.flush()
+                time.sleep(self.token_delay)
+            self.wfile.write(chunk({}, "stop"))
+            if include_usage:
+                # Como a OpenAI com stream_options.include_usage: um pedaço final sem choices
+                usage = {"prompt_tokens": 50, "completion_tokens": len(tokens), "total_tokens": 50 + len(tokens)}
+                self.wfile.write(event([], usage=usage))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente desistiu (ex.: app desligado no meio da chamada)
+            self.close_connection = True
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class FakeOpenAIServer:
+    """Endereço do servidor e o que ele recebeu"""
+
+    def __init__(self, url: str, handler: type):
+        self.url = url
+        self.handler = handler
+
+    @property
+    def requests(self) -> List[Dict[str, Any]]:
+        return self.handler.requests
+
+    @property
+    def connections(self) -> int:
+        return len(self.handler.connections)
+
+    @property
+    def peak_concurrency(self) -> int:
+        return self.handler.load["peak"]
+
+    def __str__(self) -> str:
+        return self.url
+
+
+@contextmanager
+def serve_fake_openai(
+    tokens: int = 400,
+    first_token_delay: float = 0.3,
+    token_delay: float = 0.01,
+    fail_status: int = 0,
+) -> Iterator[FakeOpenAIServer]:
+    """
+    Sobe o servidor numa thread. str(servidor) é a base_url
+    (http://127.0.0.1:<porta>/v1); requests, connections e peak_concurrency
+    mostram o que chegou até ele.
+    """
+    handler = type("Handler", (FakeOpenAIHandler,), {
+        "tokens": tokens,
+        "first_token_delay": first_token_delay,
+        "token_delay": token_delay,
+        "fail_status": fail_status,
+        "requests": [],
+        "connections": set(),
+        "seen": {},
+        "load": {"active": 0, "peak": 0},
+        "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield FakeOpenAIServer(f"http://127.0.0.1:{server.server_address[1]}/v1", handler)
+    finally:
+        server.shutdown()
+        server.server_close()
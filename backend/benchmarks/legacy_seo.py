@@ -0,0 +1,120 @@
+"""
+Implementação antiga (BeautifulSoup + find_all) dos analisadores SEO.
+
+Mantida apenas como referência para os benchmarks: os scores do extrator
+de passada única precisam ser idênticos aos desta versão.
+"""
+
+from typing import Any, Dict, List
+
+from bs4 import BeautifulSoup
+
+
+def analyze_technical_seo(soup: BeautifulSoup) -> Dict[str, Any]:
+    score = 0
+    issues: List[str] = []
+    recommendations: List[str] = []
+
+    title = soup.find("title")
+    if title and title.text.strip():
+        title_text = title.text.strip()
+        if 30 <= len(title_text) <= 60:
+            score += 10
+        else:
+            issues.append(f"Título deve ter entre 30-60 caracteres (atual: {len(title_text)})")
+    else:
+        issues.append("Título não encontrado")
+
+    meta_description = soup.find("meta", attrs={"name": "description"})
+    if meta_description and meta_description.get("content"):
+        desc = meta_description.get("content", "").strip()
+        if 120 <= len(desc) <= 160:
+            score += 10
+        else:
+            issues.append(f"Meta description deve ter entre 120-160 caracteres (atual: {len(desc)})")
+    else:
+        issues.append("Meta description não encontrada")
+
+    h1_tags = soup.find_all("h1")
+    if len(h1_tags) == 1:
+        score += 10
+    elif len(h1_tags) == 0:
+        issues.append("Nenhuma tag H1 encontrada")
+    else:
+        issues.append(f"Múltiplas tags H1 encontradas ({len(h1_tags)})")
+
+    canonical = soup.find("link", attrs={"rel": "canonical"})
+    if canonical:
+        score += 5
+    else:
+        recommendations.append("Adicionar tag canonical")
+
+    og_tags = soup.find_all("meta", attrs={"property": lambda x: x and x.startswith("og:")})
+    if len(og_tags) >= 4:
+        score += 10
+    else:
+        recommendations.append("Adicionar mais tags Open Graph")
+
+    schema_tags = soup.find_all("script", attrs={"type": "application/ld+json"})
+    if schema_tags:
+        score += 5
+    else:
+        recommendations.append("Adicionar Schema.org structured data")
+
+    images = soup.find_all("img")
+    images_with_alt = [img for img in images if img.get("alt")]
+    if images:
+        alt_percentage = (len(images_with_alt) / len(images)) * 100
+        if alt_percentage >= 90:
+            score += 10
+        else:
+            issues.append(f"Apenas {alt_percentage:.0f}% das imagens têm alt text")
+
+    return {
+        "score": min(100, score),
+        "issues": issues,
+        "recommendations": recommendations,
+    }
+
+
+def analyze_content_seo(soup: BeautifulSoup) -> Dict[str, Any]:
+    score = 0
+    issues: List[str] = []
+
+    body = soup.find("body")
+    if body:
+        text = body.get_text(strip=True)
+        word_count = len(text.split())
+
+        if word_count >= 300:
+            score += 20
+        elif word_count >= 200:
+            score += 10
+        else:
+            issues.append(f"Conteúdo muito curto ({word_count} palavras). Recomendado: 300+")
+
+    headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
+    if len(headings) >= 3:
+        score += 10
+    else:
+        issues.append("Poucos headings. Use H2, H3 para estrutura")
+
+    links = soup.find_all("a", href=True)
+    internal_links = [link for link in links if link.get("href", "").startswith("/")]
+    if len(internal_links) >= 3:
+        score += 10
+    else:
+        issues.append("Adicionar mais links internos")
+
+    return {
+        "score": min(100, score),
+        "issues": issues,
+    }
+
+
+def analyze_html(html: str) -> Dict[str, Any]:
+    soup = BeautifulSoup(html, "lxml")
+    return {
+        "technical": analyze_technical_seo(soup),
+        "content": analyze_content_seo(soup),
+    }
@@ -0,0 +1,199 @@
+"""
+Gerador de carga assíncrono para os endpoints da API (sem rede externa)
+
+Sobe o app num processo separado (uvicorn ou gunicorn) apontando para o
+corpus local e para o servidor fake da OpenAI, e dispara, um endpoint por vez,
+pedidos em malha fechada: --concurrency clientes, cada um mandando o próximo
+pedido assim que o anterior volta. Para cada endpoint, informa p50/p95/p99,
+vazão (pedidos/s) e status das respostas:
+- analyze_seo: páginas do corpus (small, medium, ecommerce, malformed, huge) com
+  um parâmetro único por pedido, para medir auditorias de verdade e não o cache
+- calculate_roi: cenários com receita variando a cada pedido
+- generate_content: geração completa (use_cache false) no fake da OpenAI, com
+  latência por token configurável
+Uso (a partir de backend/):
+    python -m benchmarks.load [--requests 200] [--concurrency 8] [--server uvicorn]
+        [--tokens 200] [--first-token-delay 0.05] [--token-delay 0.002] [--output arquivo.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.bench_content_stream import SECRET, free_port
+from benchmarks.common import environment, percentiles, server_command, spawn_server, write_report
+from benchmarks.fake_openai import serve_fake_openai
+from benchmarks.stand_in import serve_corpus
+
+ENDPOINTS = ("analyze_seo", "calculate_roi", "generate_content")
+SEO_PAGES = ("small", "medium", "ecommerce", "malformed", "huge")
+
+
+@dataclass
+class Endpoint:
+    """Rota medida e o corpo do i-ésimo pedido"""
+
+    name: str
+    path: str
+    body: Callable[[int], Dict[str, Any]]
+
+
+def endpoints(site: str) -> Dict[str, Endpoint]:
+    return {
+        "analyze_seo": Endpoint(
+            "analyze_seo",
+            "/api/v1/analyze-seo",
+            lambda i: {"url": f"{site}/{SEO_PAGES[i % len(SEO_PAGES)]}?carga={i}"},
+        ),
+        "calculate_roi": Endpoint(
+            "calculate_roi",
+            "/api/v1/calculate-roi",
+            lambda i: {
+                "investimento_inicial": 50000, "investimento_mensal": 1500, "receita_mensal": 8000 + i % 50 * 100,
+                "custo_operacional": 2500, "periodo_meses": 36, "crescimento_mensal": 0.01,
+            },
+        ),
+        "generate_content": Endpoint(
+            "generate_content",
+            "/api/v1/generate-content",
+            lambda i: {
+                "topic": f"Como medir o ROI de campanhas de SEO ({i})", "content_type": "blog_post",
+                "length": "medium", "keywords": ["roi", "seo"], "use_cache": False,
+            },
+        ),
+    }
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, endpoint: Endpoint, requests: int, concurrency: int, warmup: int
+) -> Dict[str, Any]:
+    """Dispara `requests` pedidos com `concurrency` clientes em malha fechada"""
+    for index in range(warmup):
+        await client.post(endpoint.path, json=endpoint.body(-1 - index))
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    next_index = 0
+
+    async def user() -> None:
+        nonlocal next_index
+        while next_index < requests:
+            index, next_index = next_index, next_index + 1
+            started = time.perf_counter()
+            try:
+                response = await client.post(endpoint.path, json=endpoint.body(index))
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ok = statuses.get("200", 0)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": requests - ok,
+        "statuses": dict(statuses),
+        **percentiles(latencies),
+        "throughput_rps": round(ok / elapsed, 2),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def run_load(
+    requests: int,
+    concurrency: int,
+    server: str = "uvicorn",
+    workers: int = 0,
+    tokens: int = 200,
+    first_token_delay: float = 0.05,
+    token_delay: float = 0.002,
+    only: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Sobe corpus, fake da OpenAI e app; mede cada endpoint em sequência"""
+    port = free_port()
+    with ExitStack() as stack:
+        site = stack.enter_context(serve_corpus())
+        fake = stack.enter_context(
+            serve_fake_openai(tokens=tokens, first_token_delay=first_token_delay, token_delay=token_delay)
+        )
+        env = {
+            "FASTAPI_SECRET": SECRET,
+            "OPENAI_API_KEY": "sk-fake",
+            "OPENAI_BASE_URL": fake.url,
+            "CONTENT_JOBS_DB_PATH": os.path.join(tempfile.mkdtemp(), "content_jobs.sqlite3"),
+            # Um único cliente gera toda a carga: sem rate limit por cliente
+            "RATE_LIMIT_INTERACTIVE_PER_SECOND": "0",
+            "RATE_LIMIT_STANDARD_PER_SECOND": "0",
+            "RATE_LIMIT_HEAVY_PER_SECOND": "0",
+        }
+        if workers:
+            env["WEB_CONCURRENCY"] = str(workers)
+        base, startup_s = stack.enter_context(spawn_server(server_command(server, port), port, env))
+
+        async def measure() -> Dict[str, Any]:
+            limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+            async with httpx.AsyncClient(
+                base_url=base, timeout=120, limits=limits, headers={"X-API-Secret": SECRET}
+            ) as client:
+                return {
+                    name: await run_endpoint(client, endpoint, requests, concurrency, warmup=concurrency)
+                    for name, endpoint in endpoints(site).items()
+                    if not only or name in only
+                }
+
+        results = asyncio.run(measure())
+    return {
+        "config": {
+            "server": server, "workers": workers or None, "requests": requests, "concurrency": concurrency,
+            "fake_openai": {"tokens": tokens, "first_token_delay": first_token_delay, "token_delay": token_delay},
+            "startup_s": round(startup_s, 3),
+        },
+        "endpoints": results,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    load = run_load(
+        args.requests, args.concurrency, args.server, args.workers,
+        args.tokens, args.first_token_delay, args.token_delay, args.only,
+    )
+    for name, result in load["endpoints"].items():
+        # 503/429 são o controle de admissão ou o pool saturado: a concorrência passou da capacidade
+        if result["errors"]:
+            print(f"{name}: {result['errors']} pedidos sem 200 {result['statuses']}", file=sys.stderr)
+    report = {"meta": environment(), "load": load["endpoints"], "load_config": load["config"]}
+    if args.output:
+        write_report(args.output, report)
+    print(json.dumps(report, indent=2))
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--requests", type=int, default=200, help="pedidos medidos por endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="clientes simultâneos")
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=0, help="WEB_CONCURRENCY no gunicorn (0 = padrão)")
+    parser.add_argument("--tokens", type=int, default=200, help="tokens por resposta do fake da OpenAI")
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.002)
+    parser.add_argument("--only", nargs="*", choices=ENDPOINTS, help="medir só estes endpoints")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument("--output", default="")
+    main(parser.parse_args())
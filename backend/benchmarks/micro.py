@@ -0,0 +1,118 @@
+"""
+Micro-benchmarks das funções dos serviços (sem rede, sem servidor)
+
+Uma medição por função que fica no caminho de cada endpoint:
+- análise SEO: extract_features e score_document nas páginas do corpus
+  (small, medium, malformed, huge), score_content e extração de Markdown
+- ROI: calculate_advanced_roi (24 e 60 meses), lote (grid 25 x 6 x 6) e
+  simulação Monte Carlo (10k sorteios)
+- conteúdo: prompt e chave de cache da chamada ao modelo, template de fallback
+- respostas: serialização (orjson) e gzip de um resultado de ROI
+Uso (a partir de backend/):
+    python -m benchmarks.micro [--repeat 15] [--output arquivo.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.bench_roi_batch import BASE, GRID
+from benchmarks.bench_roi_simulation import SCENARIO
+from benchmarks.common import environment, load_corpus, timeit, write_report
+from benchmarks.fake_openai import fake_tokens
+from services.content_cache import cache_key as content_cache_key
+from services.content_generator import _chat_request, build_prompt, generate_template_content
+from services.html_features import extract_features
+from services.markdown_features import extract_markdown_features
+from services.responses import compress, dumps_json
+from services.roi_calculator import calculate_advanced_roi, calculate_roi_batch, expand_grid
+from services.roi_simulation import simulate_roi
+from services.seo_analyzer import score_content, score_document
+from services.seo_cache import cache_key as seo_cache_key
+
+PAGES = ("small", "medium", "malformed", "huge")
+ROI = {
+    "investimento_inicial": 50000, "investimento_mensal": 1500, "receita_mensal": 12000,
+    "custo_operacional": 2500, "crescimento_mensal": 0.01,
+}
+CONTENT = {
+    "topic": "Como medir o ROI de campanhas de SEO", "content_type": "blog_post", "tone": "professional",
+    "length": "long", "keywords": ["roi", "seo"], "target_audience": "pequenas empresas",
+}
+
+
+# Cada amostra repete a chamada até somar ~5 ms (funções de µs ficam acima da resolução do timer)
+SAMPLE_SECONDS = 0.005
+
+
+def cases(loop: asyncio.AbstractEventLoop) -> Dict[str, Callable[[], Any]]:
+    """Nome do caso -> chamada medida"""
+    corpus = load_corpus()
+    measured: Dict[str, Callable[[], Any]] = {}
+
+    for page in PAGES:
+        html = corpus[page]
+        content = html.encode("utf-8")
+        measured[f"extract_features.{page}"] = lambda html=html: extract_features(html)
+        measured[f"score_document.{page}"] = lambda content=content: score_document(
+            content, "utf-8", "https://loja.example.com/", True, True, True, True
+        )
+
+    # Texto no formato do que o modelo devolve (headings a cada 60 tokens)
+    markdown = "".join(fake_tokens(1200))
+    measured["score_content.markdown"] = lambda: score_content(markdown, ["marketing digital", "seo"])
+    measured["extract_markdown_features"] = lambda: extract_markdown_features(markdown)
+
+    for months in (24, 60):
+        measured[f"calculate_advanced_roi.{months}m"] = lambda months=months: loop.run_until_complete(
+            calculate_advanced_roi(**ROI, periodo_meses=months)
+        )
+    scenarios, grid = expand_grid(BASE, GRID)
+    measured["calculate_roi_batch.grid_900"] = lambda: loop.run_until_complete(
+        calculate_roi_batch(scenarios, grid=grid)
+    )
+    measured["simulate_roi.10k_60m"] = lambda: simulate_roi(**SCENARIO, periodo_meses=60, simulacoes=10000, seed=42)
+
+    measured["content.prompt_and_cache_key"] = lambda: content_cache_key(
+        _chat_request(build_prompt(**CONTENT), CONTENT["length"])
+    )
+    measured["content.template_fallback"] = lambda: generate_template_content(**CONTENT, include_seo_score=True)
+    measured["seo_cache.key"] = lambda: seo_cache_key("https://Loja.Example.com/produtos/?b=2&a=1#topo", True, True, True)
+
+    roi_result = loop.run_until_complete(calculate_advanced_roi(**ROI, periodo_meses=60))
+    body = dumps_json(roi_result)
+    measured["responses.dumps_json.roi_60m"] = lambda: dumps_json(roi_result)
+    measured["responses.gzip.roi_60m"] = lambda: compress(body, "gzip")
+    return measured
+
+
+def run_micro(repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    loop = asyncio.new_event_loop()
+    try:
+        for name, fn in cases(loop).items():
+            fn()  # aquecimento (imports, caches de regex)
+            started = time.perf_counter()
+            fn()
+            number = max(1, int(SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-7)))
+            results[name] = timeit(fn, repeat, number)
+    finally:
+        loop.close()
+    return results
+
+
+def main(repeat: int, output: str) -> None:
+    report = {"meta": environment(), "micro": run_micro(repeat)}
+    if output:
+        write_report(output, report)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+    main(args.repeat, args.output)
@@ -0,0 +1,176 @@
+"""
+Servidor HTTP local que serve o corpus de páginas (substitui sites reais nos benchmarks)
+
+O marcador __BASE_URL__ nas páginas é trocado pela URL do servidor (links absolutos, sitemaps).
+PUT /<página> troca o HTML servido (páginas que mudam entre checagens do monitoramento).
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+from urllib.parse import parse_qs
+
+from benchmarks.common import load_corpus
+
+
+_ASSET_TYPES = {
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".svg": "image/svg+xml",
+    ".woff2": "font/woff2",
+}
+
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages: Dict[str, bytes] = {}
+
+    def do_GET(self) -> None:
+        path, _, query = self.path.partition("?")
+        params = parse_qs(query, keep_blank_values=True)
+        # ?delay=0.3 atrasa os headers (simula um servidor lento / TTFB alto)
+        if "delay" in params:
+            time.sleep(float(params["delay"][0]))
+        # ?redirect=/destino responde 301 (para testar cadeias de redirect)
+        if "redirect" in params:
+            self.send_response(301)
+            self.send_header("Location", params["redirect"][0])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if path.startswith("/stream/"):
+            self._stream_page(int(path.rsplit("/", 1)[1]), "no-length" not in query)
+            return
+        if path == "/binary":
+            self._send_binary()
+            return
+        if path.endswith(tuple(_ASSET_TYPES)):
+            self._send_asset(path, params, head=False)
+            return
+
+        name = path.strip("/") or "small"
+        body = self.pages.get(name)
+        if body is None:
+            self.send_error(404)
+            return
+
+        # ?etag envia ETag (hash do conteúdo) e responde 304 ao If-None-Match igual
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"' if "etag" in params else None
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        content_type = "application/xml" if name.endswith(".xml") else "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=300")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self) -> None:
+        name = self.path.partition("?")[0].strip("/")
+        self.pages[name] = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        self.send_response(204)
+        self.end_headers()
+
+    def _stream_page(self, size: int, send_length: bool) -> None:
+        """HTML de `size` bytes gerado sob demanda (simula uma URL gigante/hostil)"""
+        block = b"<p>" + b"conteudo " * 113 + b"</p>\n"
+        head = b"<html><head><title>Stream</title></head><body>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if send_length:
+            self.send_header("Content-Length", str(size))
+        else:
+            self.send_header("Connection", "close")
+        self.end_headers()
+
+        self.wfile.write(head)
+        sent = len(head)
+        try:
+            while sent < size:
+                chunk = block[: size - sent]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _send_binary(self) -> None:
+        body = b"\0" * 65536
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self) -> None:
+        path, _, query = self.path.partition("?")
+        params = parse_qs(query, keep_blank_values=True)
+        if "delay" in params:
+            time.sleep(float(params["delay"][0]))
+        # ?nohead simula servidores/CDNs que recusam HEAD (força o GET com Range)
+        if not path.endswith(tuple(_ASSET_TYPES)) or "nohead" in params:
+            self.send_response(405)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_asset(path, params, head=True)
+
+    def _send_asset(self, path: str, params: Dict[str, list], head: bool) -> None:
+        """
+        Sub-recurso gerado (CSS, JS, imagem, fonte). ?size= define o tamanho
+        e ?nocache omite o Cache-Control. Atende Range: bytes=0-0.
+        """
+        size = int(params.get("size", ["20000"])[0])
+        content_type = _ASSET_TYPES[path[path.rfind("."):]]
+        ranged = self.headers.get("Range") == "bytes=0-0" and not head
+        self.send_response(206 if ranged else 200)
+        self.send_header("Content-Type", content_type)
+        if "nocache" not in params:
+            self.send_header("Cache-Control", "max-age=86400")
+        if ranged:
+            self.send_header("Content-Range", f"bytes 0-0/{size}")
+            self.send_header("Content-Length", "1")
+        else:
+            self.send_header("Content-Length", str(size))
+        self.end_headers()
+        if not head:
+            self.wfile.write(b"x" if ranged else b"x" * size)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@contextmanager
+def serve_corpus(pages: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """Sobe o servidor numa thread e retorna a URL base (http://127.0.0.1:<porta>)"""
+    corpus = pages if pages is not None else load_corpus()
+    handler = type("Handler", (CorpusHandler,), {})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    handler.pages = {
+        name: html.replace("__BASE_URL__", base_url).encode("utf-8")
+        for name, html in corpus.items()
+    }
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield base_url
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,88 @@
+"""
+Suíte de benchmarks: micro-benchmarks + carga nos endpoints, com comparação à baseline
+
+Roda benchmarks.micro e benchmarks.load, grava o resultado em JSON e, se houver
+uma baseline, compara a mediana de cada micro-benchmark e p50/p95/vazão de
+cada endpoint: variações acima de --tolerance contam como regressão (código
+de saída 1) ou melhora. A baseline é o JSON de uma execução anterior na mesma
+máquina (ex.: a main antes de um release), gravado com --save-baseline.
+Uso (a partir de backend/):
+    python -m benchmarks.suite --save-baseline            # na versão de referência
+    python -m benchmarks.suite                            # na versão nova: compara
+    python -m benchmarks.suite --skip-load --repeat 30    # só micro-benchmarks
+Resultados em benchmarks/results/ (fora do git: os números dependem da máquina).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+from benchmarks.common import compare_reports, environment, read_report, write_report
+from benchmarks.load import add_arguments, run_load
+from benchmarks.micro import run_micro
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"meta": environment()}
+    if not args.skip_micro:
+        report["micro"] = run_micro(args.repeat)
+    if not args.skip_load:
+        load = run_load(
+            args.requests, args.concurrency, args.server, args.workers,
+            args.tokens, args.first_token_delay, args.token_delay, args.only,
+        )
+        report["load"] = load["endpoints"]
+        report["load_config"] = load["config"]
+    return report
+
+
+def main(args: argparse.Namespace) -> int:
+    report = run_suite(args)
+    write_report(args.output, report)
+    if args.save_baseline:
+        write_report(args.baseline, report)
+        print(f"Baseline gravada em {args.baseline}")
+        return 0
+
+    if not Path(args.baseline).exists():
+        print(json.dumps(report, indent=2))
+        print(f"Sem baseline em {args.baseline}; resultado em {args.output}")
+        return 0
+
+    baseline = read_report(args.baseline)
+    comparison = compare_reports(report, baseline, args.tolerance)
+    if baseline.get("load_config") and report.get("load_config"):
+        # Mesma carga dos dois lados (a subida do servidor pode variar)
+        before = {key: value for key, value in baseline["load_config"].items() if key != "startup_s"}
+        now = {key: value for key, value in report["load_config"].items() if key != "startup_s"}
+        if before != now:
+            comparison["warnings"] = [f"Carga diferente da baseline: {before} vs. {now}"]
+    if baseline["meta"].get("cpus") != report["meta"].get("cpus"):
+        comparison.setdefault("warnings", []).append("Baseline de outra máquina (número de CPUs diferente)")
+
+    summary = {
+        "baseline": {key: baseline["meta"].get(key) for key in ("commit", "timestamp")},
+        "current": {key: report["meta"].get(key) for key in ("commit", "timestamp")},
+        "tolerance_pct": args.tolerance * 100,
+        "errors": {name: result["errors"] for name, result in report.get("load", {}).items() if result["errors"]},
+        **comparison,
+    }
+    print(json.dumps(summary, indent=2))
+    return 1 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--repeat", type=int, default=15, help="amostras por micro-benchmark")
+    add_arguments(parser)
+    parser.add_argument("--output", default=str(RESULTS_DIR / "latest.json"))
+    parser.add_argument("--baseline", default=str(RESULTS_DIR / "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="variação aceita (fração, 0.25 = 25%%)")
+    sys.exit(main(parser.parse_args()))
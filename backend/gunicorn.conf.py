@@ -0,0 +1,48 @@
+"""
+Configuração do gunicorn para produção (Procfile/nixpacks)
+
+    gunicorn main:app -c gunicorn.conf.py
+
+O master carrega o app e importa os serviços uma vez (preload) e faz fork de
+WEB_CONCURRENCY workers uvicorn (padrão: um por núcleo). Cada worker roda o
+lifespan do FastAPI depois do fork: clientes HTTP/OpenAI, pool de análise e
+aquecimento são próprios do worker, e ele só aceita conexões quando o
+aquecimento termina. Workers que morrem são repostos pelo master.
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# O .env vale também para as opções abaixo (o app o lê de novo na importação)
+load_dotenv()
+
+_cores = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# Um worker por núcleo: o trabalho pesado de CPU vai para o pool de análise de cada worker
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or _cores
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Sem heartbeat do worker nesse tempo (event loop travado), o master o recria
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# Espera pelas requisições em andamento (e streams de geração) no desligamento
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Reciclar workers de tempos em tempos (0 = nunca); o jitter evita reinícios simultâneos
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+accesslog = os.getenv("GUNICORN_ACCESSLOG") or None
+
+# Os núcleos são divididos entre os pools de análise dos workers (senão seriam
+# workers x núcleos processos disputando a CPU); SEO_WORKERS > 0 manda
+if int(os.getenv("SEO_WORKERS", "0")) == 0:
+    os.environ["SEO_WORKERS"] = str(max(1, _cores // workers))
+
+
+def on_starting(server):
+    """No master, antes do fork: imports pesados (lxml, NumPy, OpenAI) herdados pelos workers"""
+    from services.warmup import import_services
+
+    server.log.info(f"Serviços importados no master em {import_services():.2f}s ({workers} workers)")
@@ -3,11 +3,13 @@ FastAPI Backend para Orbee Labs
 APIs para processamento pesado: SEO Analysis, ROI Calculation, Content Generation
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List, Dict, Any
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+from typing import Optional, List, Dict, Any, Literal, Union
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 import logging
@@ -15,15 +17,56 @@ import logging
 # Carregar variáveis de ambiente
 load_dotenv()
 
+from services.admission import ADMISSION_ENABLED, AdmissionMiddleware  # noqa: E402 (lê o .env na importação)
+from services.metrics import METRICS_ENABLED, MetricsMiddleware  # noqa: E402
+from services.responses import APIResponse, NegotiationMiddleware, dumps_json  # noqa: E402
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Recursos compartilhados criados uma vez por processo"""
+    from services.analysis_pool import start_analysis_pool, shutdown_analysis_pool
+    from services.content_jobs import start_content_jobs, stop_content_jobs
+    from services.http_client import start_http_client, close_http_client
+    from services.llm_client import start_llm_client, close_llm_client
+    from services.persistence import start_persistence, stop_persistence
+    from services.seo_cache import close_seo_cache
+    from services.seo_monitor import start_seo_monitor, stop_seo_monitor
+    from services.warmup import stop_warm_up, warm_up
+
+    await start_http_client()
+    await start_llm_client()
+    start_analysis_pool()
+    await start_content_jobs()
+    await start_persistence()
+    await start_seo_monitor()
+    # Imports, parser e processos do pool prontos antes de aceitar conexões
+    await warm_up()
+    yield
+    await stop_warm_up()
+    await stop_content_jobs()
+    await stop_seo_monitor()
+    # Grava o que ainda está na fila de persistência
+    await stop_persistence()
+    # Espera as análises em andamento numa thread (não trava o event loop)
+    await asyncio.to_thread(shutdown_analysis_pool)
+    close_seo_cache()
+    await close_llm_client()
+    await close_http_client()
+
+
 # Criar aplicação FastAPI
 app = FastAPI(
     title="Orbee Labs API",
     description="Backend API para processamento pesado de análises SEO, cálculos ROI e geração de conteúdo",
     version="1.0.0",
+    lifespan=lifespan,
+    # orjson (ou MessagePack, pelo Accept) e compressão br/gzip nas respostas grandes
+    default_response_class=APIResponse,
 )
 
 # Configurar CORS
@@ -34,14 +77,6 @@ origins = [
     "https://www.orbeelabs.com",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Secret para autenticação entre serviços
 API_SECRET = os.getenv("FASTAPI_SECRET")
 
@@ -53,6 +88,27 @@ if not API_SECRET:
     API_SECRET = "change-me-in-production"
     print("⚠️ AVISO: FASTAPI_SECRET não configurado. Usando secret padrão (NÃO SEGURO PARA PRODUÇÃO!)")
 
+# Admissão (rate limit por cliente e vagas por classe de rota) antes do CORS:
+# o CORS fica por fora e também marca as respostas 429/503. X-Client-Id só
+# identifica o cliente quando vem com o X-API-Secret
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, secret=API_SECRET)
+
+# Accept e Accept-Encoding do pedido para a APIResponse (formato e compressão)
+app.add_middleware(NegotiationMiddleware)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Métricas por rota por fora de tudo: contam também as recusas (429/503) e o preflight do CORS
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # Models
 class SEOAnalysisRequest(BaseModel):
@@ -60,15 +116,159 @@ class SEOAnalysisRequest(BaseModel):
     include_technical: bool = Field(True, description="Incluir análise técnica")
     include_content: bool = Field(True, description="Incluir análise de conteúdo")
     include_performance: bool = Field(True, description="Incluir análise de performance")
+    include_resources: bool = Field(False, description="Consultar CSS, JS, imagens e fontes da página (peso total)")
+
+
+class SEOBatchRequest(BaseModel):
+    urls: Optional[List[HttpUrl]] = Field(None, description="URLs para análise SEO", max_length=5000)
+    sitemap_url: Optional[HttpUrl] = Field(None, description="Sitemap de onde ler as URLs")
+    include_technical: bool = Field(True, description="Incluir análise técnica")
+    include_content: bool = Field(True, description="Incluir análise de conteúdo")
+    include_performance: bool = Field(True, description="Incluir análise de performance")
+    include_resources: bool = Field(False, description="Consultar CSS, JS, imagens e fontes das páginas (peso total)")
+    concurrency: int = Field(8, description="Análises simultâneas no lote", ge=1, le=32)
+    per_host_concurrency: int = Field(2, description="Análises simultâneas por host", ge=1, le=8)
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if not self.urls and not self.sitemap_url:
+            raise ValueError("Informe urls ou sitemap_url")
+        return self
+
+
+class SEOCrawlRequest(BaseModel):
+    url: HttpUrl = Field(..., description="URL semente do crawl")
+    sitemap_url: Optional[HttpUrl] = Field(None, description="Sitemap com URLs extras (detecta páginas órfãs)")
+    max_depth: int = Field(2, description="Profundidade máxima de links a partir da semente", ge=0, le=5)
+    max_pages: int = Field(50, description="Máximo de páginas analisadas", ge=1, le=500)
+    concurrency: int = Field(4, description="Páginas baixadas simultaneamente", ge=1, le=16)
+    use_bloom_filter: bool = Field(False, description="Usar Bloom filter como conjunto de visitadas (sites grandes)")
+    include_technical: bool = Field(True, description="Incluir análise técnica")
+    include_content: bool = Field(True, description="Incluir análise de conteúdo")
+    include_performance: bool = Field(True, description="Incluir análise de performance")
 
 
 class ROIRequest(BaseModel):
     investimento_inicial: float = Field(..., description="Investimento inicial", gt=0)
     investimento_mensal: float = Field(0, description="Investimento mensal recorrente", ge=0)
-    receita_mensal: float = Field(..., description="Receita mensal esperada", ge=0)
+    receita_mensal: Optional[float] = Field(
+        None, description="Receita mensal esperada (base do crescimento e da sazonalidade)", ge=0
+    )
     custo_operacional: float = Field(0, description="Custo operacional mensal", ge=0)
     periodo_meses: int = Field(12, description="Período de análise em meses", ge=1, le=60)
     taxa_desconto: float = Field(0.1, description="Taxa de desconto (padrão 10%)", ge=0, le=1)
+    crescimento_mensal: float = Field(0, description="Crescimento composto da receita por mês (ex.: 0.02)", gt=-1, le=1)
+    sazonalidade: Optional[List[float]] = Field(
+        None, description="12 multiplicadores da receita, a partir do mês 1 (ciclo anual)",
+        min_length=12, max_length=12,
+    )
+    receitas_mensais: Optional[List[float]] = Field(
+        None, description="Receita de cada mês (substitui receita_mensal, crescimento e sazonalidade)",
+        max_length=60,
+    )
+
+    @model_validator(mode="after")
+    def check_revenue(self):
+        if self.receitas_mensais is not None:
+            if len(self.receitas_mensais) != self.periodo_meses:
+                raise ValueError(
+                    f"receitas_mensais deve ter {self.periodo_meses} valores (recebido: {len(self.receitas_mensais)})"
+                )
+            if self.crescimento_mensal or self.sazonalidade is not None:
+                raise ValueError("receitas_mensais não pode ser combinado com crescimento_mensal ou sazonalidade")
+            if any(value < 0 for value in self.receitas_mensais):
+                raise ValueError("receitas_mensais não pode ter valores negativos")
+            if self.receita_mensal is None:
+                self.receita_mensal = 0.0
+        elif self.receita_mensal is None:
+            raise ValueError("Informe receita_mensal ou receitas_mensais")
+        if self.sazonalidade is not None and any(value < 0 for value in self.sazonalidade):
+            raise ValueError("sazonalidade não pode ter valores negativos")
+        return self
+
+
+class ROIBatchRequest(BaseModel):
+    scenarios: Optional[List[ROIRequest]] = Field(None, description="Cenários a calcular", max_length=10000)
+    base: Optional[ROIRequest] = Field(None, description="Valores fixos do grid (os eixos do grid sobrescrevem)")
+    grid: Optional[Dict[str, List[float]]] = Field(
+        None,
+        description="Eixos do grid, ex.: {\"receita_mensal\": [...], \"taxa_desconto\": [...]}",
+    )
+    summary_only: bool = Field(False, description="Somente métricas agregadas (sem projeção mensal)")
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if bool(self.scenarios) == bool(self.grid):
+            raise ValueError("Informe scenarios ou grid (um dos dois)")
+        if self.grid:
+            if self.base is None:
+                raise ValueError("grid exige base com os demais parâmetros")
+            base = self.base.model_dump()
+            for name, values in self.grid.items():
+                if name not in ROIRequest.model_fields:
+                    raise ValueError(f"Parâmetro de grid desconhecido: {name}")
+                if name in ("sazonalidade", "receitas_mensais"):
+                    raise ValueError(f"{name} não pode ser eixo do grid (use base)")
+                if not values:
+                    raise ValueError(f"Eixo do grid vazio: {name}")
+                # Cada valor do eixo passa pelas mesmas validações de ROIRequest
+                for value in values:
+                    ROIRequest(**{**base, name: value})
+        return self
+
+
+class ROIDistribution(BaseModel):
+    tipo: Literal["normal", "lognormal", "uniforme", "triangular"] = Field(..., description="Tipo da distribuição")
+    media: Optional[float] = Field(None, description="Média (normal, lognormal)")
+    desvio: Optional[float] = Field(None, description="Desvio padrão (normal, lognormal)", ge=0)
+    min: Optional[float] = Field(None, description="Mínimo (uniforme, triangular; corta a normal)")
+    moda: Optional[float] = Field(None, description="Valor mais provável (triangular)")
+    max: Optional[float] = Field(None, description="Máximo (uniforme, triangular; corta a normal)")
+
+    @model_validator(mode="after")
+    def check_params(self):
+        required = {
+            "normal": ("media", "desvio"),
+            "lognormal": ("media", "desvio"),
+            "uniforme": ("min", "max"),
+            "triangular": ("min", "moda", "max"),
+        }[self.tipo]
+        missing = [name for name in required if getattr(self, name) is None]
+        if missing:
+            raise ValueError(f"Distribuição {self.tipo} exige: {', '.join(missing)}")
+        if self.tipo == "lognormal" and self.media <= 0:
+            raise ValueError("Distribuição lognormal exige media > 0")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError("min deve ser menor ou igual a max")
+        if self.tipo == "triangular" and not self.min <= self.moda <= self.max:
+            raise ValueError("moda deve estar entre min e max")
+        return self
+
+
+# Parâmetro da simulação: valor fixo ou distribuição
+ROIParameter = Union[float, ROIDistribution]
+
+
+class ROISimulationRequest(BaseModel):
+    investimento_inicial: ROIParameter = Field(..., description="Investimento inicial")
+    investimento_mensal: ROIParameter = Field(0, description="Investimento mensal recorrente")
+    receita_mensal: ROIParameter = Field(..., description="Receita mensal esperada")
+    custo_operacional: ROIParameter = Field(0, description="Custo operacional mensal")
+    periodo_meses: int = Field(12, description="Período de análise em meses", ge=1, le=60)
+    taxa_desconto: ROIParameter = Field(0.1, description="Taxa de desconto anual")
+    churn_mensal: ROIParameter = Field(0, description="Fração da receita perdida por mês (ex.: 0.02)")
+    rampa_meses: ROIParameter = Field(0, description="Meses até a receita atingir 100%")
+    simulacoes: int = Field(10000, description="Número de sorteios", ge=100, le=100000)
+    seed: Optional[int] = Field(None, description="Seed do gerador (mesma seed, mesmo resultado)", ge=0)
+
+    @model_validator(mode="after")
+    def check_fixed_values(self):
+        for name in ("investimento_inicial", "investimento_mensal", "receita_mensal",
+                     "custo_operacional", "taxa_desconto", "churn_mensal", "rampa_meses"):
+            value = getattr(self, name)
+            if not isinstance(value, ROIDistribution) and value < 0:
+                raise ValueError(f"{name} não pode ser negativo")
+        return self
 
 
 class ContentGenerationRequest(BaseModel):
@@ -76,8 +276,33 @@ class ContentGenerationRequest(BaseModel):
     content_type: str = Field("blog_post", description="Tipo de conteúdo: blog_post, email, social_media")
     tone: str = Field("professional", description="Tom: professional, casual, friendly")
     length: str = Field("medium", description="Tamanho: short, medium, long")
-    keywords: Optional[List[str]] = Field(None, description="Palavras-chave a incluir")
+    keywords: Optional[List[str]] = Field(None, description="Palavras-chave a incluir", max_length=50)
     target_audience: Optional[str] = Field(None, description="Público-alvo")
+    use_cache: bool = Field(True, description="False força uma geração nova em vez de reaproveitar o cache")
+    include_seo_score: bool = Field(False, description="Incluir o score SEO do texto gerado (seo_score)")
+
+
+class ContentScoreRequest(BaseModel):
+    content: str = Field(..., description="Texto em Markdown ou HTML", min_length=1, max_length=100000)
+    # O custo do score cresce com contexto x palavras-chave: limite para um pedido não segurar o worker
+    keywords: Optional[List[str]] = Field(
+        None, description="Palavras-chave esperadas (a primeira é a principal)", max_length=50
+    )
+
+
+class SEOMonitorRequest(BaseModel):
+    urls: List[HttpUrl] = Field(..., description="URLs monitoradas", min_length=1)
+    interval_hours: float = Field(24, description="Intervalo entre checagens de cada URL (horas)", ge=0.25, le=24 * 30)
+    check_now: bool = Field(
+        False, description="Primeira checagem assim que houver vaga (senão, sorteada dentro do intervalo)"
+    )
+
+
+class ContentJobRequest(BaseModel):
+    items: List[ContentGenerationRequest] = Field(..., description="Pedidos de geração do job", min_length=1)
+    system_prompt: Optional[str] = Field(
+        None, description="System prompt de todos os itens (padrão: especialista em marketing e SEO)", max_length=4000
+    )
 
 
 # Dependência para autenticação
@@ -91,10 +316,43 @@ async def verify_api_secret(x_api_secret: Optional[str] = Header(None)):
 # Health Check
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (mantido por compatibilidade; equivale ao liveness)"""
     return {"status": "healthy", "service": "orbee-labs-api"}
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness: o processo está de pé e o event loop responde"""
+    return {"status": "alive", "service": "orbee-labs-api", "pid": os.getpid()}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness: 503 até o worker terminar o aquecimento (serviços importados,
+    parser e pool de análise prontos, clientes criados); 200 depois, com status
+    "degraded" enquanto uma etapa que falhou é tentada de novo
+    """
+    from services.warmup import readiness as worker_readiness
+
+    state = worker_readiness()
+    return APIResponse(content={**state, "service": "orbee-labs-api"}, status_code=200 if state["ready"] else 503)
+
+
+# Métricas no formato do Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Contadores, histogramas de latência e stats dos serviços (text/plain do Prometheus)"""
+    from services.metrics import METRICS_TOKEN, refresh_service_stats, render_metrics
+
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+    await refresh_service_stats()
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # SEO Analysis Endpoint
 @app.post("/api/v1/analyze-seo")
 async def analyze_seo(
@@ -108,40 +366,250 @@ async def analyze_seo(
     - Análise técnica (meta tags, headers, estrutura HTML)
     - Análise de conteúdo (keywords, headings, alt texts)
     - Análise de performance (Core Web Vitals, velocidade)
+    
+    Resultados ficam em cache; o header X-Cache indica HIT, MISS ou REVALIDATED.
+    Com a persistência ligada, X-Record-Id traz o id da auditoria em seo_audits
+    (gravada em segundo plano).
     """
+    from services.analysis_pool import PoolSaturatedError
+    from services.page_fetcher import PageTooLargeError, UnsupportedContentError
+
     try:
-        from services.seo_analyzer import analyze_url
+        from services.persistence import record_seo_audit
+        from services.seo_cache import get_seo_cache
         
         logger.info(f"Iniciando análise SEO para: {request.url}")
-        result = await analyze_url(
+        result, cache_status = await get_seo_cache().analyze(
             str(request.url),
             include_technical=request.include_technical,
             include_content=request.include_content,
             include_performance=request.include_performance,
+            include_resources=request.include_resources,
         )
         
-        return JSONResponse(content=result)
+        headers = {"X-Cache": cache_status}
+        record_id = await record_seo_audit(str(request.url), result)
+        if record_id:
+            headers["X-Record-Id"] = record_id
+        return APIResponse(content=result, headers=headers)
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado com outras análises. Tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+    except (PageTooLargeError, UnsupportedContentError) as e:
+        logger.warning(f"URL recusada na análise SEO: {str(e)}")
+        raise HTTPException(status_code=422, detail=f"Erro ao analisar URL: {str(e)}")
     except Exception as e:
         logger.error(f"Erro na análise SEO: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao analisar URL: {str(e)}")
 
 
+# Estatísticas da persistência write-behind
+@app.get("/api/v1/stats/persistence")
+async def persistence_stats_endpoint(api_secret: str = Depends(verify_api_secret)):
+    """Fila de gravação: linhas pendentes, gravadas, descartadas e duração do último lote"""
+    from services.persistence import persistence_stats
+
+    return APIResponse(content=persistence_stats())
+
+
+# Monitoramento agendado (auditoria periódica com detecção de mudanças)
+@app.post("/api/v1/monitors", status_code=202)
+async def create_monitors(
+    request: SEOMonitorRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Cadastra URLs para auditoria periódica
+    
+    Responde na hora com o id de cada URL (na ordem enviada; cadastrar de novo
+    só atualiza o intervalo). As checagens são espalhadas pelo intervalo, com
+    limite por host, e só reanalisam o que mudou na página. Acompanhe em
+    GET /api/v1/monitors/{monitor_id}.
+    """
+    from services.seo_monitor import SEO_MONITOR_MAX_URLS, get_seo_monitor
+    
+    if len(request.urls) > SEO_MONITOR_MAX_URLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo de {SEO_MONITOR_MAX_URLS} URLs por pedido (recebido: {len(request.urls)})",
+        )
+    
+    logger.info(f"Monitoramento de {len(request.urls)} URLs a cada {request.interval_hours}h")
+    created = await get_seo_monitor().add(
+        [str(url) for url in request.urls],
+        interval=request.interval_hours * 3600,
+        check_now=request.check_now,
+    )
+    return APIResponse(status_code=202, content=created)
+
+
+@app.get("/api/v1/monitors/{monitor_id}")
+async def get_monitor(
+    monitor_id: str,
+    runs: int = Query(10, ge=1, le=100, description="Checagens mais recentes"),
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Último resultado da URL e histórico de checagens
+    
+    Cada checagem traz o status (baseline, not_modified, unchanged, changed ou
+    error), as categorias recalculadas e o diff de scores e issues em relação
+    à anterior.
+    """
+    from services.seo_monitor import MonitorNotFoundError, get_seo_monitor
+    
+    try:
+        return APIResponse(content=await get_seo_monitor().get(monitor_id, runs=runs))
+    except MonitorNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.delete("/api/v1/monitors/{monitor_id}", status_code=204)
+async def delete_monitor(
+    monitor_id: str,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """Remove a URL do monitoramento (e o histórico)"""
+    from services.seo_monitor import MonitorNotFoundError, get_seo_monitor
+    
+    try:
+        await get_seo_monitor().remove(monitor_id)
+    except MonitorNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
+
+
+@app.get("/api/v1/stats/seo-monitor")
+async def seo_monitor_stats(api_secret: str = Depends(verify_api_secret)):
+    """URLs monitoradas, vencidas e checagens por resultado"""
+    from services.seo_monitor import get_seo_monitor
+
+    monitor = get_seo_monitor()
+    await monitor.refresh_stats()
+    return APIResponse(content=monitor.stats())
+
+
+# Estatísticas do pool HTTP
+@app.get("/api/v1/stats/http-pool")
+async def http_pool_stats(api_secret: str = Depends(verify_api_secret)):
+    """Conexões ativas, ociosas e reutilizadas do cliente HTTP compartilhado"""
+    from services.analysis_pool import pool_stats as analysis_pool_stats
+    from services.http_client import pool_stats
+
+    return {**pool_stats(), "analysis_pool": analysis_pool_stats()}
+
+
+# Batch SEO Analysis Endpoint
+@app.post("/api/v1/analyze-seo/batch")
+async def analyze_seo_batch(
+    request: SEOBatchRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Análise SEO em lote
+    
+    Recebe uma lista de URLs e/ou um sitemap e devolve um stream NDJSON:
+    uma linha por URL assim que a análise termina (type "result" ou "error")
+    e uma linha final com o resumo (type "summary").
+    """
+    from services.seo_batch import SEO_BATCH_MAX_URLS, analyze_batch, dedupe_urls, load_sitemap
+    
+    urls = [str(url) for url in request.urls or []]
+    if request.sitemap_url:
+        try:
+            urls += await load_sitemap(str(request.sitemap_url), limit=SEO_BATCH_MAX_URLS)
+        except Exception as e:
+            logger.error(f"Erro ao ler sitemap: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Erro ao ler sitemap: {str(e)}")
+    
+    urls = dedupe_urls(urls)[:SEO_BATCH_MAX_URLS]
+    logger.info(f"Iniciando análise SEO em lote de {len(urls)} URLs")
+    
+    async def stream():
+        async for record in analyze_batch(
+            urls,
+            include_technical=request.include_technical,
+            include_content=request.include_content,
+            include_performance=request.include_performance,
+            include_resources=request.include_resources,
+            concurrency=request.concurrency,
+            per_host_concurrency=request.per_host_concurrency,
+        ):
+            yield dumps_json(record) + b"\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# Site Crawl Endpoint
+@app.post("/api/v1/analyze-seo/crawl")
+async def analyze_seo_crawl(
+    request: SEOCrawlRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Auditoria SEO do site inteiro
+    
+    Parte da URL semente e segue os links internos (até max_depth/max_pages),
+    retornando o resultado de cada página e métricas agregadas do site:
+    títulos e descriptions duplicados, páginas órfãs e distribuição de H1.
+    """
+    try:
+        from services.seo_batch import load_sitemap
+        from services.site_crawler import crawl_site
+        
+        extra_urls = await load_sitemap(str(request.sitemap_url)) if request.sitemap_url else None
+        result = await crawl_site(
+            str(request.url),
+            max_depth=request.max_depth,
+            max_pages=request.max_pages,
+            concurrency=request.concurrency,
+            include_technical=request.include_technical,
+            include_content=request.include_content,
+            include_performance=request.include_performance,
+            use_bloom_filter=request.use_bloom_filter,
+            extra_urls=extra_urls,
+        )
+        
+        return APIResponse(content=result)
+    except Exception as e:
+        logger.error(f"Erro no crawl SEO: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao analisar site: {str(e)}")
+
+
+# Estatísticas do cache de análises SEO
+@app.get("/api/v1/stats/seo-cache")
+async def seo_cache_stats(api_secret: str = Depends(verify_api_secret)):
+    """Hits, misses e revalidações do cache de /api/v1/analyze-seo"""
+    from services.seo_cache import get_seo_cache
+
+    return get_seo_cache().stats()
+
+
 # ROI Calculation Endpoint
 @app.post("/api/v1/calculate-roi")
 async def calculate_roi(
     request: ROIRequest,
-    api_secret: str = Depends(verify_api_secret)
+    api_secret: str = Depends(verify_api_secret),
+    x_client_id: Optional[str] = Header(None),
 ):
     """
     Cálculo avançado de ROI
     
     Calcula o ROI considerando:
     - Investimento inicial e recorrente
-    - Receita e custos operacionais
-    - Taxa de desconto (NPV)
+    - Receita (constante, com crescimento/sazonalidade ou série mês a mês) e custos operacionais
+    - Taxa de desconto (NPV, TIR, TIRM e payback descontado)
     - Período de análise customizável
+    
+    Com a persistência ligada, o cálculo vai para roi_calculations em segundo
+    plano (userId = X-Client-Id) e X-Record-Id traz o id.
     """
     try:
+        from services.persistence import record_roi_calculation
         from services.roi_calculator import calculate_advanced_roi
         
         logger.info(f"Calculando ROI para período de {request.periodo_meses} meses")
@@ -152,14 +620,107 @@ async def calculate_roi(
             custo_operacional=request.custo_operacional,
             periodo_meses=request.periodo_meses,
             taxa_desconto=request.taxa_desconto,
+            crescimento_mensal=request.crescimento_mensal,
+            sazonalidade=request.sazonalidade,
+            receitas_mensais=request.receitas_mensais,
         )
         
-        return JSONResponse(content=result)
+        record_id = await record_roi_calculation(request.model_dump(), result, user_id=x_client_id)
+        return APIResponse(content=result, headers={"X-Record-Id": record_id} if record_id else None)
     except Exception as e:
         logger.error(f"Erro no cálculo ROI: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao calcular ROI: {str(e)}")
 
 
+# Batch ROI Calculation Endpoint
+@app.post("/api/v1/calculate-roi/batch")
+async def calculate_roi_batch(
+    request: ROIBatchRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Cálculo de ROI em lote (cenários ou grid de parâmetros)
+    
+    Recebe uma lista de cenários ou um grid (ex.: receita x taxa x período,
+    aplicado sobre `base`) e calcula tudo numa única passada vetorizada.
+    A resposta é colunar: uma lista por métrica, na ordem dos cenários.
+    Com summary_only, a projeção mensal é omitida.
+    """
+    try:
+        from services.roi_calculator import ROI_PARAMETERS, ROI_SERIES, calculate_roi_batch, expand_grid
+        
+        grid = None
+        if request.grid:
+            scenarios, grid = expand_grid(request.base.model_dump(), request.grid)
+        else:
+            scenarios = {
+                name: [getattr(scenario, name) for scenario in request.scenarios]
+                for name in ROI_PARAMETERS + ROI_SERIES
+            }
+        
+        logger.info(f"Calculando ROI em lote ({len(scenarios['investimento_inicial'])} cenários)")
+        result = await calculate_roi_batch(scenarios, summary_only=request.summary_only, grid=grid)
+        
+        return APIResponse(content=result)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro no cálculo ROI em lote: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular ROI: {str(e)}")
+
+
+# ROI Monte Carlo Simulation Endpoint
+@app.post("/api/v1/calculate-roi/simulate")
+async def simulate_roi_endpoint(
+    request: ROISimulationRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Simulação Monte Carlo de ROI
+    
+    Cada parâmetro pode ser fixo ou uma distribuição (normal, lognormal,
+    uniforme, triangular), além de churn mensal e rampa de receita.
+    Retorna percentis de VPL, ROI e payback e a probabilidade de break-even
+    dentro do período. A resposta traz a seed usada (reprodutível).
+    """
+    from services.analysis_pool import PoolSaturatedError, run_in_pool
+    from services.roi_simulation import simulate_roi
+    
+    def param(value):
+        return value.model_dump(exclude_none=True) if isinstance(value, ROIDistribution) else value
+    
+    try:
+        logger.info(f"Simulando ROI ({request.simulacoes} sorteios, {request.periodo_meses} meses)")
+        # Trabalho de CPU: roda no pool de workers, fora do event loop
+        result = await run_in_pool(
+            simulate_roi,
+            param(request.investimento_inicial),
+            param(request.investimento_mensal),
+            param(request.receita_mensal),
+            param(request.custo_operacional),
+            request.periodo_meses,
+            param(request.taxa_desconto),
+            param(request.churn_mensal),
+            param(request.rampa_meses),
+            request.simulacoes,
+            request.seed,
+        )
+        
+        return APIResponse(content=result)
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro na simulação de ROI: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao simular ROI: {str(e)}")
+
+
 # Content Generation Endpoint
 @app.post("/api/v1/generate-content")
 async def generate_content(
@@ -174,6 +735,10 @@ async def generate_content(
     - Tipo de conteúdo (blog post, email, social media)
     - Tom e público-alvo
     - Palavras-chave
+    
+    O mesmo pedido refeito volta do cache (cached=true na resposta);
+    use_cache=false força uma geração nova. Com include_seo_score, a resposta
+    traz o score SEO do texto gerado (seo_score).
     """
     try:
         from services.content_generator import generate_content
@@ -186,14 +751,155 @@ async def generate_content(
             length=request.length,
             keywords=request.keywords or [],
             target_audience=request.target_audience,
+            use_cache=request.use_cache,
+            include_seo_score=request.include_seo_score,
         )
         
-        return JSONResponse(content=result)
+        return APIResponse(content=result)
     except Exception as e:
         logger.error(f"Erro na geração de conteúdo: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erro ao gerar conteúdo: {str(e)}")
 
 
+# Content SEO Score Endpoint
+@app.post("/api/v1/score-content")
+async def score_content_endpoint(
+    request: ContentScoreRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Score SEO de um texto (Markdown ou HTML) sem URL
+    
+    Mesmas regras de conteúdo de /api/v1/analyze-seo, mais estrutura de
+    headings e cobertura/densidade das palavras-chave.
+    """
+    from services.analysis_pool import PoolSaturatedError, run_in_pool
+    from services.seo_analyzer import score_content
+    
+    try:
+        # Trabalho de CPU (até 100 KB x 50 palavras-chave): fora do event loop
+        return await run_in_pool(score_content, request.content, request.keywords)
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado. Tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+
+
+# Estatísticas da geração de conteúdo
+@app.get("/api/v1/stats/content")
+async def content_stats(api_secret: str = Depends(verify_api_secret)):
+    """Cache de conteúdo gerado e chamadas à OpenAI (em andamento, na fila, espera)"""
+    from services.content_cache import get_content_cache
+    from services.content_jobs import get_content_jobs
+    from services.llm_client import llm_stats
+
+    jobs = get_content_jobs()
+    await jobs.refresh_stats()
+    return {"cache": get_content_cache().stats(), "openai": llm_stats(), "jobs": jobs.stats()}
+
+
+@app.get("/api/v1/stats/admission")
+async def admission_stats(api_secret: str = Depends(verify_api_secret)):
+    """Vagas, filas e recusas (429/503) por classe de prioridade"""
+    from services.admission import get_admission_controller
+
+    return get_admission_controller().stats()
+
+
+# Content Generation Streaming Endpoint (SSE)
+@app.post("/api/v1/generate-content/stream")
+async def generate_content_stream(
+    request: ContentGenerationRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Geração de conteúdo com IA em streaming (Server-Sent Events)
+    
+    Mesmos parâmetros de /api/v1/generate-content. O texto chega em eventos
+    "token" ({"content": "..."}) à medida que é gerado; o evento final "done"
+    traz os metadados (word_count, keywords, generated_with_ai, ...) e
+    ttfb_ms. Sem OpenAI configurada, o template é enviado do mesmo jeito.
+    """
+    from services.content_generator import stream_content
+    
+    logger.info(f"Gerando conteúdo do tipo {request.content_type} (streaming)")
+    
+    async def stream():
+        async for event in stream_content(
+            topic=request.topic,
+            content_type=request.content_type,
+            tone=request.tone,
+            length=request.length,
+            keywords=request.keywords or [],
+            target_audience=request.target_audience,
+            use_cache=request.use_cache,
+            include_seo_score=request.include_seo_score,
+        ):
+            yield f"event: {event['event']}\ndata: {dumps_json(event['data']).decode()}\n\n"
+    
+    # Sem cache nem buffering em proxies (nginx), para cada evento sair na hora
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Content Generation Jobs (lote em segundo plano)
+@app.post("/api/v1/content-jobs", status_code=202)
+async def create_content_job(
+    request: ContentJobRequest,
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Geração de conteúdo em lote
+    
+    Responde na hora (202) com o id do job; os itens são gerados em segundo
+    plano, com concorrência limitada e novas tentativas para erros
+    transitórios. Acompanhe em GET /api/v1/content-jobs/{job_id}.
+    """
+    from services.content_jobs import CONTENT_JOBS_MAX_ITEMS, get_content_jobs
+    
+    if len(request.items) > CONTENT_JOBS_MAX_ITEMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo de {CONTENT_JOBS_MAX_ITEMS} itens por job (recebido: {len(request.items)})",
+        )
+    
+    logger.info(f"Job de conteúdo com {len(request.items)} itens")
+    job = await get_content_jobs().submit(
+        [item.model_dump() for item in request.items],
+        system_prompt=request.system_prompt,
+    )
+    return APIResponse(status_code=202, content=job)
+
+
+@app.get("/api/v1/content-jobs/{job_id}")
+async def get_content_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Primeiro item da página"),
+    limit: int = Query(50, ge=1, le=200, description="Itens por página"),
+    status: Optional[Literal["pending", "running", "done", "failed"]] = Query(None, description="Filtrar itens por status"),
+    api_secret: str = Depends(verify_api_secret)
+):
+    """
+    Status do job e uma página de resultados
+    
+    Cada item traz status, tentativas e o resultado (mesmo formato de
+    /api/v1/generate-content) ou o erro; pagination.next_offset é null na
+    última página.
+    """
+    from services.content_jobs import JobNotFoundError, get_content_jobs
+    
+    try:
+        return await get_content_jobs().results(job_id, offset=offset, limit=limit, status=status)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,291 @@
+"""
+Controle de admissão: classes de prioridade, concorrência por classe e rate limit por cliente
+
+Cada rota da API pertence a uma classe (interactive: ROI, score de conteúdo,
+status de jobs; standard: geração de conteúdo e simulação; heavy: auditorias SEO). Cada
+classe tem suas próprias vagas e fila limitada, então uma rajada de auditorias
+nunca enfileira um cálculo de ROI. Antes da vaga, um token bucket por
+(classe, cliente) limita a taxa de cada chamador. Pedidos recusados recebem
+429 (rate limit) ou 503 (fila cheia / espera esgotada) na hora, com Retry-After.
+
+O estado do rate limit fica atrás de RateLimitBackend: hoje em memória,
+por processo; um backend compartilhado (ex.: Redis) pode ser plugado depois.
+"""
+
+import abc
+import asyncio
+import hmac
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services.concurrency import ConcurrencyLimiter, QueueFullError, SlotUnavailableError
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_STANDARD = "standard"
+PRIORITY_HEAVY = "heavy"
+
+# Prefixo da rota -> classe. Rotas fora da lista (health, docs) não passam pelo controle
+ROUTE_CLASSES: Tuple[Tuple[str, str], ...] = (
+    ("/api/v1/analyze-seo", PRIORITY_HEAVY),
+    ("/api/v1/generate-content", PRIORITY_STANDARD),
+    # Monte Carlo ocupa o pool de processos: não compete com o ROI simples
+    ("/api/v1/calculate-roi/simulate", PRIORITY_STANDARD),
+    ("/api/v1/calculate-roi", PRIORITY_INTERACTIVE),
+    ("/api/v1/score-content", PRIORITY_INTERACTIVE),
+    ("/api/v1/content-jobs", PRIORITY_INTERACTIVE),
+    ("/api/v1/monitors", PRIORITY_INTERACTIVE),
+    ("/api/v1/stats", PRIORITY_INTERACTIVE),
+)
+
+# Desligado por padrão: sem X-Client-Id, todo pedido vindo do Next.js cai no
+# mesmo bucket (o IP do servidor Next.js ou do proxy da plataforma)
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+# Máximo de clientes com bucket em memória (os menos recentes são descartados)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+# Identidade do chamador (ex.: id do usuário repassado pelo Next.js), aceita só
+# com X-API-Secret válido; sem ele, o IP
+CLIENT_ID_HEADER = os.getenv("ADMISSION_CLIENT_ID_HEADER", "x-client-id").lower()
+
+
+@dataclass(frozen=True)
+class AdmissionClass:
+    name: str
+    # Pedidos em andamento, na fila e espera máxima por uma vaga (s)
+    concurrency: int
+    max_waiting: int
+    queue_timeout: float
+    # Token bucket por cliente: pedidos por segundo e rajada (rate 0 = sem rate limit)
+    rate: float
+    burst: float
+
+
+def _class_from_env(
+    name: str, concurrency: int, max_waiting: int, queue_timeout: float, rate: float, burst: float
+) -> AdmissionClass:
+    """Valores padrão da classe, ajustáveis via ADMISSION_<CLASSE>_* e RATE_LIMIT_<CLASSE>_*"""
+    prefix = name.upper()
+    return AdmissionClass(
+        name=name,
+        concurrency=int(os.getenv(f"ADMISSION_{prefix}_CONCURRENCY", str(concurrency))),
+        max_waiting=int(os.getenv(f"ADMISSION_{prefix}_QUEUE", str(max_waiting))),
+        queue_timeout=float(os.getenv(f"ADMISSION_{prefix}_QUEUE_TIMEOUT", str(queue_timeout))),
+        rate=float(os.getenv(f"RATE_LIMIT_{prefix}_PER_SECOND", str(rate))),
+        burst=float(os.getenv(f"RATE_LIMIT_{prefix}_BURST", str(burst))),
+    )
+
+
+ADMISSION_CLASSES: Dict[str, AdmissionClass] = {
+    admission_class.name: admission_class
+    for admission_class in (
+        _class_from_env(PRIORITY_INTERACTIVE, 64, 256, 2, 20, 60),
+        _class_from_env(PRIORITY_STANDARD, 16, 64, 10, 2, 20),
+        _class_from_env(PRIORITY_HEAVY, 8, 32, 15, 1, 10),
+    )
+}
+
+
+class RateLimitBackend(abc.ABC):
+    """
+    Estado dos token buckets. Um backend compartilhado entre processos só
+    precisa implementar acquire (de forma atômica por chave).
+    """
+
+    @abc.abstractmethod
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Consome cost tokens do bucket; retorna 0 se permitido ou os segundos até haver tokens"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets em memória (por processo), com LRU limitado por número de chaves"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        # chave -> (tokens, instante da última atualização)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def acquire(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            # Um cliente descartado volta com o bucket cheio (erro a favor do cliente)
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+def classify(path: str) -> Optional[str]:
+    """Classe de prioridade da rota (None = fora do controle de admissão)"""
+    for prefix, name in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return name
+    return None
+
+
+def client_identity(scope: Dict[str, Any], secret: Optional[str] = None) -> str:
+    """
+    Header de identidade do chamador ou, na falta dele, o IP da conexão. O
+    header só vale junto com X-API-Secret igual a secret (quem não se
+    autenticou escolheria o próprio bucket); sem secret, sempre o IP.
+    """
+    headers = dict(scope.get("headers", ()))
+    provided = headers.get(b"x-api-secret")
+    if secret and provided is not None and hmac.compare_digest(provided, secret.encode("utf-8")):
+        identity = headers.get(CLIENT_ID_HEADER.encode("latin-1"), b"").decode("latin-1").strip()[:128]
+        if identity:
+            return f"id:{identity}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anon"
+
+
+class AdmissionController:
+    """Limitadores por classe e rate limit por cliente (estado compartilhado do processo)"""
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, AdmissionClass]] = None,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        self.classes = classes if classes is not None else ADMISSION_CLASSES
+        self.backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.admitted = {name: 0 for name in self.classes}
+        self.rate_limited = {name: 0 for name in self.classes}
+        self.overloaded = {name: 0 for name in self.classes}
+
+    def limiter(self, name: str) -> ConcurrencyLimiter:
+        # Semáforos pertencem ao event loop: recriar se o app rodar num loop novo
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._limiters = {
+                admission_class.name: ConcurrencyLimiter(
+                    admission_class.concurrency,
+                    admission_class.queue_timeout,
+                    admission_class.max_waiting,
+                    name=f"Classe {admission_class.name}",
+                )
+                for admission_class in self.classes.values()
+            }
+        return self._limiters[name]
+
+    async def check_rate(self, name: str, identity: str) -> float:
+        """Segundos até o cliente poder chamar de novo (0 = liberado)"""
+        admission_class = self.classes[name]
+        if admission_class.rate <= 0:
+            return 0.0
+        wait = await self.backend.acquire(f"{name}:{identity}", admission_class.rate, admission_class.burst)
+        if wait > 0:
+            self.rate_limited[name] += 1
+        return wait
+
+    def retry_after(self, name: str) -> int:
+        """Sugestão de Retry-After para fila cheia: espera média atual da classe (1 a 30 s)"""
+        average = self.limiter(name).wait.to_dict()["avg_ms"] or 0
+        return max(1, min(30, math.ceil(average / 1000)))
+
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for name, admission_class in self.classes.items():
+            limiter = self._limiters.get(name)
+            classes[name] = {
+                "concurrency": admission_class.concurrency,
+                "max_waiting": admission_class.max_waiting,
+                "queue_timeout": admission_class.queue_timeout,
+                "rate_per_second": admission_class.rate,
+                "burst": admission_class.burst,
+                "admitted": self.admitted[name],
+                "rate_limited": self.rate_limited[name],
+                "overloaded": self.overloaded[name],
+                "limiter": limiter.stats() if limiter is not None else None,
+            }
+        return {"enabled": ADMISSION_ENABLED, "classes": classes, "rate_limit": self.backend.stats()}
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
+
+
+async def _reject(send: Callable, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI: rate limit (429) e vaga na classe da rota (503) antes do
+    endpoint. A vaga fica ocupada até o fim da resposta, streaming incluído.
+    secret é o FASTAPI_SECRET, que autentica o header de identidade.
+    """
+
+    def __init__(self, app: Callable, controller: Optional[AdmissionController] = None, secret: Optional[str] = None):
+        self.app = app
+        self.controller = controller
+        self.secret = secret
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        name = classify(scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller or get_admission_controller()
+        wait = await controller.check_rate(name, client_identity(scope, self.secret))
+        if wait > 0:
+            await _reject(send, 429, "Muitas requisições. Tente novamente em instantes.", wait)
+            return
+
+        async with AsyncExitStack() as stack:
+            try:
+                await stack.enter_async_context(controller.limiter(name).slot())
+            except SlotUnavailableError as e:
+                controller.overloaded[name] += 1
+                logger.warning(f"Pedido recusado ({scope['path']}): {str(e)}")
+                retry_after = controller.retry_after(name) if isinstance(e, QueueFullError) else 5
+                await _reject(send, 503, "Servidor ocupado. Tente novamente em instantes.", retry_after)
+                return
+            controller.admitted[name] += 1
+            await self.app(scope, receive, send)
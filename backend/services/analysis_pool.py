@@ -0,0 +1,130 @@
+"""
+Pool de workers para o trabalho de CPU (parsing e scoring) fora do event loop
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# process (padrão) | thread | inline (roda no event loop; apenas debug/benchmarks)
+SEO_EXECUTOR = os.getenv("SEO_EXECUTOR", "process").lower()
+SEO_WORKERS = int(os.getenv("SEO_WORKERS", "0")) or (os.cpu_count() or 1)
+# Máximo de análises em execução + na fila; acima disso a API responde 503
+SEO_POOL_MAX_PENDING = int(os.getenv("SEO_POOL_MAX_PENDING", str(SEO_WORKERS * 4)))
+
+_executor: Optional[Executor] = None
+_kind = SEO_EXECUTOR
+_workers = SEO_WORKERS
+_max_pending = SEO_POOL_MAX_PENDING
+_pending = 0
+_rejected = 0
+_restarts = 0
+
+
+class PoolSaturatedError(Exception):
+    """O pool já tem o máximo de análises pendentes"""
+
+
+def start_analysis_pool(
+    kind: Optional[str] = None,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+) -> None:
+    """Cria o executor (chamado no lifespan do FastAPI)"""
+    global _executor, _kind, _workers, _max_pending
+
+    if _executor is not None:
+        return
+
+    _kind = kind or SEO_EXECUTOR
+    _workers = workers or SEO_WORKERS
+    _max_pending = max_pending or SEO_POOL_MAX_PENDING
+
+    if _kind == "process":
+        # spawn: os workers não herdam sockets nem threads do processo do uvicorn
+        _executor = ProcessPoolExecutor(
+            max_workers=_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    elif _kind == "thread":
+        _executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="seo-worker")
+    elif _kind != "inline":
+        raise ValueError(f"SEO_EXECUTOR inválido: {_kind}")
+
+    logger.info(f"Pool de análise iniciado ({_kind}, workers={_workers}, max_pending={_max_pending})")
+
+
+def shutdown_analysis_pool() -> None:
+    """
+    Encerra o executor aguardando as análises em andamento (bloqueia: no
+    lifespan, chamar via asyncio.to_thread)
+    """
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+    _executor = None
+
+
+def _replace_broken(broken: Executor) -> None:
+    """Troca um executor quebrado por um novo (uma vez só, mesmo com várias chamadas falhando juntas)"""
+    global _executor, _restarts
+
+    if _executor is not broken:
+        return
+    logger.error("Processo do pool de análise morreu; recriando o pool")
+    broken.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _restarts += 1
+    start_analysis_pool(_kind, _workers, _max_pending)
+
+
+async def run_in_pool(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Executa fn(*args) no pool. Só os argumentos e o retorno cruzam a fronteira
+    do processo, então ambos precisam ser serializáveis (bytes, dicts, ...).
+    Se um processo do pool morre (OOM, crash do lxml numa página hostil), o
+    ProcessPoolExecutor inteiro fica quebrado: ele é recriado e fn roda de novo
+    uma vez.
+    """
+    global _pending, _rejected
+
+    if _executor is None and _kind != "inline":
+        start_analysis_pool()
+
+    if _pending >= _max_pending:
+        _rejected += 1
+        raise PoolSaturatedError(f"Pool de análise saturado ({_pending} pendentes)")
+
+    _pending += 1
+    try:
+        if _executor is None:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        executor = _executor
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            _replace_broken(executor)
+            return await loop.run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Profundidade da fila e rejeições do pool de análise"""
+    return {
+        "executor": _kind,
+        "workers": _workers,
+        "pending": _pending,
+        "max_pending": _max_pending,
+        "rejected": _rejected,
+        "restarts": _restarts,
+    }
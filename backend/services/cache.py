@@ -0,0 +1,90 @@
+"""
+Cache em memória com TTL e despejo LRU
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheEntry(Generic[V]):
+    value: V
+    stored_at: float
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class TTLCache(Generic[V]):
+    """
+    LRU limitado por número de entradas. Entradas vencidas continuam guardadas
+    por stale_ttl segundos para permitir revalidação antes de serem descartadas.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry[V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[CacheEntry[V]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.time()
+            if now >= entry.expires_at + self.stale_ttl:
+                del self._entries[key]
+                entry = None
+            elif not allow_stale and now >= entry.expires_at:
+                entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        key: Hashable,
+        value: V,
+        ttl: Optional[float] = None,
+        stored_at: Optional[float] = None,
+    ) -> CacheEntry[V]:
+        stored_at = time.time() if stored_at is None else stored_at
+        entry = CacheEntry(value, stored_at, stored_at + (self.ttl if ttl is None else ttl))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,93 @@
+"""
+Limite de execuções simultâneas com fila limitada e estatísticas
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from services.network_timing import LatencyStats
+
+
+class SlotUnavailableError(Exception):
+    """Sem vaga no limitador (fila cheia ou espera esgotada)"""
+
+
+class QueueFullError(SlotUnavailableError):
+    """Fila de espera já está no máximo: recusar na hora"""
+
+
+class QueueTimeoutError(SlotUnavailableError):
+    """Esperou queue_timeout segundos sem conseguir vaga"""
+
+
+class ConcurrencyLimiter:
+    """
+    Semáforo com estatísticas: execuções em andamento, na fila e tempo de espera
+
+    max_waiting limita a fila (0 = sem limite) e queue_timeout a espera por
+    uma vaga (0 = sem limite).
+    """
+
+    def __init__(self, limit: int, queue_timeout: float = 0, max_waiting: int = 0, name: str = ""):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.max_waiting = max_waiting
+        self.name = name
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.peak_active = 0
+        self.peak_waiting = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.wait = LatencyStats()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.max_waiting and self.waiting >= self.max_waiting and self._semaphore.locked():
+            self.rejected += 1
+            raise QueueFullError(f"{self.name or 'Limitador'}: {self.waiting} na fila, {self.limit} em andamento")
+
+        started = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            if self.queue_timeout > 0:
+                async with asyncio.timeout(self.queue_timeout):
+                    await self._semaphore.acquire()
+            else:
+                await self._semaphore.acquire()
+        except TimeoutError:
+            self.timeouts += 1
+            raise QueueTimeoutError(
+                f"{self.name or 'Limitador'}: {self.limit} em andamento; sem vaga em {self.queue_timeout:g}s"
+            ) from None
+        finally:
+            self.waiting -= 1
+
+        self.wait.add((time.perf_counter() - started) * 1000)
+        self.calls += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "peak_active": self.peak_active,
+            "peak_waiting": self.peak_waiting,
+            "calls": self.calls,
+            "queue_timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "wait": self.wait.to_dict(),
+        }
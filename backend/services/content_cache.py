@@ -0,0 +1,115 @@
+"""
+Cache de conteúdo gerado pela IA
+
+A chave é um hash do prompt normalizado (maiúsculas/minúsculas, acentos
+compostos e espaços não importam) junto com os parâmetros do modelo (modelo,
+system prompt, temperatura, max_tokens): o mesmo pedido refeito por um editor
+volta do cache em vez de pagar outra geração. Só conteúdo da IA é guardado;
+o template de fallback nunca entra no cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from services.cache import TTLCache
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CONTENT_CACHE_TTL = float(os.getenv("CONTENT_CACHE_TTL", "3600"))
+CONTENT_CACHE_MAX_ENTRIES = int(os.getenv("CONTENT_CACHE_MAX_ENTRIES", "256"))
+
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_BYPASS = "BYPASS"
+
+
+def normalize_prompt(text: str) -> str:
+    """NFKC + casefold, espaços colapsados em cada linha e linhas vazias removidas"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(chat_request: Dict[str, Any]) -> str:
+    """Hash da chamada de chat (parâmetros de _chat_request) com as mensagens normalizadas"""
+    payload = {
+        **{name: value for name, value in chat_request.items() if name != "messages"},
+        "messages": [
+            [message["role"], normalize_prompt(message["content"])]
+            for message in chat_request["messages"]
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ContentCache:
+    """Cache em memória (TTL + LRU) do texto gerado, com single-flight por chave"""
+
+    def __init__(self, max_entries: int = CONTENT_CACHE_MAX_ENTRIES, ttl: float = CONTENT_CACHE_TTL):
+        self.memory: TTLCache[str] = TTLCache(max_entries, ttl)
+        self.counters = {CACHE_HIT: 0, CACHE_MISS: 0, CACHE_BYPASS: 0}
+        # Pedidos idênticos simultâneos compartilham uma única chamada ao modelo
+        self.inflight: SingleFlight[str] = SingleFlight()
+
+    def get(self, key: str) -> Optional[str]:
+        """Conteúdo em cache (None se ausente ou vencido); conta HIT"""
+        entry = self.memory.get(key)
+        if entry is None:
+            return None
+        self.counters[CACHE_HIT] += 1
+        return entry.value
+
+    def set(self, key: str, content: str, use_cache: bool = True) -> None:
+        """Guarda o conteúdo de uma geração nova (MISS ou BYPASS)"""
+        self.memory.set(key, content)
+        self.counters[CACHE_MISS if use_cache else CACHE_BYPASS] += 1
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[str]],
+        use_cache: bool = True,
+    ) -> Tuple[str, str]:
+        """
+        Retorna (conteúdo, HIT/MISS/BYPASS). Com use_cache=False o cache não é
+        lido, mas a geração nova substitui a entrada guardada.
+        """
+        if use_cache:
+            content = self.get(key)
+            if content is not None:
+                return content, CACHE_HIT
+
+        async def fill() -> str:
+            content = await generate()
+            self.set(key, content, use_cache)
+            return content
+
+        if not use_cache:
+            return await fill(), CACHE_BYPASS
+        return await self.inflight.do(key, fill), CACHE_MISS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.counters[CACHE_HIT],
+            "misses": self.counters[CACHE_MISS],
+            "bypassed": self.counters[CACHE_BYPASS],
+            "memory": self.memory.stats(),
+            "single_flight": self.inflight.stats(),
+        }
+
+
+_cache: Optional[ContentCache] = None
+
+
+def get_content_cache() -> ContentCache:
+    """Cache compartilhado do processo"""
+    global _cache
+    if _cache is None:
+        _cache = ContentCache()
+    return _cache
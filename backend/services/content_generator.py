@@ -2,14 +2,92 @@
 Serviço de geração de conteúdo com IA
 """
 
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Callable, Dict, Any, Optional, List
 import logging
 import os
+import re
+import time
+
+from services.content_cache import CACHE_HIT, cache_key, get_content_cache
+from services.llm_client import OPENAI_API_KEY, get_llm_client, get_llm_limiter
+from services.metrics import LLM_FIRST_TOKEN_SECONDS, LLM_REQUEST_SECONDS, record_llm_usage
+from services.seo_analyzer import score_content
 
 logger = logging.getLogger(__name__)
 
-# OpenAI API Key (opcional)
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+SYSTEM_PROMPT = "Você é um especialista em marketing digital e SEO. Crie conteúdo otimizado, envolvente e profissional."
+
+# Pedaços do template no modo streaming: uma palavra (com o espaço que a segue) por evento
+_TEMPLATE_CHUNK = re.compile(r"\S+\s*|\s+")
+
+
+def _chat_request(prompt: str, length: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+    """Parâmetros da chamada de chat (mesmos no modo normal e no streaming)"""
+    return {
+        "model": OPENAI_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt or SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0.7,
+        "max_tokens": 2000 if length == "long" else 1000 if length == "medium" else 500,
+    }
+
+
+def content_metadata(
+    content: str,
+    topic: str,
+    content_type: str,
+    tone: str,
+    length: str,
+    keywords: Optional[List[str]],
+    generated_with_ai: bool,
+    cached: bool = False,
+    include_seo_score: bool = False,
+) -> Dict[str, Any]:
+    """
+    Campos da resposta além do conteúdo (também usados no evento final do streaming)
+    
+    Com include_seo_score, inclui o score SEO do próprio texto (seo_score),
+    calculado no processo, sem passar por uma URL.
+    """
+    metadata = {
+        "topic": topic,
+        "content_type": content_type,
+        "tone": tone,
+        "length": length,
+        "keywords": keywords or [],
+        "word_count": len(content.split()),
+        "generated_with_ai": generated_with_ai,
+        "cached": cached,
+    }
+    if include_seo_score:
+        metadata["seo_score"] = score_content(content, keywords)
+    return metadata
+
+
+async def _complete(chat_request: Dict[str, Any], on_request: Optional[Callable[[], None]] = None) -> str:
+    """
+    Uma chamada de chat (modo normal) dentro do limite de chamadas simultâneas.
+    on_request é chamado com a vaga obtida, logo antes de a chamada sair.
+    """
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        async with get_llm_limiter().slot():
+            if on_request is not None:
+                on_request()
+            response = await get_llm_client().chat.completions.create(**chat_request)
+        outcome = "ok"
+    finally:
+        LLM_REQUEST_SECONDS.labels("complete", outcome).observe(time.perf_counter() - started)
+    record_llm_usage(response.usage)
+    content = response.choices[0].message.content
+    if not content:
+        raise ValueError("Resposta vazia do modelo")
+    return content
 
 
 async def generate_content(
@@ -19,64 +97,200 @@ async def generate_content(
     length: str = "medium",
     keywords: Optional[List[str]] = None,
     target_audience: Optional[str] = None,
+    use_cache: bool = True,
+    system_prompt: Optional[str] = None,
+    fallback: bool = True,
+    include_seo_score: bool = False,
+    on_request: Optional[Callable[[], None]] = None,
 ) -> Dict[str, Any]:
     """
     Gera conteúdo otimizado para SEO usando IA
+    
+    Pedidos com o mesmo prompt e parâmetros do modelo voltam do cache
+    (cached=True); use_cache=False força uma geração nova, que substitui a
+    entrada guardada. system_prompt substitui SYSTEM_PROMPT. Com
+    fallback=False, erros da OpenAI são propagados em vez de virar template
+    (os jobs em lote decidem se tentam de novo). include_seo_score acrescenta
+    o score SEO do texto (seo_score). on_request é chamado quando a chamada
+    ao modelo sai (não é chamado em cache HIT).
     """
     try:
         # Se OpenAI não estiver configurado, retornar template
         if not OPENAI_API_KEY:
             logger.warning("OpenAI API Key não configurada. Retornando template.")
             return generate_template_content(
-                topic, content_type, tone, length, keywords, target_audience
+                topic, content_type, tone, length, keywords, target_audience, include_seo_score
             )
         
-        # Usar OpenAI para gerar conteúdo real
-        from openai import AsyncOpenAI
-        
-        client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-        
         # Construir prompt
         prompt = build_prompt(topic, content_type, tone, length, keywords, target_audience)
+        chat_request = _chat_request(prompt, length, system_prompt)
         
-        # Gerar conteúdo
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Você é um especialista em marketing digital e SEO. Crie conteúdo otimizado, envolvente e profissional.",
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            temperature=0.7,
-            max_tokens=2000 if length == "long" else 1000 if length == "medium" else 500,
+        # Gerar conteúdo (ou reaproveitar do cache)
+        content, cache_status = await get_content_cache().get_or_generate(
+            cache_key(chat_request), lambda: _complete(chat_request, on_request), use_cache
         )
         
-        content = response.choices[0].message.content
-        
         return {
             "content": content,
-            "topic": topic,
-            "content_type": content_type,
-            "tone": tone,
-            "length": length,
-            "keywords": keywords or [],
-            "word_count": len(content.split()),
-            "generated_with_ai": True,
+            **content_metadata(
+                content, topic, content_type, tone, length, keywords, True,
+                cached=cache_status == CACHE_HIT, include_seo_score=include_seo_score,
+            ),
         }
         
     except Exception as e:
+        if not fallback:
+            raise
         logger.error(f"Erro na geração de conteúdo: {str(e)}")
         # Fallback para template
         return generate_template_content(
-            topic, content_type, tone, length, keywords, target_audience
+            topic, content_type, tone, length, keywords, target_audience, include_seo_score
         )
 
 
+async def stream_content(
+    topic: str,
+    content_type: str = "blog_post",
+    tone: str = "professional",
+    length: str = "medium",
+    keywords: Optional[List[str]] = None,
+    target_audience: Optional[str] = None,
+    use_cache: bool = True,
+    include_seo_score: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Versão em streaming de generate_content
+    
+    Produz eventos {"event": ..., "data": ...}: um "token" por pedaço de
+    texto assim que chega da OpenAI e um "done" final com os mesmos metadados
+    de generate_content (sem o conteúdo, já enviado nos tokens), mais
+    ttfb_ms (tempo até o primeiro pedaço) e duration_ms. Sem OpenAI, ou se a
+    chamada falhar antes do primeiro pedaço, o template é enviado do mesmo
+    jeito. Uma falha no meio do texto gera um evento "error" final.
+    Um acerto no cache é reenviado em tokens (uma palavra por evento), e só
+    um texto recebido por inteiro entra no cache.
+    """
+    started = time.perf_counter()
+    if not OPENAI_API_KEY:
+        logger.warning("OpenAI API Key não configurada. Retornando template.")
+        async for event in stream_template_content(
+            topic, content_type, tone, length, keywords, target_audience, include_seo_score, started=started
+        ):
+            yield event
+        return
+    
+    prompt = build_prompt(topic, content_type, tone, length, keywords, target_audience)
+    chat_request = _chat_request(prompt, length)
+    key = cache_key(chat_request)
+    cache = get_content_cache()
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            metadata = content_metadata(
+                cached, topic, content_type, tone, length, keywords, True,
+                cached=True, include_seo_score=include_seo_score,
+            )
+            async for event in _stream_text(cached, metadata, started):
+                yield event
+            return
+    
+    parts: List[str] = []
+    ttfb_ms: Optional[float] = None
+    stream = None
+    upstream_started = time.perf_counter()
+    outcome = "error"
+    try:
+        # A vaga no limitador fica ocupada enquanto o modelo ainda envia o texto
+        async with get_llm_limiter().slot():
+            # include_usage: o último pedaço (sem choices) traz a contagem de tokens
+            stream = await get_llm_client().chat.completions.create(
+                **chat_request, stream=True, stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    record_llm_usage(chunk.usage)
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if ttfb_ms is None:
+                    ttfb_ms = round((time.perf_counter() - started) * 1000, 1)
+                    LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - upstream_started)
+                    logger.info(f"Primeiro token da OpenAI em {ttfb_ms}ms")
+                parts.append(delta)
+                yield {"event": "token", "data": {"content": delta}}
+        outcome = "ok"
+    except Exception as e:
+        if not parts:
+            logger.error(f"Erro na geração de conteúdo (streaming): {str(e)}")
+            async for event in stream_template_content(
+                topic, content_type, tone, length, keywords, target_audience, include_seo_score, started=started
+            ):
+                yield event
+            return
+        # Parte do texto já foi enviada: não dá para trocar pelo template
+        logger.error(f"Streaming interrompido após {len(parts)} pedaços: {str(e)}")
+        yield {"event": "error", "data": {"detail": f"Geração interrompida: {str(e)}"}}
+        return
+    finally:
+        LLM_REQUEST_SECONDS.labels("stream", outcome).observe(time.perf_counter() - upstream_started)
+        if stream is not None:
+            # Cliente desconectou ou fim do texto: libera a conexão com a OpenAI
+            await stream.close()
+    
+    content = "".join(parts)
+    if content:
+        cache.set(key, content, use_cache)
+    yield {
+        "event": "done",
+        "data": {
+            **content_metadata(
+                content, topic, content_type, tone, length, keywords, True, include_seo_score=include_seo_score
+            ),
+            "ttfb_ms": ttfb_ms,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+async def stream_template_content(
+    topic: str,
+    content_type: str,
+    tone: str,
+    length: str,
+    keywords: Optional[List[str]],
+    target_audience: Optional[str],
+    include_seo_score: bool = False,
+    started: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Template no formato de eventos de stream_content (uma palavra por evento)"""
+    started = started if started is not None else time.perf_counter()
+    result = generate_template_content(
+        topic, content_type, tone, length, keywords, target_audience, include_seo_score
+    )
+    content = result.pop("content")
+    async for event in _stream_text(content, result, started):
+        yield event
+
+
+async def _stream_text(content: str, metadata: Dict[str, Any], started: float) -> AsyncIterator[Dict[str, Any]]:
+    """Texto pronto (template ou cache) enviado como tokens, uma palavra por evento, mais o "done" """
+    ttfb_ms: Optional[float] = None
+    for match in _TEMPLATE_CHUNK.finditer(content):
+        if ttfb_ms is None:
+            ttfb_ms = round((time.perf_counter() - started) * 1000, 1)
+        yield {"event": "token", "data": {"content": match.group()}}
+    yield {
+        "event": "done",
+        "data": {
+            **metadata,
+            "ttfb_ms": ttfb_ms,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
 def build_prompt(
     topic: str,
     content_type: str,
@@ -117,6 +331,7 @@ def generate_template_content(
     length: str,
     keywords: Optional[List[str]],
     target_audience: Optional[str],
+    include_seo_score: bool = False,
 ) -> Dict[str, Any]:
     """Gera conteúdo template quando IA não está disponível"""
     word_count = {
@@ -157,13 +372,9 @@ Este artigo explora {topic.lower()} e como isso pode impactar seu negócio.
     
     return {
         "content": template.strip(),
-        "topic": topic,
-        "content_type": content_type,
-        "tone": tone,
-        "length": length,
-        "keywords": keywords or [],
-        "word_count": len(template.split()),
-        "generated_with_ai": False,
+        **content_metadata(
+            template, topic, content_type, tone, length, keywords, False, include_seo_score=include_seo_score
+        ),
         "note": "Conteúdo gerado via template. Configure OPENAI_API_KEY para usar IA.",
     }
 
@@ -0,0 +1,551 @@
+"""
+Jobs de geração de conteúdo em lote
+
+Um job guarda N pedidos de geração (posts, outlines, ...) no SQLite e responde
+na hora com o id; workers asyncio do próprio processo geram os itens em
+segundo plano, com concorrência limitada e novas tentativas com backoff
+exponencial (e jitter) para erros transitórios da OpenAI. Cada worker dá
+preferência a itens com o mesmo system prompt do item anterior, de modo que
+chamadas seguidas compartilham o prefixo (aproveitado pelo cache de prompt
+do provedor). Como o estado fica no SQLite, um reinício retoma os itens
+pendentes e os que estavam em andamento.
+
+Com vários workers do servidor (gunicorn) apontando para o mesmo arquivo, só
+o processo que detém o lock exclusivo ao lado do SQLite consome a fila; os
+outros só gravam e leem jobs e assumem a fila se o dono do lock morrer.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.concurrency import SlotUnavailableError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows (dev com um processo só)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Arquivo SQLite dos jobs (":memory:" = sem persistência)
+CONTENT_JOBS_DB_PATH = os.getenv("CONTENT_JOBS_DB_PATH", "content_jobs.sqlite3")
+CONTENT_JOBS_MAX_ITEMS = int(os.getenv("CONTENT_JOBS_MAX_ITEMS", "200"))
+# Itens gerados ao mesmo tempo (somados a eles, os pedidos interativos dividem OPENAI_MAX_CONCURRENCY)
+CONTENT_JOBS_WORKERS = int(os.getenv("CONTENT_JOBS_WORKERS", "4"))
+CONTENT_JOBS_MAX_ATTEMPTS = int(os.getenv("CONTENT_JOBS_MAX_ATTEMPTS", "4"))
+# Backoff: base * 2^(tentativa - 1), limitado a RETRY_MAX, com jitter de ±50%
+CONTENT_JOBS_RETRY_BASE = float(os.getenv("CONTENT_JOBS_RETRY_BASE", "2"))
+CONTENT_JOBS_RETRY_MAX = float(os.getenv("CONTENT_JOBS_RETRY_MAX", "60"))
+# Jobs terminados há mais tempo que isso (segundos) são apagados na inicialização
+CONTENT_JOBS_RETENTION = float(os.getenv("CONTENT_JOBS_RETENTION", str(7 * 86400)))
+# Intervalo (s) em que o dono da fila procura itens enviados por outros workers
+# e em que os demais tentam pegar o lock
+CONTENT_JOBS_POLL_INTERVAL = float(os.getenv("CONTENT_JOBS_POLL_INTERVAL", "2"))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+ITEM_STATUSES = (ITEM_PENDING, ITEM_RUNNING, ITEM_DONE, ITEM_FAILED)
+
+
+class JobNotFoundError(Exception):
+    """Job inexistente (ou já removido pela retenção)"""
+
+
+def system_key(system_prompt: Optional[str]) -> str:
+    """Grupo do item: hash do system prompt (vazio = SYSTEM_PROMPT padrão)"""
+    return hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+
+
+def retryable(error: Exception) -> bool:
+    """
+    Só erros transitórios valem nova tentativa: rede e timeout da OpenAI,
+    timeout, fila do limitador cheia ou esgotada e status 408/409/429/5xx.
+    O resto (400, erros de programação, entrada inválida) falha o item na hora.
+    """
+    import openai
+
+    if isinstance(error, (openai.APIConnectionError, asyncio.TimeoutError, SlotUnavailableError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def retry_delay(attempts: int, error: Optional[Exception] = None) -> float:
+    """Espera antes da próxima tentativa (respeita Retry-After quando a OpenAI manda)"""
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(CONTENT_JOBS_RETRY_MAX, float(retry_after))
+        except ValueError:
+            pass
+    delay = min(CONTENT_JOBS_RETRY_MAX, CONTENT_JOBS_RETRY_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class SQLiteJobStore:
+    """Estado dos jobs e itens. As chamadas são síncronas; o gerenciador as executa em threads."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS content_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " total INTEGER NOT NULL,"
+            " succeeded INTEGER NOT NULL DEFAULT 0,"
+            " failed INTEGER NOT NULL DEFAULT 0,"
+            " system_prompt TEXT,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL);"
+            "CREATE TABLE IF NOT EXISTS content_job_items ("
+            " job_id TEXT NOT NULL,"
+            " idx INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " system_key TEXT NOT NULL,"
+            " request TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (job_id, idx));"
+            "CREATE INDEX IF NOT EXISTS content_job_items_due"
+            " ON content_job_items (status, next_attempt_at);"
+        )
+        self._conn.commit()
+
+    def create(self, job_id: str, items: List[Dict[str, Any]], system_prompt: Optional[str]) -> None:
+        now = time.time()
+        key = system_key(system_prompt)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO content_jobs (id, status, total, system_prompt, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, len(items), system_prompt, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO content_job_items"
+                " (job_id, idx, status, system_key, request, next_attempt_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, index, ITEM_PENDING, key, json.dumps(item, ensure_ascii=False), now, now)
+                    for index, item in enumerate(items)
+                ],
+            )
+
+    def recover(self) -> int:
+        """Itens que estavam em andamento quando o processo parou voltam para a fila"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE content_job_items SET status = ? WHERE status = ?", (ITEM_PENDING, ITEM_RUNNING)
+            )
+        return cursor.rowcount
+
+    def prune(self, before: float) -> int:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM content_job_items WHERE job_id IN"
+                " (SELECT id FROM content_jobs WHERE finished_at < ?)",
+                (before,),
+            )
+            cursor = self._conn.execute("DELETE FROM content_jobs WHERE finished_at < ?", (before,))
+        return cursor.rowcount
+
+    def claim(self, preferred_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Reserva o próximo item vencido: primeiro os do grupo preferido (mesmo
+        system prompt do último item do worker), depois o mais antigo
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT i.job_id, i.idx, i.system_key, i.request, i.attempts, j.system_prompt"
+                " FROM content_job_items i JOIN content_jobs j ON j.id = i.job_id"
+                " WHERE i.status = ? AND i.next_attempt_at <= ?"
+                " ORDER BY i.system_key = ? DESC, i.rowid LIMIT 1",
+                (ITEM_PENDING, now, preferred_key or ""),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE content_job_items SET status = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE job_id = ? AND idx = ?",
+                (ITEM_RUNNING, now, row["job_id"], row["idx"]),
+            )
+            self._conn.execute(
+                "UPDATE content_jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                (JOB_RUNNING, now, row["job_id"], JOB_QUEUED),
+            )
+        return {
+            "job_id": row["job_id"],
+            "idx": row["idx"],
+            "system_key": row["system_key"],
+            "system_prompt": row["system_prompt"],
+            "request": json.loads(row["request"]),
+            "attempts": row["attempts"] + 1,
+        }
+
+    def next_due(self) -> Optional[float]:
+        """Quando o próximo item pendente fica disponível (None = fila vazia)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM content_job_items WHERE status = ?", (ITEM_PENDING,)
+            ).fetchone()
+        return row[0]
+
+    def finish(
+        self, job_id: str, idx: int, result: Optional[Dict[str, Any]], error: Optional[str], refund: bool = False
+    ) -> None:
+        """
+        Item terminado (result) ou falha definitiva (error). refund devolve a
+        tentativa quando nada chegou ao modelo (ex.: resposta vinda do cache).
+        """
+        now = time.time()
+        status = ITEM_DONE if error is None else ITEM_FAILED
+        counter = "succeeded" if error is None else "failed"
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE content_job_items SET status = ?, result = ?, error = ?, attempts = attempts - ?,"
+                " updated_at = ? WHERE job_id = ? AND idx = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False) if result is not None else None,
+                    error,
+                    1 if refund else 0,
+                    now,
+                    job_id,
+                    idx,
+                ),
+            )
+            self._conn.execute(
+                f"UPDATE content_jobs SET {counter} = {counter} + 1 WHERE id = ?", (job_id,)
+            )
+            self._conn.execute(
+                "UPDATE content_jobs SET status = ?, finished_at = ? WHERE id = ? AND succeeded + failed = total",
+                (JOB_COMPLETED, now, job_id),
+            )
+
+    def retry(self, job_id: str, idx: int, error: str, delay: float) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE content_job_items SET status = ?, error = ?, next_attempt_at = ?, updated_at = ?"
+                " WHERE job_id = ? AND idx = ?",
+                (ITEM_PENDING, error, now + delay, now, job_id, idx),
+            )
+
+    def release(self, job_id: str, idx: int, refund: bool = True) -> None:
+        """
+        Item interrompido pelo desligamento: volta para a fila. refund devolve
+        a tentativa (só quando a chamada nem chegou ao modelo).
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE content_job_items SET status = ?, attempts = attempts - ?"
+                " WHERE job_id = ? AND idx = ? AND status = ?",
+                (ITEM_PENDING, 1 if refund else 0, job_id, idx, ITEM_RUNNING),
+            )
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM content_jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM content_job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        job = {
+            name: row[name]
+            for name in ("id", "status", "total", "succeeded", "failed", "created_at", "started_at", "finished_at")
+        }
+        job["items"] = {status: counts.get(status, 0) for status in ITEM_STATUSES}
+        return job
+
+    def items(
+        self, job_id: str, offset: int, limit: int, status: Optional[str] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """(total de itens no filtro, página de itens em ordem de envio)"""
+        where, params = "job_id = ?", [job_id]
+        if status is not None:
+            where += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM content_job_items WHERE {where}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT idx, status, attempts, result, error FROM content_job_items WHERE {where}"
+                " ORDER BY idx LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return total, [
+            {
+                "index": row["idx"],
+                "status": row["status"],
+                "attempts": row["attempts"],
+                "result": json.loads(row["result"]) if row["result"] is not None else None,
+                "error": row["error"],
+            }
+            for row in rows
+        ]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM content_job_items WHERE status = ?", (ITEM_PENDING,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ContentJobManager:
+    """Workers asyncio que consomem os itens pendentes do SQLite"""
+
+    def __init__(
+        self,
+        path: str = CONTENT_JOBS_DB_PATH,
+        workers: int = CONTENT_JOBS_WORKERS,
+        max_attempts: int = CONTENT_JOBS_MAX_ATTEMPTS,
+    ):
+        self.store = SQLiteJobStore(path)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        # Banco em arquivo pode ser compartilhado por outros processos
+        self._lock_path = None if path == ":memory:" else f"{path}.lock"
+        self._lock_file: Any = None
+        self.leader = False
+        self._wakeup = asyncio.Event()
+        self._tasks: List["asyncio.Task[None]"] = []
+        self.counters = {"generated": 0, "retried": 0, "failed": 0, "recovered": 0}
+        # Contagem no SQLite, atualizada fora do event loop por refresh_stats()
+        self._pending_items = 0
+
+    async def start(self) -> None:
+        if self._acquire_queue():
+            self._lead()
+        else:
+            logger.info("Fila de jobs de conteúdo consumida por outro worker; este aguarda o lock")
+            self._tasks = [asyncio.create_task(self._standby())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._lock_file is not None:
+            # Fechar o arquivo solta o lock (outro worker assume a fila)
+            self._lock_file.close()
+            self._lock_file = None
+        self.leader = False
+        self.store.close()
+
+    def _acquire_queue(self) -> bool:
+        """Lock exclusivo (sem esperar) no arquivo ao lado do SQLite"""
+        if self._lock_path is None or fcntl is None:
+            return True
+        lock_file = open(self._lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _lead(self) -> None:
+        """Dono da fila: limpa jobs antigos, retoma itens interrompidos e sobe os workers"""
+        self.leader = True
+        self.store.prune(time.time() - CONTENT_JOBS_RETENTION)
+        recovered = self.store.recover()
+        self.counters["recovered"] += recovered
+        if recovered:
+            logger.info(f"{recovered} itens de jobs de conteúdo retomados após reinício")
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _standby(self) -> None:
+        """Tenta pegar o lock de tempos em tempos (o dono pode ter morrido)"""
+        while not self._acquire_queue():
+            await asyncio.sleep(CONTENT_JOBS_POLL_INTERVAL)
+        logger.info("Fila de jobs de conteúdo assumida por este worker")
+        self._lead()
+
+    async def submit(self, items: List[Dict[str, Any]], system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self.store.create, job_id, items, system_prompt)
+        self._notify()
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Dict[str, Any]:
+        job = await asyncio.to_thread(self.store.job, job_id)
+        if job is None:
+            raise JobNotFoundError(f"Job {job_id} não encontrado")
+        return job
+
+    async def results(
+        self, job_id: str, offset: int = 0, limit: int = 50, status: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Job com uma página de itens (resultado ou erro de cada um)"""
+        job = await self.get(job_id)
+        total, items = await asyncio.to_thread(self.store.items, job_id, offset, limit, status)
+        next_offset = offset + len(items)
+        return {
+            **job,
+            "results": items,
+            "pagination": {
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+                "next_offset": next_offset if next_offset < total else None,
+            },
+        }
+
+    def _notify(self) -> None:
+        """Acorda os workers ociosos (cada espera usa o evento da sua rodada)"""
+        event, self._wakeup = self._wakeup, asyncio.Event()
+        event.set()
+
+    async def _worker(self) -> None:
+        preferred: Optional[str] = None
+        while True:
+            # Evento capturado antes do claim: um job enviado depois disso acorda este worker
+            wakeup = self._wakeup
+            claim = asyncio.ensure_future(asyncio.to_thread(self.store.claim, preferred))
+            try:
+                item = await asyncio.shield(claim)
+            except asyncio.CancelledError:
+                # A thread conclui o claim mesmo com o worker cancelado: devolver o item
+                item = await claim
+                if item is not None:
+                    self.store.release(item["job_id"], item["idx"])
+                raise
+            if item is None:
+                await self._idle(wakeup)
+                continue
+            preferred = item["system_key"]
+            try:
+                await self._process(item)
+            except asyncio.CancelledError:
+                # Chamada já enviada ao modelo conta como tentativa (o modelo pode ter respondido)
+                self.store.release(item["job_id"], item["idx"], refund=not item.get("sent", False))
+                raise
+
+    async def _idle(self, wakeup: asyncio.Event) -> None:
+        """Espera um job novo, o próximo item em backoff ou (banco compartilhado) a próxima checagem"""
+        due = await asyncio.to_thread(self.store.next_due)
+        timeout = None if due is None else max(0.0, due - time.time())
+        if self._lock_path is not None:
+            # Jobs enviados por outros workers não acordam este processo
+            timeout = CONTENT_JOBS_POLL_INTERVAL if timeout is None else min(timeout, CONTENT_JOBS_POLL_INTERVAL)
+        # asyncio.timeout e não wait_for: no 3.11, wait_for engole um cancel que chega
+        # junto com o wakeup e o worker nunca sai (stop() fica preso no gather)
+        try:
+            async with asyncio.timeout(timeout):
+                await wakeup.wait()
+        except TimeoutError:
+            pass
+
+    async def _process(self, item: Dict[str, Any]) -> None:
+        from services.content_generator import generate_content
+
+        request = item["request"]
+        try:
+            result = await generate_content(
+                topic=request["topic"],
+                content_type=request["content_type"],
+                tone=request["tone"],
+                length=request["length"],
+                keywords=request.get("keywords") or [],
+                target_audience=request.get("target_audience"),
+                use_cache=request.get("use_cache", True),
+                system_prompt=item["system_prompt"],
+                fallback=False,
+                include_seo_score=request.get("include_seo_score", False),
+                on_request=lambda: item.update(sent=True),
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            if retryable(e) and item["attempts"] < self.max_attempts:
+                delay = retry_delay(item["attempts"], e)
+                self.counters["retried"] += 1
+                logger.warning(
+                    f"Item {item['idx']} do job {item['job_id']} falhou "
+                    f"(tentativa {item['attempts']}); nova tentativa em {delay:.1f}s: {error}"
+                )
+                await asyncio.to_thread(self.store.retry, item["job_id"], item["idx"], error, delay)
+                # Workers ociosos recalculam a espera até este item
+                self._notify()
+                return
+            self.counters["failed"] += 1
+            logger.error(f"Item {item['idx']} do job {item['job_id']} falhou: {error}")
+            await asyncio.to_thread(
+                self.store.finish, item["job_id"], item["idx"], None, error, not item.get("sent", False)
+            )
+            return
+
+        self.counters["generated"] += 1
+        await asyncio.to_thread(
+            self.store.finish, item["job_id"], item["idx"], result, None, not item.get("sent", False)
+        )
+
+    async def refresh_stats(self) -> None:
+        """Atualiza as contagens do SQLite usadas em stats() (numa thread)"""
+        self._pending_items = await asyncio.to_thread(self.store.pending_count)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores em memória e a última contagem de refresh_stats() (sem consultar o banco)"""
+        return {
+            "workers": self.workers,
+            "leader": self.leader,
+            # Fora do lock, a única tarefa é a espera pela fila
+            "running": sum(1 for task in self._tasks if not task.done()) if self.leader else 0,
+            "pending_items": self._pending_items,
+            **self.counters,
+        }
+
+
+_manager: Optional[ContentJobManager] = None
+
+
+async def start_content_jobs() -> ContentJobManager:
+    """Abre o SQLite e inicia os workers (chamado no lifespan do FastAPI)"""
+    global _manager
+    if _manager is None:
+        _manager = ContentJobManager()
+        await _manager.start()
+    return _manager
+
+
+async def stop_content_jobs() -> None:
+    """Para os workers; itens em andamento voltam para a fila no SQLite"""
+    global _manager
+    if _manager is not None:
+        await _manager.stop()
+    _manager = None
+
+
+def get_content_jobs() -> ContentJobManager:
+    if _manager is None:
+        raise RuntimeError("Jobs de conteúdo não iniciados")
+    return _manager
@@ -0,0 +1,219 @@
+"""
+Extração de features SEO em uma única passada pelo HTML
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+# Tags cujo texto não conta como texto da página (script, style, ...).
+# Mesma regra usada pelo get_text() do BeautifulSoup.
+_NON_TEXT_CONTAINERS = frozenset({"script", "style", "template", "rt", "rp"})
+_PRESERVE_WHITESPACE = frozenset({"pre", "textarea"})
+_HEADINGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+# Tipos de <link rel="preload" as="..."> tratados como sub-recursos
+_PRELOAD_KINDS = {"font": "font", "style": "stylesheet", "script": "script", "image": "image"}
+# Token com pelo menos uma letra ou dígito
+_WORD_TOKEN = re.compile(r"\S*\w\S*")
+
+
+@dataclass(slots=True)
+class PageFeatures:
+    """Tudo o que os analisadores precisam de uma página, coletado de uma vez"""
+
+    title: Optional[str] = None
+    meta_description: Optional[str] = None
+    h1_count: int = 0
+    has_canonical: bool = False
+    og_count: int = 0
+    has_schema: bool = False
+    image_count: int = 0
+    images_with_alt: int = 0
+    has_body: bool = False
+    word_count: int = 0
+    heading_count: int = 0
+    # Nível (1 a 6) de cada heading, na ordem do documento
+    heading_levels: List[int] = field(default_factory=list)
+    internal_link_count: int = 0
+    links: List[str] = field(default_factory=list)
+    # Sub-recursos da página: (tipo, URL como está no HTML, bloqueia renderização)
+    resources: List[Tuple[str, str, bool]] = field(default_factory=list)
+    # Texto do body, trechos separados por espaço (só com collect_text)
+    text: Optional[str] = None
+
+
+class _FeatureHandler:
+    """Target SAX do lxml: recebe eventos de início/fim/texto sem montar árvore"""
+
+    def __init__(self, collect_text: bool = False) -> None:
+        self.features = PageFeatures()
+        self._text_parts: Optional[List[str]] = [] if collect_text else None
+        self._data: List[str] = []
+        self._containers: List[str] = []
+        self._preserve = 0
+        self._depth = 0
+        self._body_depth: Optional[int] = None
+        self._body_done = False
+        self._title_depth: Optional[int] = None
+        self._title_parts: Optional[List[str]] = None
+        self._body_pieces = 0
+        self._body_words = 0
+
+    def _flush(self) -> None:
+        if not self._data:
+            return
+        text = "".join(self._data)
+        self._data = []
+
+        # Strings só de texto de script/style/template não contam
+        if self._containers:
+            return
+
+        if not self._preserve and not text.strip(_ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+
+        if self._title_depth is not None:
+            self._title_parts.append(text)  # type: ignore[union-attr]
+
+        if self._body_depth is not None and not self._body_done:
+            stripped = text.strip()
+            if stripped:
+                # get_text(strip=True) concatena os trechos sem separador
+                self._body_pieces += 1
+                self._body_words += len(stripped.split())
+                if self._text_parts is not None:
+                    self._text_parts.append(stripped)
+
+    def start(self, tag: str, attrib: Dict[str, str], nsmap: Any = None) -> None:
+        self._flush()
+        self._depth += 1
+        features = self.features
+
+        if tag in _HEADINGS:
+            features.heading_count += 1
+            features.heading_levels.append(int(tag[1]))
+            if tag == "h1":
+                features.h1_count += 1
+        elif tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                features.links.append(href)
+                if href.startswith("/"):
+                    features.internal_link_count += 1
+        elif tag == "img":
+            features.image_count += 1
+            if attrib.get("alt"):
+                features.images_with_alt += 1
+            src = attrib.get("src")
+            if src:
+                features.resources.append(("image", src, False))
+        elif tag == "meta":
+            if features.meta_description is None and attrib.get("name") == "description":
+                features.meta_description = attrib.get("content") or ""
+            prop = attrib.get("property")
+            if prop and prop.startswith("og:"):
+                features.og_count += 1
+        elif tag == "link":
+            rel = attrib.get("rel")
+            if rel is not None:
+                # Canonical sensível a maiúsculas, como o find(rel="canonical") do BeautifulSoup
+                if "canonical" in rel.split():
+                    features.has_canonical = True
+                href = attrib.get("href")
+                if href:
+                    rels = rel.lower().split()
+                    if "stylesheet" in rels:
+                        # CSS bloqueia a renderização, exceto para mídias que não se aplicam à tela
+                        media = (attrib.get("media") or "all").lower()
+                        features.resources.append(("stylesheet", href, "print" not in media))
+                    elif "preload" in rels and attrib.get("as") in _PRELOAD_KINDS:
+                        features.resources.append((_PRELOAD_KINDS[attrib["as"]], href, False))
+        elif tag == "script":
+            script_type = attrib.get("type")
+            if script_type == "application/ld+json":
+                features.has_schema = True
+            src = attrib.get("src")
+            if src:
+                # Script síncrono antes do <body> bloqueia a renderização
+                blocking = (
+                    self._body_depth is None
+                    and "async" not in attrib
+                    and "defer" not in attrib
+                    and script_type != "module"
+                )
+                features.resources.append(("script", src, blocking))
+        elif tag == "title":
+            if self._title_parts is None:
+                self._title_depth = self._depth
+                self._title_parts = []
+        elif tag == "body":
+            if self._body_depth is None:
+                self._body_depth = self._depth
+                features.has_body = True
+
+        if tag in _NON_TEXT_CONTAINERS:
+            self._containers.append(tag)
+        if tag in _PRESERVE_WHITESPACE:
+            self._preserve += 1
+
+    def end(self, tag: str) -> None:
+        self._flush()
+
+        if tag in _NON_TEXT_CONTAINERS and self._containers:
+            self._containers.pop()
+        if tag in _PRESERVE_WHITESPACE and self._preserve:
+            self._preserve -= 1
+
+        if self._depth == self._title_depth:
+            self.features.title = "".join(self._title_parts)  # type: ignore[arg-type]
+            self._title_depth = None
+        if self._depth == self._body_depth:
+            self._body_done = True
+
+        self._depth -= 1
+
+    def data(self, data: str) -> None:
+        self._data.append(data)
+
+    def comment(self, text: str) -> None:
+        self._flush()
+
+    def pi(self, target: str, data: str) -> None:
+        self._flush()
+
+    def doctype(self, *args: Any) -> None:
+        self._flush()
+
+    def close(self) -> PageFeatures:
+        self._flush()
+        features = self.features
+        if self._title_parts is not None and features.title is None:
+            features.title = "".join(self._title_parts)
+        if self._body_pieces:
+            # Trechos vizinhos se fundem na concatenação: n trechos, n-1 junções
+            features.word_count = self._body_words - (self._body_pieces - 1)
+        if self._text_parts is not None:
+            features.text = " ".join(self._text_parts)
+        return features
+
+
+def count_words(text: str) -> int:
+    """Palavras de um texto; pontuação solta (ex.: o "." depois de um link) não conta"""
+    return len(_WORD_TOKEN.findall(text))
+
+
+def extract_features(html: str, collect_text: bool = False) -> PageFeatures:
+    """
+    Percorre o HTML uma única vez e preenche o PageFeatures
+
+    Com collect_text, guarda também o texto do body (análise de palavras-chave).
+    """
+    if html and html[0] == "\N{BYTE ORDER MARK}":
+        html = html[1:]
+
+    parser = etree.HTMLParser(target=_FeatureHandler(collect_text), recover=True, strip_cdata=False)
+    parser.feed(html)
+    return parser.close()
@@ -0,0 +1,206 @@
+"""
+Cliente HTTP compartilhado (pool de conexões) para requisições externas
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from services.network_timing import LatencyStats, RequestTimer
+
+logger = logging.getLogger(__name__)
+
+# Configuração do pool (ajustável via ambiente)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "6"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+_client: Optional[httpx.AsyncClient] = None
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+_host_limiter: Optional["HostLimiter"] = None
+_stats: Dict[str, int] = {"requests": 0, "connections_opened": 0}
+# Latência das requisições de saída, por fase (todas as requisições do cliente)
+_latency: Dict[str, LatencyStats] = {
+    "connect_ms": LatencyStats(),
+    "tls_ms": LatencyStats(),
+    "ttfb_ms": LatencyStats(),
+}
+
+
+class HostLimiter:
+    """Limita requisições simultâneas por host (o httpx só limita o pool inteiro)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._users: Dict[str, int] = {}
+        self._active: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.limit)
+        self._users[host] = self._users.get(host, 0) + 1
+        try:
+            async with semaphore:
+                self._active[host] = self._active.get(host, 0) + 1
+                try:
+                    yield
+                finally:
+                    self._active[host] -= 1
+        finally:
+            # Remover o semáforo quando ninguém mais usa o host
+            self._users[host] -= 1
+            if self._users[host] == 0:
+                del self._users[host]
+                del self._semaphores[host]
+                self._active.pop(host, None)
+
+    def in_use(self) -> Dict[str, int]:
+        return {host: count for host, count in self._active.items() if count}
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("Pacote h2 não instalado. Usando apenas HTTP/1.1.")
+        return False
+    return True
+
+
+async def _on_request(request: httpx.Request) -> None:
+    """Event hook: conta requisições e conexões novas via trace do httpcore"""
+    _stats["requests"] += 1
+
+    inner = request.extensions.get("trace")
+    if getattr(inner, "_pool_trace", False):
+        # Redirect: as extensions são herdadas da requisição anterior
+        return
+
+    timer = RequestTimer()
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        # Trace do chamador primeiro (ex.: RequestTimer da auditoria)
+        if inner is not None:
+            await inner(event_name, info)
+        if event_name == "connection.connect_tcp.started":
+            _stats["connections_opened"] += 1
+        await timer(event_name, info)
+
+    trace._pool_trace = True  # type: ignore[attr-defined]
+    trace._timer = timer  # type: ignore[attr-defined]
+    request.extensions["trace"] = trace
+
+
+async def _on_response(response: httpx.Response) -> None:
+    """Event hook: headers recebidos, registrar conexão/TLS/TTFB do salto"""
+    timer = getattr(response.request.extensions.get("trace"), "_timer", None)
+    hop = timer.last_hop() if timer is not None else None
+    if hop is None:
+        return
+    _latency["connect_ms"].add(hop.connect_ms)
+    _latency["tls_ms"].add(hop.tls_ms)
+    _latency["ttfb_ms"].add(hop.ttfb_ms)
+
+
+def _create_client() -> httpx.AsyncClient:
+    global _client, _transport, _host_limiter
+
+    if _client is not None:
+        return _client
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    http2 = _http2_available()
+    _transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+    _client = httpx.AsyncClient(
+        transport=_transport,
+        timeout=HTTP_TIMEOUT,
+        event_hooks={"request": [_on_request], "response": [_on_response]},
+    )
+    _host_limiter = HostLimiter(HTTP_MAX_CONNECTIONS_PER_HOST)
+
+    logger.info(
+        f"Cliente HTTP iniciado (max_connections={HTTP_MAX_CONNECTIONS}, "
+        f"por host={HTTP_MAX_CONNECTIONS_PER_HOST}, http2={http2})"
+    )
+    return _client
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Cria o cliente compartilhado (chamado no lifespan do FastAPI)"""
+    return _create_client()
+
+
+async def close_http_client() -> None:
+    """Fecha o cliente compartilhado e libera as conexões"""
+    global _client, _transport, _host_limiter
+
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _transport = None
+    _host_limiter = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retorna o cliente compartilhado, criando-o se o lifespan não rodou (scripts)"""
+    return _client if _client is not None else _create_client()
+
+
+@asynccontextmanager
+async def host_slot(url: str) -> AsyncIterator[None]:
+    """Reserva uma vaga no limite de conexões do host da URL"""
+    get_http_client()
+    assert _host_limiter is not None
+    host = (urlsplit(url).hostname or "").lower()
+    async with _host_limiter.slot(host):
+        yield
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Estatísticas do pool: conexões ativas, ociosas e reutilizadas"""
+    active = idle = http2 = 0
+    pool = getattr(_transport, "_pool", None)
+    for connection in getattr(pool, "connections", []):
+        if connection.is_idle():
+            idle += 1
+        else:
+            active += 1
+        if getattr(connection, "_connection", None).__class__.__name__ == "AsyncHTTP2Connection":
+            http2 += 1
+
+    requests = _stats["requests"]
+    opened = _stats["connections_opened"]
+    return {
+        "started": _client is not None,
+        "active": active,
+        "idle": idle,
+        "http2_connections": http2,
+        "requests": requests,
+        "connections_opened": opened,
+        "reused": max(0, requests - opened),
+        "hosts_in_use": _host_limiter.in_use() if _host_limiter else {},
+        "latency": {phase: stats.to_dict() for phase, stats in _latency.items()},
+        "limits": {
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+            "max_connections_per_host": HTTP_MAX_CONNECTIONS_PER_HOST,
+        },
+    }
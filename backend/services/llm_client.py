@@ -0,0 +1,89 @@
+"""
+Cliente compartilhado da OpenAI e limite de chamadas simultâneas
+
+Um único AsyncOpenAI por processo (pool de conexões com keep-alive reaproveitado
+entre as gerações), criado no lifespan do FastAPI. Cada chamada ao modelo ocupa
+uma vaga do limitador: uma rajada de pedidos espera na fila em vez de estourar
+o rate limit da OpenAI.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from services.concurrency import ConcurrencyLimiter, QueueTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# OpenAI API Key (opcional)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Endpoint compatível com a API da OpenAI (vazio = api.openai.com)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# Chamadas simultâneas ao modelo; as demais esperam na fila
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+# Espera máxima por uma vaga (segundos, 0 = sem limite)
+OPENAI_QUEUE_TIMEOUT = float(os.getenv("OPENAI_QUEUE_TIMEOUT", "60"))
+
+# Sem vaga para chamar o modelo dentro de OPENAI_QUEUE_TIMEOUT
+LLMQueueTimeoutError = QueueTimeoutError
+
+_client: Any = None
+_limiter: Optional[ConcurrencyLimiter] = None
+
+
+def _create_client() -> Any:
+    global _client
+
+    if _client is not None:
+        return _client
+
+    from openai import AsyncOpenAI
+
+    _client = AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        base_url=OPENAI_BASE_URL,
+        timeout=OPENAI_TIMEOUT,
+        max_retries=OPENAI_MAX_RETRIES,
+    )
+    logger.info(f"Cliente OpenAI iniciado (max_concurrency={OPENAI_MAX_CONCURRENCY})")
+    return _client
+
+
+async def start_llm_client() -> None:
+    """Cria o cliente compartilhado (chamado no lifespan do FastAPI; sem API key, nada a fazer)"""
+    if OPENAI_API_KEY:
+        _create_client()
+
+
+async def close_llm_client() -> None:
+    """Fecha o cliente compartilhado e libera as conexões com a OpenAI"""
+    global _client, _limiter
+
+    if _client is not None:
+        await _client.close()
+    _client = None
+    # O semáforo pertence ao event loop que termina aqui
+    _limiter = None
+
+
+def get_llm_client() -> Any:
+    """Retorna o cliente compartilhado, criando-o se o lifespan não rodou (scripts)"""
+    return _client if _client is not None else _create_client()
+
+
+def get_llm_limiter() -> ConcurrencyLimiter:
+    """Limitador compartilhado (criado no primeiro uso, dentro do event loop)"""
+    global _limiter
+    if _limiter is None:
+        _limiter = ConcurrencyLimiter(OPENAI_MAX_CONCURRENCY, OPENAI_QUEUE_TIMEOUT, name="Chamadas ao modelo")
+    return _limiter
+
+
+def llm_stats() -> Dict[str, Any]:
+    return {
+        "configured": bool(OPENAI_API_KEY),
+        "started": _client is not None,
+        "limiter": get_llm_limiter().stats(),
+    }
@@ -0,0 +1,104 @@
+"""
+Features SEO de um texto em Markdown (conteúdo gerado), no formato do PageFeatures
+
+Uma passada pelas linhas: headings ATX (# ...) e setext (=== / ---), links,
+imagens e o texto sem a marcação. Blocos de código contam como texto, mas o
+que está dentro deles não vira heading.
+"""
+
+import re
+from typing import List
+
+from services.html_features import PageFeatures, count_words
+
+_ATX_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_UNDERLINE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_BLOCK_PREFIX = re.compile(r"^[ \t]*(?:>[ \t]?)*(?:[-+*][ \t]+|\d{1,9}[.)][ \t]+)?")
+_THEMATIC_BREAK = re.compile(r"^ {0,3}(?:(?:-[ \t]*){3,}|(?:\*[ \t]*){3,}|(?:_[ \t]*){3,})$")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(\s*<?([^)\s>]*)>?[^)]*\)")
+_LINK = re.compile(r"\[([^\]]*)\]\(\s*<?([^)\s>]*)>?[^)]*\)")
+_EMPHASIS = re.compile(r"[*_`~]+")
+_HTML_TAG = re.compile(r"<[^>\n]+>")
+
+
+def _inline_text(line: str, features: PageFeatures) -> str:
+    """Texto visível de uma linha; links e imagens vão para o features"""
+
+    def image(match: "re.Match[str]") -> str:
+        features.image_count += 1
+        if match.group(1).strip():
+            features.images_with_alt += 1
+        return " "
+
+    def link(match: "re.Match[str]") -> str:
+        href = match.group(2)
+        features.links.append(href)
+        if href.startswith("/"):
+            features.internal_link_count += 1
+        return match.group(1)
+
+    line = _IMAGE.sub(image, line)
+    line = _LINK.sub(link, line)
+    line = _HTML_TAG.sub(" ", line)
+    return _EMPHASIS.sub("", line)
+
+
+def extract_markdown_features(markdown: str) -> PageFeatures:
+    """Headings, links, imagens, contagem de palavras e texto de um Markdown"""
+    features = PageFeatures(has_body=True)
+    text: List[str] = []
+    lines = markdown.splitlines()
+    fence = None
+    index = 0
+
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+
+        match = _FENCE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            else:
+                text.append(line.strip())
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+
+        if not line.strip():
+            continue
+
+        level = 0
+        heading = _ATX_HEADING.match(line)
+        if heading:
+            level = len(heading.group(1))
+            line = heading.group(2) or ""
+        elif (
+            index < len(lines)
+            and _SETEXT_UNDERLINE.match(lines[index])
+            and not _BLOCK_PREFIX.match(line).group().strip()
+        ):
+            # Linha de parágrafo sublinhada com === (H1) ou --- (H2)
+            level = 1 if lines[index].strip()[0] == "=" else 2
+            index += 1
+        elif _THEMATIC_BREAK.match(line):
+            continue
+        else:
+            line = line[_BLOCK_PREFIX.match(line).end():]
+
+        visible = _inline_text(line, features).strip()
+        if level:
+            features.heading_count += 1
+            features.heading_levels.append(level)
+            if level == 1:
+                features.h1_count += 1
+                if features.title is None:
+                    features.title = visible
+        if visible:
+            text.append(visible)
+
+    features.text = " ".join(part for part in text if part)
+    features.word_count = count_words(features.text)
+    return features
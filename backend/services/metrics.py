@@ -0,0 +1,494 @@
+"""
+Métricas no formato de texto do Prometheus (GET /metrics)
+
+Contadores, gauges e histogramas com labels, mais coletores chamados na hora
+da leitura, que convertem os stats() já existentes (pools, caches, limitadores,
+jobs) em gauges. As atualizações são O(1) (um lock, um dict e um bisect), então
+instrumentar o caminho quente do ROI não pesa; bench_metrics mede o custo.
+"""
+
+import abc
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Se definido, /metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Limites dos buckets (s): de rotas de poucos ms a gerações longas da OpenAI
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        """Série do conjunto de labels (criada no primeiro uso)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abc.abstractmethod
+    def _new_child(self) -> Any:
+        """Valor de uma série nova"""
+
+    @abc.abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Linhas de amostra de todas as séries"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self, lock: threading.Lock):
+        self.value = 0.0
+        self._lock = lock
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value(self._lock)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...], lock: threading.Lock):
+        self.bounds = bounds
+        # Um contador por bucket (não cumulativo) + o +Inf no fim
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = lock
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets, self._lock)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        names = self.labelnames + ("le",)
+        for values, child in list(self._children.items()):
+            with self._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, values + (_format_value(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, values)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, values)} {cumulative}"
+
+
+class MetricFamily:
+    """Métrica montada na hora da leitura por um coletor (valores de stats())"""
+
+    def __init__(self, name: str, documentation: str, kind: str = "gauge", labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+    def add(self, value: Optional[float], *labels: str, suffix: str = "") -> "MetricFamily":
+        if value is not None:
+            self.samples.append((suffix, labels, float(value)))
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, value in self.samples:
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> Any:
+        """Registra a métrica (ou devolve a já registrada com o mesmo nome)"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def register_collector(self, collector: Collector) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in list(self._collectors):
+            for family in collector():
+                lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_collector(collector: Collector) -> None:
+    REGISTRY.register_collector(collector)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+async def refresh_service_stats() -> None:
+    """
+    Atualiza os stats que vêm de consultas ao SQLite (jobs e monitoramento),
+    numa thread, antes de render_metrics: os coletores rodam no event loop e
+    só leem memória
+    """
+    from services.content_jobs import get_content_jobs
+    from services.seo_monitor import get_seo_monitor
+
+    for get_service in (get_content_jobs, get_seo_monitor):
+        try:
+            await get_service().refresh_stats()
+        except RuntimeError:
+            # Serviço não iniciado
+            pass
+
+
+# Métricas de estágios compartilhadas pelos serviços
+SEO_STAGE_SECONDS = histogram(
+    "orbee_seo_stage_duration_seconds",
+    "Tempo de cada estágio da análise SEO (fetch, queue, parse, technical, content, resources, performance)",
+    ("stage",),
+)
+LLM_REQUEST_SECONDS = histogram(
+    "orbee_llm_request_duration_seconds",
+    "Duração das chamadas ao modelo (vaga no limitador + resposta completa)",
+    ("mode", "outcome"),
+)
+LLM_FIRST_TOKEN_SECONDS = histogram(
+    "orbee_llm_first_token_seconds", "Tempo até o primeiro pedaço de texto no streaming"
+)
+LLM_TOKENS = counter("orbee_llm_tokens_total", "Tokens informados pela OpenAI (usage)", ("kind",))
+
+
+def observe_stages(timings: Dict[str, float]) -> None:
+    """Registra os tempos (s) de estágios da análise SEO"""
+    for stage, seconds in timings.items():
+        SEO_STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_llm_usage(usage: Any) -> None:
+    """Tokens de prompt e de resposta de uma chamada (objeto usage do SDK, pode ser None)"""
+    if usage is None:
+        return
+    LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+
+# Métricas HTTP por rota
+HTTP_REQUESTS = counter(
+    "orbee_http_requests_total", "Requisições por rota, método e status", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = histogram(
+    "orbee_http_request_duration_seconds", "Duração das requisições até o fim da resposta", ("method", "route")
+)
+# A rota só é conhecida depois do roteamento: em andamento conta por método
+HTTP_IN_PROGRESS = gauge("orbee_http_requests_in_progress", "Requisições em andamento", ("method",))
+HTTP_EXCEPTIONS = counter(
+    "orbee_http_exceptions_total", "Exceções não tratadas por rota", ("method", "route")
+)
+
+# Rotas sem correspondência entram todas numa série só (URLs arbitrárias não viram labels)
+_UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: contagem por status, duração e requisições em andamento por
+    rota. A rota é o template do FastAPI (/api/v1/content-jobs/{job_id}), não a URL.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            HTTP_EXCEPTIONS.labels(method, _route(scope)).inc()
+            raise
+        finally:
+            in_progress.dec()
+            route = _route(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - started)
+
+
+def _route(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or _UNMATCHED
+
+
+def _service_families() -> Iterable[MetricFamily]:
+    """Stats dos serviços (pools, caches, limitadores, jobs) como gauges"""
+    from services.admission import get_admission_controller
+    from services.analysis_pool import pool_stats as analysis_pool_stats
+    from services.content_cache import get_content_cache
+    from services.http_client import pool_stats as http_pool_stats
+    from services.llm_client import llm_stats
+    from services.persistence import persistence_stats
+    from services.seo_cache import get_seo_cache
+
+    http = http_pool_stats()
+    yield (
+        MetricFamily("orbee_http_pool_connections", "Conexões do pool HTTP compartilhado", labelnames=("state",))
+        .add(http["active"], "active")
+        .add(http["idle"], "idle")
+    )
+    yield MetricFamily("orbee_http_pool_requests_total", "Requisições feitas pelo pool HTTP", "counter").add(
+        http["requests"]
+    )
+    yield MetricFamily(
+        "orbee_http_pool_connections_opened_total", "Conexões abertas pelo pool HTTP", "counter"
+    ).add(http["connections_opened"])
+    phases = MetricFamily(
+        "orbee_http_upstream_phase_seconds", "Fases de rede das páginas baixadas", "summary", ("phase",)
+    )
+    for phase, latency in http["latency"].items():
+        name = phase.removesuffix("_ms")
+        phases.add(latency["count"], name, suffix="_count")
+        phases.add((latency["avg_ms"] or 0) * latency["count"] / 1000, name, suffix="_sum")
+    yield phases
+
+    pool = analysis_pool_stats()
+    yield MetricFamily("orbee_analysis_pool_pending", "Análises rodando ou na fila do pool").add(pool["pending"])
+    yield MetricFamily("orbee_analysis_pool_max_pending", "Limite de análises pendentes").add(pool["max_pending"])
+    yield MetricFamily(
+        "orbee_analysis_pool_rejected_total", "Análises recusadas (pool saturado)", "counter"
+    ).add(pool["rejected"])
+
+    for cache_name, stats in (("seo", get_seo_cache().stats()), ("content", get_content_cache().stats())):
+        lookups = MetricFamily(
+            f"orbee_{cache_name}_cache_lookups_total", f"Consultas ao cache ({cache_name}) por resultado",
+            "counter", ("result",),
+        )
+        for result in ("hits", "misses", "revalidated", "bypassed"):
+            if result in stats:
+                lookups.add(stats[result], result)
+        yield lookups
+        yield MetricFamily(f"orbee_{cache_name}_cache_entries", f"Entradas em memória no cache ({cache_name})").add(
+            stats["memory"]["entries"]
+        )
+
+    limiters = [("llm", llm_stats()["limiter"])]
+    admission = get_admission_controller().stats()
+    for name, data in admission["classes"].items():
+        if data["limiter"] is not None:
+            limiters.append((f"admission_{name}", data["limiter"]))
+    active = MetricFamily("orbee_limiter_active", "Execuções em andamento por limitador", labelnames=("limiter",))
+    waiting = MetricFamily("orbee_limiter_waiting", "Execuções na fila por limitador", labelnames=("limiter",))
+    rejected = MetricFamily(
+        "orbee_limiter_rejected_total", "Recusas por limitador (fila cheia ou espera esgotada)", "counter",
+        ("limiter", "reason"),
+    )
+    for name, stats in limiters:
+        active.add(stats["active"], name)
+        waiting.add(stats["waiting"], name)
+        rejected.add(stats["rejected"], name, "queue_full")
+        rejected.add(stats["queue_timeouts"], name, "queue_timeout")
+    yield active
+    yield waiting
+    yield rejected
+
+    rate_limited = MetricFamily(
+        "orbee_rate_limited_total", "Pedidos recusados com 429 por classe", "counter", ("class",)
+    )
+    for name, data in admission["classes"].items():
+        rate_limited.add(data["rate_limited"], name)
+    yield rate_limited
+
+    persistence = persistence_stats()
+    if persistence["enabled"]:
+        yield MetricFamily("orbee_persistence_queued_rows", "Linhas na fila de persistência").add(
+            persistence["queued"]
+        )
+        rows = MetricFamily(
+            "orbee_persistence_rows_total", "Linhas da fila de persistência por resultado", "counter", ("result",)
+        )
+        for result in ("written", "dropped", "failed"):
+            rows.add(persistence[result], result)
+        yield rows
+        yield MetricFamily("orbee_persistence_batches_total", "Lotes gravados no banco", "counter").add(
+            persistence["batches"]
+        )
+
+    monitor = _monitor_stats()
+    if monitor is not None:
+        yield (
+            MetricFamily("orbee_seo_monitor_urls", "URLs monitoradas", labelnames=("state",))
+            .add(monitor["monitors"], "total")
+            .add(monitor["due"], "due")
+        )
+        checks = MetricFamily(
+            "orbee_seo_monitor_checks_total", "Checagens do monitoramento SEO por resultado", "counter", ("result",)
+        )
+        for result, count in monitor["checks"].items():
+            checks.add(count, result)
+        yield checks
+
+    jobs = _jobs_stats()
+    if jobs is not None:
+        yield MetricFamily("orbee_content_jobs_pending_items", "Itens de jobs aguardando geração").add(
+            jobs["pending_items"]
+        )
+        processed = MetricFamily(
+            "orbee_content_jobs_items_total", "Itens de jobs processados por resultado", "counter", ("result",)
+        )
+        for result in ("generated", "retried", "failed"):
+            processed.add(jobs[result], result)
+        yield processed
+
+
+def _monitor_stats() -> Optional[Dict[str, Any]]:
+    from services.seo_monitor import get_seo_monitor
+
+    try:
+        return get_seo_monitor().stats()
+    except RuntimeError:
+        return None
+
+
+def _jobs_stats() -> Optional[Dict[str, Any]]:
+    from services.content_jobs import get_content_jobs
+
+    try:
+        return get_content_jobs().stats()
+    except RuntimeError:
+        # Jobs não iniciados (fora do lifespan)
+        return None
+
+
+register_collector(_service_families)
@@ -0,0 +1,158 @@
+"""
+Tempos de rede por requisição (conexão com DNS, TLS, TTFB, download)
+
+Coletados pelo trace do httpcore: cada requisição (e cada salto de redirect)
+gera eventos como "connection.connect_tcp.started" e
+"http11.receive_response_headers.complete", que viram um HopTiming.
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return round((end - start) * 1000, 1)
+
+
+def _sum(values: Iterable[Optional[float]]) -> Optional[float]:
+    present = [value for value in values if value is not None]
+    return round(sum(present), 1) if present else None
+
+
+@dataclass(slots=True)
+class HopTiming:
+    """Um salto da cadeia de redirects. Os tempos são em ms; None = fase não ocorreu."""
+
+    url: Optional[str] = None
+    status_code: Optional[int] = None
+    reused_connection: bool = True
+    # Resolução de DNS + handshake TCP (o httpcore resolve o host dentro do connect_tcp)
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    download_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+
+
+class _Hop:
+    __slots__ = (
+        "started", "connect_started", "connect_done",
+        "tls_started", "tls_done", "headers_done", "body_done",
+    )
+
+    def __init__(self, started: float):
+        self.started = started
+        self.connect_started = self.connect_done = None
+        self.tls_started = self.tls_done = None
+        self.headers_done = self.body_done = None
+
+    def timing(self) -> HopTiming:
+        end = self.body_done or self.headers_done
+        return HopTiming(
+            reused_connection=self.connect_started is None,
+            connect_ms=_ms(self.connect_started, self.connect_done),
+            tls_ms=_ms(self.tls_started, self.tls_done),
+            # TTFB a partir do início do salto: inclui conexão (com DNS) e TLS
+            ttfb_ms=_ms(self.started, self.headers_done),
+            download_ms=_ms(self.headers_done, self.body_done),
+            total_ms=_ms(self.started, end),
+        )
+
+
+class RequestTimer:
+    """
+    Callback de trace do httpcore que separa os tempos de cada salto.
+
+    O httpcore não emite eventos de DNS (a resolução acontece dentro do
+    connect_tcp), então connect_ms inclui a resolução do host.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self._hops: List[_Hop] = []
+
+    def _hop(self, now: float) -> _Hop:
+        # Um salto novo começa quando o anterior já recebeu os headers
+        if not self._hops or self._hops[-1].headers_done is not None:
+            self._hops.append(_Hop(now))
+        return self._hops[-1]
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+
+        if event_name == "connection.connect_tcp.started":
+            self._hop(now).connect_started = now
+        elif event_name == "connection.connect_tcp.complete":
+            self._hop(now).connect_done = now
+        elif event_name == "connection.start_tls.started":
+            self._hop(now).tls_started = now
+        elif event_name == "connection.start_tls.complete":
+            self._hop(now).tls_done = now
+        elif event_name.endswith(".send_request_headers.started"):
+            self._hop(now)
+        elif event_name.endswith(".receive_response_headers.complete"):
+            self._hop(now).headers_done = now
+        elif event_name.endswith(".receive_response_body.complete"):
+            if self._hops:
+                self._hops[-1].body_done = now
+
+    def last_hop(self) -> Optional[HopTiming]:
+        return self._hops[-1].timing() if self._hops else None
+
+    def finish(self, responses: List[Any]) -> Dict[str, Any]:
+        """
+        Fecha a medição. responses é a cadeia (response.history + [response]),
+        usada para rotular cada salto com URL e status.
+        """
+        ended = time.perf_counter()
+        if self._hops and self._hops[-1].body_done is None:
+            # Download interrompido (ou corpo ainda não lido): conta até agora
+            self._hops[-1].body_done = ended
+
+        hops = [hop.timing() for hop in self._hops]
+        for hop, response in zip(hops, responses):
+            hop.url = str(response.url)
+            hop.status_code = response.status_code
+
+        final = hops[-1] if hops else HopTiming()
+        first_started = self._hops[0].started if self._hops else None
+        final_headers = self._hops[-1].headers_done if self._hops else None
+        return {
+            "redirects": max(0, len(hops) - 1),
+            # Conexões podem ser abertas em qualquer salto: somar a cadeia
+            "connect_ms": _sum(hop.connect_ms for hop in hops),
+            "tls_ms": _sum(hop.tls_ms for hop in hops),
+            # TTFB da cadeia inteira: do primeiro salto até os headers da resposta final
+            "ttfb_ms": _ms(first_started, final_headers),
+            "download_ms": final.download_ms,
+            "total_ms": _ms(self.started, ended),
+            "hops": [asdict(hop) for hop in hops],
+        }
+
+
+class LatencyStats:
+    """Agregado simples (contagem, média, máximo) de uma fase, em ms"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: Optional[float]) -> None:
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1),
+        }
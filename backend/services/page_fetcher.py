@@ -0,0 +1,167 @@
+"""
+Download de páginas em streaming, com limite de tamanho e aborto antecipado
+"""
+
+import codecs
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from services.http_client import get_http_client, host_slot
+from services.metrics import observe_stages
+from services.network_timing import RequestTimer
+
+logger = logging.getLogger(__name__)
+
+# Tamanho máximo (descomprimido) de uma página analisada
+SEO_MAX_PAGE_BYTES = int(os.getenv("SEO_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# O HTML5 manda procurar a declaração de charset nos primeiros 1024 bytes
+_SNIFF_BYTES = 1024
+_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""",
+    re.IGNORECASE,
+)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+
+class PageTooLargeError(Exception):
+    """A página passou de SEO_MAX_PAGE_BYTES"""
+
+
+class UnsupportedContentError(Exception):
+    """A URL não devolveu HTML"""
+
+
+@dataclass(slots=True)
+class FetchedPage:
+    """Página baixada; size é medido uma única vez durante o download"""
+
+    url: str
+    status_code: int
+    headers: httpx.Headers
+    content: bytes
+    encoding: str
+    size: int
+    # Tempos de rede (conexão com DNS, TLS, TTFB, download) por salto de redirect
+    timing: Optional[Dict[str, Any]] = None
+
+
+def _valid_encoding(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.decode("ascii") if isinstance(name, bytes) else name).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+class CharsetSniffer:
+    """
+    Detecta o charset incrementalmente: header Content-Type, BOM ou <meta charset>
+    no início do documento. Decide assim que encontra (ou após 1024 bytes).
+    """
+
+    def __init__(self, header_charset: Optional[str]):
+        self.encoding = _valid_encoding(header_charset)
+        self._prefix = b""
+
+    @property
+    def done(self) -> bool:
+        return self.encoding is not None or len(self._prefix) >= _SNIFF_BYTES
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        self._prefix += chunk[: _SNIFF_BYTES - len(self._prefix)]
+
+        for bom, encoding in _BOMS:
+            if self._prefix.startswith(bom):
+                self.encoding = encoding
+                return
+        match = _META_CHARSET.search(self._prefix)
+        if match:
+            self.encoding = _valid_encoding(match.group(1))
+
+    def result(self) -> str:
+        # Mesmo padrão do httpx quando nada é declarado
+        return self.encoding or "utf-8"
+
+
+async def fetch_page(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = SEO_MAX_PAGE_BYTES,
+    content_types: Optional[Tuple[str, ...]] = _HTML_CONTENT_TYPES,
+) -> FetchedPage:
+    """
+    Baixa a página em streaming usando uma conexão do pool compartilhado.
+    Aborta cedo se o conteúdo não for HTML (ou um de content_types; None
+    aceita qualquer tipo) ou passar de max_bytes.
+    Headers extras permitem requisições condicionais (If-None-Match etc.).
+    """
+    timer = RequestTimer()
+    started = time.perf_counter()
+    try:
+        client = get_http_client()
+        async with host_slot(url):
+            async with client.stream(
+                "GET", url, headers=headers, follow_redirects=True, extensions={"trace": timer}
+            ) as response:
+                # 304 só é esperado (e válido) em requisições condicionais
+                if headers and response.status_code == 304:
+                    return FetchedPage(
+                        str(response.url), 304, response.headers, b"", "utf-8", 0,
+                        timing=timer.finish([*response.history, response]),
+                    )
+                response.raise_for_status()
+
+                content_type = response.headers.get("content-type", "").lower()
+                if content_types and content_type and not content_type.startswith(content_types):
+                    raise UnsupportedContentError(
+                        f"Conteúdo não é HTML ({content_type.split(';')[0]})"
+                    )
+
+                declared = response.headers.get("content-length")
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise PageTooLargeError(
+                        f"Página maior que o limite de {max_bytes // 1024}KB"
+                    )
+
+                sniffer = CharsetSniffer(response.charset_encoding)
+                chunks: List[bytes] = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise PageTooLargeError(
+                            f"Página maior que o limite de {max_bytes // 1024}KB"
+                        )
+                    sniffer.feed(chunk)
+                    chunks.append(chunk)
+
+                return FetchedPage(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    content=b"".join(chunks),
+                    encoding=sniffer.result(),
+                    size=size,
+                    timing=timer.finish([*response.history, response]),
+                )
+    except httpx.HTTPError as e:
+        logger.error(f"Erro HTTP ao acessar URL: {str(e)}")
+        raise Exception(f"Erro ao acessar URL: {str(e)}")
+    finally:
+        # Inclui a espera pela vaga do host e o download completo
+        observe_stages({"fetch": time.perf_counter() - started})
@@ -0,0 +1,368 @@
+"""
+Persistência write-behind de auditorias SEO e cálculos de ROI
+
+Opcional (PERSISTENCE_ENABLED): o backend grava os resultados nas tabelas do
+Prisma (seo_audits e roi_calculations) sem que o banco entre no caminho da
+resposta. O endpoint só coloca a linha numa fila limitada em memória e
+devolve o id gerado; uma tarefa do processo grava em lote a cada
+PERSISTENCE_BATCH_SIZE linhas ou PERSISTENCE_FLUSH_INTERVAL_MS, o que vier
+primeiro, numa transação só.
+
+Com o banco lento ou fora do ar, o lote é tentado de novo com backoff e a fila
+enche: quem enfileira espera uma vaga por até PERSISTENCE_ENQUEUE_TIMEOUT e,
+depois disso, a linha é descartada (contada em stats) em vez de segurar a
+resposta. No desligamento, a fila é esvaziada antes de fechar o pool.
+
+PERSISTENCE_DATABASE_URL (ou DATABASE_URL) escolhe o backend:
+postgres(ql)://... usa um pool do asyncpg; sqlite:///caminho grava num SQLite
+local com as mesmas tabelas (desenvolvimento e benchmarks).
+"""
+
+import abc
+import asyncio
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import asyncpg
+except ImportError:  # pragma: no cover - dependência opcional (só com Postgres)
+    asyncpg = None
+
+from services.responses import dumps_json
+
+logger = logging.getLogger(__name__)
+
+PERSISTENCE_ENABLED = os.getenv("PERSISTENCE_ENABLED", "false").lower() == "true"
+PERSISTENCE_DATABASE_URL = os.getenv("PERSISTENCE_DATABASE_URL") or os.getenv("DATABASE_URL", "")
+# Conexões do pool (Postgres); o gravador usa uma por lote
+PERSISTENCE_POOL_SIZE = int(os.getenv("PERSISTENCE_POOL_SIZE", "4"))
+# Lote: grava a cada N linhas ou T milissegundos desde a primeira linha pendente
+PERSISTENCE_BATCH_SIZE = int(os.getenv("PERSISTENCE_BATCH_SIZE", "100"))
+PERSISTENCE_FLUSH_INTERVAL_MS = float(os.getenv("PERSISTENCE_FLUSH_INTERVAL_MS", "200"))
+# Linhas aguardando gravação; fila cheia = espera de até ENQUEUE_TIMEOUT (s) e descarte
+PERSISTENCE_QUEUE_SIZE = int(os.getenv("PERSISTENCE_QUEUE_SIZE", "10000"))
+PERSISTENCE_ENQUEUE_TIMEOUT = float(os.getenv("PERSISTENCE_ENQUEUE_TIMEOUT", "0.5"))
+# Tentativas por lote (backoff de 0,5 s dobrando até 10 s) antes de descartar
+PERSISTENCE_MAX_ATTEMPTS = int(os.getenv("PERSISTENCE_MAX_ATTEMPTS", "5"))
+# Espera máxima para esvaziar a fila no desligamento (s)
+PERSISTENCE_SHUTDOWN_TIMEOUT = float(os.getenv("PERSISTENCE_SHUTDOWN_TIMEOUT", "10"))
+
+# Colunas das tabelas do Prisma (prisma/schema.prisma): id e updatedAt não têm default no banco
+TABLES: Dict[str, Tuple[str, ...]] = {
+    "seo_audits": ("id", "url", "score", "data", "createdAt", "updatedAt"),
+    "roi_calculations": ("id", "userId", "name", "data", "result", "createdAt", "updatedAt"),
+}
+
+Row = Tuple[str, Tuple[Any, ...]]
+
+
+def new_id() -> str:
+    """Id no formato dos cuid do Prisma (25 caracteres começando com "c")"""
+    return "c" + secrets.token_hex(12)
+
+
+def _now() -> datetime:
+    # TIMESTAMP(3) sem fuso no Postgres: UTC sem tzinfo, como o Prisma grava
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class PersistenceBackend(abc.ABC):
+    """Destino dos lotes. Um backend só precisa gravar as linhas de uma tabela de forma atômica."""
+
+    async def start(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def insert_many(self, table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        """Grava as linhas de table numa transação (tudo ou nada)"""
+
+    async def close(self) -> None:
+        pass
+
+
+# Parâmetros da URL do Prisma que o asyncpg não entende
+_PRISMA_PARAMS = ("schema", "connection_limit", "pool_timeout", "pgbouncer", "socket_timeout", "connect_timeout")
+
+
+def asyncpg_options(url: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    DATABASE_URL do Prisma -> DSN do asyncpg: tira os parâmetros do Prisma,
+    usa ?schema= como search_path e desliga o cache de statements com pgbouncer
+    """
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    options: Dict[str, Any] = {}
+    if params.get("schema"):
+        options["server_settings"] = {"search_path": params["schema"]}
+    if params.get("pgbouncer") == "true":
+        options["statement_cache_size"] = 0
+    query = urlencode({name: value for name, value in params.items() if name not in _PRISMA_PARAMS})
+    return urlunsplit(parts._replace(query=query)), options
+
+
+class PostgresBackend(PersistenceBackend):
+    """Pool do asyncpg; cada lote é um executemany numa transação"""
+
+    def __init__(self, url: str, pool_size: int = PERSISTENCE_POOL_SIZE):
+        if asyncpg is None:
+            raise RuntimeError("asyncpg não instalado (necessário para persistir no Postgres)")
+        self.url = url
+        self.pool_size = pool_size
+        self._pool: Any = None
+
+    async def start(self) -> None:
+        dsn, options = asyncpg_options(self.url)
+        self._pool = await asyncpg.create_pool(dsn, min_size=1, max_size=self.pool_size, **options)
+
+    async def insert_many(self, table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        columns = TABLES[table]
+        placeholders = ", ".join(f"${index}" for index in range(1, len(columns) + 1))
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        async with self._pool.acquire() as conn, conn.transaction():
+            await conn.executemany(f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})', rows)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+        self._pool = None
+
+
+class SQLiteBackend(PersistenceBackend):
+    """SQLite local com as tabelas do Prisma; as gravações rodam numa thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def start(self) -> None:
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS "seo_audits" ('
+            ' "id" TEXT PRIMARY KEY, "url" TEXT NOT NULL, "score" INTEGER NOT NULL, "data" TEXT NOT NULL,'
+            ' "createdAt" TIMESTAMP NOT NULL, "updatedAt" TIMESTAMP NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS "roi_calculations" ('
+            ' "id" TEXT PRIMARY KEY, "userId" TEXT, "name" TEXT, "data" TEXT NOT NULL, "result" TEXT NOT NULL,'
+            ' "createdAt" TIMESTAMP NOT NULL, "updatedAt" TIMESTAMP NOT NULL);'
+        )
+
+    def _insert(self, table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        columns = TABLES[table]
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        values = [tuple(v.isoformat(sep=" ") if isinstance(v, datetime) else v for v in row) for row in rows]
+        with self._lock, self._conn:
+            self._conn.executemany(f'INSERT INTO "{table}" ({quoted}) VALUES ({placeholders})', values)
+
+    async def insert_many(self, table: str, rows: Sequence[Tuple[Any, ...]]) -> None:
+        await asyncio.to_thread(self._insert, table, rows)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+        self._conn = None
+
+
+def backend_for_url(url: str) -> PersistenceBackend:
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresBackend(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    raise ValueError("PERSISTENCE_DATABASE_URL deve começar com postgresql:// ou sqlite:///")
+
+
+class WriteBehindQueue:
+    """Fila limitada de linhas + tarefa que grava em lotes"""
+
+    def __init__(
+        self,
+        backend: PersistenceBackend,
+        batch_size: int = PERSISTENCE_BATCH_SIZE,
+        flush_interval: float = PERSISTENCE_FLUSH_INTERVAL_MS / 1000,
+        max_size: int = PERSISTENCE_QUEUE_SIZE,
+        enqueue_timeout: float = PERSISTENCE_ENQUEUE_TIMEOUT,
+        max_attempts: int = PERSISTENCE_MAX_ATTEMPTS,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_attempts = max_attempts
+        self._queue: "asyncio.Queue[Row]" = asyncio.Queue(max_size)
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._closing = False
+        self.counters = {
+            "enqueued": 0, "written": 0, "batches": 0, "retries": 0, "dropped": 0, "failed": 0, "waited": 0,
+        }
+        self.last_batch_ms: Optional[float] = None
+
+    async def start(self) -> None:
+        await self.backend.start()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = PERSISTENCE_SHUTDOWN_TIMEOUT) -> None:
+        """Para de aceitar linhas, grava o que está na fila e fecha o backend"""
+        self._closing = True
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Persistência: {self._queue.qsize()} linhas não gravadas no desligamento")
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.backend.close()
+
+    async def put(self, table: str, row: Tuple[Any, ...]) -> bool:
+        """
+        Enfileira uma linha. Com a fila cheia, espera uma vaga por até
+        enqueue_timeout (backpressure) e descarta a linha depois disso.
+        """
+        if self._closing:
+            self.counters["dropped"] += 1
+            return False
+        try:
+            self._queue.put_nowait((table, row))
+        except asyncio.QueueFull:
+            self.counters["waited"] += 1
+            try:
+                await asyncio.wait_for(self._queue.put((table, row)), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.counters["dropped"] += 1
+                # Com o banco fora do ar, uma linha de log a cada 100 descartes
+                if self.counters["dropped"] % 100 == 1:
+                    logger.warning(f"Persistência: fila cheia, {self.counters['dropped']} linhas descartadas até agora")
+                return False
+        self.counters["enqueued"] += 1
+        return True
+
+    async def _next_batch(self) -> List[Row]:
+        """Primeira linha (espera sem limite, ou até fechar) + o que chegar até o lote fechar"""
+        batch: List[Row] = []
+        while not batch:
+            if self._closing and self._queue.empty():
+                return batch
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), self.flush_interval))
+            except asyncio.TimeoutError:
+                continue
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closing:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            if not batch:
+                return
+            await self._write(batch)
+
+    async def _write(self, batch: List[Row]) -> None:
+        tables: Dict[str, List[Tuple[Any, ...]]] = {}
+        for table, row in batch:
+            tables.setdefault(table, []).append(row)
+        for table, rows in tables.items():
+            for attempt in range(1, self.max_attempts + 1):
+                started = time.perf_counter()
+                try:
+                    await self.backend.insert_many(table, rows)
+                except Exception as e:
+                    if attempt == self.max_attempts:
+                        self.counters["failed"] += len(rows)
+                        logger.error(f"Persistência: lote de {len(rows)} linhas de {table} descartado: {e}")
+                        break
+                    self.counters["retries"] += 1
+                    delay = min(10.0, 0.5 * 2 ** (attempt - 1))
+                    logger.warning(f"Persistência: falha ao gravar {table} (tentativa {attempt}); nova em {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                self.last_batch_ms = (time.perf_counter() - started) * 1000
+                self.counters["written"] += len(rows)
+                self.counters["batches"] += 1
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "backend": type(self.backend).__name__,
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "last_batch_ms": round(self.last_batch_ms, 3) if self.last_batch_ms is not None else None,
+            **self.counters,
+        }
+
+
+_writer: Optional[WriteBehindQueue] = None
+
+
+async def start_persistence() -> Optional[WriteBehindQueue]:
+    """Abre o pool e inicia o gravador (chamado no lifespan; nada a fazer se desligado)"""
+    global _writer
+    if not PERSISTENCE_ENABLED or _writer is not None:
+        return _writer
+    if not PERSISTENCE_DATABASE_URL:
+        logger.warning("PERSISTENCE_ENABLED sem PERSISTENCE_DATABASE_URL/DATABASE_URL: persistência desligada")
+        return None
+    writer = WriteBehindQueue(backend_for_url(PERSISTENCE_DATABASE_URL))
+    try:
+        await writer.start()
+    except Exception as e:
+        # Banco fora do ar não impede a API de subir (os resultados só não são gravados)
+        logger.error(f"Persistência desligada: falha ao conectar no banco: {e}")
+        return None
+    _writer = writer
+    logger.info(f"Persistência write-behind iniciada ({type(writer.backend).__name__})")
+    return _writer
+
+
+async def stop_persistence() -> None:
+    """Grava o que restou na fila e fecha o pool"""
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+    _writer = None
+
+
+def persistence_stats() -> Dict[str, Any]:
+    return _writer.stats() if _writer is not None else {"enabled": False}
+
+
+async def record_seo_audit(url: str, result: Dict[str, Any]) -> Optional[str]:
+    """Enfileira a auditoria (tabela seo_audits); devolve o id ou None se não foi enfileirada"""
+    if _writer is None:
+        return None
+    record_id, now = new_id(), _now()
+    row = (record_id, url, int(result.get("overall_score", 0)), dumps_json(result).decode("utf-8"), now, now)
+    return record_id if await _writer.put("seo_audits", row) else None
+
+
+async def record_roi_calculation(
+    data: Dict[str, Any], result: Dict[str, Any], user_id: Optional[str] = None, name: Optional[str] = None
+) -> Optional[str]:
+    """Enfileira o cálculo (tabela roi_calculations); devolve o id ou None se não foi enfileirado"""
+    if _writer is None:
+        return None
+    record_id, now = new_id(), _now()
+    row = (record_id, user_id, name, dumps_json(data).decode("utf-8"), dumps_json(result).decode("utf-8"), now, now)
+    return record_id if await _writer.put("roi_calculations", row) else None
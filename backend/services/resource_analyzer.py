@@ -0,0 +1,189 @@
+"""
+Peso dos sub-recursos da página (CSS, JS, imagens, fontes)
+
+Cada recurso é consultado com HEAD (sem baixar o corpo); se o servidor não
+informar o tamanho, cai para um GET com Range: bytes=0-0 e lê o total do
+Content-Range. As consultas usam o pool HTTP compartilhado, com prazo por
+requisição e um prazo total para a auditoria.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from services.http_client import get_http_client, host_slot
+from services.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+SEO_RESOURCE_MAX = int(os.getenv("SEO_RESOURCE_MAX", "150"))
+SEO_RESOURCE_CONCURRENCY = int(os.getenv("SEO_RESOURCE_CONCURRENCY", "16"))
+# Prazo de cada recurso e prazo total (segundos)
+SEO_RESOURCE_TIMEOUT = float(os.getenv("SEO_RESOURCE_TIMEOUT", "3"))
+SEO_RESOURCE_BUDGET = float(os.getenv("SEO_RESOURCE_BUDGET", "10"))
+
+_COMPRESSED_ENCODINGS = ("gzip", "br", "deflate", "zstd")
+_COMPRESSIBLE_TYPES = ("text/", "javascript", "json", "xml", "svg")
+_CONTENT_RANGE_TOTAL = re.compile(r"/\s*(\d+)\s*$")
+_MAX_AGE = re.compile(r"(?:^|[,\s])(?:s-)?max-age\s*=\s*\"?(\d+)")
+
+
+def _content_length(response: httpx.Response) -> Optional[int]:
+    value = response.headers.get("content-length", "")
+    return int(value) if value.isdigit() else None
+
+
+def _is_cacheable(headers: httpx.Headers) -> bool:
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return False
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return int(match.group(1)) > 0
+    return "expires" in headers
+
+
+def _is_compressible(kind: str, content_type: str) -> bool:
+    if content_type:
+        return any(marker in content_type for marker in _COMPRESSIBLE_TYPES)
+    return kind in ("stylesheet", "script")
+
+
+async def _probe(url: str) -> Tuple[httpx.Response, Optional[int]]:
+    """HEAD e, se preciso, GET com Range. Retorna a resposta usada e o tamanho."""
+    client = get_http_client()
+    async with host_slot(url):
+        response = await client.head(url, follow_redirects=True, timeout=SEO_RESOURCE_TIMEOUT)
+        size = _content_length(response)
+        if response.status_code < 400 and size is not None:
+            return response, size
+
+        # HEAD não suportado ou sem Content-Length: pedir um único byte
+        async with client.stream(
+            "GET", url, headers={"Range": "bytes=0-0"},
+            follow_redirects=True, timeout=SEO_RESOURCE_TIMEOUT,
+        ) as ranged:
+            if ranged.status_code == 206:
+                await ranged.aread()
+                match = _CONTENT_RANGE_TOTAL.search(ranged.headers.get("content-range", ""))
+                return ranged, int(match.group(1)) if match else None
+            # Range ignorado: o Content-Length do 200 basta (o corpo não é lido)
+            return ranged, _content_length(ranged)
+
+
+async def _inspect(kind: str, url: str, render_blocking: bool) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"url": url, "type": kind, "render_blocking": render_blocking}
+    started = time.perf_counter()
+    try:
+        response, size = await asyncio.wait_for(_probe(url), timeout=SEO_RESOURCE_TIMEOUT)
+    except asyncio.TimeoutError:
+        record["error"] = "timeout"
+        return record
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        record["error"] = str(e) or type(e).__name__
+        return record
+
+    headers = response.headers
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    encoding = headers.get("content-encoding", "").lower()
+    record.update({
+        "status_code": response.status_code,
+        "size": size,
+        "content_type": content_type or None,
+        "content_encoding": encoding or None,
+        "compressed": encoding.startswith(_COMPRESSED_ENCODINGS),
+        "compressible": _is_compressible(kind, content_type),
+        "cacheable": _is_cacheable(headers),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    if response.status_code >= 400:
+        record["error"] = f"HTTP {response.status_code}"
+    return record
+
+
+def resolve_resources(
+    page_url: str, resources: List[Tuple[str, str, bool]]
+) -> Tuple[List[Tuple[str, str, bool]], List[Dict[str, Any]]]:
+    """
+    URLs absolutas, só http(s), sem repetição (mantém a 1ª ocorrência).
+    URLs malformadas (ex.: porta > 65535) voltam à parte, como itens com erro.
+    """
+    resolved: List[Tuple[str, str, bool]] = []
+    invalid: List[Dict[str, Any]] = []
+    seen = set()
+    for kind, href, render_blocking in resources:
+        try:
+            url = urljoin(page_url, href.strip())
+            if urlsplit(url).scheme not in ("http", "https"):
+                continue
+            key = normalize_url(url)
+        except ValueError as e:
+            invalid.append({"url": href, "type": kind, "render_blocking": render_blocking, "error": f"URL inválida: {e}"})
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        resolved.append((kind, url, render_blocking))
+    return resolved, invalid
+
+
+async def analyze_resources(
+    page_url: str,
+    page_size: int,
+    resources: List[Tuple[str, str, bool]],
+    max_resources: int = SEO_RESOURCE_MAX,
+    concurrency: int = SEO_RESOURCE_CONCURRENCY,
+    budget: float = SEO_RESOURCE_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Consulta os sub-recursos em paralelo e resume peso total, recursos que
+    bloqueiam a renderização e recursos sem compressão ou sem cache
+    """
+    resolved, invalid = resolve_resources(page_url, resources)
+    truncated = len(resolved) > max_resources
+    resolved = resolved[:max_resources]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(kind: str, url: str, render_blocking: bool) -> Dict[str, Any]:
+        async with semaphore:
+            return await _inspect(kind, url, render_blocking)
+
+    tasks = [asyncio.create_task(limited(*resource)) for resource in resolved]
+    if tasks:
+        # Prazo total: o que não terminar a tempo é cancelado e marcado como timeout
+        await asyncio.wait(tasks, timeout=budget)
+    items: List[Dict[str, Any]] = list(invalid)
+    for task, (kind, url, render_blocking) in zip(tasks, resolved):
+        if task.done() and not task.cancelled():
+            items.append(task.result())
+        else:
+            task.cancel()
+            items.append({"url": url, "type": kind, "render_blocking": render_blocking, "error": "timeout"})
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    by_type: Dict[str, Dict[str, int]] = defaultdict(lambda: {"count": 0, "bytes": 0})
+    for item in items:
+        by_type[item["type"]]["count"] += 1
+        by_type[item["type"]]["bytes"] += item.get("size") or 0
+
+    ok = [item for item in items if "error" not in item]
+    return {
+        "count": len(items),
+        "truncated": truncated,
+        "failed": len(items) - len(ok),
+        "timed_out": sum(1 for item in items if item.get("error") == "timeout"),
+        "unknown_size": sum(1 for item in ok if item["size"] is None),
+        "total_weight_bytes": page_size + sum(item["size"] or 0 for item in ok),
+        "by_type": dict(by_type),
+        "render_blocking": [item["url"] for item in items if item["render_blocking"]],
+        "uncompressed": [item["url"] for item in ok if item["compressible"] and not item["compressed"]],
+        "uncached": [item["url"] for item in ok if not item["cacheable"]],
+        "items": items,
+    }
@@ -0,0 +1,178 @@
+"""
+Camada de resposta da API: JSON com orjson, MessagePack negociado e compressão
+
+APIResponse serializa com orjson (ou json da stdlib, se o orjson não estiver
+instalado), em MessagePack quando o header Accept pede (application/msgpack)
+e comprime com brotli ou gzip acima de RESPONSE_COMPRESSION_MIN_BYTES, conforme
+o Accept-Encoding. Os headers do pedido chegam à resposta por um ContextVar
+preenchido pelo NegotiationMiddleware, então os endpoints só trocam
+JSONResponse por APIResponse.
+
+Devolver uma APIResponse (em vez de um dict) também pula o jsonable_encoder
+do FastAPI: o resultado já vem de dados validados pelo Pydantic e não precisa
+ser percorrido de novo antes da serialização.
+"""
+
+import gzip
+import json
+import os
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Respostas menores que isso saem sem compressão (não compensa o custo)
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+# Qualidade 4 do brotli e nível 6 do gzip: boa taxa sem pesar no tempo de resposta
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_MSGPACK_ENABLED = os.getenv("RESPONSE_MSGPACK_ENABLED", "true").lower() == "true"
+
+# (Accept, Accept-Encoding) do pedido em andamento
+_request_headers: ContextVar[Tuple[str, str]] = ContextVar("response_negotiation", default=("", ""))
+
+
+def _default(value: Any) -> Any:
+    """Tipos fora do JSON/MessagePack nativo (escalares e arrays do NumPy)"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def dumps_json(content: Any) -> bytes:
+    """JSON em UTF-8 (orjson quando disponível)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, use_bin_type=True, default=_default)
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Valores de um header Accept* com o peso q de cada um"""
+    accepted: Dict[str, float] = {}
+    for part in header.lower().split(","):
+        value, _, params = part.partition(";")
+        value = value.strip()
+        if value:
+            accepted[value] = _quality(params)
+    return accepted
+
+
+def negotiate_media_type(accept: str) -> str:
+    """MessagePack só quando o cliente pede explicitamente e prefere a JSON"""
+    if not accept or msgpack is None or not RESPONSE_MSGPACK_ENABLED:
+        return JSON_MEDIA_TYPE
+    accepted = _accepted(accept)
+    msgpack_q = max((accepted.get(name, 0.0) for name in _MSGPACK_ALIASES), default=0.0)
+    json_q = accepted.get(JSON_MEDIA_TYPE, accepted.get("application/*", accepted.get("*/*", 0.0)))
+    return MSGPACK_MEDIA_TYPE if msgpack_q > 0 and msgpack_q >= json_q else JSON_MEDIA_TYPE
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """br (se o brotli estiver instalado) ou gzip, pelo maior peso do Accept-Encoding"""
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    options = [("gzip", accepted.get("gzip", wildcard))]
+    if brotli is not None:
+        # Em empate, br (comprime mais com custo parecido)
+        options.insert(0, ("br", accepted.get("br", wildcard)))
+    coding, quality = max(options, key=lambda option: option[1])
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+class APIResponse(Response):
+    """
+    Resposta da API no formato pedido pelo cliente (JSON ou MessagePack),
+    comprimida quando passa do limite e o cliente aceita br/gzip
+    """
+
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        accept, accept_encoding = _request_headers.get()
+        media_type = media_type or negotiate_media_type(accept)
+        body = dumps_msgpack(content) if media_type == MSGPACK_MEDIA_TYPE else dumps_json(content)
+
+        # A resposta depende de Accept e Accept-Encoding (caches/CDN precisam saber)
+        vary = [value for name, value in (headers or {}).items() if name.lower() == "vary"]
+        headers = {name: value for name, value in (headers or {}).items() if name.lower() != "vary"}
+        headers["Vary"] = ", ".join(vary + ["Accept", "Accept-Encoding"])
+        if len(body) >= RESPONSE_COMPRESSION_MIN_BYTES:
+            coding = negotiate_encoding(accept_encoding)
+            if coding is not None:
+                body = compress(body, coding)
+                headers["Content-Encoding"] = coding
+
+        super().__init__(body, status_code, headers, media_type, background)
+
+
+class NegotiationMiddleware:
+    """Middleware ASGI: guarda Accept e Accept-Encoding do pedido para a APIResponse"""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept":
+                accept = value.decode("latin-1")
+            elif name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        token = _request_headers.set((accept, accept_encoding))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_headers.reset(token)
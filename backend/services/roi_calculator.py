@@ -2,11 +2,41 @@
 Serviço de cálculo avançado de ROI
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import os
+
+import numpy as np
+
+from services.roi_engine import (
+    monthly_projection,
+    revenue_schedule,
+    roi_summary,
+    serialize_projection,
+    serialize_projection_columns,
+    serialize_summary,
+)
 
 logger = logging.getLogger(__name__)
 
+# Limites do cálculo em lote (cenários e células cenário x mês da projeção)
+ROI_BATCH_MAX_SCENARIOS = int(os.getenv("ROI_BATCH_MAX_SCENARIOS", "10000"))
+ROI_BATCH_MAX_PROJECTION_CELLS = int(os.getenv("ROI_BATCH_MAX_PROJECTION_CELLS", "600000"))
+
+# Parâmetros de um cenário, na ordem de calculate_advanced_roi
+ROI_PARAMETERS = (
+    "investimento_inicial",
+    "investimento_mensal",
+    "receita_mensal",
+    "custo_operacional",
+    "periodo_meses",
+    "taxa_desconto",
+    "crescimento_mensal",
+)
+
+# Parâmetros em série (uma lista por cenário, ou None)
+ROI_SERIES = ("sazonalidade", "receitas_mensais")
+
 
 async def calculate_advanced_roi(
     investimento_inicial: float,
@@ -15,83 +45,49 @@ async def calculate_advanced_roi(
     custo_operacional: float,
     periodo_meses: int,
     taxa_desconto: float = 0.1,
+    crescimento_mensal: float = 0.0,
+    sazonalidade: Optional[List[float]] = None,
+    receitas_mensais: Optional[List[float]] = None,
 ) -> Dict[str, Any]:
     """
-    Calcula ROI avançado com NPV (Net Present Value)
+    Calcula ROI avançado com NPV (Net Present Value), TIR e TIRM
+    
+    A receita pode variar mês a mês: crescimento_mensal (composto) e
+    sazonalidade (12 multiplicadores, a partir do mês 1) sobre receita_mensal,
+    ou a série explícita receitas_mensais (uma receita por mês do período).
     """
     try:
-        # Calcular fluxo de caixa mensal
-        fluxo_caixa_mensal = receita_mensal - custo_operacional - investimento_mensal
-        
-        # Calcular investimento total
-        investimento_total = investimento_inicial + (investimento_mensal * periodo_meses)
-        
-        # Calcular receita total
-        receita_total = receita_mensal * periodo_meses
-        
-        # Calcular custo total
-        custo_total = investimento_total + (custo_operacional * periodo_meses)
-        
-        # Calcular lucro total
-        lucro_total = receita_total - custo_total
+        receitas = None
+        if receitas_mensais is not None:
+            receitas = np.asarray(receitas_mensais, dtype=np.float64)
+        elif crescimento_mensal or sazonalidade is not None:
+            receitas = revenue_schedule(receita_mensal, crescimento_mensal, periodo_meses, sazonalidade)
         
-        # Calcular ROI simples
-        roi_percentual = (lucro_total / investimento_total) * 100 if investimento_total > 0 else 0
+        # Métricas agregadas: com receita constante, VPL, TIR e paybacks por fórmula fechada
+        summary = serialize_summary(roi_summary(
+            investimento_inicial,
+            investimento_mensal,
+            receita_mensal,
+            custo_operacional,
+            periodo_meses,
+            taxa_desconto,
+            receitas=receitas,
+        ))
         
-        # Calcular NPV (Net Present Value)
-        npv = -investimento_inicial
-        taxa_mensal = taxa_desconto / 12
-        
-        for mes in range(1, periodo_meses + 1):
-            valor_presente = fluxo_caixa_mensal / ((1 + taxa_mensal) ** mes)
-            npv += valor_presente
-        
-        # Calcular payback period
-        acumulado = -investimento_inicial
-        payback_meses = None
-        for mes in range(1, periodo_meses + 1):
-            acumulado += fluxo_caixa_mensal
-            if acumulado >= 0 and payback_meses is None:
-                payback_meses = mes
-        
-        # Calcular break-even point
-        if fluxo_caixa_mensal > 0:
-            break_even_meses = investimento_inicial / fluxo_caixa_mensal
-        else:
-            break_even_meses = None
-        
-        # Projeção mensal
-        projecao_mensal: List[Dict[str, Any]] = []
-        acumulado_investimento = investimento_inicial
-        
-        for mes in range(1, periodo_meses + 1):
-            acumulado_investimento += investimento_mensal
-            receita_acumulada = receita_mensal * mes
-            custo_acumulado = acumulado_investimento + (custo_operacional * mes)
-            lucro_acumulado = receita_acumulada - custo_acumulado
-            roi_mensal = (lucro_acumulado / acumulado_investimento) * 100 if acumulado_investimento > 0 else 0
-            
-            projecao_mensal.append({
-                "mes": mes,
-                "investimento_acumulado": round(acumulado_investimento, 2),
-                "receita_acumulada": round(receita_acumulada, 2),
-                "custo_acumulado": round(custo_acumulado, 2),
-                "lucro_acumulado": round(lucro_acumulado, 2),
-                "roi_percentual": round(roi_mensal, 2),
-            })
+        # Projeção mensal: arrays NumPy, convertidos em dicts só na serialização
+        projecao = monthly_projection(
+            investimento_inicial,
+            investimento_mensal,
+            receita_mensal,
+            custo_operacional,
+            periodo_meses,
+            receitas=receitas,
+        )
         
         return {
-            "investimento_inicial": round(investimento_inicial, 2),
-            "investimento_total": round(investimento_total, 2),
-            "receita_total": round(receita_total, 2),
-            "custo_total": round(custo_total, 2),
-            "lucro_total": round(lucro_total, 2),
-            "roi_percentual": round(roi_percentual, 2),
-            "npv": round(npv, 2),
-            "payback_meses": payback_meses,
-            "break_even_meses": round(break_even_meses, 2) if break_even_meses else None,
+            **{name: values[0] for name, values in summary.items()},
             "periodo_meses": periodo_meses,
-            "projecao_mensal": projecao_mensal,
+            "projecao_mensal": serialize_projection(projecao),
         }
         
     except Exception as e:
@@ -99,3 +95,122 @@ async def calculate_advanced_roi(
         raise
 
 
+def batch_revenues(
+    arrays: Dict[str, np.ndarray],
+    series: Dict[str, List[Optional[List[float]]]],
+    horizonte: int,
+) -> Optional[np.ndarray]:
+    """
+    Matriz cenários x meses com a receita de cada mês, ou None quando todos
+    os cenários têm receita constante (aí o motor usa as fórmulas fechadas)
+    """
+    sazonalidade = series.get("sazonalidade") or []
+    receitas_mensais = series.get("receitas_mensais") or []
+    com_sazonalidade = any(values is not None for values in sazonalidade)
+    com_serie = any(values is not None for values in receitas_mensais)
+    if not com_sazonalidade and not com_serie and not arrays["crescimento_mensal"].any():
+        return None
+    
+    fatores = None
+    if com_sazonalidade:
+        fatores = np.asarray(
+            [values if values is not None else [1.0] * 12 for values in sazonalidade], dtype=np.float64
+        )
+    receitas = revenue_schedule(arrays["receita_mensal"], arrays["crescimento_mensal"], horizonte, fatores)
+    receitas = np.array(np.broadcast_to(receitas, (len(arrays["receita_mensal"]), horizonte)))
+    for row, values in enumerate(receitas_mensais):
+        if values is not None:
+            receitas[row, :len(values)] = values
+            receitas[row, len(values):] = 0.0
+    return receitas
+
+
+def expand_grid(
+    base: Dict[str, float], grid: Dict[str, List[float]]
+) -> Tuple[Dict[str, List[float]], Dict[str, Any]]:
+    """
+    Produto cartesiano dos eixos do grid sobre os valores base.
+    Os cenários seguem a ordem dos eixos (o último eixo varia mais rápido),
+    então o resultado pode ser remodelado com o formato devolvido.
+    """
+    names = list(grid)
+    shape = [len(grid[name]) for name in names]
+    count = int(np.prod(shape)) if shape else 1
+    if count > ROI_BATCH_MAX_SCENARIOS:
+        raise ValueError(f"Grid com {count} cenários excede o máximo de {ROI_BATCH_MAX_SCENARIOS}")
+    axes = np.meshgrid(*(np.asarray(grid[name], dtype=np.float64) for name in names), indexing="ij")
+
+    scenarios = {
+        name: np.full(count, base[name], dtype=np.float64).tolist() for name in ROI_PARAMETERS
+    }
+    for name, axis in zip(names, axes):
+        scenarios[name] = axis.ravel().tolist()
+    # Séries da base valem para todos os cenários do grid
+    for name in ROI_SERIES:
+        scenarios[name] = [base.get(name)] * count
+    scenarios["periodo_meses"] = [int(months) for months in scenarios["periodo_meses"]]
+    return scenarios, {"dimensoes": names, "formato": shape}
+
+
+async def calculate_roi_batch(
+    scenarios: Dict[str, List[float]],
+    summary_only: bool = False,
+    grid: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula vários cenários de uma vez (colunas: uma lista por parâmetro;
+    sazonalidade e receitas_mensais, quando presentes, uma lista por cenário)
+    
+    O resultado também é colunar: uma lista por métrica, na ordem dos cenários.
+    Com summary_only, a projeção mensal não é calculada nem enviada.
+    """
+    try:
+        arrays = {name: np.asarray(scenarios[name], dtype=np.float64) for name in ROI_PARAMETERS}
+        count = len(arrays["investimento_inicial"])
+        if count > ROI_BATCH_MAX_SCENARIOS:
+            raise ValueError(f"Máximo de {ROI_BATCH_MAX_SCENARIOS} cenários por lote (recebido: {count})")
+        
+        max_meses = int(arrays["periodo_meses"].max()) if count else 0
+        if not summary_only and count * max_meses > ROI_BATCH_MAX_PROJECTION_CELLS:
+            raise ValueError(
+                f"Projeção mensal grande demais ({count} cenários x {max_meses} meses). "
+                "Use summary_only ou reduza o lote."
+            )
+        
+        series = {name: scenarios[name] for name in ROI_SERIES if name in scenarios}
+        receitas = batch_revenues(arrays, series, max_meses)
+        
+        summary = roi_summary(
+            arrays["investimento_inicial"],
+            arrays["investimento_mensal"],
+            arrays["receita_mensal"],
+            arrays["custo_operacional"],
+            arrays["periodo_meses"],
+            arrays["taxa_desconto"],
+            receitas=receitas,
+        )
+        result: Dict[str, Any] = {
+            "total_cenarios": count,
+            "cenarios": {name: arrays[name].tolist() for name in ROI_PARAMETERS},
+            "resultados": serialize_summary(summary),
+        }
+        result["cenarios"]["periodo_meses"] = arrays["periodo_meses"].astype(int).tolist()
+        if grid is not None:
+            result["grid"] = grid
+        
+        if not summary_only:
+            projecao = monthly_projection(
+                arrays["investimento_inicial"],
+                arrays["investimento_mensal"],
+                arrays["receita_mensal"],
+                arrays["custo_operacional"],
+                max_meses,
+                receitas=receitas,
+            )
+            result["projecao_mensal"] = serialize_projection_columns(projecao, arrays["periodo_meses"])
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Erro no cálculo ROI em lote: {str(e)}")
+        raise
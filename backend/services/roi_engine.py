@@ -0,0 +1,546 @@
+"""
+Motor de cálculo de ROI em NumPy
+
+VPL pela fórmula fechada da anuidade, payback analítico e projeção mensal
+montada em arrays numa única passada vetorizada. Todas as funções aceitam
+escalares ou arrays de cenários (mesmo código para /calculate-roi e para o
+lote), então um cenário calculado sozinho ou dentro de um lote dá o mesmo
+resultado. Os dicts de projecao_mensal só são criados na serialização, com o
+mesmo arredondamento do round() do Python.
+
+Receitas variáveis (crescimento, sazonalidade ou série explícita) usam a
+matriz cenários x meses; TIR e TIRM saem de um Newton com salvaguarda de
+bisseção, vetorizado sobre os cenários.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ArrayLike = Any
+
+# Colunas da projeção mensal, na ordem em que aparecem na resposta
+PROJECTION_COLUMNS = (
+    "investimento_acumulado",
+    "receita_acumulada",
+    "custo_acumulado",
+    "lucro_acumulado",
+    "roi_percentual",
+)
+
+# Taxas (mesma unidade de taxa_desconto: 0.1 = 10%) e métricas em meses inteiros
+RATE_METRICS = ("tir_mensal", "tir_anual", "tirm_mensal", "tirm_anual")
+MONTH_METRICS = ("payback_meses", "payback_descontado_meses")
+
+# Limites da busca da TIR em log(1 + taxa mensal): de -99% a e^40 - 1 ao mês
+_IRR_MIN_LOG = float(np.log(0.01))
+_IRR_MAX_LOG = 40.0
+
+
+def annuity_factor(taxa_mensal: ArrayLike, periodo_meses: ArrayLike) -> np.ndarray:
+    """Soma de 1/(1+r)^k para k = 1..n: (1 - (1+r)^-n) / r (ou n quando r = 0)"""
+    taxa = np.asarray(taxa_mensal, dtype=np.float64)
+    meses = np.asarray(periodo_meses, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # expm1/log1p mantêm a precisão para taxas pequenas
+        factor = -np.expm1(-meses * np.log1p(taxa)) / taxa
+    return np.where(taxa == 0, meses, factor)
+
+
+def npv(
+    investimento_inicial: ArrayLike,
+    fluxo_caixa_mensal: ArrayLike,
+    taxa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """VPL de um fluxo constante: -I + F * fator de anuidade"""
+    return -np.asarray(investimento_inicial, dtype=np.float64) + (
+        np.asarray(fluxo_caixa_mensal, dtype=np.float64) * annuity_factor(taxa_mensal, periodo_meses)
+    )
+
+
+def payback_months(
+    investimento_inicial: ArrayLike,
+    fluxo_caixa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """
+    Primeiro mês em que o acumulado (-I + mes * F) fica >= 0; NaN se não
+    acontecer no período. O candidato vem de ceil(I / F); os vizinhos são
+    conferidos porque a divisão pode errar por um ulp perto de inteiros.
+    """
+    inicial = np.asarray(investimento_inicial, dtype=np.float64)
+    fluxo = np.asarray(fluxo_caixa_mensal, dtype=np.float64)
+    meses = np.asarray(periodo_meses, dtype=np.float64)
+    positivo = fluxo > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mes = np.where(positivo, np.maximum(1, np.ceil(inicial / fluxo)), 1)
+        anterior = positivo & (mes > 1) & (-inicial + (mes - 1) * fluxo >= 0)
+        mes = np.where(anterior, mes - 1, mes)
+        seguinte = positivo & ~anterior & (-inicial + mes * fluxo < 0)
+        mes = np.where(seguinte, mes + 1, mes)
+
+    # Fluxo <= 0: o acumulado não cresce, só o primeiro mês pode zerar o investimento
+    atingido = np.where(positivo, mes <= meses, fluxo - inicial >= 0) & (meses >= 1)
+    return np.where(atingido, mes, np.nan)
+
+
+def revenue_schedule(
+    receita_mensal: ArrayLike,
+    crescimento_mensal: ArrayLike,
+    periodo_meses: int,
+    sazonalidade: Optional[ArrayLike] = None,
+) -> np.ndarray:
+    """
+    Receita de cada mês: receita * (1 + crescimento)^(mês - 1), multiplicada
+    pelo fator de sazonalidade do mês (ciclo de 12, a partir do mês 1).
+    Formato (..., periodo_meses); sazonalidade pode ser (12,) ou (cenários, 12).
+    """
+    receita = np.asarray(receita_mensal, dtype=np.float64)[..., None]
+    crescimento = np.asarray(crescimento_mensal, dtype=np.float64)[..., None]
+    decorridos = np.arange(periodo_meses, dtype=np.float64)
+    receitas = receita * np.exp(np.log1p(crescimento) * decorridos)
+    if sazonalidade is not None:
+        fatores = np.asarray(sazonalidade, dtype=np.float64)
+        receitas = receitas * np.take(fatores, np.arange(periodo_meses) % fatores.shape[-1], axis=-1)
+    return receitas
+
+
+def _first_month(acumulado: np.ndarray, no_periodo: np.ndarray) -> np.ndarray:
+    """Primeiro mês (1..n) com acumulado >= 0 dentro do período; NaN se não houver"""
+    atingido = (acumulado >= 0) & no_periodo
+    return np.where(atingido.any(axis=-1), atingido.argmax(axis=-1) + 1, np.nan)
+
+
+def _solve_irr(
+    value: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    count: int,
+    tol: float = 1e-12,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Raiz de f(x) = -I + soma F_t * e^(-x t) para `count` cenários, com
+    x = log(1 + taxa mensal): a função é suave em toda a reta e a taxa fica
+    sempre acima de -100%. value(x, linhas) devolve f e f' dessas linhas.
+
+    Primeiro abre um intervalo com troca de sinal a partir de x = 0 (o sinal
+    de f(0) diz para que lado), dobrando o passo; depois Newton com bisseção
+    quando o passo sai do intervalo (rtsafe). Só os cenários ainda não
+    convergidos são reavaliados. NaN quando não há troca de sinal.
+    """
+    todos = np.arange(count)
+    f0, _ = value(np.zeros(count), todos)
+    raiz = np.where(f0 == 0, 0.0, np.nan)
+
+    # Intervalo com f(a) > 0 > f(b)
+    a = np.zeros(count)
+    b = np.zeros(count)
+    achado = np.zeros(count, dtype=bool)
+    aberto = np.flatnonzero(np.isfinite(f0) & (f0 != 0))
+    passo = 0.05
+    while aberto.size:
+        subindo = f0[aberto] > 0
+        x = np.clip(np.where(subindo, passo, -passo), _IRR_MIN_LOG, _IRR_MAX_LOG)
+        fx, _ = value(x, aberto)
+        mudou = np.where(subindo, fx < 0, fx > 0)
+        # Sem troca de sinal, o ponto testado vira o extremo mais próximo da raiz
+        positivo = np.where(mudou, ~subindo, subindo)
+        a[aberto] = np.where(positivo, x, a[aberto])
+        b[aberto] = np.where(positivo, b[aberto], x)
+        achado[aberto] = mudou
+        esgotado = (x == _IRR_MAX_LOG) | (x == _IRR_MIN_LOG) | ~np.isfinite(fx)
+        aberto = aberto[~mudou & ~esgotado]
+        passo *= 2
+    ativos = np.flatnonzero(achado)
+
+    # Começa pelo extremo com f > 0: com fluxos positivos f é convexa e
+    # decrescente, e daí o Newton converge sem passar da raiz
+    x = a.copy()
+    for _ in range(max_iter):
+        if not ativos.size:
+            break
+        fx, dfx = value(x[ativos], ativos)
+        positivo = fx > 0
+        a[ativos] = np.where(positivo, x[ativos], a[ativos])
+        b[ativos] = np.where(positivo, b[ativos], x[ativos])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            passo = fx / dfx
+        proximo = x[ativos] - passo
+        dentro = np.isfinite(proximo) & ((proximo - a[ativos]) * (proximo - b[ativos]) <= 0)
+        proximo = np.where(dentro, proximo, (a[ativos] + b[ativos]) / 2)
+        margem = tol * (1 + np.abs(x[ativos]))
+        convergiu = (fx == 0) | (dentro & (np.abs(passo) <= margem)) | (np.abs(a[ativos] - b[ativos]) <= margem)
+        x[ativos] = proximo
+        raiz[ativos[convergiu]] = proximo[convergiu]
+        ativos = ativos[~convergiu]
+
+    return np.expm1(raiz)
+
+
+def irr(investimento_inicial: ArrayLike, fluxos: ArrayLike) -> np.ndarray:
+    """
+    TIR mensal de fluxos variáveis, formato (..., meses) (zeros fora do
+    período do cenário). Com mais de uma troca de sinal nos fluxos a TIR pode
+    não ser única; vale a raiz do primeiro intervalo encontrado a partir de 0.
+    """
+    fluxos = np.asarray(fluxos, dtype=np.float64)
+    inicial = np.broadcast_to(np.asarray(investimento_inicial, dtype=np.float64), fluxos.shape[:-1])
+    shape = inicial.shape
+    fluxos = fluxos.reshape(-1, fluxos.shape[-1])
+    inicial = inicial.reshape(-1)
+    meses = np.arange(1, fluxos.shape[-1] + 1, dtype=np.float64)
+
+    def value(x: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        with np.errstate(over="ignore", invalid="ignore"):
+            pesos = fluxos[rows] * np.exp(-x[:, None] * meses)
+            return -inicial[rows] + pesos.sum(axis=1), -(pesos @ meses)
+
+    return _solve_irr(value, len(inicial)).reshape(shape)
+
+
+def annuity_irr(
+    investimento_inicial: ArrayLike,
+    fluxo_caixa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """
+    TIR mensal de um fluxo constante: f e f' pela fórmula fechada da
+    anuidade, sem montar a matriz cenários x meses
+    """
+    inicial, fluxo, meses = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (
+            investimento_inicial, fluxo_caixa_mensal, periodo_meses,
+        ))
+    )
+    shape = inicial.shape
+    inicial, fluxo, meses = (np.ravel(value) for value in (inicial, fluxo, meses))
+
+    def value(x: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n, q = meses[rows], np.exp(-x)
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            fator = np.where(x == 0, n, -np.expm1(-x * n) / np.expm1(x))
+            # soma t * q^t; perto de x = 0 a forma fechada perde precisão
+            qn = np.exp(-x * n)
+            ponderado = q * (1 - (n + 1) * qn + n * qn * q) / np.expm1(-x) ** 2
+            ponderado = np.where(np.abs(x) < 1e-5, n * (n + 1) / 2, ponderado)
+        return -inicial[rows] + fluxo[rows] * fator, -fluxo[rows] * ponderado
+
+    return _solve_irr(value, len(inicial)).reshape(shape)
+
+
+def mirr(
+    investimento_inicial: ArrayLike,
+    fluxos: np.ndarray,
+    taxa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """
+    TIRM mensal: fluxos positivos capitalizados até o fim do período e
+    negativos (investimento inicial incluso) trazidos a valor presente, os
+    dois à taxa de desconto. NaN quando não há fluxo positivo.
+    """
+    fluxos = np.asarray(fluxos, dtype=np.float64)
+    inicial = np.asarray(investimento_inicial, dtype=np.float64)
+    taxa = np.log1p(np.asarray(taxa_mensal, dtype=np.float64))[..., None]
+    n = np.asarray(periodo_meses, dtype=np.float64)
+    meses = np.arange(1, fluxos.shape[-1] + 1, dtype=np.float64)
+
+    futuro = np.where(fluxos > 0, fluxos * np.exp(taxa * (n[..., None] - meses)), 0.0).sum(axis=-1)
+    presente = inicial - np.where(fluxos < 0, fluxos * np.exp(-taxa * meses), 0.0).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        taxa_mirr = np.expm1(np.log(futuro / presente) / n)
+    return np.where((futuro > 0) & (presente > 0), taxa_mirr, np.nan)
+
+
+def annuity_mirr(
+    investimento_inicial: ArrayLike,
+    fluxo_caixa_mensal: ArrayLike,
+    taxa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """TIRM mensal de um fluxo constante: (F * ((1+r)^n - 1) / r / I)^(1/n) - 1"""
+    inicial = np.asarray(investimento_inicial, dtype=np.float64)
+    fluxo = np.asarray(fluxo_caixa_mensal, dtype=np.float64)
+    taxa = np.asarray(taxa_mensal, dtype=np.float64)
+    meses = np.asarray(periodo_meses, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        capitalizado = np.where(taxa == 0, meses, np.expm1(meses * np.log1p(taxa)) / taxa)
+        taxa_mirr = np.expm1(np.log(fluxo * capitalizado / inicial) / meses)
+    return np.where((fluxo > 0) & (inicial > 0) & (meses >= 1), taxa_mirr, np.nan)
+
+
+def discounted_payback_months(
+    investimento_inicial: ArrayLike,
+    fluxo_caixa_mensal: ArrayLike,
+    taxa_mensal: ArrayLike,
+    periodo_meses: ArrayLike,
+) -> np.ndarray:
+    """
+    Primeiro mês em que o VPL acumulado (-I + F * fator de anuidade) fica
+    >= 0; NaN se não acontecer no período. O candidato vem de
+    n = -log(1 - r I / F) / log(1 + r); os vizinhos são conferidos como em
+    payback_months.
+    """
+    inicial = np.asarray(investimento_inicial, dtype=np.float64)
+    fluxo = np.asarray(fluxo_caixa_mensal, dtype=np.float64)
+    taxa = np.asarray(taxa_mensal, dtype=np.float64)
+    meses = np.asarray(periodo_meses, dtype=np.float64)
+    positivo = fluxo > 0
+
+    def acumulado(mes: np.ndarray) -> np.ndarray:
+        return -inicial + fluxo * annuity_factor(taxa, mes)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exato = np.where(taxa == 0, inicial / fluxo, -np.log1p(-taxa * inicial / fluxo) / np.log1p(taxa))
+        # Sem solução (r I / F >= 1) o VPL acumulado nunca zera: fica além do período
+        mes = np.where(np.isfinite(exato), np.clip(np.ceil(exato), 1, meses + 1), meses + 1)
+        anterior = positivo & (mes > 1) & (acumulado(mes - 1) >= 0)
+        mes = np.where(anterior, mes - 1, mes)
+        seguinte = positivo & ~anterior & (acumulado(mes) < 0)
+        mes = np.where(positivo, np.where(seguinte, mes + 1, mes), 1)
+
+    # Fluxo <= 0: o acumulado não cresce, só o primeiro mês pode zerar o investimento
+    atingido = np.where(positivo, mes <= meses, acumulado(np.ones_like(mes)) >= 0) & (meses >= 1)
+    return np.where(atingido, mes, np.nan)
+
+
+def roi_summary(
+    investimento_inicial: ArrayLike,
+    investimento_mensal: ArrayLike,
+    receita_mensal: ArrayLike,
+    custo_operacional: ArrayLike,
+    periodo_meses: ArrayLike,
+    taxa_desconto: ArrayLike,
+    receitas: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Métricas agregadas (sem projeção mensal) de um ou vários cenários
+
+    Sem `receitas`, a receita é constante e VPL, payback e break-even usam as
+    fórmulas fechadas. Com `receitas` (receita de cada mês, formato
+    (..., maior período)), tudo sai da matriz de fluxos.
+    O break-even é o mês fracionado em que o acumulado zera, interpolado dentro
+    do mês; se não zerar no período, o acumulado segue com o fluxo do último
+    mês (NaN se esse fluxo não for positivo). Com fluxo constante isso é I / F,
+    a fórmula fechada.
+    TIR/TIRM mensais e anuais (taxa mensal x 12, mesma convenção de
+    taxa_desconto) e o payback descontado são calculados nos dois casos.
+    """
+    inicial, mensal, receita, custo, meses, taxa = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (
+            investimento_inicial, investimento_mensal, receita_mensal,
+            custo_operacional, periodo_meses, taxa_desconto,
+        ))
+    )
+
+    fluxo = receita - custo - mensal
+    investimento_total = inicial + mensal * meses
+    custo_total = investimento_total + custo * meses
+
+    if receitas is None:
+        # Fluxo constante: tudo por fórmula fechada, sem a matriz cenários x meses
+        receita_total = receita * meses
+        valor_presente = npv(inicial, fluxo, taxa / 12, meses)
+        payback = payback_months(inicial, fluxo, meses)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            break_even = np.where(fluxo > 0, inicial / fluxo, np.nan)
+        tir_mensal = annuity_irr(inicial, fluxo, meses)
+        tirm_mensal = annuity_mirr(inicial, fluxo, taxa / 12, meses)
+        payback_descontado = discounted_payback_months(inicial, fluxo, taxa / 12, meses)
+    else:
+        horizonte = receitas.shape[-1]
+        mes = np.arange(1, horizonte + 1, dtype=np.float64)
+        no_periodo = mes <= meses[..., None]
+        desconto = np.exp(-np.log1p(taxa / 12)[..., None] * mes)
+
+        receitas = np.where(no_periodo, receitas, 0.0)
+        receita_total = receitas.sum(axis=-1)
+        fluxos = np.where(no_periodo, receitas - (custo + mensal)[..., None], 0.0)
+        valor_presente = -inicial + (fluxos * desconto).sum(axis=-1)
+
+        acumulado = np.cumsum(fluxos, axis=-1) - inicial[..., None]
+        payback = _first_month(acumulado, no_periodo)
+        # Break-even: mês do payback (ou o último do período) menos a fração do
+        # mês que sobra depois de zerar, acumulado / fluxo do mês
+        mes_base = np.where(np.isnan(payback), np.clip(meses, 1, horizonte), payback)
+        indice = (mes_base.astype(np.intp) - 1)[..., None]
+        fluxo_mes = np.take_along_axis(fluxos, indice, axis=-1)[..., 0]
+        acumulado_mes = np.take_along_axis(acumulado, indice, axis=-1)[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            break_even = np.where(fluxo_mes > 0, mes_base - acumulado_mes / fluxo_mes, np.nan)
+
+        tir_mensal = irr(inicial, fluxos)
+        tirm_mensal = mirr(inicial, fluxos, taxa / 12, meses)
+        descontado = np.cumsum(fluxos * desconto, axis=-1) - inicial[..., None]
+        payback_descontado = _first_month(descontado, no_periodo)
+
+    lucro_total = receita_total - custo_total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi_percentual = np.where(investimento_total > 0, (lucro_total / investimento_total) * 100, 0.0)
+
+    return {
+        "investimento_inicial": inicial,
+        "investimento_total": investimento_total,
+        "receita_total": receita_total,
+        "custo_total": custo_total,
+        "lucro_total": lucro_total,
+        "roi_percentual": roi_percentual,
+        "npv": valor_presente,
+        "payback_meses": payback,
+        "break_even_meses": break_even,
+        "tir_mensal": tir_mensal,
+        "tir_anual": tir_mensal * 12,
+        "tirm_mensal": tirm_mensal,
+        "tirm_anual": tirm_mensal * 12,
+        "payback_descontado_meses": payback_descontado,
+    }
+
+
+def monthly_projection(
+    investimento_inicial: ArrayLike,
+    investimento_mensal: ArrayLike,
+    receita_mensal: ArrayLike,
+    custo_operacional: ArrayLike,
+    periodo_meses: int,
+    receitas: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Projeção acumulada mês a mês. Com escalares os arrays têm tamanho
+    periodo_meses; com arrays de cenários, formato (cenários, periodo_meses)
+    (cenários com período menor são cortados na serialização).
+    Com `receitas` (receita de cada mês), a receita acumulada é a soma da série.
+    """
+    inicial, mensal, receita, custo = np.broadcast_arrays(
+        *(np.asarray(value, dtype=np.float64) for value in (
+            investimento_inicial, investimento_mensal, receita_mensal, custo_operacional,
+        ))
+    )
+    inicial, mensal, receita, custo = (value[..., None] for value in (inicial, mensal, receita, custo))
+    meses = np.arange(1, periodo_meses + 1, dtype=np.float64)
+
+    # cumsum sequencial a partir do investimento inicial: mesma ordem de somas do laço
+    aportes = np.concatenate(
+        [inicial, np.broadcast_to(mensal, mensal.shape[:-1] + (periodo_meses,))], axis=-1
+    )
+    investimento_acumulado = np.cumsum(aportes, axis=-1)[..., 1:]
+
+    if receitas is None:
+        receita_acumulada = receita * meses
+    else:
+        receita_acumulada = np.cumsum(np.broadcast_to(receitas, investimento_acumulado.shape), axis=-1)
+    custo_acumulado = investimento_acumulado + custo * meses
+    lucro_acumulado = receita_acumulada - custo_acumulado
+
+    roi_percentual = np.zeros(lucro_acumulado.shape)
+    np.divide(
+        lucro_acumulado, investimento_acumulado,
+        out=roi_percentual, where=investimento_acumulado > 0,
+    )
+    roi_percentual *= 100
+
+    return {
+        "investimento_acumulado": investimento_acumulado,
+        "receita_acumulada": receita_acumulada,
+        "custo_acumulado": custo_acumulado,
+        "lucro_acumulado": lucro_acumulado,
+        "roi_percentual": roi_percentual,
+    }
+
+
+def round_cents(values: ArrayLike) -> List[float]:
+    """
+    Equivalente a [round(v, 2) for v in values] (array achatado), vetorizado.
+
+    rint(v * 100) / 100 coincide com o round() do Python, exceto quando
+    v * 100 cai (quase) exatamente em ,5: a multiplicação pode ter
+    arredondado para o outro lado. Esses poucos casos usam o round() do Python.
+    """
+    flat = np.ravel(np.asarray(values, dtype=np.float64))
+    scaled = flat * 100
+    rounded = (np.rint(scaled) / 100).tolist()
+    distance = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5)
+    for index in np.flatnonzero(distance < 1e-7 + np.abs(scaled) * 4e-16).tolist():
+        rounded[index] = round(float(flat[index]), 2)
+    return rounded
+
+
+def payback_list(values: ArrayLike) -> List[Optional[int]]:
+    """Payback para a resposta: mês inteiro ou None (NaN)"""
+    flat = np.ravel(np.asarray(values, dtype=np.float64))
+    return [int(value) if value == value else None for value in flat.tolist()]
+
+
+def rate_list(values: ArrayLike) -> List[Optional[float]]:
+    """Taxas para a resposta: 6 casas ou None (NaN/infinito)"""
+    flat = np.ravel(np.asarray(values, dtype=np.float64))
+    return [round(value, 6) if math.isfinite(value) else None for value in flat.tolist()]
+
+
+def _rounded_rows(arrays: List[np.ndarray]) -> List[List[float]]:
+    """round_cents de várias séries de mesmo tamanho numa única chamada"""
+    stacked = np.stack([np.ravel(values) for values in arrays])
+    flat = round_cents(stacked)
+    width = stacked.shape[1]
+    return [flat[row * width:(row + 1) * width] for row in range(len(arrays))]
+
+
+def serialize_summary(summary: Dict[str, np.ndarray]) -> Dict[str, List[Any]]:
+    """Métricas de roi_summary em colunas (uma lista por métrica, um valor por cenário)"""
+    money = [
+        name for name in summary
+        if name not in MONTH_METRICS + RATE_METRICS and name != "break_even_meses"
+    ]
+    # Break-even: 2 casas, ou None quando NaN ou zero
+    break_even = np.ravel(summary["break_even_meses"])
+    present = (break_even == break_even) & (break_even != 0)
+    rows = _rounded_rows([summary[name] for name in money] + [np.where(present, break_even, 0.0)])
+
+    columns: Dict[str, List[Any]] = dict(zip(money, rows))
+    for name in MONTH_METRICS:
+        columns[name] = payback_list(summary[name])
+    for name in RATE_METRICS:
+        columns[name] = rate_list(summary[name])
+    columns["break_even_meses"] = [
+        value if ok else None for value, ok in zip(rows[-1], present.tolist())
+    ]
+    # Mesma ordem de chaves de roi_summary
+    return {name: columns[name] for name in summary}
+
+
+def serialize_projection(projection: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Converte os arrays de um cenário para a lista projecao_mensal (2 casas)"""
+    columns = _rounded_rows([projection[name] for name in PROJECTION_COLUMNS])
+    return [
+        {
+            "mes": mes,
+            "investimento_acumulado": investimento,
+            "receita_acumulada": receita,
+            "custo_acumulado": custo,
+            "lucro_acumulado": lucro,
+            "roi_percentual": roi,
+        }
+        for mes, investimento, receita, custo, lucro, roi in zip(
+            range(1, len(columns[0]) + 1), *columns
+        )
+    ]
+
+
+def serialize_projection_columns(
+    projection: Dict[str, np.ndarray], periodo_meses: ArrayLike
+) -> Dict[str, List[List[float]]]:
+    """
+    Projeção de vários cenários em colunas: uma lista por métrica, com uma
+    série por cenário (cortada no período do cenário)
+    """
+    periods = np.asarray(periodo_meses).astype(int).tolist()
+    columns: Dict[str, List[List[float]]] = {}
+    for name in PROJECTION_COLUMNS:
+        values = projection[name]
+        width = values.shape[-1]
+        flat = round_cents(values)
+        columns[name] = [
+            flat[row * width: row * width + months] for row, months in enumerate(periods)
+        ]
+    return columns
@@ -0,0 +1,162 @@
+"""
+Simulação Monte Carlo do ROI
+
+Cada parâmetro pode ser um número fixo ou uma distribuição; todos os
+sorteios são feitos de uma vez (matriz sorteios x meses) com um gerador
+NumPy semeado, então a mesma seed sempre produz o mesmo resultado.
+"""
+
+import logging
+import os
+import secrets
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ROI_SIMULATION_MAX_DRAWS = int(os.getenv("ROI_SIMULATION_MAX_DRAWS", "100000"))
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Parâmetro: número fixo ou {"tipo": ..., parâmetros da distribuição}
+Spec = Union[float, int, Dict[str, Any]]
+
+
+def sample(spec: Spec, size: int, rng: np.random.Generator, minimo: Optional[float] = 0.0) -> np.ndarray:
+    """
+    Sorteia `size` valores de um parâmetro. Um número fixo vira um array de
+    tamanho 1 (broadcast). Distribuições: normal (media, desvio),
+    lognormal (media, desvio da própria variável), uniforme (min, max) e
+    triangular (min, moda, max). Opcionalmente min/max cortam a normal.
+    """
+    if not isinstance(spec, dict):
+        return np.asarray([spec], dtype=np.float64)
+
+    tipo = spec["tipo"]
+    if tipo == "normal":
+        values = rng.normal(spec["media"], spec["desvio"], size)
+    elif tipo == "lognormal":
+        media, desvio = spec["media"], spec["desvio"]
+        sigma2 = np.log1p((desvio / media) ** 2)
+        values = rng.lognormal(np.log(media) - sigma2 / 2, np.sqrt(sigma2), size)
+    elif tipo == "uniforme":
+        values = rng.uniform(spec["min"], spec["max"], size)
+    elif tipo == "triangular":
+        values = rng.triangular(spec["min"], spec["moda"], spec["max"], size)
+    else:
+        raise ValueError(f"Distribuição desconhecida: {tipo}")
+
+    lower = spec.get("min", minimo)
+    upper = spec.get("max")
+    if lower is not None or upper is not None:
+        values = np.clip(values, lower, upper)
+    return values
+
+
+def _percentiles(values: np.ndarray, method: str = "linear") -> Dict[str, Optional[float]]:
+    bands = np.percentile(values, PERCENTILES, method=method)
+    return {
+        f"p{p}": round(float(value), 2) if np.isfinite(value) else None
+        for p, value in zip(PERCENTILES, bands)
+    }
+
+
+def _distribution(values: np.ndarray) -> Dict[str, Any]:
+    return {
+        "media": round(float(values.mean()), 2),
+        "desvio": round(float(values.std()), 2),
+        "percentis": _percentiles(values),
+    }
+
+
+def simulate_roi(
+    investimento_inicial: Spec,
+    investimento_mensal: Spec,
+    receita_mensal: Spec,
+    custo_operacional: Spec,
+    periodo_meses: int,
+    taxa_desconto: Spec = 0.1,
+    churn_mensal: Spec = 0.0,
+    rampa_meses: Spec = 0,
+    simulacoes: int = 10000,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Monte Carlo do ROI: percentis de VPL, ROI e payback e a probabilidade de
+    break-even dentro do período.
+
+    Além dos parâmetros de calculate_advanced_roi:
+    - churn_mensal: fração da receita perdida a cada mês (decaimento composto)
+    - rampa_meses: meses até a receita atingir 100% (cresce linearmente até lá)
+    """
+    if simulacoes > ROI_SIMULATION_MAX_DRAWS:
+        raise ValueError(f"Máximo de {ROI_SIMULATION_MAX_DRAWS} simulações (recebido: {simulacoes})")
+    if seed is None:
+        seed = secrets.randbits(32)
+    rng = np.random.default_rng(seed)
+    n = simulacoes
+
+    # Vetores coluna (sorteios x 1); parâmetros fixos ficam com 1 linha e fazem broadcast
+    inicial = sample(investimento_inicial, n, rng)[:, None]
+    mensal = sample(investimento_mensal, n, rng)[:, None]
+    receita = sample(receita_mensal, n, rng)[:, None]
+    custo = sample(custo_operacional, n, rng)[:, None]
+    taxa = sample(taxa_desconto, n, rng)[:, None]
+    churn = sample(churn_mensal, n, rng, minimo=0.0)[:, None]
+    rampa = sample(rampa_meses, n, rng, minimo=0.0)[:, None]
+
+    meses = np.arange(1, periodo_meses + 1, dtype=np.float64)
+
+    # Receita mês a mês: rampa linear até rampa_meses e decaimento por churn
+    fator = np.ones((1, periodo_meses))
+    if np.any(rampa > 0):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fator = np.where(rampa > 0, np.minimum(1.0, meses / np.round(rampa)), 1.0)
+    if np.any(churn > 0):
+        # power em vez de exp(log1p(-churn) * n): com churn = 1 o log é -inf e -inf * 0 = NaN
+        fator = fator * np.power(1.0 - np.minimum(churn, 1.0), meses - 1)
+    receitas = receita * fator
+    fluxos = receitas - (custo + mensal)
+
+    # VPL: desconto por mês; com taxa fixa vira um produto matriz-vetor
+    desconto = np.exp(-np.log1p(taxa / 12) * meses)
+    if desconto.shape[0] == 1:
+        vpl = fluxos @ desconto[0]
+    else:
+        vpl = np.einsum("ij,ij->i", fluxos, desconto)
+    vpl = vpl - inicial[:, 0]
+
+    # ROI no fim do período (mesma definição de calculate_advanced_roi)
+    investimento_total = (inicial + mensal * periodo_meses)[:, 0]
+    custo_total = investimento_total + (custo * periodo_meses)[:, 0]
+    lucro_total = receitas.sum(axis=1) - custo_total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(investimento_total > 0, lucro_total / investimento_total * 100, 0.0)
+
+    # Payback: primeiro mês com acumulado >= 0 (inf quando não acontece no período)
+    acumulado = np.cumsum(fluxos, axis=1)
+    acumulado -= inicial
+    atingiu = acumulado >= 0
+    pagou = atingiu.any(axis=1)
+    payback = np.where(pagou, atingiu.argmax(axis=1) + 1, np.inf)
+
+    vpl = np.broadcast_to(vpl, (n,))
+    roi = np.broadcast_to(roi, (n,))
+    payback = np.broadcast_to(payback, (n,))
+    pagou = np.broadcast_to(pagou, (n,))
+
+    return {
+        "simulacoes": n,
+        "seed": seed,
+        "periodo_meses": periodo_meses,
+        "npv": _distribution(vpl),
+        "roi_percentual": _distribution(roi),
+        "payback_meses": {
+            "media": round(float(payback[pagou].mean()), 2) if pagou.any() else None,
+            # Meses inteiros, arredondando para cima; None = não paga nesse percentil
+            "percentis": _percentiles(payback, method="higher"),
+        },
+        "probabilidade_break_even": round(float(pagou.mean()), 4),
+        "probabilidade_npv_positivo": round(float((vpl > 0).mean()), 4),
+    }
@@ -2,79 +2,195 @@
 Serviço de análise SEO avançada
 """
 
-import httpx
-from bs4 import BeautifulSoup
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
+import re
+import time
+
+from services.analysis_pool import PoolSaturatedError, run_in_pool
+from services.html_features import PageFeatures, count_words, extract_features
+from services.markdown_features import extract_markdown_features
+from services.metrics import observe_stages
+from services.page_fetcher import FetchedPage, fetch_page
+from services.resource_analyzer import analyze_resources
 
 logger = logging.getLogger(__name__)
 
+# Densidade saudável de cada palavra-chave (% das palavras do texto)
+KEYWORD_DENSITY_MIN = 0.5
+KEYWORD_DENSITY_MAX = 2.5
+# A palavra-chave principal deve aparecer no H1 ou nesse começo do texto
+_INTRO_WORDS = 100
+# Tags de bloco que indicam um texto em HTML (senão é tratado como Markdown)
+_HTML_CONTENT = re.compile(r"<(?:html|body|h[1-6]|p|div|article|section|ul|ol)\b", re.IGNORECASE)
+# Peso de cada categoria no overall_score de uma página
+CATEGORY_WEIGHTS = {"technical": 0.4, "content": 0.4, "performance": 0.2}
+
 
 async def analyze_url(
     url: str,
     include_technical: bool = True,
     include_content: bool = True,
     include_performance: bool = True,
+    include_resources: bool = False,
 ) -> Dict[str, Any]:
     """
     Analisa uma URL e retorna métricas SEO completas
     """
+    page = await fetch_page(url)
+    return await analyze_response(
+        url,
+        page,
+        include_technical=include_technical,
+        include_content=include_content,
+        include_performance=include_performance,
+        include_resources=include_resources,
+    )
+
+
+async def analyze_response(
+    url: str,
+    page: FetchedPage,
+    include_technical: bool = True,
+    include_content: bool = True,
+    include_performance: bool = True,
+    with_page_info: bool = False,
+    include_resources: bool = False,
+) -> Dict[str, Any]:
+    """
+    Calcula os scores SEO de uma página já baixada
+    
+    Com include_resources (e include_performance), os sub-recursos da página
+    também são consultados e entram no score de performance.
+    """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, follow_redirects=True)
-            response.raise_for_status()
-            
-            html = response.text
-            soup = BeautifulSoup(html, 'lxml')
-            
-            result: Dict[str, Any] = {
-                "url": str(response.url),
-                "status_code": response.status_code,
-                "overall_score": 0,
-                "categories": {},
-            }
+        result: Dict[str, Any] = {
+            "url": page.url,
+            "status_code": page.status_code,
+            "overall_score": 0,
+            "categories": {},
+        }
+        
+        with_resources = include_resources and include_performance
+        resources: Optional[Dict[str, Any]] = None
+        
+        # Tempos dos estágios (s) para as métricas
+        stages: Dict[str, float] = {}
+        
+        # Parsing e scoring rodam no pool de workers: só os bytes vão e só o dict volta
+        if include_technical or include_content or with_page_info or with_resources:
+            started = time.perf_counter()
+            scored = await run_in_pool(
+                score_document,
+                page.content,
+                page.encoding,
+                url,
+                include_technical,
+                include_content,
+                with_page_info,
+                with_resources,
+            )
+            # Ida e volta no pool menos o trabalho no worker = fila + serialização
+            stages.update(scored.pop("timings"))
+            stages["queue"] = max(0.0, time.perf_counter() - started - sum(stages.values()))
+            categories = scored["categories"]
+            if with_page_info:
+                result["page"] = scored["page"]
             
             # Análise técnica
             if include_technical:
-                technical_score = await analyze_technical_seo(soup, url)
+                technical_score = categories["technical"]
                 result["categories"]["technical"] = technical_score
-                result["overall_score"] += technical_score.get("score", 0) * 0.4
+                result["overall_score"] += technical_score.get("score", 0) * CATEGORY_WEIGHTS["technical"]
             
             # Análise de conteúdo
             if include_content:
-                content_score = await analyze_content_seo(soup)
+                content_score = categories["content"]
                 result["categories"]["content"] = content_score
-                result["overall_score"] += content_score.get("score", 0) * 0.4
-            
-            # Análise de performance
-            if include_performance:
-                performance_score = await analyze_performance(url, response)
-                result["categories"]["performance"] = performance_score
-                result["overall_score"] += performance_score.get("score", 0) * 0.2
+                result["overall_score"] += content_score.get("score", 0) * CATEGORY_WEIGHTS["content"]
             
-            # Normalizar score (0-100)
-            result["overall_score"] = min(100, max(0, int(result["overall_score"])))
-            
-            return result
-            
-    except httpx.HTTPError as e:
-        logger.error(f"Erro HTTP ao acessar URL: {str(e)}")
-        raise Exception(f"Erro ao acessar URL: {str(e)}")
+            # Sub-recursos (rede, fora do pool): HEAD/Range em paralelo
+            if with_resources:
+                started = time.perf_counter()
+                resources = await analyze_resources(page.url, page.size, scored["resources"])
+                stages["resources"] = time.perf_counter() - started
+        
+        # Análise de performance
+        if include_performance:
+            started = time.perf_counter()
+            performance_score = await analyze_performance(url, page, resources)
+            stages["performance"] = time.perf_counter() - started
+            result["categories"]["performance"] = performance_score
+            result["overall_score"] += performance_score.get("score", 0) * CATEGORY_WEIGHTS["performance"]
+        
+        # Normalizar score (0-100)
+        result["overall_score"] = min(100, max(0, int(result["overall_score"])))
+        observe_stages(stages)
+        
+        return result
+        
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Erro inesperado na análise SEO: {str(e)}")
         raise
 
 
-async def analyze_technical_seo(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+def score_document(
+    content: bytes,
+    encoding: str,
+    url: str,
+    include_technical: bool,
+    include_content: bool,
+    with_page_info: bool = False,
+    with_resources: bool = False,
+) -> Dict[str, Any]:
+    """
+    Parsing + scoring de uma página (executado no pool de workers)
+    
+    Com with_page_info, devolve também título, description, H1s e links
+    (usados pelo crawler para seguir links e montar métricas do site).
+    Com with_resources, devolve os sub-recursos (CSS, JS, imagens, fontes).
+    timings traz a duração (s) de parse, technical e content no worker.
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    # Uma única passada pelo HTML alimenta todos os analisadores
+    features = extract_features(content.decode(encoding, errors="replace"))
+    timings["parse"] = time.perf_counter() - started
+    
+    categories: Dict[str, Any] = {}
+    if include_technical:
+        started = time.perf_counter()
+        categories["technical"] = analyze_technical_seo(features, url)
+        timings["technical"] = time.perf_counter() - started
+    if include_content:
+        started = time.perf_counter()
+        categories["content"] = analyze_content_seo(features)
+        timings["content"] = time.perf_counter() - started
+    
+    scored: Dict[str, Any] = {"categories": categories, "timings": timings}
+    if with_page_info:
+        scored["page"] = {
+            "title": (features.title or "").strip() or None,
+            "meta_description": (features.meta_description or "").strip() or None,
+            "h1_count": features.h1_count,
+            "links": features.links,
+        }
+    if with_resources:
+        scored["resources"] = features.resources
+    return scored
+
+
+def analyze_technical_seo(features: PageFeatures, url: str) -> Dict[str, Any]:
     """Análise técnica de SEO"""
     score = 0
     issues: List[str] = []
     recommendations: List[str] = []
     
     # Meta tags
-    title = soup.find("title")
-    if title and title.text.strip():
-        title_text = title.text.strip()
+    title_text = (features.title or "").strip()
+    if title_text:
         if 30 <= len(title_text) <= 60:
             score += 10
         else:
@@ -82,9 +198,8 @@ async def analyze_technical_seo(soup: BeautifulSoup, url: str) -> Dict[str, Any]
     else:
         issues.append("Título não encontrado")
     
-    meta_description = soup.find("meta", attrs={"name": "description"})
-    if meta_description and meta_description.get("content"):
-        desc = meta_description.get("content", "").strip()
+    if features.meta_description:
+        desc = features.meta_description.strip()
         if 120 <= len(desc) <= 160:
             score += 10
         else:
@@ -93,40 +208,34 @@ async def analyze_technical_seo(soup: BeautifulSoup, url: str) -> Dict[str, Any]
         issues.append("Meta description não encontrada")
     
     # Headers
-    h1_tags = soup.find_all("h1")
-    if len(h1_tags) == 1:
+    if features.h1_count == 1:
         score += 10
-    elif len(h1_tags) == 0:
+    elif features.h1_count == 0:
         issues.append("Nenhuma tag H1 encontrada")
     else:
-        issues.append(f"Múltiplas tags H1 encontradas ({len(h1_tags)})")
+        issues.append(f"Múltiplas tags H1 encontradas ({features.h1_count})")
     
     # Canonical
-    canonical = soup.find("link", attrs={"rel": "canonical"})
-    if canonical:
+    if features.has_canonical:
         score += 5
     else:
         recommendations.append("Adicionar tag canonical")
     
     # Open Graph
-    og_tags = soup.find_all("meta", attrs={"property": lambda x: x and x.startswith("og:")})
-    if len(og_tags) >= 4:
+    if features.og_count >= 4:
         score += 10
     else:
         recommendations.append("Adicionar mais tags Open Graph")
     
     # Schema.org
-    schema_tags = soup.find_all("script", attrs={"type": "application/ld+json"})
-    if schema_tags:
+    if features.has_schema:
         score += 5
     else:
         recommendations.append("Adicionar Schema.org structured data")
     
     # Alt texts em imagens
-    images = soup.find_all("img")
-    images_with_alt = [img for img in images if img.get("alt")]
-    if images:
-        alt_percentage = (len(images_with_alt) / len(images)) * 100
+    if features.image_count:
+        alt_percentage = (features.images_with_alt / features.image_count) * 100
         if alt_percentage >= 90:
             score += 10
         else:
@@ -139,16 +248,14 @@ async def analyze_technical_seo(soup: BeautifulSoup, url: str) -> Dict[str, Any]
     }
 
 
-async def analyze_content_seo(soup: BeautifulSoup) -> Dict[str, Any]:
+def analyze_content_seo(features: PageFeatures) -> Dict[str, Any]:
     """Análise de conteúdo SEO"""
     score = 0
     issues: List[str] = []
     
     # Texto do conteúdo
-    body = soup.find("body")
-    if body:
-        text = body.get_text(strip=True)
-        word_count = len(text.split())
+    if features.has_body:
+        word_count = features.word_count
         
         if word_count >= 300:
             score += 20
@@ -158,16 +265,13 @@ async def analyze_content_seo(soup: BeautifulSoup) -> Dict[str, Any]:
             issues.append(f"Conteúdo muito curto ({word_count} palavras). Recomendado: 300+")
     
     # Headings hierarchy
-    headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-    if len(headings) >= 3:
+    if features.heading_count >= 3:
         score += 10
     else:
         issues.append("Poucos headings. Use H2, H3 para estrutura")
     
     # Links internos
-    links = soup.find_all("a", href=True)
-    internal_links = [link for link in links if link.get("href", "").startswith("/")]
-    if len(internal_links) >= 3:
+    if features.internal_link_count >= 3:
         score += 10
     else:
         issues.append("Adicionar mais links internos")
@@ -178,13 +282,159 @@ async def analyze_content_seo(soup: BeautifulSoup) -> Dict[str, Any]:
     }
 
 
-async def analyze_performance(url: str, response: httpx.Response) -> Dict[str, Any]:
-    """Análise de performance"""
+def score_content(content: str, keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Score SEO de um texto (Markdown ou HTML), sem buscar nenhuma URL
+    
+    Usado no conteúdo gerado: as mesmas regras de conteúdo da análise de
+    páginas, mais estrutura de headings e cobertura/densidade das
+    palavras-chave pedidas. Sem palavras-chave, os headings valem o peso delas.
+    """
+    if _HTML_CONTENT.search(content):
+        content_format = "html"
+        features = extract_features(content, collect_text=True)
+        # Palavras do texto com os trechos separados (o word_count da página os concatena)
+        features.word_count = count_words(features.text or "")
+    else:
+        content_format = "markdown"
+        features = extract_markdown_features(content)
+    
+    content_score = analyze_content_seo(features)
+    headings_score = analyze_heading_structure(features)
+    categories: Dict[str, Any] = {"content": content_score, "headings": headings_score}
+    
+    # Conteúdo vale até 40 pontos (mesma escala da análise de páginas); headings e palavras-chave, 30 cada
+    overall = content_score["score"]
+    if keywords:
+        keywords_score = analyze_keywords(features, keywords)
+        categories["keywords"] = keywords_score
+        overall += headings_score["score"] * 0.3 + keywords_score["score"] * 0.3
+    else:
+        overall += headings_score["score"] * 0.6
+    
+    return {
+        "overall_score": min(100, max(0, int(overall))),
+        "format": content_format,
+        "word_count": features.word_count,
+        "categories": categories,
+    }
+
+
+def analyze_heading_structure(features: PageFeatures) -> Dict[str, Any]:
+    """Estrutura de headings: um H1 no topo, seções em H2 e níveis sem saltos"""
+    score = 0
+    issues: List[str] = []
+    levels = features.heading_levels
+    
+    if features.h1_count == 1:
+        score += 30
+    elif features.h1_count == 0:
+        issues.append("Nenhum título H1 encontrado")
+    else:
+        issues.append(f"Múltiplos títulos H1 ({features.h1_count})")
+    
+    if levels and levels[0] == 1:
+        score += 20
+    elif levels:
+        issues.append(f"O primeiro heading deve ser o H1 (atual: H{levels[0]})")
+    
+    sections = levels.count(2)
+    if sections >= 2:
+        score += 30
+    else:
+        issues.append(f"Divida o texto em seções com H2 (atual: {sections})")
+    
+    skips = [(current, following) for current, following in zip(levels, levels[1:]) if following > current + 1]
+    if levels and not skips:
+        score += 20
+    for current, following in skips[:3]:
+        issues.append(f"Nível de heading pulado: H{current} → H{following}")
+    
+    return {
+        "score": min(100, score),
+        "issues": issues,
+        "counts": {f"h{level}": levels.count(level) for level in sorted(set(levels))},
+    }
+
+
+def analyze_keywords(features: PageFeatures, keywords: List[str]) -> Dict[str, Any]:
+    """Cobertura e densidade das palavras-chave no texto (features com collect_text)"""
+    text = (features.text or "").casefold()
+    words = features.word_count
+    intro = " ".join(text.split()[:_INTRO_WORDS])
+    title = (features.title or "").casefold()
+    
+    details: List[Dict[str, Any]] = []
+    issues: List[str] = []
+    seen = set()
+    for keyword in keywords:
+        terms = keyword.casefold().split()
+        if not terms or tuple(terms) in seen:
+            continue
+        seen.add(tuple(terms))
+        # Frase inteira, em qualquer quantidade de espaços, sem casar dentro de outra palavra.
+        # O limite à esquerda é conferido fora da regex para manter o prefixo literal (busca rápida).
+        pattern = re.compile(r"\s+".join(map(re.escape, terms)) + r"(?!\w)")
+        occurrences = _count_phrase(pattern, text)
+        density = occurrences * len(terms) / words * 100 if words else 0.0
+        details.append({
+            "keyword": keyword,
+            "occurrences": occurrences,
+            "density": round(density, 2),
+            "pattern": pattern,
+        })
+        if not occurrences:
+            issues.append(f"Palavra-chave ausente: {keyword}")
+        elif density < KEYWORD_DENSITY_MIN:
+            issues.append(f"Palavra-chave pouco usada: {keyword} ({density:.1f}%)")
+        elif density > KEYWORD_DENSITY_MAX:
+            issues.append(f"Palavra-chave repetida demais: {keyword} ({density:.1f}%). Evite keyword stuffing")
+    
+    if not details:
+        return {"score": 0, "issues": ["Nenhuma palavra-chave válida"], "coverage": 0.0, "keywords": []}
+    
+    found = sum(1 for detail in details if detail["occurrences"])
+    in_range = sum(1 for detail in details if KEYWORD_DENSITY_MIN <= detail["density"] <= KEYWORD_DENSITY_MAX)
+    coverage = found / len(details)
+    score = 50 * coverage + 30 * in_range / len(details)
+    
+    primary = details[0]["pattern"]
+    if _count_phrase(primary, title) or _count_phrase(primary, intro):
+        score += 20
+    else:
+        issues.append(f"Use a palavra-chave principal ({details[0]['keyword']}) no título ou na introdução")
+    
+    for detail in details:
+        del detail["pattern"]
+    return {
+        "score": min(100, int(score)),
+        "issues": issues,
+        "coverage": round(coverage, 2),
+        "keywords": details,
+    }
+
+
+def _count_phrase(pattern: "re.Pattern[str]", text: str) -> int:
+    """Ocorrências que não começam no meio de uma palavra"""
+    count = 0
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start == 0 or not (text[start - 1].isalnum() or text[start - 1] == "_"):
+            count += 1
+    return count
+
+
+async def analyze_performance(
+    url: str,
+    page: FetchedPage,
+    resources: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Análise de performance (resources: resultado de analyze_resources, opcional)"""
     score = 50  # Score base
     issues: List[str] = []
     
-    # Tamanho da resposta
-    content_length = len(response.content)
+    # Tamanho da resposta (medido durante o download)
+    content_length = page.size
     if content_length < 100000:  # < 100KB
         score += 20
     elif content_length < 500000:  # < 500KB
@@ -194,20 +444,62 @@ async def analyze_performance(url: str, response: httpx.Response) -> Dict[str, A
     
     # Headers de cache
     cache_headers = ["cache-control", "expires", "etag"]
-    has_cache = any(header in response.headers for header in cache_headers)
+    has_cache = any(header in page.headers for header in cache_headers)
     if has_cache:
         score += 10
     else:
         issues.append("Configurar headers de cache")
     
     # Compressão
-    if "gzip" in response.headers.get("content-encoding", "").lower():
+    if "gzip" in page.headers.get("content-encoding", "").lower():
         score += 10
     else:
         issues.append("Habilitar compressão GZIP")
     
-    return {
-        "score": min(100, score),
+    # Tempo até o primeiro byte (cadeia de redirects inclusa) e redirects
+    timing = page.timing or {}
+    ttfb = timing.get("ttfb_ms")
+    if ttfb is not None:
+        if ttfb < 200:
+            score += 10
+        elif ttfb < 600:
+            score += 5
+            issues.append(f"Tempo até o primeiro byte alto ({ttfb:.0f}ms). Recomendado: < 200ms")
+        else:
+            issues.append(f"Servidor lento: primeiro byte em {ttfb:.0f}ms")
+    if timing.get("redirects"):
+        issues.append(f"Cadeia de {timing['redirects']} redirect(s) antes da página final")
+    
+    # Sub-recursos: peso total, bloqueio de renderização, compressão e cache
+    if resources is not None:
+        total_weight = resources["total_weight_bytes"]
+        if total_weight > 3 * 1024 * 1024:
+            score -= 10
+            issues.append(f"Peso total da página muito alto ({total_weight / 1024:.0f}KB com recursos)")
+        elif total_weight > 1.5 * 1024 * 1024:
+            score -= 5
+            issues.append(f"Peso total da página alto ({total_weight / 1024:.0f}KB com recursos)")
+        
+        blocking = len(resources["render_blocking"])
+        if blocking > 2:
+            score -= 5
+            issues.append(f"{blocking} recursos bloqueiam a renderização. Use defer/async ou CSS crítico inline")
+        
+        if resources["uncompressed"]:
+            score -= 5
+            issues.append(f"{len(resources['uncompressed'])} recursos de texto sem compressão")
+        
+        if resources["uncached"]:
+            score -= 5
+            issues.append(f"{len(resources['uncached'])} recursos sem headers de cache")
+    
+    result: Dict[str, Any] = {
+        "score": max(0, min(100, score)),
         "issues": issues,
     }
+    if page.timing is not None:
+        result["timing"] = page.timing
+    if resources is not None:
+        result["resources"] = resources
+    return result
 
@@ -0,0 +1,230 @@
+"""
+Análise SEO em lote com concorrência limitada e resultados em streaming (NDJSON)
+"""
+
+import asyncio
+import logging
+import os
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+from services.analysis_pool import PoolSaturatedError
+from services.page_fetcher import PageTooLargeError, fetch_page
+from services.seo_cache import get_seo_cache
+from services.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+SEO_BATCH_MAX_URLS = int(os.getenv("SEO_BATCH_MAX_URLS", "5000"))
+SEO_BATCH_CONCURRENCY = int(os.getenv("SEO_BATCH_CONCURRENCY", "8"))
+SEO_BATCH_PER_HOST = int(os.getenv("SEO_BATCH_PER_HOST", "2"))
+# Tamanho máximo de um sitemap, baixado e depois de descomprimido (o protocolo limita a 50 MB)
+SEO_SITEMAP_MAX_BYTES = int(os.getenv("SEO_SITEMAP_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Sitemaps de índice podem apontar para outros sitemaps; limitar a profundidade
+_SITEMAP_MAX_DEPTH = 2
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+# Tentativas quando o pool de análise está saturado (o lote espera em vez de falhar)
+_POOL_RETRIES = 5
+
+
+def _gunzip(content: bytes, max_bytes: int) -> bytes:
+    """Descomprime um .xml.gz sem passar de max_bytes (protege contra gzip bombs)"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(content, max_bytes)
+    except zlib.error as e:
+        raise ValueError(f"Sitemap gzip inválido: {e}")
+    if decompressor.unconsumed_tail:
+        raise PageTooLargeError(f"Sitemap maior que o limite de {max_bytes // 1024}KB")
+    return data
+
+
+async def load_sitemap(
+    url: str,
+    limit: int = SEO_BATCH_MAX_URLS,
+    max_bytes: int = SEO_SITEMAP_MAX_BYTES,
+) -> List[str]:
+    """
+    Lê as URLs (<loc>) de um sitemap, seguindo sitemaps de índice.
+    As URLs voltam como estão no sitemap (inclusive malformadas).
+    """
+    urls: List[str] = []
+    pending = [(url, 0)]
+
+    while pending and len(urls) < limit:
+        sitemap_url, depth = pending.pop(0)
+        # Download em streaming com limite, aceitando XML ou .gz
+        page = await fetch_page(sitemap_url, max_bytes=max_bytes, content_types=None)
+
+        content = page.content
+        if content[:2] == b"\x1f\x8b":
+            content = _gunzip(content, max_bytes)
+
+        root = etree.fromstring(content, parser=etree.XMLParser(recover=True, resolve_entities=False))
+        if root is None:
+            continue
+
+        is_index = etree.QName(root).localname == "sitemapindex"
+        for loc in root.iter(f"{_SITEMAP_NS}loc", "loc"):
+            value = (loc.text or "").strip()
+            if not value:
+                continue
+            if is_index:
+                if depth < _SITEMAP_MAX_DEPTH:
+                    try:
+                        normalize_url(value)
+                    except ValueError:
+                        logger.warning(f"Sitemap com URL inválida ignorado: {value}")
+                        continue
+                    pending.append((value, depth + 1))
+            else:
+                urls.append(value)
+                if len(urls) >= limit:
+                    break
+
+    return urls
+
+
+def dedupe_urls(urls: List[str]) -> List[str]:
+    """
+    Remove URLs repetidas (após normalização) mantendo a ordem.
+    URLs malformadas ficam como vieram: o lote as devolve como erro.
+    """
+    seen = set()
+    unique: List[str] = []
+    for url in urls:
+        try:
+            key = normalize_url(url)
+        except ValueError:
+            key = url
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+async def _analyze_one(url: str, options: Dict[str, bool]) -> Dict[str, Any]:
+    cache = get_seo_cache()
+    for attempt in range(_POOL_RETRIES):
+        try:
+            result, cache_status = await cache.analyze(url, **options)
+            return {"type": "result", "url": url, "cache": cache_status, "result": result}
+        except PoolSaturatedError:
+            await asyncio.sleep(0.5 * (attempt + 1))
+    raise PoolSaturatedError("Pool de análise saturado")
+
+
+async def analyze_batch(
+    urls: List[str],
+    include_technical: bool = True,
+    include_content: bool = True,
+    include_performance: bool = True,
+    include_resources: bool = False,
+    concurrency: int = SEO_BATCH_CONCURRENCY,
+    per_host_concurrency: int = SEO_BATCH_PER_HOST,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Analisa as URLs com limite global e por host, produzindo cada registro
+    assim que fica pronto. Falhas viram registros de erro e não abortam o lote.
+
+    concurrency workers fixos pegam a próxima URL de um host com vaga e
+    entregam o registro numa fila limitada: se quem lê o stream fica para
+    trás, os workers param na fila e nenhuma auditoria nova começa (a memória
+    não cresce com o tamanho do lote).
+    """
+    options = {
+        "include_technical": include_technical,
+        "include_content": include_content,
+        "include_performance": include_performance,
+        "include_resources": include_resources,
+    }
+    started = time.perf_counter()
+    ok = errors = 0
+
+    # Host -> URLs pendentes (ordem de chegada); URL malformada (ex.: porta
+    # inválida num <loc>) vira linha de erro sem baixar nada
+    pending: "OrderedDict[str, Deque[Tuple[int, str]]]" = OrderedDict()
+    invalid: List[Dict[str, Any]] = []
+    for index, url in enumerate(urls):
+        try:
+            normalize_url(url)
+            host = (urlsplit(url).hostname or "").lower()
+        except ValueError as e:
+            invalid.append({"type": "error", "url": url, "error": f"URL inválida: {e}", "index": index})
+            continue
+        pending.setdefault(host, deque()).append((index, url))
+    valid = len(urls) - len(invalid)
+
+    claimed: Dict[str, int] = {}
+    changed = asyncio.Condition()
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=concurrency)
+
+    async def claim() -> Optional[Tuple[int, str, str]]:
+        """Próxima URL de um host com vaga; espera uma vaga se os hosts restantes estão cheios"""
+        async with changed:
+            while pending:
+                # Vaga do host primeiro: URLs de um host lento não ocupam workers
+                for host, queued in pending.items():
+                    if claimed.get(host, 0) < per_host_concurrency:
+                        index, url = queued.popleft()
+                        if not queued:
+                            del pending[host]
+                        claimed[host] = claimed.get(host, 0) + 1
+                        return index, url, host
+                await changed.wait()
+            return None
+
+    async def release(host: str) -> None:
+        async with changed:
+            claimed[host] -= 1
+            changed.notify_all()
+
+    async def worker() -> None:
+        while True:
+            claimed_url = await claim()
+            if claimed_url is None:
+                return
+            index, url, host = claimed_url
+            try:
+                record = await _analyze_one(url, options)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                record = {"type": "error", "url": url, "error": str(e)}
+            finally:
+                await release(host)
+            record["index"] = index
+            # Fila limitada: backpressure do stream até aqui
+            await queue.put(record)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(min(concurrency, valid))]
+    try:
+        for record in invalid:
+            errors += 1
+            yield record
+        for _ in range(valid):
+            record = await queue.get()
+            if record["type"] == "result":
+                ok += 1
+            else:
+                errors += 1
+            yield record
+
+        yield {
+            "type": "summary",
+            "total": len(urls),
+            "ok": ok,
+            "errors": errors,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+    finally:
+        # Cliente desconectou (ou o lote terminou): cancelar o que sobrou
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,232 @@
+"""
+Cache de resultados da análise SEO com revalidação condicional
+
+Duas camadas: LRU em memória (TTL + limite de entradas) e, opcionalmente,
+SQLite em disco para sobreviver a reinícios. Entradas vencidas são
+revalidadas com If-None-Match/If-Modified-Since; um 304 reaproveita a análise.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from services.cache import CacheEntry, TTLCache
+from services.page_fetcher import fetch_page
+from services.seo_analyzer import analyze_response
+from services.singleflight import SingleFlight
+from services.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+SEO_CACHE_TTL = float(os.getenv("SEO_CACHE_TTL", "600"))
+SEO_CACHE_MAX_ENTRIES = int(os.getenv("SEO_CACHE_MAX_ENTRIES", "512"))
+# Por quanto tempo uma entrada vencida ainda pode ser revalidada
+SEO_CACHE_STALE_TTL = float(os.getenv("SEO_CACHE_STALE_TTL", "86400"))
+# Caminho do SQLite (vazio = apenas memória)
+SEO_CACHE_SQLITE_PATH = os.getenv("SEO_CACHE_SQLITE_PATH", "")
+
+CACHE_HIT = "HIT"
+CACHE_MISS = "MISS"
+CACHE_REVALIDATED = "REVALIDATED"
+
+
+def cache_key(
+    url: str,
+    include_technical: bool,
+    include_content: bool,
+    include_performance: bool,
+    include_resources: bool = False,
+) -> str:
+    """Chave: URL normalizada + flags include_*"""
+    flags = "".join(
+        "1" if flag else "0"
+        for flag in (include_technical, include_content, include_performance, include_resources)
+    )
+    return f"{normalize_url(url)}|{flags}"
+
+
+class SQLiteCacheStore:
+    """Camada em disco. As chamadas são síncronas; o cache as executa em threads."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seo_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM seo_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, key: str, value: Dict[str, Any], stored_at: float, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seo_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), stored_at, expires_at),
+            )
+            self._conn.commit()
+
+    def prune(self, before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM seo_cache WHERE expires_at < ?", (before,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SEOResultCache:
+    """Cache de análises SEO (memória + SQLite opcional)"""
+
+    def __init__(
+        self,
+        max_entries: int = SEO_CACHE_MAX_ENTRIES,
+        ttl: float = SEO_CACHE_TTL,
+        stale_ttl: float = SEO_CACHE_STALE_TTL,
+        sqlite_path: Optional[str] = SEO_CACHE_SQLITE_PATH or None,
+    ):
+        self.memory: TTLCache[Dict[str, Any]] = TTLCache(max_entries, ttl, stale_ttl)
+        self.disk = SQLiteCacheStore(sqlite_path) if sqlite_path else None
+        self.counters = {CACHE_HIT: 0, CACHE_MISS: 0, CACHE_REVALIDATED: 0}
+        # Auditorias simultâneas da mesma URL/opções compartilham um único fetch + parse
+        self.inflight: SingleFlight[Tuple[Dict[str, Any], str]] = SingleFlight()
+
+        if self.disk is not None:
+            self.disk.prune(time.time() - stale_ttl)
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry[Dict[str, Any]]]:
+        entry = self.memory.get(key, allow_stale=True)
+        if entry is not None or self.disk is None:
+            return entry
+
+        row = await asyncio.to_thread(self.disk.get, key)
+        if row is None or time.time() >= row[2] + self.memory.stale_ttl:
+            return None
+
+        # Promover para a memória mantendo a validade original
+        value, stored_at, expires_at = row
+        return self.memory.set(key, value, ttl=expires_at - stored_at, stored_at=stored_at)
+
+    async def _store(self, key: str, value: Dict[str, Any]) -> None:
+        entry = self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, entry.stored_at, entry.expires_at)
+
+    async def analyze(
+        self,
+        url: str,
+        include_technical: bool = True,
+        include_content: bool = True,
+        include_performance: bool = True,
+        include_resources: bool = False,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Retorna (resultado, status do cache: HIT, MISS ou REVALIDATED)"""
+        key = cache_key(url, include_technical, include_content, include_performance, include_resources)
+        entry = await self._lookup(key)
+
+        if entry is not None and entry.fresh:
+            self.counters[CACHE_HIT] += 1
+            return entry.value["result"], CACHE_HIT
+
+        return await self.inflight.do(
+            key,
+            lambda: self._refresh(
+                key, entry, url, include_technical, include_content, include_performance, include_resources
+            ),
+        )
+
+    async def _refresh(
+        self,
+        key: str,
+        entry: Optional[CacheEntry[Dict[str, Any]]],
+        url: str,
+        include_technical: bool,
+        include_content: bool,
+        include_performance: bool,
+        include_resources: bool,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Revalida a entrada vencida ou faz a análise completa"""
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.value.get("etag"):
+                headers["If-None-Match"] = entry.value["etag"]
+            if entry.value.get("last_modified"):
+                headers["If-Modified-Since"] = entry.value["last_modified"]
+
+        page = await fetch_page(url, headers=headers or None)
+
+        if entry is not None and page.status_code == 304:
+            # Página não mudou: renovar a validade e reaproveitar a análise
+            await self._store(key, entry.value)
+            self.counters[CACHE_REVALIDATED] += 1
+            return entry.value["result"], CACHE_REVALIDATED
+
+        result = await analyze_response(
+            url,
+            page,
+            include_technical=include_technical,
+            include_content=include_content,
+            include_performance=include_performance,
+            include_resources=include_resources,
+        )
+        await self._store(
+            key,
+            {
+                "result": result,
+                "etag": page.headers.get("etag"),
+                "last_modified": page.headers.get("last-modified"),
+            },
+        )
+        self.counters[CACHE_MISS] += 1
+        return result, CACHE_MISS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.counters[CACHE_HIT],
+            "misses": self.counters[CACHE_MISS],
+            "revalidated": self.counters[CACHE_REVALIDATED],
+            "memory": self.memory.stats(),
+            "sqlite": self.disk is not None,
+            "single_flight": self.inflight.stats(),
+        }
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+_cache: Optional[SEOResultCache] = None
+
+
+def get_seo_cache() -> SEOResultCache:
+    """Cache compartilhado do processo"""
+    global _cache
+    if _cache is None:
+        _cache = SEOResultCache()
+    return _cache
+
+
+def close_seo_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+    _cache = None
@@ -0,0 +1,693 @@
+"""
+Monitoramento agendado de páginas (auditoria SEO periódica)
+
+Cada URL monitorada é checada a cada `interval` segundos (padrão: diário). A
+primeira checagem é sorteada dentro do intervalo e as seguintes levam jitter,
+de modo que milhares de URLs cadastradas juntas não viram uma rajada; um limite
+por host evita martelar o site de um mesmo cliente.
+
+A checagem é incremental:
+- GET condicional com o ETag/Last-Modified guardados: 304 não baixa nem analisa
+- hash do conteúdo igual ao da última checagem: nada é analisado
+- a página é dividida em <head> e resto (body); só a parte cujo hash mudou
+  passa pelo parser, e só as categorias cujas entradas mudaram (technical,
+  content, performance) são recalculadas; as outras vêm da última checagem
+
+Cada checagem gera um registro com o diff de scores e issues em relação à
+anterior. O estado fica num SQLite (como os jobs de conteúdo): com vários
+workers do servidor, só o dono do lock ao lado do arquivo executa as checagens.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows (dev com um processo só)
+    fcntl = None
+
+from services.analysis_pool import PoolSaturatedError, run_in_pool
+from services.html_features import PageFeatures, extract_features
+from services.http_client import HostLimiter
+from services.page_fetcher import FetchedPage, fetch_page
+from services.seo_analyzer import (
+    CATEGORY_WEIGHTS,
+    analyze_content_seo,
+    analyze_performance,
+    analyze_technical_seo,
+)
+from services.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Arquivo SQLite das URLs monitoradas (":memory:" = sem persistência)
+SEO_MONITOR_DB_PATH = os.getenv("SEO_MONITOR_DB_PATH", "seo_monitor.sqlite3")
+SEO_MONITOR_INTERVAL = float(os.getenv("SEO_MONITOR_INTERVAL", "86400"))
+# Variação de cada agendamento: intervalo x (1 ± JITTER)
+SEO_MONITOR_JITTER = float(os.getenv("SEO_MONITOR_JITTER", "0.1"))
+# Checagens simultâneas (o parsing divide o pool de análise com as auditorias interativas)
+SEO_MONITOR_CONCURRENCY = int(os.getenv("SEO_MONITOR_CONCURRENCY", "2"))
+SEO_MONITOR_PER_HOST = int(os.getenv("SEO_MONITOR_PER_HOST", "1"))
+SEO_MONITOR_MAX_URLS = int(os.getenv("SEO_MONITOR_MAX_URLS", "5000"))
+# Checagens guardadas por URL (as mais antigas são apagadas)
+SEO_MONITOR_RUNS_KEPT = int(os.getenv("SEO_MONITOR_RUNS_KEPT", "30"))
+# Falha ao baixar: nova tentativa em base x 2^(falhas - 1), limitada ao intervalo
+SEO_MONITOR_RETRY_BASE = float(os.getenv("SEO_MONITOR_RETRY_BASE", "900"))
+# Checagem em andamento: a URL só volta para a fila depois disso (processo morto no meio)
+SEO_MONITOR_LEASE = float(os.getenv("SEO_MONITOR_LEASE", "300"))
+# Intervalo (s) em que o dono procura URLs cadastradas por outros workers
+# e em que os demais tentam pegar o lock
+SEO_MONITOR_POLL_INTERVAL = float(os.getenv("SEO_MONITOR_POLL_INTERVAL", "2"))
+
+RUN_BASELINE = "baseline"
+RUN_NOT_MODIFIED = "not_modified"
+RUN_UNCHANGED = "unchanged"
+RUN_CHANGED = "changed"
+RUN_ERROR = "error"
+RUN_STATUSES = (RUN_BASELINE, RUN_NOT_MODIFIED, RUN_UNCHANGED, RUN_CHANGED, RUN_ERROR)
+
+CATEGORIES = ("technical", "content", "performance")
+PARTS = ("head", "body")
+# Fim do <head> nos bytes (sem decodificar); sem ele, a página inteira é o body
+_HEAD_END = re.compile(rb"</head\s*>", re.IGNORECASE)
+# Campos do PageFeatures lidos por cada categoria
+_TECHNICAL_FIELDS = (
+    "title", "meta_description", "h1_count", "has_canonical", "og_count", "has_schema", "image_count",
+    "images_with_alt",
+)
+_CONTENT_FIELDS = ("has_body", "word_count", "heading_count", "internal_link_count")
+
+
+class MonitorNotFoundError(Exception):
+    """URL não monitorada (ou removida)"""
+
+
+def monitor_id(url: str) -> str:
+    """Id estável da URL (normalizada): cadastrar de novo só atualiza o intervalo"""
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def next_check(interval: float, jitter: float = SEO_MONITOR_JITTER) -> float:
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+
+def retry_delay(failures: int, interval: float) -> float:
+    delay = min(interval, SEO_MONITOR_RETRY_BASE * 2 ** (failures - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def split_document(content: bytes) -> Dict[str, bytes]:
+    """Bytes do <head> (antes do </head>) e do resto da página (depois dele)"""
+    match = _HEAD_END.search(content)
+    if match is None:
+        return {"head": b"", "body": content}
+    return {"head": content[: match.start()], "body": content[match.end():]}
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def part_features(content: bytes, encoding: str, parts: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Features das partes pedidas (executado no pool de workers). Cada parte é
+    analisada sozinha; só os campos usados pelos analisadores voltam.
+    """
+    split = split_document(content)
+    features: Dict[str, Dict[str, Any]] = {}
+    for part in parts:
+        extracted = asdict(extract_features(split[part].decode(encoding, errors="replace")))
+        features[part] = {name: extracted[name] for name in _TECHNICAL_FIELDS + _CONTENT_FIELDS}
+    return features
+
+
+def merge_parts(head: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+    """Features da página inteira: contagens somadas, flags em OU, textos do primeiro que tiver"""
+    merged: Dict[str, Any] = {}
+    for name, value in head.items():
+        other = body[name]
+        if isinstance(value, bool):
+            merged[name] = value or other
+        elif isinstance(value, int):
+            merged[name] = value + other
+        else:
+            merged[name] = value if value is not None else other
+    return merged
+
+
+def _ttfb_band(ttfb: Optional[float]) -> Optional[int]:
+    # Mesmas faixas do score de performance
+    if ttfb is None:
+        return None
+    return 0 if ttfb < 200 else 1 if ttfb < 600 else 2
+
+
+def _size_band(size: int) -> Any:
+    # Abaixo de 500KB só a faixa conta; acima, o tamanho aparece no issue
+    return 0 if size < 100000 else 1 if size < 500000 else round(size / 1024)
+
+
+def performance_inputs(page: FetchedPage) -> Dict[str, Any]:
+    """O que o score de performance lê da resposta (sem os sub-recursos)"""
+    timing = page.timing or {}
+    return {
+        "size": _size_band(page.size),
+        "cache": any(header in page.headers for header in ("cache-control", "expires", "etag")),
+        "gzip": "gzip" in page.headers.get("content-encoding", "").lower(),
+        "ttfb": _ttfb_band(timing.get("ttfb_ms")),
+        "redirects": timing.get("redirects") or 0,
+    }
+
+
+def category_inputs(parts: Dict[str, Dict[str, Any]], page: FetchedPage) -> Dict[str, Any]:
+    merged = merge_parts(parts["head"], parts["body"])
+    return {
+        "technical": {name: merged[name] for name in _TECHNICAL_FIELDS},
+        "content": {name: merged[name] for name in _CONTENT_FIELDS},
+        "performance": performance_inputs(page),
+    }
+
+
+def overall_score(categories: Dict[str, Dict[str, Any]]) -> int:
+    score = sum(categories[name].get("score", 0) * CATEGORY_WEIGHTS[name] for name in CATEGORIES if name in categories)
+    return min(100, max(0, int(score)))
+
+
+def _score_delta(before: Any, after: Any) -> Dict[str, Any]:
+    return {"before": before, "after": after, "delta": (after or 0) - (before or 0)}
+
+
+def diff_results(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Scores que mudaram e issues/recomendações novas ou resolvidas, por categoria"""
+    categories: Dict[str, Any] = {}
+    for name in CATEGORIES:
+        old = before["categories"].get(name, {})
+        new = after["categories"].get(name, {})
+        entry: Dict[str, Any] = {}
+        if old.get("score") != new.get("score"):
+            entry["score"] = _score_delta(old.get("score"), new.get("score"))
+        for field in ("issues", "recommendations"):
+            old_items, new_items = old.get(field, []), new.get(field, [])
+            added = [item for item in new_items if item not in old_items]
+            resolved = [item for item in old_items if item not in new_items]
+            if added or resolved:
+                entry[field] = {"added": added, "resolved": resolved}
+        if entry:
+            categories[name] = entry
+    return {
+        "changed": bool(categories) or before["overall_score"] != after["overall_score"],
+        "overall_score": _score_delta(before["overall_score"], after["overall_score"]),
+        "categories": categories,
+    }
+
+
+class SQLiteMonitorStore:
+    """URLs monitoradas e histórico de checagens. Chamadas síncronas, executadas em threads."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS seo_monitors ("
+            " id TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " host TEXT NOT NULL,"
+            " interval REAL NOT NULL,"
+            " next_check_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " content_hash TEXT,"
+            " state TEXT,"
+            " result TEXT,"
+            " checks INTEGER NOT NULL DEFAULT 0,"
+            " changes INTEGER NOT NULL DEFAULT 0,"
+            " failures INTEGER NOT NULL DEFAULT 0,"
+            " last_status TEXT,"
+            " last_error TEXT,"
+            " last_checked_at REAL,"
+            " last_changed_at REAL,"
+            " created_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS seo_monitors_due ON seo_monitors (next_check_at);"
+            "CREATE TABLE IF NOT EXISTS seo_monitor_runs ("
+            " monitor_id TEXT NOT NULL,"
+            " checked_at REAL NOT NULL,"
+            " status TEXT NOT NULL,"
+            " http_status INTEGER,"
+            " overall_score INTEGER,"
+            " rescored TEXT NOT NULL,"
+            " diff TEXT,"
+            " error TEXT,"
+            " duration_ms REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS seo_monitor_runs_monitor ON seo_monitor_runs (monitor_id, checked_at);"
+        )
+        self._conn.commit()
+
+    def upsert(self, urls: List[str], interval: float, first_check_window: float) -> Tuple[int, List[str]]:
+        """(URLs novas, ids na ordem das URLs). Primeira checagem sorteada dentro da janela."""
+        now = time.time()
+        ids = [monitor_id(url) for url in urls]
+        rows = [
+            (id_, url, (urlsplit(url).hostname or "").lower(), interval, now + random.uniform(0, first_check_window), now)
+            for id_, url in zip(ids, urls)
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seo_monitors (id, url, host, interval, next_check_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            created = self._conn.total_changes - before
+            # Já monitoradas: só o intervalo muda (o agendamento atual é mantido)
+            self._conn.executemany("UPDATE seo_monitors SET interval = ? WHERE id = ?", [(interval, id_) for id_ in ids])
+        return created, ids
+
+    def delete(self, id_: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM seo_monitor_runs WHERE monitor_id = ?", (id_,))
+            cursor = self._conn.execute("DELETE FROM seo_monitors WHERE id = ?", (id_,))
+        return cursor.rowcount > 0
+
+    def claim(self, busy_hosts: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Reserva a URL vencida mais atrasada de um host com vaga (a reserva expira em LEASE)"""
+        now = time.time()
+        placeholders = ", ".join("?" for _ in busy_hosts)
+        excluded = f" AND host NOT IN ({placeholders})" if busy_hosts else ""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT * FROM seo_monitors WHERE next_check_at <= ?{excluded} ORDER BY next_check_at LIMIT 1",
+                (now, *busy_hosts),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE seo_monitors SET next_check_at = ? WHERE id = ?", (now + SEO_MONITOR_LEASE, row["id"])
+            )
+        monitor = dict(row)
+        monitor["state"] = json.loads(monitor["state"]) if monitor["state"] else None
+        monitor["result"] = json.loads(monitor["result"]) if monitor["result"] else None
+        return monitor
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            return self._conn.execute("SELECT MIN(next_check_at) FROM seo_monitors").fetchone()[0]
+
+    def due_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM seo_monitors WHERE next_check_at <= ?", (time.time(),)
+            ).fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seo_monitors").fetchone()[0]
+
+    def save_check(self, id_: str, check: Dict[str, Any], next_check_at: float) -> None:
+        """Grava o novo estado da URL e o registro da checagem (e poda o histórico)"""
+        now = time.time()
+        status = check["status"]
+        # Conteúdo novo (o diff diz se os scores mudaram)
+        changed = status in (RUN_BASELINE, RUN_CHANGED)
+        with self._lock, self._conn:
+            if status == RUN_ERROR:
+                self._conn.execute(
+                    "UPDATE seo_monitors SET next_check_at = ?, failures = failures + 1, checks = checks + 1,"
+                    " last_status = ?, last_error = ?, last_checked_at = ? WHERE id = ?",
+                    (next_check_at, status, check["error"], now, id_),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE seo_monitors SET next_check_at = ?, etag = ?, last_modified = ?, content_hash = ?,"
+                    " state = ?, result = ?, checks = checks + 1, changes = changes + ?, failures = 0,"
+                    " last_status = ?, last_error = NULL, last_checked_at = ?,"
+                    " last_changed_at = CASE WHEN ? THEN ? ELSE last_changed_at END WHERE id = ?",
+                    (
+                        next_check_at, check["etag"], check["last_modified"], check["content_hash"],
+                        json.dumps(check["state"]), json.dumps(check["result"], ensure_ascii=False),
+                        int(changed), status, now, changed, now, id_,
+                    ),
+                )
+            self._conn.execute(
+                "INSERT INTO seo_monitor_runs"
+                " (monitor_id, checked_at, status, http_status, overall_score, rescored, diff, error, duration_ms)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    id_, now, status, check.get("http_status"),
+                    check["result"]["overall_score"] if check.get("result") else None,
+                    json.dumps(check.get("rescored", [])),
+                    json.dumps(check["diff"], ensure_ascii=False) if check.get("diff") else None,
+                    check.get("error"), check["duration_ms"],
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM seo_monitor_runs WHERE monitor_id = ? AND rowid NOT IN"
+                " (SELECT rowid FROM seo_monitor_runs WHERE monitor_id = ? ORDER BY checked_at DESC LIMIT ?)",
+                (id_, id_, SEO_MONITOR_RUNS_KEPT),
+            )
+
+    def reschedule(self, id_: str, next_check_at: float) -> None:
+        """Checagem adiada sem contar como falha (ex.: pool de análise saturado)"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE seo_monitors SET next_check_at = ? WHERE id = ?", (next_check_at, id_))
+
+    def monitor(self, id_: str, runs: int) -> Optional[Dict[str, Any]]:
+        """URL monitorada, último resultado e as checagens mais recentes"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM seo_monitors WHERE id = ?", (id_,)).fetchone()
+            if row is None:
+                return None
+            history = self._conn.execute(
+                "SELECT * FROM seo_monitor_runs WHERE monitor_id = ? ORDER BY checked_at DESC LIMIT ?", (id_, runs)
+            ).fetchall()
+        monitor = {
+            name: row[name]
+            for name in (
+                "id", "url", "interval", "next_check_at", "checks", "changes", "failures", "last_status",
+                "last_error", "last_checked_at", "last_changed_at", "created_at",
+            )
+        }
+        monitor["etag"] = row["etag"]
+        monitor["result"] = json.loads(row["result"]) if row["result"] else None
+        monitor["runs"] = [
+            {
+                "checked_at": run["checked_at"],
+                "status": run["status"],
+                "http_status": run["http_status"],
+                "overall_score": run["overall_score"],
+                "rescored": json.loads(run["rescored"]),
+                "diff": json.loads(run["diff"]) if run["diff"] else None,
+                "error": run["error"],
+                "duration_ms": run["duration_ms"],
+            }
+            for run in history
+        ]
+        return monitor
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+async def check_page(monitor: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checagem incremental de uma URL a partir do estado da anterior.
+    Devolve o novo estado, o resultado (mesmo formato de analyze_url) e o diff.
+    """
+    previous: Optional[Dict[str, Any]] = monitor["result"]
+    state: Dict[str, Any] = monitor["state"] or {}
+    headers: Dict[str, str] = {}
+    if previous is not None:
+        if monitor["etag"]:
+            headers["If-None-Match"] = monitor["etag"]
+        if monitor["last_modified"]:
+            headers["If-Modified-Since"] = monitor["last_modified"]
+
+    page = await fetch_page(monitor["url"], headers=headers or None)
+    check: Dict[str, Any] = {
+        "http_status": page.status_code,
+        "etag": monitor["etag"],
+        "last_modified": monitor["last_modified"],
+        "content_hash": monitor["content_hash"],
+        "state": state,
+        "result": previous,
+        "parsed": [],
+        "rescored": [],
+        "diff": None,
+        # Scores ou issues diferentes dos da checagem anterior
+        "changed": False,
+    }
+    if previous is not None and page.status_code == 304:
+        check["status"] = RUN_NOT_MODIFIED
+        return check
+
+    check.update(etag=page.headers.get("etag"), last_modified=page.headers.get("last-modified"))
+    content_hash = fingerprint(page.content)
+    parts: Dict[str, Dict[str, Any]] = dict(state.get("parts") or {})
+    hashes: Dict[str, str] = dict(state.get("hashes") or {})
+    if content_hash != monitor["content_hash"] or previous is None:
+        # Só as partes com hash novo passam pelo parser
+        split = split_document(page.content)
+        new_hashes = {part: fingerprint(split[part]) for part in PARTS}
+        changed = [part for part in PARTS if new_hashes[part] != hashes.get(part) or part not in parts]
+        if changed:
+            parts.update(await run_in_pool(part_features, page.content, page.encoding, changed))
+            check["parsed"] = changed
+        hashes = new_hashes
+
+    inputs = category_inputs(parts, page)
+    previous_inputs = state.get("inputs") or {}
+    categories: Dict[str, Any] = dict(previous["categories"]) if previous is not None else {}
+    for name in CATEGORIES:
+        if previous is not None and inputs[name] == previous_inputs.get(name):
+            continue
+        if name == "technical":
+            categories[name] = analyze_technical_seo(PageFeatures(**inputs[name]), page.url)
+        elif name == "content":
+            categories[name] = analyze_content_seo(PageFeatures(**inputs[name]))
+        else:
+            categories[name] = await analyze_performance(page.url, page)
+        check["rescored"].append(name)
+
+    result = {
+        "url": page.url,
+        "status_code": page.status_code,
+        "overall_score": overall_score(categories),
+        "categories": {name: categories[name] for name in CATEGORIES},
+    }
+    check.update(
+        content_hash=content_hash,
+        state={"hashes": hashes, "parts": parts, "inputs": inputs},
+        result=result,
+    )
+    if previous is None:
+        check.update(status=RUN_BASELINE, changed=True)
+    else:
+        check["diff"] = diff_results(previous, result)
+        check["changed"] = check["diff"]["changed"]
+        check["status"] = RUN_CHANGED if content_hash != monitor["content_hash"] or check["changed"] else RUN_UNCHANGED
+    return check
+
+
+class SEOMonitorScheduler:
+    """Workers asyncio que checam as URLs vencidas, com limite global e por host"""
+
+    def __init__(
+        self,
+        path: str = SEO_MONITOR_DB_PATH,
+        concurrency: int = SEO_MONITOR_CONCURRENCY,
+        per_host: int = SEO_MONITOR_PER_HOST,
+    ):
+        self.store = SQLiteMonitorStore(path)
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.hosts = HostLimiter(per_host)
+        # Banco em arquivo pode ser compartilhado por outros processos
+        self._lock_path = None if path == ":memory:" else f"{path}.lock"
+        self._lock_file: Any = None
+        self.leader = False
+        self._wakeup = asyncio.Event()
+        # Reservas por host feitas no claim (antes de o worker entrar no slot)
+        self._claiming = asyncio.Lock()
+        self._claimed: Dict[str, int] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        self.counters = {status: 0 for status in RUN_STATUSES}
+        self.counters.update(parsed_parts=0, rescored_categories=0, postponed=0)
+        # Contagens do SQLite atualizadas por refresh_stats (stats() roda no event loop)
+        self._counts = {"monitors": 0, "due": 0}
+
+    async def start(self) -> None:
+        if self._acquire_scheduler():
+            self._lead()
+        else:
+            logger.info("Monitoramento SEO executado por outro worker; este aguarda o lock")
+            self._tasks = [asyncio.create_task(self._standby())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._lock_file is not None:
+            # Fechar o arquivo solta o lock (outro worker assume as checagens)
+            self._lock_file.close()
+            self._lock_file = None
+        self.leader = False
+        self.store.close()
+
+    def _acquire_scheduler(self) -> bool:
+        """Lock exclusivo (sem esperar) no arquivo ao lado do SQLite"""
+        if self._lock_path is None or fcntl is None:
+            return True
+        lock_file = open(self._lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _lead(self) -> None:
+        self.leader = True
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def _standby(self) -> None:
+        """Tenta pegar o lock de tempos em tempos (o dono pode ter morrido)"""
+        while not self._acquire_scheduler():
+            await asyncio.sleep(SEO_MONITOR_POLL_INTERVAL)
+        logger.info("Monitoramento SEO assumido por este worker")
+        self._lead()
+
+    async def add(self, urls: List[str], interval: float = SEO_MONITOR_INTERVAL, check_now: bool = False) -> Dict[str, Any]:
+        """
+        Cadastra as URLs. A primeira checagem é sorteada dentro do intervalo
+        (check_now: assim que houver vaga, para ter o resultado de referência logo).
+        """
+        created, ids = await asyncio.to_thread(self.store.upsert, urls, interval, 0 if check_now else interval)
+        self._notify()
+        return {"created": created, "updated": len(set(ids)) - created, "ids": ids}
+
+    async def get(self, id_: str, runs: int = 10) -> Dict[str, Any]:
+        monitor = await asyncio.to_thread(self.store.monitor, id_, runs)
+        if monitor is None:
+            raise MonitorNotFoundError(f"Monitoramento {id_} não encontrado")
+        return monitor
+
+    async def remove(self, id_: str) -> None:
+        if not await asyncio.to_thread(self.store.delete, id_):
+            raise MonitorNotFoundError(f"Monitoramento {id_} não encontrado")
+
+    def _notify(self) -> None:
+        """Acorda os workers ociosos (URL nova ou vaga de host liberada)"""
+        event, self._wakeup = self._wakeup, asyncio.Event()
+        event.set()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Um claim por vez: o host é reservado antes de o próximo worker escolher,
+        senão dois workers pegam o mesmo host e um fica parado no slot.
+        """
+        async with self._claiming:
+            busy = [host for host, claimed in self._claimed.items() if claimed >= self.per_host]
+            monitor = await asyncio.to_thread(self.store.claim, busy)
+            if monitor is not None:
+                self._claimed[monitor["host"]] = self._claimed.get(monitor["host"], 0) + 1
+            return monitor
+
+    async def _worker(self) -> None:
+        while True:
+            wakeup = self._wakeup
+            monitor = await self._claim()
+            if monitor is None:
+                await self._idle(wakeup)
+                continue
+            host = monitor["host"]
+            try:
+                async with self.hosts.slot(host):
+                    await self._check(monitor)
+            finally:
+                self._claimed[host] -= 1
+                if not self._claimed[host]:
+                    del self._claimed[host]
+                # Vaga do host liberada: URLs do mesmo host podem ser checadas
+                self._notify()
+
+    async def _idle(self, wakeup: asyncio.Event) -> None:
+        """Espera a próxima URL vencer, uma URL nova ou uma vaga de host"""
+        due = await asyncio.to_thread(self.store.next_due)
+        timeout = None if due is None else max(0.0, due - time.time())
+        if timeout == 0.0 or self._lock_path is not None:
+            # Vencidas presas no limite por host (ou URLs cadastradas por outros workers)
+            timeout = SEO_MONITOR_POLL_INTERVAL if timeout in (None, 0.0) else min(timeout, SEO_MONITOR_POLL_INTERVAL)
+        # asyncio.timeout e não wait_for: no 3.11, wait_for engole um cancel que chega
+        # junto com o wakeup e o worker nunca sai (stop() fica preso no gather)
+        try:
+            async with asyncio.timeout(timeout):
+                await wakeup.wait()
+        except TimeoutError:
+            pass
+
+    async def _check(self, monitor: Dict[str, Any]) -> None:
+        from services.persistence import record_seo_audit
+
+        started = time.perf_counter()
+        try:
+            check = await check_page(monitor)
+        except PoolSaturatedError:
+            # Auditorias interativas têm prioridade: tentar de novo em instantes
+            self.counters["postponed"] += 1
+            await asyncio.to_thread(self.store.reschedule, monitor["id"], time.time() + random.uniform(5, 15))
+            return
+        except Exception as e:
+            failures = monitor["failures"] + 1
+            logger.warning(f"Monitoramento de {monitor['url']} falhou ({failures}x): {e}")
+            check = {"status": RUN_ERROR, "error": f"{type(e).__name__}: {str(e)}"}
+            next_check_at = time.time() + retry_delay(failures, monitor["interval"])
+        else:
+            next_check_at = time.time() + next_check(monitor["interval"])
+            self.counters["parsed_parts"] += len(check["parsed"])
+            self.counters["rescored_categories"] += len(check["rescored"])
+            if check["changed"]:
+                # Nova auditoria no histórico (seo_audits), quando a persistência está ligada
+                await record_seo_audit(monitor["url"], check["result"])
+        check["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self.counters[check["status"]] += 1
+        await asyncio.to_thread(self.store.save_check, monitor["id"], check, next_check_at)
+
+    async def refresh_stats(self) -> None:
+        """Atualiza as contagens do SQLite usadas em stats() (numa thread)"""
+        monitors, due = await asyncio.to_thread(lambda: (self.store.count(), self.store.due_count()))
+        self._counts = {"monitors": monitors, "due": due}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leader": self.leader,
+            "concurrency": self.concurrency,
+            "per_host": self.per_host,
+            "monitors": self._counts["monitors"],
+            "due": self._counts["due"],
+            "checking": self.hosts.in_use(),
+            "checks": {status: self.counters[status] for status in RUN_STATUSES},
+            "parsed_parts": self.counters["parsed_parts"],
+            "rescored_categories": self.counters["rescored_categories"],
+            "postponed": self.counters["postponed"],
+        }
+
+
+_scheduler: Optional[SEOMonitorScheduler] = None
+
+
+async def start_seo_monitor() -> SEOMonitorScheduler:
+    """Abre o SQLite e inicia os workers (chamado no lifespan do FastAPI)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SEOMonitorScheduler()
+        await _scheduler.start()
+    return _scheduler
+
+
+async def stop_seo_monitor() -> None:
+    """Para os workers; checagens interrompidas voltam para a fila quando a reserva expira"""
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+    _scheduler = None
+
+
+def get_seo_monitor() -> SEOMonitorScheduler:
+    if _scheduler is None:
+        raise RuntimeError("Monitoramento SEO não iniciado")
+    return _scheduler
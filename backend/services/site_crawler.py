@@ -0,0 +1,255 @@
+"""
+Crawl de site: auditoria SEO de várias páginas a partir de uma URL semente
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set
+from urllib.parse import urljoin, urlsplit
+
+from services.analysis_pool import PoolSaturatedError
+from services.page_fetcher import fetch_page
+from services.seo_analyzer import analyze_response
+from services.urls import normalize_url
+
+logger = logging.getLogger(__name__)
+
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "500"))
+
+# Extensões que não são páginas HTML (não vale a pena baixar)
+_SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".css", ".js",
+    ".zip", ".gz", ".mp4", ".mp3", ".woff", ".woff2", ".xml", ".json",
+)
+_POOL_RETRIES = 5
+
+
+class BloomFilter:
+    """Conjunto aproximado de URLs visitadas para sites grandes (memória fixa)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+@dataclass(slots=True)
+class _FrontierItem:
+    url: str
+    depth: int
+
+
+class SiteCrawler:
+    """
+    Fronteira em largura (BFS) com deduplicação por URL normalizada,
+    limites de profundidade/páginas e fetch concorrente limitado.
+    """
+
+    def __init__(
+        self,
+        seed_url: str,
+        max_depth: int = 2,
+        max_pages: int = 50,
+        concurrency: int = 4,
+        include_technical: bool = True,
+        include_content: bool = True,
+        include_performance: bool = True,
+        use_bloom_filter: bool = False,
+    ):
+        self.seed_url = seed_url
+        self.host = (urlsplit(seed_url).hostname or "").lower()
+        self.max_depth = max_depth
+        self.max_pages = min(max_pages, CRAWL_MAX_PAGES)
+        self.concurrency = concurrency
+        self.options = {
+            "include_technical": include_technical,
+            "include_content": include_content,
+            "include_performance": include_performance,
+        }
+        self.visited = BloomFilter(self.max_pages * 50) if use_bloom_filter else set()
+        self.frontier: Deque[_FrontierItem] = deque()
+        self.scheduled = 0
+        self.pages: List[Dict[str, Any]] = []
+        self.inbound: Dict[str, Set[str]] = defaultdict(set)
+
+    def _is_internal(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return (
+            parts.scheme in ("http", "https")
+            and (parts.hostname or "").lower() == self.host
+            and not parts.path.lower().endswith(_SKIP_EXTENSIONS)
+        )
+
+    def _enqueue(self, url: str, depth: int) -> None:
+        key = normalize_url(url)
+        if key in self.visited or self.scheduled >= self.max_pages:
+            return
+        self.visited.add(key)
+        self.scheduled += 1
+        # Buscar a forma normalizada (sem fragmento, host em minúsculas)
+        self.frontier.append(_FrontierItem(key, depth))
+
+    async def _analyze(self, url: str) -> Dict[str, Any]:
+        page = await fetch_page(url)
+        for attempt in range(_POOL_RETRIES):
+            try:
+                return await analyze_response(url, page, with_page_info=True, **self.options)
+            except PoolSaturatedError:
+                await asyncio.sleep(0.5 * (attempt + 1))
+        raise PoolSaturatedError("Pool de análise saturado")
+
+    async def _visit(self, item: _FrontierItem) -> None:
+        try:
+            result = await self._analyze(item.url)
+        except Exception as e:
+            self.pages.append({"url": item.url, "depth": item.depth, "error": str(e)})
+            return
+
+        page = result.pop("page")
+        final_url = result["url"]
+        source = normalize_url(final_url)
+        # Redirect: a URL final também conta como visitada
+        if source not in self.visited:
+            self.visited.add(source)
+
+        invalid_links: List[str] = []
+        for href in page["links"]:
+            try:
+                target = urljoin(final_url, href.strip())
+                if not self._is_internal(target):
+                    continue
+                target_key = normalize_url(target)
+            except ValueError:
+                # href malformado (ex.: "http://[bad", porta > 65535): registra e segue
+                invalid_links.append(href)
+                continue
+            if target_key != source:
+                self.inbound[target_key].add(source)
+            if item.depth < self.max_depth:
+                self._enqueue(target, item.depth + 1)
+
+        self.pages.append({
+            **result,
+            "requested_url": item.url,
+            "depth": item.depth,
+            "title": page["title"],
+            "meta_description": page["meta_description"],
+            "h1_count": page["h1_count"],
+            "invalid_links": invalid_links,
+        })
+
+    async def crawl(self, extra_urls: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Executa o crawl; extra_urls (ex.: do sitemap) entram na fronteira com profundidade 0"""
+        started = time.perf_counter()
+        self._enqueue(self.seed_url, 0)
+        for url in extra_urls or []:
+            try:
+                if self._is_internal(url):
+                    self._enqueue(url, 0)
+            except ValueError:
+                logger.warning(f"URL inválida do sitemap ignorada no crawl: {url}")
+
+        running: Set["asyncio.Task[None]"] = set()
+        try:
+            while self.frontier or running:
+                while self.frontier and len(running) < self.concurrency:
+                    running.add(asyncio.create_task(self._visit(self.frontier.popleft())))
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        finally:
+            # Erro inesperado (ou crawl cancelado): não deixar visitas rodando soltas
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return {
+            "seed_url": self.seed_url,
+            "pages": self.pages,
+            "site": self._site_metrics(),
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+
+    def _site_metrics(self) -> Dict[str, Any]:
+        analyzed = [page for page in self.pages if "error" not in page]
+        seed_key = normalize_url(self.seed_url)
+
+        titles: Dict[str, List[str]] = defaultdict(list)
+        descriptions: Dict[str, List[str]] = defaultdict(list)
+        h1_distribution: Counter = Counter()
+        orphans: List[str] = []
+
+        for page in analyzed:
+            if page["title"]:
+                titles[page["title"]].append(page["url"])
+            if page["meta_description"]:
+                descriptions[page["meta_description"]].append(page["url"])
+            h1_distribution["2+" if page["h1_count"] >= 2 else str(page["h1_count"])] += 1
+
+            key = normalize_url(page["url"])
+            requested_key = normalize_url(page["requested_url"])
+            page["inbound_links"] = len(self.inbound.get(key, set()) | self.inbound.get(requested_key, set()))
+            if page["inbound_links"] == 0 and seed_key not in (key, requested_key):
+                orphans.append(page["url"])
+
+        scores = [page["overall_score"] for page in analyzed]
+        return {
+            "pages_crawled": len(analyzed),
+            "pages_failed": len(self.pages) - len(analyzed),
+            "site_score": round(sum(scores) / len(scores)) if scores else 0,
+            "duplicate_titles": {title: urls for title, urls in titles.items() if len(urls) > 1},
+            "duplicate_descriptions": {desc: urls for desc, urls in descriptions.items() if len(urls) > 1},
+            "missing_titles": sum(1 for page in analyzed if not page["title"]),
+            "missing_descriptions": sum(1 for page in analyzed if not page["meta_description"]),
+            "invalid_links": sum(len(page["invalid_links"]) for page in analyzed),
+            "orphan_pages": orphans,
+            "h1_distribution": {key: h1_distribution.get(key, 0) for key in ("0", "1", "2+")},
+        }
+
+
+async def crawl_site(
+    seed_url: str,
+    max_depth: int = 2,
+    max_pages: int = 50,
+    concurrency: int = 4,
+    include_technical: bool = True,
+    include_content: bool = True,
+    include_performance: bool = True,
+    use_bloom_filter: bool = False,
+    extra_urls: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Audita o site a partir da URL semente seguindo os links internos
+    """
+    crawler = SiteCrawler(
+        seed_url,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        concurrency=concurrency,
+        include_technical=include_technical,
+        include_content=include_content,
+        include_performance=include_performance,
+        use_bloom_filter=use_bloom_filter,
+    )
+    logger.info(f"Iniciando crawl de {seed_url} (profundidade {max_depth}, até {crawler.max_pages} páginas)")
+    return await crawler.crawl(extra_urls)
@@ -0,0 +1,227 @@
+"""
+Aquecimento do worker e estado de prontidão (liveness/readiness)
+
+Os endpoints importam os serviços sob demanda e o lxml, o NumPy e o SDK da
+OpenAI só carregavam no primeiro uso: as primeiras requisições depois de um
+deploy (ou de um worker novo) pagavam os imports, o spawn dos processos do
+pool de análise e a criação dos clientes. warm_up() faz isso no lifespan,
+antes de o worker aceitar conexões:
+- importa os módulos dos serviços (também chamado no master do gunicorn, com
+  preload, para os workers já nascerem com eles carregados)
+- roda o parser e os analisadores num documento de exemplo no próprio processo
+- manda o mesmo documento para cada worker do pool de análise, que sobe os
+  processos e importa o lxml dentro deles
+
+/health/ready responde 503 até o aquecimento terminar e 200 depois. Uma etapa
+que falha não tira o worker do tráfego (só deixa a primeira chamada mais
+lenta): o status fica "degraded" e a etapa é tentada de novo em segundo plano
+até passar. /health/live só diz que o processo responde. No desligamento,
+o uvicorn para de aceitar conexões antes do lifespan terminar, então o
+readiness não tem como avisar o balanceador: ele percebe a porta fechada.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.metrics import gauge
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+# Espera máxima pelo aquecimento do pool de análise (segundos)
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
+# Intervalo entre novas tentativas das etapas que falharam (dobra a cada falha, até 10x)
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "15"))
+
+# Serviços usados pelos endpoints (importados sob demanda em main.py)
+SERVICE_MODULES = (
+    "services.http_client",
+    "services.page_fetcher",
+    "services.analysis_pool",
+    "services.html_features",
+    "services.markdown_features",
+    "services.seo_analyzer",
+    "services.seo_cache",
+    "services.seo_batch",
+    "services.site_crawler",
+    "services.roi_calculator",
+    "services.roi_simulation",
+    "services.llm_client",
+    "services.content_generator",
+    "services.content_cache",
+    "services.content_jobs",
+    "services.seo_monitor",
+    "openai",
+)
+
+_SAMPLE_URL = "https://warmup.orbeelabs.com/"
+_SAMPLE_HTML = b"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Marketing digital para pequenas empresas</title>
+<meta name="description" content="Como atrair clientes com SEO, conteudo e anuncios.">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<link rel="canonical" href="https://warmup.orbeelabs.com/">
+<link rel="stylesheet" href="/static/site.css">
+<script src="/static/app.js" defer></script>
+</head>
+<body>
+<h1>Marketing digital para pequenas empresas</h1>
+<p>SEO, conteudo e anuncios trabalham juntos para atrair clientes.</p>
+<h2>SEO local</h2>
+<p>Palavras-chave, links internos e <a href="/contato">chamadas para acao</a>.</p>
+<img src="/static/capa.webp" alt="Equipe de marketing">
+</body>
+</html>
+"""
+_SAMPLE_MARKDOWN = "# Marketing digital\n\nSEO e conteúdo para atrair clientes.\n\n## SEO local\n\nPalavras-chave."
+
+STARTUP_SECONDS = gauge("orbee_startup_seconds", "Duração de cada etapa do aquecimento do worker", ("step",))
+READY = gauge("orbee_ready", "1 quando o worker está pronto para receber tráfego")
+
+# errors: etapa -> última falha (some quando a etapa passa numa nova tentativa)
+_state: Dict[str, Any] = {"ready": False, "steps": {}, "errors": {}, "retries": 0}
+_retry_task: Optional["asyncio.Task[None]"] = None
+
+
+def import_services() -> float:
+    """Importa os módulos dos serviços; devolve a duração (s)"""
+    started = time.perf_counter()
+    for module in SERVICE_MODULES:
+        importlib.import_module(module)
+    return time.perf_counter() - started
+
+
+def prime_parser() -> Dict[str, Any]:
+    """Parsing e scoring de um documento de exemplo (também usado nos workers do pool)"""
+    from services.seo_analyzer import score_content, score_document
+
+    scored = score_document(_SAMPLE_HTML, "utf-8", _SAMPLE_URL, True, True, True, True)
+    score_content(_SAMPLE_MARKDOWN, ["marketing digital"])
+    return scored
+
+
+async def prime_analysis_pool() -> int:
+    """Um documento por worker do pool: sobe os processos e importa o parser em cada um"""
+    from services.analysis_pool import pool_stats, run_in_pool
+
+    stats = pool_stats()
+    if stats["executor"] == "inline":
+        return 0
+    workers = min(stats["workers"], stats["max_pending"])
+    await asyncio.gather(*(run_in_pool(prime_parser) for _ in range(workers)))
+    return workers
+
+
+async def _prime_parser_step() -> None:
+    prime_parser()
+
+
+async def _prime_analysis_pool_step() -> None:
+    await asyncio.wait_for(prime_analysis_pool(), WARMUP_TIMEOUT)
+
+
+# Etapas que podem falhar (e ser tentadas de novo), na ordem do aquecimento
+WARMUP_STEPS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "parser": _prime_parser_step,
+    "analysis_pool": _prime_analysis_pool_step,
+}
+
+
+async def _run_step(step: str) -> bool:
+    """Roda uma etapa; a falha fica em _state["errors"] até uma tentativa passar"""
+    try:
+        await WARMUP_STEPS[step]()
+    except Exception as e:
+        _state["errors"][step] = f"{type(e).__name__}: {e}"
+        logger.warning(f"Falha no aquecimento ({step}): {e}")
+        return False
+    _state["errors"].pop(step, None)
+    return True
+
+
+async def _retry_failed() -> None:
+    """Tenta de novo as etapas que falharam, com espera crescente, até todas passarem"""
+    delay = WARMUP_RETRY_INTERVAL
+    while _state["errors"]:
+        await asyncio.sleep(delay)
+        _state["retries"] += 1
+        for step in list(_state["errors"]):
+            if await _run_step(step):
+                logger.info(f"Etapa do aquecimento recuperada ({step})")
+        delay = min(delay * 2, WARMUP_RETRY_INTERVAL * 10)
+
+
+async def warm_up() -> Dict[str, float]:
+    """
+    Aquecimento do worker (chamado no lifespan, depois de criar os clientes);
+    falhas não impedem a subida e as etapas que falharam são tentadas de novo
+    em segundo plano
+    """
+    global _retry_task
+
+    _state.update(steps={}, errors={}, retries=0)
+    if not WARMUP_ENABLED:
+        mark_ready()
+        return {}
+
+    steps: Dict[str, float] = _state["steps"]
+    steps["imports"] = import_services()
+    for step in WARMUP_STEPS:
+        started = time.perf_counter()
+        await _run_step(step)
+        steps[step] = time.perf_counter() - started
+
+    for step, seconds in steps.items():
+        STARTUP_SECONDS.labels(step).set(seconds)
+    detail = ", ".join(f"{step}={seconds:.2f}s" for step, seconds in steps.items())
+    logger.info(f"Worker aquecido em {sum(steps.values()):.2f}s ({detail})")
+    if _state["errors"]:
+        _retry_task = asyncio.create_task(_retry_failed())
+    mark_ready()
+    return steps
+
+
+async def stop_warm_up() -> None:
+    """Cancela as novas tentativas pendentes (chamado no desligamento)"""
+    global _retry_task
+
+    if _retry_task is not None:
+        _retry_task.cancel()
+        try:
+            await _retry_task
+        except asyncio.CancelledError:
+            pass
+        _retry_task = None
+
+
+def mark_ready() -> None:
+    _state["ready"] = True
+    READY.set(1)
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Estado de prontidão do worker (para o /health/ready): pronto depois do
+    aquecimento, "degraded" enquanto alguma etapa ainda não passou
+    """
+    ready = _state["ready"]
+    if not ready:
+        status = "starting"
+    elif _state["errors"]:
+        status = "degraded"
+    else:
+        status = "ready"
+    return {
+        "ready": ready,
+        "status": status,
+        "pid": os.getpid(),
+        "warmup": {step: round(seconds, 4) for step, seconds in _state["steps"].items()},
+        "errors": [f"{step}: {error}" for step, error in _state["errors"].items()],
+        "retries": _state["retries"],
+    }
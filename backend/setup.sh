@@ -35,7 +35,7 @@ echo "✅ Setup concluído!"
 echo ""
 echo "📝 Próximos passos:"
 echo "1. Ative o ambiente virtual: source venv/bin/activate"
-echo "2. Execute o servidor: uvicorn main:app --reload --port 8000"
+echo "2. Execute o servidor: uvicorn main:app --reload --port 8000 (produção: gunicorn main:app -c gunicorn.conf.py)"
 echo "3. Acesse a documentação: http://localhost:8000/docs"
 echo ""
 
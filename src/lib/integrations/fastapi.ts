@@ -15,6 +15,50 @@ interface FastAPIOptions {
   endpoint: string;
   method?: 'GET' | 'POST';
   body?: Record<string, unknown> | unknown[];
+  /** Identidade do chamador para o rate limit do backend (ex.: id do usuário) */
+  clientId?: string;
+}
+
+/**
+ * Erro do FastAPI; em 429 (rate limit) e 503 (backend ocupado) traz o Retry-After em segundos
+ */
+export class FastAPIError extends Error {
+  status: number;
+  retryAfter?: number;
+
+  constructor(message: string, status: number, retryAfter?: number) {
+    super(message);
+    this.name = 'FastAPIError';
+    this.status = status;
+    this.retryAfter = retryAfter;
+  }
+}
+
+/**
+ * Headers comuns; o X-Client-Id (ex.: session.user.id) separa o rate limit de cada usuário no backend
+ */
+function fastAPIHeaders(clientId?: string): Record<string, string> {
+  if (!FASTAPI_SECRET) {
+    throw new Error('FASTAPI_SECRET não configurado');
+  }
+  return {
+    'Content-Type': 'application/json',
+    'X-API-Secret': FASTAPI_SECRET,
+    ...(clientId ? { 'X-Client-Id': clientId } : {}),
+  };
+}
+
+/**
+ * FastAPIError a partir de uma resposta de erro (detail do corpo e Retry-After)
+ */
+async function fastAPIError(response: Response): Promise<FastAPIError> {
+  const error = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+  const retryAfter = Number(response.headers.get('Retry-After')) || undefined;
+  return new FastAPIError(
+    error.detail || `Erro ${response.status}: ${response.statusText}`,
+    response.status,
+    retryAfter,
+  );
 }
 
 /**
@@ -24,24 +68,17 @@ export async function callFastAPI<T = unknown>({
   endpoint,
   method = 'POST',
   body,
+  clientId,
 }: FastAPIOptions): Promise<T> {
-  if (!FASTAPI_SECRET) {
-    throw new Error('FASTAPI_SECRET não configurado');
-  }
-
   const url = `${FASTAPI_URL}${endpoint}`;
   const response = await fetch(url, {
     method,
-    headers: {
-      'Content-Type': 'application/json',
-      'X-API-Secret': FASTAPI_SECRET,
-    },
+    headers: fastAPIHeaders(clientId),
     body: body ? JSON.stringify(body) : undefined,
   });
 
   if (!response.ok) {
-    const error = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
-    throw new Error(error.detail || `Erro ${response.status}: ${response.statusText}`);
+    throw await fastAPIError(response);
   }
 
   return response.json();
@@ -54,31 +91,151 @@ export async function analyzeSEOWithFastAPI(url: string, options?: {
   include_technical?: boolean;
   include_content?: boolean;
   include_performance?: boolean;
-}) {
+  include_resources?: boolean;
+}, clientId?: string) {
   return callFastAPI({
     endpoint: '/api/v1/analyze-seo',
+    clientId,
     body: {
       url,
       include_technical: options?.include_technical ?? true,
       include_content: options?.include_content ?? true,
       include_performance: options?.include_performance ?? true,
+      include_resources: options?.include_resources ?? false,
     },
   });
 }
 
+export type SEOBatchRecord =
+  | { type: 'result'; index: number; url: string; cache: string; result: Record<string, unknown> }
+  | { type: 'error'; index: number; url: string; error: string }
+  | { type: 'summary'; total: number; ok: number; errors: number; elapsed_s: number };
+
+/**
+ * Análise SEO em lote via FastAPI
+ *
+ * O backend responde em NDJSON; cada registro é entregue assim que a URL
+ * correspondente termina, sem esperar o lote inteiro.
+ */
+export async function* analyzeSEOBatchWithFastAPI(data: {
+  urls?: string[];
+  sitemap_url?: string;
+  include_technical?: boolean;
+  include_content?: boolean;
+  include_performance?: boolean;
+  include_resources?: boolean;
+  concurrency?: number;
+  per_host_concurrency?: number;
+}, clientId?: string): AsyncGenerator<SEOBatchRecord> {
+  const response = await fetch(`${FASTAPI_URL}/api/v1/analyze-seo/batch`, {
+    method: 'POST',
+    headers: fastAPIHeaders(clientId),
+    body: JSON.stringify(data),
+  });
+
+  if (!response.ok || !response.body) {
+    throw await fastAPIError(response);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    let newline = buffer.indexOf('\n');
+    while (newline >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) {
+        yield JSON.parse(line) as SEOBatchRecord;
+      }
+      newline = buffer.indexOf('\n');
+    }
+
+    if (done) {
+      if (buffer.trim()) {
+        yield JSON.parse(buffer) as SEOBatchRecord;
+      }
+      return;
+    }
+  }
+}
+
 /**
  * Cálculo ROI via FastAPI
  */
-export async function calculateROIWithFastAPI(data: {
+export async function calculateROIWithFastAPI(data: ROIScenario, clientId?: string) {
+  return callFastAPI({
+    endpoint: '/api/v1/calculate-roi',
+    clientId,
+    body: data,
+  });
+}
+
+/**
+ * Receita constante (receita_mensal), com crescimento/sazonalidade,
+ * ou série explícita (receitas_mensais, um valor por mês do período)
+ */
+export type ROIScenario = {
   investimento_inicial: number;
   investimento_mensal?: number;
-  receita_mensal: number;
+  receita_mensal?: number;
   custo_operacional?: number;
   periodo_meses?: number;
   taxa_desconto?: number;
-}) {
+  crescimento_mensal?: number;
+  sazonalidade?: number[];
+  receitas_mensais?: number[];
+};
+
+/**
+ * Cálculo ROI em lote via FastAPI
+ *
+ * Informe `scenarios` ou `base` + `grid` (ex.: { receita_mensal: [...], taxa_desconto: [...] }).
+ * A resposta é colunar: `resultados.npv[i]` é o VPL do cenário i.
+ */
+export async function calculateROIBatchWithFastAPI(data: {
+  scenarios?: ROIScenario[];
+  base?: ROIScenario;
+  grid?: Partial<Record<Exclude<keyof ROIScenario, 'sazonalidade' | 'receitas_mensais'>, number[]>>;
+  summary_only?: boolean;
+}, clientId?: string) {
   return callFastAPI({
-    endpoint: '/api/v1/calculate-roi',
+    endpoint: '/api/v1/calculate-roi/batch',
+    clientId,
+    body: data,
+  });
+}
+
+export type ROIDistribution =
+  | { tipo: 'normal'; media: number; desvio: number; min?: number; max?: number }
+  | { tipo: 'lognormal'; media: number; desvio: number; min?: number; max?: number }
+  | { tipo: 'uniforme'; min: number; max: number }
+  | { tipo: 'triangular'; min: number; moda: number; max: number };
+
+type ROISimulationParameter = number | ROIDistribution;
+
+/**
+ * Simulação Monte Carlo de ROI via FastAPI (percentis de VPL, ROI e payback)
+ */
+export async function simulateROIWithFastAPI(data: {
+  investimento_inicial: ROISimulationParameter;
+  investimento_mensal?: ROISimulationParameter;
+  receita_mensal: ROISimulationParameter;
+  custo_operacional?: ROISimulationParameter;
+  periodo_meses?: number;
+  taxa_desconto?: ROISimulationParameter;
+  churn_mensal?: ROISimulationParameter;
+  rampa_meses?: ROISimulationParameter;
+  simulacoes?: number;
+  seed?: number;
+}, clientId?: string) {
+  return callFastAPI({
+    endpoint: '/api/v1/calculate-roi/simulate',
+    clientId,
     body: data,
   });
 }
@@ -93,9 +250,12 @@ export async function generateContentWithFastAPI(data: {
   length?: string;
   keywords?: string[];
   target_audience?: string;
-}) {
+  use_cache?: boolean;
+  include_seo_score?: boolean;
+}, clientId?: string) {
   return callFastAPI({
     endpoint: '/api/v1/generate-content',
+    clientId,
     body: {
       topic: data.topic,
       content_type: data.content_type || 'blog_post',
@@ -103,16 +263,184 @@ export async function generateContentWithFastAPI(data: {
       length: data.length || 'medium',
       keywords: data.keywords || [],
       target_audience: data.target_audience,
+      use_cache: data.use_cache ?? true,
+      include_seo_score: data.include_seo_score ?? false,
     },
   });
 }
 
+export type ContentSEOScore = {
+  overall_score: number;
+  format: 'markdown' | 'html';
+  word_count: number;
+  categories: {
+    content: { score: number; issues: string[] };
+    headings: { score: number; issues: string[]; counts: Record<string, number> };
+    keywords?: {
+      score: number;
+      issues: string[];
+      coverage: number;
+      keywords: Array<{ keyword: string; occurrences: number; density: number }>;
+    };
+  };
+};
+
+/**
+ * Score SEO de um texto (Markdown ou HTML) sem URL
+ */
+export async function scoreContentWithFastAPI(data: { content: string; keywords?: string[] }, clientId?: string) {
+  return callFastAPI<ContentSEOScore>({
+    endpoint: '/api/v1/score-content',
+    clientId,
+    body: data,
+  });
+}
+
+export type ContentStreamEvent =
+  | { event: 'token'; data: { content: string } }
+  | { event: 'done'; data: Record<string, unknown> & { word_count: number; generated_with_ai: boolean; cached: boolean; ttfb_ms: number | null } }
+  | { event: 'error'; data: { detail: string } };
+
+/**
+ * Geração de conteúdo em streaming (SSE) via FastAPI
+ *
+ * Entrega cada pedaço de texto ("token") assim que chega; o evento "done"
+ * traz os mesmos metadados de generateContentWithFastAPI.
+ */
+export async function* streamContentWithFastAPI(data: {
+  topic: string;
+  content_type?: string;
+  tone?: string;
+  length?: string;
+  keywords?: string[];
+  target_audience?: string;
+  use_cache?: boolean;
+  include_seo_score?: boolean;
+}, clientId?: string): AsyncGenerator<ContentStreamEvent> {
+  const response = await fetch(`${FASTAPI_URL}/api/v1/generate-content/stream`, {
+    method: 'POST',
+    headers: fastAPIHeaders(clientId),
+    body: JSON.stringify({
+      topic: data.topic,
+      content_type: data.content_type || 'blog_post',
+      tone: data.tone || 'professional',
+      length: data.length || 'medium',
+      keywords: data.keywords || [],
+      target_audience: data.target_audience,
+      use_cache: data.use_cache ?? true,
+      include_seo_score: data.include_seo_score ?? false,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw await fastAPIError(response);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+
+    // Eventos SSE terminam com uma linha em branco
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let payload = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) payload += line.slice(6);
+      }
+      if (payload) {
+        yield { event, data: JSON.parse(payload) } as ContentStreamEvent;
+      }
+      boundary = buffer.indexOf('\n\n');
+    }
+
+    if (done) {
+      return;
+    }
+  }
+}
+
+export type ContentGenerationItem = {
+  topic: string;
+  content_type?: string;
+  tone?: string;
+  length?: string;
+  keywords?: string[];
+  target_audience?: string;
+  use_cache?: boolean;
+  include_seo_score?: boolean;
+};
+
+export type ContentJob = {
+  id: string;
+  status: 'queued' | 'running' | 'completed';
+  total: number;
+  succeeded: number;
+  failed: number;
+  created_at: number;
+  started_at: number | null;
+  finished_at: number | null;
+  items: Record<'pending' | 'running' | 'done' | 'failed', number>;
+};
+
+export type ContentJobPage = ContentJob & {
+  results: Array<{
+    index: number;
+    status: 'pending' | 'running' | 'done' | 'failed';
+    attempts: number;
+    result: (Record<string, unknown> & { content: string }) | null;
+    error: string | null;
+  }>;
+  pagination: { offset: number; limit: number; total: number; next_offset: number | null };
+};
+
+/**
+ * Geração de conteúdo em lote: cria o job e retorna o id na hora
+ */
+export async function createContentJobWithFastAPI(data: {
+  items: ContentGenerationItem[];
+  system_prompt?: string;
+}, clientId?: string) {
+  return callFastAPI<ContentJob>({
+    endpoint: '/api/v1/content-jobs',
+    clientId,
+    body: data,
+  });
+}
+
+/**
+ * Status de um job de conteúdo e uma página de resultados
+ */
+export async function getContentJobWithFastAPI(
+  jobId: string,
+  options?: { offset?: number; limit?: number; status?: 'pending' | 'running' | 'done' | 'failed' },
+  clientId?: string
+) {
+  const params = new URLSearchParams();
+  if (options?.offset !== undefined) params.set('offset', String(options.offset));
+  if (options?.limit !== undefined) params.set('limit', String(options.limit));
+  if (options?.status) params.set('status', options.status);
+  const query = params.toString();
+  return callFastAPI<ContentJobPage>({
+    endpoint: `/api/v1/content-jobs/${encodeURIComponent(jobId)}${query ? `?${query}` : ''}`,
+    method: 'GET',
+    clientId,
+  });
+}
+
 /**
- * Health check do FastAPI
+ * Health check do FastAPI (readiness: worker aquecido; "degraded" também responde 200)
  */
 export async function checkFastAPIHealth(): Promise<boolean> {
   try {
-    const response = await fetch(`${FASTAPI_URL}/health`);
+    const response = await fetch(`${FASTAPI_URL}/health/ready`);
     return response.ok;
   } catch {
     return false;